@@ -0,0 +1,133 @@
+"""
+Сколько запросов к Bot API уходит на полный сценарий заявки — с редактированием экранов и без.
+
+    python -m benchmarks.api_calls_per_flow
+
+Реальные роутеры проекта, заглушка API из tests/fake_telegram.py (без сети), временная БД.
+Сравнивается NAV_EDIT_MESSAGES=1 (edit_message_text на inline-переходах) и 0 (новое сообщение на каждый шаг).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import tempfile
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from aiogram import Dispatcher
+
+from bot import config
+from bot.callback_index import CallbackIndex
+from bot.constants.portfolio import PORTFOLIO_MEDIA_FILE_IDS
+from bot.db.repository import init_db, seed_portfolio_media
+from bot.handlers import ROUTERS, include_routers
+from bot.services.portfolio_media import portfolio_media_store
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+PHOTO = [{"file_id": "AgAD", "file_unique_id": "u1", "width": 800, "height": 600}]
+
+
+async def restoration_from_services(chat: ChatDriver) -> None:
+    await chat.send("🧩 Услуги")
+    await chat.press("services:open:2")
+    await chat.press("services:apply:2")
+    await chat.press("rest:photo")
+    await chat.send("Убрать царапины")
+    await chat.send(photo=PHOTO)
+    await chat.send(photo=PHOTO)
+    await chat.press("files:done")
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+
+
+async def neuro_from_catalog(chat: ChatDriver) -> None:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:1")
+    await chat.press("neuro:step1_done")
+    await chat.press("neuro:step2_done")
+    await chat.send("Деловой стиль")
+    await chat.press("deadline:urgent")
+    await chat.send("✅ Использовать мой @username")
+    await chat.press("lead:send")
+
+
+async def content_with_back_and_custom_deadline(chat: ChatDriver) -> None:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:4")
+    await chat.send("Посты для Telegram")
+    await chat.press("deadline:urgent")
+    await chat.send("⬅️ Назад")
+    await chat.press("deadline:custom")
+    await chat.send("к пятнице")
+    await chat.send("📞 Указать телефон")
+    await chat.send("+79001234567")
+    await chat.press("lead:back")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+
+
+async def photo_stories_from_portfolio(chat: ChatDriver) -> None:
+    await chat.send("🖼 Примеры работ")
+    await chat.press("portfolio:open:3")  # примеров 3D нет -> экран со списком
+    await chat.press("portfolio:open:5")
+    await chat.press("portfolio:apply:5")
+    await chat.send("Ролик к юбилею")
+    await chat.press("deadline:not_urgent")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+
+
+async def model3d_from_catalog(chat: ChatDriver) -> None:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:3")
+    await chat.press("model3d:next")
+    await chat.send(photo=PHOTO, caption="Фигурка кота")
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+
+
+FLOWS: dict[str, Callable[[ChatDriver], Awaitable[None]]] = {
+    "restoration (услуги -> карточка)": restoration_from_services,
+    "neuro (каталог)": neuro_from_catalog,
+    "content (назад, свой срок)": content_with_back_and_custom_deadline,
+    "photo_stories (примеры работ)": photo_stories_from_portfolio,
+    "model3d (каталог)": model3d_from_catalog,
+}
+
+
+async def _count(dp: Dispatcher, flow: Callable[[ChatDriver], Awaitable[None]]) -> tuple[int, int, int]:
+    bot, session = fake_bot()
+    await dp.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+    await flow(ChatDriver(dp, bot, session))
+    calls = session.calls
+    # answerCallbackQuery обязателен в обоих режимах, считаем отдельно
+    sent = sum(n for method, n in calls.items() if method.startswith("send"))
+    return sum(calls.values()), sent, calls["editMessageText"]
+
+
+async def main() -> None:
+    dp = Dispatcher()
+    include_routers(dp, {spec.name for spec in ROUTERS})
+    dp.callback_query.outer_middleware(CallbackIndex.build(dp))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        await init_db(db_path)
+        # как в run_bot: портфолио из констант, чтобы альбомы были непустыми
+        await seed_portfolio_media(db_path, PORTFOLIO_MEDIA_FILE_IDS)
+        await portfolio_media_store.load(db_path)
+        base = config.Settings(bot_token="42:TEST", admin_tg_id=777, db_path=db_path)
+
+        print(f"{'flow':<36} {'mode':<6} {'API calls':>9} {'new msgs':>9} {'edits':>6}")
+        for name, flow in FLOWS.items():
+            for edit in (False, True):
+                config.configure(dataclasses.replace(base, nav_edit_messages=edit))
+                total, sent, edits = await _count(dp, flow)
+                print(f"{name:<36} {'edit' if edit else 'send':<6} {total:>9} {sent:>9} {edits:>6}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Стоимость маршрутизации одного callback_query в зависимости от числа хэндлеров.
+
+    python -m benchmarks.callback_dispatch [--updates 2000]
+
+plain   — обычные фильтры F.data == "...": aiogram перебирает роутеры и хэндлеры по порядку;
+indexed — те же хэндлеры с CallbackRoute + CallbackIndex: один dict lookup по (namespace, action).
+Нажимается кнопка последнего хэндлера (худший случай для последовательного перебора).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import time
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from bot.callback_index import CallbackIndex
+from bot.filters.callback import CallbackRoute
+
+HANDLERS_PER_ROUTER = 8
+SIZES = (8, 32, 128, 512)
+
+
+def _build(total: int, *, indexed: bool) -> Dispatcher:
+    dp = Dispatcher()
+    for r in range(max(1, total // HANDLERS_PER_ROUTER)):
+        router = Router(name=f"r{r}")
+        for h in range(HANDLERS_PER_ROUTER):
+            data_filter = CallbackRoute(f"ns{r}", f"a{h}") if indexed else F.data == f"ns{r}:a{h}"
+
+            async def handler(call: CallbackQuery) -> None:
+                return None
+
+            router.callback_query.register(handler, data_filter)
+        dp.include_router(router)
+    if indexed:
+        dp.callback_query.outer_middleware(CallbackIndex.build(dp))
+    return dp
+
+
+def _update(update_id: int, data: str) -> Update:
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=User(id=1, is_bot=False, first_name="U"),
+            chat_instance="c",
+            data=data,
+            message=Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private")),
+        ),
+    )
+
+
+async def _measure(dp: Dispatcher, bot: Bot, data: str, updates: int) -> float:
+    batch = [_update(i, data) for i in range(updates)]
+    started = time.perf_counter()
+    for update in batch:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / updates * 1e6
+
+
+async def main(updates: int) -> None:
+    bot = Bot("42:TEST")
+    print(f"{'handlers':>8} {'plain, µs':>10} {'indexed, µs':>12} {'speedup':>8}")
+    for total in SIZES:
+        routers = max(1, total // HANDLERS_PER_ROUTER)
+        last = f"ns{routers - 1}:a{HANDLERS_PER_ROUTER - 1}"
+        plain = await _measure(_build(total, indexed=False), bot, last, updates)
+        indexed = await _measure(_build(total, indexed=True), bot, last, updates)
+        print(f"{total:>8} {plain:>10.1f} {indexed:>12.1f} {plain / indexed:>7.1f}x")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().updates))
@@ -0,0 +1,49 @@
+"""
+Разбор контакта из заявки: normalize_contact на каждый ввод на шаге контакта.
+
+    python -m benchmarks.contact_normalize [--repeat 20000]
+
+По строке на тип ввода: телефоны в разной записи, @username, ссылки t.me, email, ссылки
+и мусор, который проходит все шаблоны и отклоняется (худший случай).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from bot.utils.contacts import normalize_contact
+
+SAMPLES: dict[str, str] = {
+    "phone +7": "+7 (900) 123-45-67",
+    "phone 8": "8 900 123 45 67",
+    "phone intl 00": "0049 30 1234567",
+    "@username": "@Some_User_Name",
+    "t.me link": "https://t.me/some_user_name",
+    "email": "Ivan.Petrov@Example.COM",
+    "url": "https://www.behance.net/someone/projects",
+    "garbage short": "позвоните",
+    "garbage long": "напишите мне в любой мессенджер, я обычно на связи вечером " * 4,
+}
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(repeat: int) -> None:
+    print(f"{'input':<16} {'type':<9} {'µs':>7}")
+    for name, text in SAMPLES.items():
+        contact = normalize_contact(text)
+        took = _measure(lambda: normalize_contact(text), repeat)
+        print(f"{name:<16} {contact.type if contact else '—':<9} {took:>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20000)
+    main(parser.parse_args().repeat)
@@ -0,0 +1,98 @@
+"""
+Сводка /stats: счётчики lead_stats_daily против полного прохода по leads.
+
+    python -m benchmarks.lead_stats [--repeat 20]
+
+scan     — GROUP BY по leads с проверкой lead_files на каждую заявку (как считали бы без счётчиков);
+counters — services.stats.load_stats: диапазон по первичному ключу lead_stats_daily.
+Заявки за последний год, сводка за 30 дней; время на одну сводку.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from bot.constants.deadlines import DEADLINE_LABELS
+from bot.constants.services import SERVICES
+from bot.db.models import LEAD_STATS_KEY_SQL
+from bot.db.repository import init_db, rebuild_lead_stats
+from bot.db.storage import SqliteLeadStorage, configure_storage
+from bot.services.stats import load_stats
+
+SIZES = (1_000, 10_000, 100_000)
+TODAY = date(2026, 10, 19)
+
+SCAN_SQL = f"""
+SELECT {LEAD_STATS_KEY_SQL}, EXISTS (SELECT 1 FROM lead_files f WHERE f.lead_id = leads.id), count(*)
+FROM leads WHERE created_at >= ? GROUP BY 1, 2, 3, 4
+"""
+
+
+def _fill(db_path: Path, n: int) -> None:
+    rng = random.Random(n)
+    deadlines = [*DEADLINE_LABELS.values(), "к пятнице"]
+    leads = [
+        (
+            f"{TODAY - timedelta(days=rng.randrange(365))}T12:00:00+00:00",
+            0,
+            "U",
+            rng.choice(SERVICES),
+            "t" * 200,
+            rng.choice(deadlines),
+            "—",
+            "{}",
+        )
+        for _ in range(n)
+    ]
+    with sqlite3.connect(db_path) as db:
+        db.executemany(
+            "INSERT INTO leads (created_at, tg_user_id, tg_full_name, service, task, deadline, contact, extra_json) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            leads,
+        )
+        db.execute(
+            "INSERT INTO lead_files (lead_id, file_type, file_id) SELECT id, 'photo', 'F' FROM leads WHERE id % 3 = 0"
+        )
+
+
+def _scan(db_path: Path, since: str) -> list[tuple]:
+    with closing(sqlite3.connect(db_path)) as db:
+        return db.execute(SCAN_SQL, (since,)).fetchall()
+
+
+async def _measure(fn: Callable[[], Awaitable[object]], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+async def main(repeat: int) -> None:
+    since = f"{TODAY - timedelta(days=29)}"
+    print(f"{'leads':>8} {'scan, ms':>9} {'counters, ms':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            db_path = Path(tmp) / f"bench-{n}.db"
+            await init_db(db_path)
+            _fill(db_path, n)
+            await rebuild_lead_stats(db_path)
+            configure_storage(SqliteLeadStorage(db_path))
+
+            scan_ms = await _measure(lambda: asyncio.to_thread(_scan, db_path, since), repeat)
+            counters_ms = await _measure(lambda: load_stats(30, today=TODAY), repeat)
+            print(f"{n:>8} {scan_ms:>9.2f} {counters_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args().repeat))
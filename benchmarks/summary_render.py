@@ -0,0 +1,54 @@
+"""
+Стоимость сборки экрана «Проверь заявку» для задач разной длины (до лимита Telegram 4096).
+
+    python -m benchmarks.summary_render [--repeat 20000]
+
+cold — без кэша фрагментов: экранирование и сборка всех строк (первый показ, правка поля);
+warm — повторный показ без правок (возврат «Назад»): фрагменты берутся из FSM data.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.services.summary import SUMMARY_CACHE_KEY, render_summary
+
+SIZES = (64, 512, 2048, 4000)
+
+
+def _data(task_len: int) -> dict:
+    # немного разметки-подобных символов: худший случай для экранирования
+    chunk = "Нужно <сделать> ролик & музыку; "
+    return {
+        "service": SERVICE_ID_TO_TITLE["photo_stories"],
+        "service_id": "photo_stories",
+        "task": (chunk * (task_len // len(chunk) + 1))[:task_len],
+        "deadline_key": "week",
+        "contact": "@user",
+        "files": [{"file_type": "photo", "file_id": f"id{i}"} for i in range(10)],
+    }
+
+
+def _measure(data: dict, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render_summary(data)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(repeat: int) -> None:
+    print(f"{'task chars':>10} {'cold, µs':>9} {'warm, µs':>9} {'speedup':>8}")
+    for size in SIZES:
+        data = _data(size)
+        _, cache = render_summary(data)
+        cold = _measure(data, repeat)
+        warm = _measure({**data, SUMMARY_CACHE_KEY: cache}, repeat)
+        print(f"{size:>10} {cold:>9.2f} {warm:>9.2f} {cold / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20000)
+    main(parser.parse_args().repeat)
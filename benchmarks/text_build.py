@@ -0,0 +1,69 @@
+"""
+Экранирование и деление исходящих текстов на сообщения по 4096.
+
+    python -m benchmarks.text_build [--repeat 2000]
+
+escape — варианты экранирования пользовательского ввода (текст задачи до 4000 символов):
+replace-цепочка (utils.text.escape_html), str.translate и re.sub — оба последних за один проход.
+split  — utils.text.split_html для уведомления админу разной длины.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import re
+import time
+from typing import Callable
+
+from bot.services.leads import format_admin_message
+from bot.utils.text import escape_html, split_html
+
+_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_SPECIAL = re.compile("[&<>]")
+_ENTITIES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+
+ESCAPERS: dict[str, Callable[[str], str]] = {
+    "escape_html": escape_html,
+    "html.escape": lambda s: html.escape(s, quote=False),
+    "translate": lambda s: s.translate(_TABLE),
+    "re.sub": lambda s: _SPECIAL.sub(lambda m: _ENTITIES[m.group()], s),
+}
+
+
+def _task(size: int, special: bool) -> str:
+    chunk = "Нужно <сделать> ролик & музыку; " if special else "Нужно сделать ролик и музыку; "
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(repeat: int) -> None:
+    print(f"{'escape, 4000 chars':<20} {'plain, µs':>10} {'<&>, µs':>10}")
+    plain, special = _task(4000, False), _task(4000, True)
+    for name, escaper in ESCAPERS.items():
+        p = _measure(lambda: escaper(plain), repeat)
+        s = _measure(lambda: escaper(special), repeat)
+        print(f"{name:<20} {p:>10.1f} {s:>10.1f}")
+
+    print(f"\n{'split, task chars':<20} {'text chars':>10} {'parts':>6} {'µs':>8}")
+    files = [{"file_type": "photo", "file_id": "AgACAgIAAxkBAAICKmlEE" + str(i) * 40} for i in range(10)]
+    for size in (500, 4000, 20000):
+        text = format_admin_message(
+            {"tg_full_name": "Иван", "service": "x", "task": _task(size, True).replace("; ", ";\n"), "contact": "@u"},
+            files,
+        )
+        parts = len(split_html(text))
+        took = _measure(lambda: split_html(text), repeat)
+        print(f"{size:<20} {len(text):>10} {parts:>6} {took:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    main(parser.parse_args().repeat)
@@ -1,29 +1,124 @@
 from __future__ import annotations
 
+from functools import partial
+
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
-from bot.config import BOT_TOKEN, DB_PATH
-from bot.db.repository import init_db
-from bot.handlers import lead_flow, pages, portfolio, services, start
-from bot.handlers.debug_file_id import router as debug_file_id_router
+from bot.callback_index import CallbackIndex
+from bot.config import Settings, configure, get_settings
+from bot.constants.portfolio import PORTFOLIO_MEDIA_FILE_IDS
+from bot.db.repository import checkpoint_wal, init_db, optimize_db, seed_portfolio_media
+from bot.db.storage import configure_storage, open_storage
+from bot.handlers import include_routers
+from bot.lifecycle import Lifecycle
+from bot.services.content import content_store
+from bot.scheduler import CronTrigger, Scheduler, scheduler
+from bot.services.backup import db_backups
+from bot.services.drafts import draft_tracker, remind_idle_drafts
+from bot.services.media_check import validate_known_media
+from bot.services.retention import archive_old_leads
+from bot.services.portfolio_media import NEURO_EXAMPLES_KEY, portfolio_media_store
+from bot.services.routing import load_routing
+from bot.texts.neuro import NEURO_EXAMPLE_PHOTO_FILE_IDS
+
+
+def schedule_jobs(scheduler: Scheduler, bot: Bot, settings: Settings) -> list[str]:
+    """Регистрирует периодические задачи по настройкам. Возвращает имена задач."""
+    # проверка file_id медиа: при старте и далее каждые MEDIA_CHECK_INTERVAL_S
+    scheduler.add_interval(
+        "media_validation",
+        partial(validate_known_media, bot, settings.admin_tg_id),
+        settings.media_check_interval_s,
+        run_at_start=True,
+    )
+    if settings.draft_reminder_after_s > 0:
+        scheduler.add_interval(
+            "draft_reminders",
+            partial(remind_idle_drafts, bot, settings.db_path, idle_s=settings.draft_reminder_after_s),
+            settings.draft_check_interval_s,
+        )
+    if settings.db_optimize_cron:
+        scheduler.add_cron(
+            "db_optimize", partial(optimize_db, settings.db_path), settings.db_optimize_cron, jitter_s=300
+        )
+    if settings.wal_checkpoint_interval_s > 0:
+        scheduler.add_interval(
+            "wal_checkpoint", partial(checkpoint_wal, settings.db_path), settings.wal_checkpoint_interval_s, jitter_s=30
+        )
+    if settings.backup_dir is not None:
+        # без BACKUP_CRON — только по команде /backup (через run_now: не пересекается с другим запуском)
+        scheduler.add(
+            "db_backup",
+            partial(
+                db_backups.run,
+                settings.db_path,
+                settings.backup_dir,
+                keep=settings.backup_keep,
+                compress=settings.backup_gzip,
+            ),
+            CronTrigger(settings.backup_cron) if settings.backup_cron else None,
+            jitter_s=300,
+        )
+    if settings.retention_days > 0:
+        scheduler.add_cron(
+            "retention",
+            partial(
+                archive_old_leads,
+                settings.archive_dir,
+                older_than_days=settings.retention_days,
+                fmt=settings.archive_format,
+                anonymize=settings.retention_anonymize,
+            ),
+            settings.retention_cron,
+            jitter_s=300,
+        )
+    return list(scheduler.jobs)
 
 
-async def run_bot() -> None:
+async def run_bot(settings: Settings | None = None) -> None:
+    settings = configure(settings) if settings is not None else get_settings()
+
     # aiogram>=3.7: parse_mode через DefaultBotProperties
-    bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot = Bot(token=settings.bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
     dp = Dispatcher()
+    lifecycle = Lifecycle()
+    # учёт обработчиков в работе: при остановке дожидаемся их (lead_send и т.п.)
+    dp.update.outer_middleware(lifecycle.middleware())
+
+    # тексты и клавиатуры страниц: собираются и проверяются (HTML) один раз, ошибка — бот не стартует
+    content_store.load(settings.content_path)
+
+    # init DB before polling (SPEC): локальная SQLite бота, затем хранилище заявок по DB_URL (она же или PostgreSQL)
+    await init_db(settings.db_path)
+    storage = configure_storage(open_storage(settings))
+    await storage.init()
+    lifecycle.on_close("storage", storage.close)
+    # portfolio_media: первичное наполнение из констант + прогрев кэша
+    await seed_portfolio_media(
+        settings.db_path, {**PORTFOLIO_MEDIA_FILE_IDS, NEURO_EXAMPLES_KEY: NEURO_EXAMPLE_PHOTO_FILE_IDS}
+    )
+    await portfolio_media_store.load(settings.db_path)
+    # правила маршрутизации заявок по админам: lead_routes (если заданы командой /routes) или LEAD_ROUTING
+    await load_routing(settings.db_path, settings.lead_routing, settings.admin_ids)
 
-    # init DB before polling (SPEC)
-    await init_db(DB_PATH)
+    # routers: декларативный список в bot/handlers/__init__.py, модули импортируются здесь
+    include_routers(dp, settings.optional_routers)
+    # callback_query: (namespace, action) -> хэндлер без перебора роутеров, остальное — обычным путём
+    dp.callback_query.outer_middleware(CallbackIndex.build(dp))
+    if settings.draft_reminder_after_s > 0:
+        # черновики заявок: FSM сценария пишется в lead_drafts после каждого апдейта; outer на update —
+        # чтобы покрыть и быстрый путь CallbackIndex (inner-middleware он не вызывает)
+        dp.update.outer_middleware(draft_tracker.middleware())
 
-    # routers
-    dp.include_router(start.router)
-    dp.include_router(pages.router)
-    dp.include_router(services.router)
-    dp.include_router(portfolio.router)
-    dp.include_router(lead_flow.router)
-    dp.include_router(debug_file_id_router)
+    # периодические задачи — одной фоновой задачей: при остановке отменяются вместе с текущими запусками
+    schedule_jobs(scheduler, bot, settings)
+    lifecycle.start_background("scheduler", scheduler.run())
+    lifecycle.on_close("bot_session", bot.session.close)
 
-    await dp.start_polling(bot)
+    try:
+        # SIGTERM/SIGINT останавливают polling (aiogram); сессию закрываем сами — после drain
+        await dp.start_polling(bot, close_bot_session=False)
+    finally:
+        await lifecycle.shutdown(settings.drain_timeout_s)
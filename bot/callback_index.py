@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import CallbackQuery, TelegramObject
+
+from bot.filters.callback import CALLBACK_ROUTE_FLAG, parse_callback
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, eq=False)
+class IndexedHandler:
+    # порядковый номер в обычном порядке обхода роутеров aiogram
+    position: int
+    router: Router
+    handler: HandlerObject
+
+    @property
+    def name(self) -> str:
+        return getattr(self.handler.callback, "__name__", repr(self.handler.callback))
+
+
+class CallbackIndex(BaseMiddleware):
+    """
+    Быстрый путь для callback_query: (namespace, action) -> хэндлеры одним dict lookup.
+
+    Индексируются хэндлеры с фильтром CallbackRoute. Кандидаты по ключу проверяются в том же
+    порядке, что и при обычном обходе (включая фильтры роутеров и остальные фильтры хэндлера:
+    состояние FSM и т.п.). Если ни один не подошёл или ключа нет — обычная маршрутизация aiogram.
+
+    Собирается один раз после подключения роутеров:
+        dp.callback_query.outer_middleware(CallbackIndex.build(dp))
+    """
+
+    def __init__(self, root: Router, entries: list[tuple[str, frozenset[str] | None, IndexedHandler]]) -> None:
+        self.root = root
+        by_namespace: dict[str, list[IndexedHandler]] = {}
+        by_action: dict[tuple[str, str], list[IndexedHandler]] = {}
+        for namespace, actions, entry in entries:
+            if actions is None:
+                by_namespace.setdefault(namespace, []).append(entry)
+            else:
+                for action in actions:
+                    by_action.setdefault((namespace, action), []).append(entry)
+
+        # хэндлеры "весь namespace" участвуют в каждом конкретном ключе — в порядке регистрации
+        self._by_namespace = {ns: sorted(items, key=_position) for ns, items in by_namespace.items()}
+        self._by_action = {
+            key: sorted({*items, *by_namespace.get(key[0], ())}, key=_position) for key, items in by_action.items()
+        }
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def build(cls, root: Router) -> CallbackIndex:
+        entries: list[tuple[str, frozenset[str] | None, IndexedHandler]] = []
+        skipped: list[str] = []
+        position = 0
+        for router in _walk(root):
+            observer = router.callback_query
+            for handler in observer.handlers:
+                position += 1
+                routes = handler.flags.get(CALLBACK_ROUTE_FLAG)
+                if not routes:
+                    continue
+                entry = IndexedHandler(position, router, handler)
+                if _has_inner_middlewares(router):
+                    # inner-middleware роутера быстрый путь не вызывает — такой хэндлер только обычным путём
+                    skipped.append(entry.name)
+                    continue
+                for namespace, actions in routes:
+                    entries.append((namespace, actions, entry))
+        if skipped:
+            logger.info("callback index: skipped handlers with inner middlewares: %s", ", ".join(skipped))
+        return cls(root, entries)
+
+    def candidates(self, data: str | None) -> list[IndexedHandler]:
+        namespace, action, _ = parse_callback(data)
+        found = self._by_action.get((namespace, action))
+        if found is None:
+            found = self._by_namespace.get(namespace, [])
+        return found
+
+    async def _dispatch(self, event: CallbackQuery, data: dict[str, Any]) -> Any:
+        for entry in self.candidates(event.data):
+            kwargs = dict(data)
+            passed = True
+            for router in reversed(tuple(entry.router.chain_head)):
+                passed, kwargs = await router.callback_query.check_root_filters(event, **kwargs)
+                if not passed:
+                    break
+            if not passed:
+                continue
+
+            kwargs.update(event_router=entry.router, handler=entry.handler)
+            passed, kwargs = await entry.handler.check(event, **kwargs)
+            if not passed:
+                continue
+            try:
+                return await entry.handler.call(event, **kwargs)
+            except SkipHandler:
+                continue
+        return UNHANDLED
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, CallbackQuery):
+            result = await self._dispatch(event, data)
+            if result is not UNHANDLED:
+                self.hits += 1
+                return result
+            self.misses += 1
+        return await handler(event, data)
+
+
+def _position(entry: IndexedHandler) -> int:
+    return entry.position
+
+
+def _walk(router: Router):
+    # тот же порядок, что и Router.propagate_event: сначала свои хэндлеры, потом вложенные роутеры
+    yield router
+    for sub in router.sub_routers:
+        yield from _walk(sub)
+
+
+def _has_inner_middlewares(router: Router) -> bool:
+    return any(len(r.callback_query.middleware) for r in router.chain_head)
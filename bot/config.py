@@ -1,24 +1,226 @@
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Mapping
 
-from dotenv import load_dotenv
+# Конфиг читается явно (load_settings/get_settings), а не при импорте модуля:
+# bot.* можно импортировать в тестах и утилитах без .env и BOT_TOKEN.
 
-# Загружаем .env как можно раньше
-load_dotenv()
+DEFAULT_DB_PATH = "data/bot.db"
+# Хранилище заявок (bot/db/storage.py): пустой DB_URL — SQLite DB_PATH, postgresql://... — PostgreSQL с пулом
+DEFAULT_DB_POOL_SIZE = 10
+POSTGRES_URL_SCHEMES = ("postgresql://", "postgres://")
+DEFAULT_MEDIA_CHECK_INTERVAL_S = 21600
+# Сколько ждать обработчики в работе при остановке (меньше типичного grace period 30 с)
+DEFAULT_DRAIN_TIMEOUT_S = 25
+# Необязательные роутеры (см. bot/handlers/__init__.py), включённые по умолчанию
+DEFAULT_OPTIONAL_ROUTERS = "admin_leads,relay,admin_portfolio,admin_content,admin_jobs,debug_file_id"
+# Навигация по inline-кнопкам: редактировать сообщение вместо отправки нового
+DEFAULT_NAV_EDIT_MESSAGES = True
+# Напоминание о брошенной заявке: через сколько секунд простоя (0 — выключено) и как часто проверять
+DEFAULT_DRAFT_REMINDER_AFTER_S = 3600
+DEFAULT_DRAFT_CHECK_INTERVAL_S = 300
+# Обслуживание БД (bot/scheduler.py): PRAGMA optimize по cron (UTC; пусто — выключено), wal_checkpoint (0 — выключено)
+DEFAULT_DB_OPTIMIZE_CRON = "15 4 * * *"
+DEFAULT_WAL_CHECKPOINT_INTERVAL_S = 900
+# Бэкапы БД (bot/services/backup.py): каталог (пусто — выключены), расписание (пусто — только /backup), поколения
+DEFAULT_BACKUP_DIR = "data/backups"
+DEFAULT_BACKUP_CRON = "30 3 * * *"
+DEFAULT_BACKUP_KEEP = 7
+DEFAULT_BACKUP_GZIP = True
+# Хранение заявок (bot/services/retention.py): старше RETENTION_DAYS — в помесячный архив (0 — не переносить)
+DEFAULT_RETENTION_DAYS = 0
+DEFAULT_RETENTION_CRON = "0 5 * * *"
+DEFAULT_ARCHIVE_DIR = "data/archive"
+DEFAULT_ARCHIVE_FORMAT = "sqlite"
+DEFAULT_RETENTION_ANONYMIZE = False
+# Кнопки статуса заявки у админа: править уведомление на месте вместо нового сообщения
+DEFAULT_ADMIN_EDIT_NOTIFICATIONS = True
 
-BOT_TOKEN: str = os.getenv("BOT_TOKEN", "").strip()
-if not BOT_TOKEN:
-    raise RuntimeError("BOT_TOKEN is missing in environment (.env)")
 
-_admin_raw = os.getenv("ADMIN_TG_ID", "").strip()
-if not _admin_raw:
-    raise RuntimeError("ADMIN_TG_ID is missing in environment (.env)")
-try:
-    ADMIN_TG_ID: int = int(_admin_raw)
-except ValueError as e:
-    raise RuntimeError("ADMIN_TG_ID must be an integer") from e
+@dataclass(frozen=True)
+class Settings:
+    bot_token: str
+    admin_tg_id: int
+    db_path: Path = Path(DEFAULT_DB_PATH)
+    # "" — заявки в SQLite db_path; postgresql://... — в PostgreSQL (локальное состояние бота остаётся в db_path)
+    db_url: str = ""
+    db_pool_size: int = DEFAULT_DB_POOL_SIZE
+    media_check_interval_s: int = DEFAULT_MEDIA_CHECK_INTERVAL_S
+    drain_timeout_s: int = DEFAULT_DRAIN_TIMEOUT_S
+    optional_routers: frozenset[str] = frozenset(DEFAULT_OPTIONAL_ROUTERS.split(","))
+    nav_edit_messages: bool = DEFAULT_NAV_EDIT_MESSAGES
+    admin_edit_notifications: bool = DEFAULT_ADMIN_EDIT_NOTIFICATIONS
+    # JSON {page: text} с заменами текстов из bot/texts (bot/services/content.py), None — без замен
+    content_path: Path | None = None
+    # дополнительные админы (ADMIN_IDS) — кнопки заявок, переписка, получение заявок по правилам
+    extra_admin_ids: frozenset[int] = frozenset()
+    # правила маршрутизации заявок (bot/services/routing.py); пусто — каждая заявка всем админам
+    lead_routing: str = ""
+    draft_reminder_after_s: int = DEFAULT_DRAFT_REMINDER_AFTER_S
+    draft_check_interval_s: int = DEFAULT_DRAFT_CHECK_INTERVAL_S
+    db_optimize_cron: str = DEFAULT_DB_OPTIMIZE_CRON
+    wal_checkpoint_interval_s: int = DEFAULT_WAL_CHECKPOINT_INTERVAL_S
+    # None — бэкапы выключены
+    backup_dir: Path | None = Path(DEFAULT_BACKUP_DIR)
+    backup_cron: str = DEFAULT_BACKUP_CRON
+    backup_keep: int = DEFAULT_BACKUP_KEEP
+    backup_gzip: bool = DEFAULT_BACKUP_GZIP
+    retention_days: int = DEFAULT_RETENTION_DAYS
+    retention_cron: str = DEFAULT_RETENTION_CRON
+    archive_dir: Path = Path(DEFAULT_ARCHIVE_DIR)
+    # sqlite — leads-YYYY-MM.db, jsonl — leads-YYYY-MM.jsonl.gz
+    archive_format: str = DEFAULT_ARCHIVE_FORMAT
+    retention_anonymize: bool = DEFAULT_RETENTION_ANONYMIZE
 
-_db_raw = os.getenv("DB_PATH", "data/bot.db").strip() or "data/bot.db"
-DB_PATH: Path = Path(_db_raw)
+    @property
+    def admin_ids(self) -> frozenset[int]:
+        return self.extra_admin_ids | {self.admin_tg_id}
+
+
+def _int_env(env: Mapping[str, str], name: str, default: int) -> int:
+    raw = (env.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError as e:
+        raise RuntimeError(f"{name} must be an integer") from e
+
+
+def _int_list_env(env: Mapping[str, str], name: str) -> frozenset[int]:
+    raw = (env.get(name) or "").strip()
+    try:
+        return frozenset(int(part) for part in raw.split(",") if part.strip())
+    except ValueError as e:
+        raise RuntimeError(f"{name} must be a comma-separated list of integers") from e
+
+
+def _bool_env(env: Mapping[str, str], name: str, default: bool) -> bool:
+    raw = (env.get(name) or "").strip().lower()
+    if not raw:
+        return default
+    if raw in {"1", "true", "yes", "on"}:
+        return True
+    if raw in {"0", "false", "no", "off"}:
+        return False
+    raise RuntimeError(f"{name} must be a boolean (1/0, true/false)")
+
+
+def _cron_env(env: Mapping[str, str], name: str, default: str) -> str:
+    raw = env.get(name)
+    spec = default if raw is None else raw.strip()
+    if spec:
+        from bot.scheduler import CronTrigger, ScheduleError
+
+        try:
+            CronTrigger(spec)
+        except ScheduleError as e:
+            raise RuntimeError(f"{name}: {e}") from e
+    return spec
+
+
+def load_settings(env: Mapping[str, str] | None = None) -> Settings:
+    """
+    Собирает Settings из окружения. Без env — сначала подгружает .env (python-dotenv).
+    Ошибки конфигурации — RuntimeError с именем переменной.
+    """
+    if env is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        env = os.environ
+
+    bot_token = (env.get("BOT_TOKEN") or "").strip()
+    if not bot_token:
+        raise RuntimeError("BOT_TOKEN is missing in environment (.env)")
+
+    if not (env.get("ADMIN_TG_ID") or "").strip():
+        raise RuntimeError("ADMIN_TG_ID is missing in environment (.env)")
+    admin_tg_id = _int_env(env, "ADMIN_TG_ID", 0)
+
+    db_raw = (env.get("DB_PATH") or "").strip() or DEFAULT_DB_PATH
+    db_url = (env.get("DB_URL") or "").strip()
+    if db_url.startswith("sqlite:///"):
+        # sqlite:///path — то же, что DB_PATH=path
+        db_raw, db_url = db_url.removeprefix("sqlite:///"), ""
+    elif db_url and not db_url.startswith(POSTGRES_URL_SCHEMES):
+        raise RuntimeError("DB_URL must be sqlite:///path or postgresql://...")
+    db_pool_size = _int_env(env, "DB_POOL_SIZE", DEFAULT_DB_POOL_SIZE)
+    if db_pool_size < 1:
+        raise RuntimeError("DB_POOL_SIZE must be at least 1")
+
+    content_raw = (env.get("CONTENT_PATH") or "").strip()
+
+    extra_admin_ids = _int_list_env(env, "ADMIN_IDS")
+    lead_routing = (env.get("LEAD_ROUTING") or "").strip()
+    if lead_routing:
+        from bot.services.routing import RoutingError, check_admins, parse_rules
+
+        try:
+            check_admins(parse_rules(lead_routing), extra_admin_ids | {admin_tg_id})
+        except RoutingError as e:
+            raise RuntimeError(f"LEAD_ROUTING: {e}") from e
+
+    backup_raw = env.get("BACKUP_DIR")
+    backup_raw = DEFAULT_BACKUP_DIR if backup_raw is None else backup_raw.strip()
+    backup_keep = _int_env(env, "BACKUP_KEEP", DEFAULT_BACKUP_KEEP)
+    if backup_keep < 1:
+        raise RuntimeError("BACKUP_KEEP must be at least 1")
+
+    archive_format = (env.get("ARCHIVE_FORMAT") or "").strip().lower() or DEFAULT_ARCHIVE_FORMAT
+    if archive_format not in {"sqlite", "jsonl"}:
+        raise RuntimeError("ARCHIVE_FORMAT must be sqlite or jsonl")
+
+    routers_raw = env.get("OPTIONAL_ROUTERS")
+    if routers_raw is None:
+        routers_raw = DEFAULT_OPTIONAL_ROUTERS
+    optional_routers = frozenset(r.strip() for r in routers_raw.split(",") if r.strip())
+
+    return Settings(
+        bot_token=bot_token,
+        admin_tg_id=admin_tg_id,
+        db_path=Path(db_raw),
+        db_url=db_url,
+        db_pool_size=db_pool_size,
+        media_check_interval_s=_int_env(env, "MEDIA_CHECK_INTERVAL_S", DEFAULT_MEDIA_CHECK_INTERVAL_S),
+        drain_timeout_s=_int_env(env, "DRAIN_TIMEOUT_S", DEFAULT_DRAIN_TIMEOUT_S),
+        optional_routers=optional_routers,
+        nav_edit_messages=_bool_env(env, "NAV_EDIT_MESSAGES", DEFAULT_NAV_EDIT_MESSAGES),
+        admin_edit_notifications=_bool_env(env, "ADMIN_EDIT_NOTIFICATIONS", DEFAULT_ADMIN_EDIT_NOTIFICATIONS),
+        content_path=Path(content_raw) if content_raw else None,
+        extra_admin_ids=extra_admin_ids,
+        lead_routing=lead_routing,
+        draft_reminder_after_s=_int_env(env, "DRAFT_REMINDER_AFTER_S", DEFAULT_DRAFT_REMINDER_AFTER_S),
+        draft_check_interval_s=_int_env(env, "DRAFT_CHECK_INTERVAL_S", DEFAULT_DRAFT_CHECK_INTERVAL_S),
+        db_optimize_cron=_cron_env(env, "DB_OPTIMIZE_CRON", DEFAULT_DB_OPTIMIZE_CRON),
+        wal_checkpoint_interval_s=_int_env(env, "WAL_CHECKPOINT_INTERVAL_S", DEFAULT_WAL_CHECKPOINT_INTERVAL_S),
+        backup_dir=Path(backup_raw) if backup_raw else None,
+        backup_cron=_cron_env(env, "BACKUP_CRON", DEFAULT_BACKUP_CRON),
+        backup_keep=backup_keep,
+        backup_gzip=_bool_env(env, "BACKUP_GZIP", DEFAULT_BACKUP_GZIP),
+        retention_days=_int_env(env, "RETENTION_DAYS", DEFAULT_RETENTION_DAYS),
+        retention_cron=_cron_env(env, "RETENTION_CRON", DEFAULT_RETENTION_CRON) or DEFAULT_RETENTION_CRON,
+        archive_dir=Path((env.get("ARCHIVE_DIR") or "").strip() or DEFAULT_ARCHIVE_DIR),
+        archive_format=archive_format,
+        retention_anonymize=_bool_env(env, "RETENTION_ANONYMIZE", DEFAULT_RETENTION_ANONYMIZE),
+    )
+
+
+_settings: Settings | None = None
+
+
+def configure(settings: Settings) -> Settings:
+    """Устанавливает активные настройки процесса (run_bot, тесты)."""
+    global _settings
+    _settings = settings
+    return settings
+
+
+def get_settings() -> Settings:
+    """Активные настройки; при первом обращении — загрузка из окружения."""
+    if _settings is None:
+        return configure(load_settings())
+    return _settings
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+# Срок заявки: ключ из deadline_kb -> текст в leads.deadline; custom — свой текст пользователя.
+DEADLINE_CUSTOM = "custom"
+
+DEADLINE_LABELS: dict[str, str] = {
+    "urgent": "Срочно",
+    "week": "В течение недели",
+    "not_urgent": "Не срочно",
+}
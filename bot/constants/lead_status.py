@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+# Статусы заявки (leads.status). Открытые — new и in_progress: по ним частичные индексы.
+STATUS_NEW = "new"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_DONE = "done"
+STATUS_REJECTED = "rejected"
+
+OPEN_STATUSES: tuple[str, ...] = (STATUS_NEW, STATUS_IN_PROGRESS)
+
+STATUS_LABELS: dict[str, str] = {
+    STATUS_NEW: "🆕 Новая",
+    STATUS_IN_PROGRESS: "🙋 В работе",
+    STATUS_DONE: "✅ Выполнена",
+    STATUS_REJECTED: "❌ Отклонена",
+}
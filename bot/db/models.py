@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from bot.constants.deadlines import DEADLINE_CUSTOM, DEADLINE_LABELS
+from bot.constants.lead_status import OPEN_STATUSES, STATUS_IN_PROGRESS, STATUS_NEW
+
 LEADS_TABLE = "leads"
 LEAD_FILES_TABLE = "lead_files"
+LEAD_STATUS_HISTORY_TABLE = "lead_status_history"
 
 LEADS_COLUMNS: tuple[str, ...] = (
     "id",
@@ -15,8 +19,16 @@ LEADS_COLUMNS: tuple[str, ...] = (
     "budget",
     "contact",
     "extra_json",
+    "submit_token",
+    "status",
+    "assigned_to",
+    "status_changed_at",
+    "contact_type",
 )
 
+# Краткая строка заявки: кнопки статуса, /leads, переписка
+LEAD_BRIEF_COLUMNS_SQL = "id, created_at, tg_user_id, tg_username, tg_full_name, service, status, assigned_to"
+
 LEAD_FILES_COLUMNS: tuple[str, ...] = (
     "id",
     "lead_id",
@@ -36,7 +48,12 @@ CREATE TABLE IF NOT EXISTS {LEADS_TABLE} (
     deadline TEXT NOT NULL,
     budget TEXT,
     contact TEXT NOT NULL,
-    extra_json TEXT NOT NULL
+    extra_json TEXT NOT NULL,
+    submit_token TEXT,
+    status TEXT NOT NULL DEFAULT '{STATUS_NEW}',
+    assigned_to INTEGER,
+    status_changed_at TEXT,
+    contact_type TEXT
 );
 """
 
@@ -50,7 +67,315 @@ CREATE TABLE IF NOT EXISTS {LEAD_FILES_TABLE} (
 );
 """
 
+# Колонки, добавленные после первого релиза: init_db докидывает их в существующие БД
+LEADS_ADDED_COLUMNS: dict[str, str] = {
+    "submit_token": "TEXT",
+    "status": f"TEXT NOT NULL DEFAULT '{STATUS_NEW}'",
+    "assigned_to": "INTEGER",
+    "status_changed_at": "TEXT",
+    "contact_type": "TEXT",
+}
+
+# Токен отправки из FSM (экран подтверждения): повторный "Отправить" не создаёт дубль
+CREATE_INDEX_LEADS_SUBMIT_TOKEN_SQL = f"""
+CREATE UNIQUE INDEX IF NOT EXISTS idx_{LEADS_TABLE}_submit_token
+ON {LEADS_TABLE}(submit_token);
+"""
+
+# Частичные индексы: в них только открытые заявки — размер не растёт с архивом done/rejected.
+# Планировщик SQLite берёт такой индекс, только если WHERE запроса буквально содержит условие индекса,
+# поэтому запросы используют тот же OPEN_STATUSES_SQL.
+OPEN_STATUSES_SQL = "status IN (" + ", ".join(f"'{s}'" for s in OPEN_STATUSES) + ")"
+IN_PROGRESS_SQL = f"status = '{STATUS_IN_PROGRESS}'"
+
+CREATE_INDEX_LEADS_OPEN_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{LEADS_TABLE}_open
+ON {LEADS_TABLE}(created_at) WHERE {OPEN_STATUSES_SQL};
+"""
+
+CREATE_INDEX_LEADS_ASSIGNED_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{LEADS_TABLE}_in_progress_assignee
+ON {LEADS_TABLE}(assigned_to, created_at) WHERE {IN_PROGRESS_SQL};
+"""
+
+# Повторные обращения: заявки с тем же нормализованным контактом (bot/utils/contacts.py).
+# contact_type NULL — контакт пропущен или заявка сохранена до нормализации: в индекс не попадает.
+CONTACT_KNOWN_SQL = "contact_type IS NOT NULL"
+
+CREATE_INDEX_LEADS_CONTACT_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{LEADS_TABLE}_contact
+ON {LEADS_TABLE}(contact, id) WHERE {CONTACT_KNOWN_SQL};
+"""
+
+LEAD_STATUS_HISTORY_COLUMNS: tuple[str, ...] = (
+    "id",
+    "lead_id",
+    "status",
+    "changed_by",
+    "changed_at",
+)
+
+CREATE_TABLE_LEAD_STATUS_HISTORY_SQL = f"""
+CREATE TABLE IF NOT EXISTS {LEAD_STATUS_HISTORY_TABLE} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lead_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    changed_by INTEGER,
+    changed_at TEXT NOT NULL,
+    FOREIGN KEY (lead_id) REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE
+);
+"""
+
+CREATE_INDEX_LEAD_STATUS_HISTORY_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{LEAD_STATUS_HISTORY_TABLE}_lead_id
+ON {LEAD_STATUS_HISTORY_TABLE}(lead_id, id);
+"""
+
+RELAY_MESSAGES_TABLE = "relay_messages"
+
+RELAY_MESSAGES_COLUMNS: tuple[str, ...] = (
+    "chat_id",
+    "message_id",
+    "lead_id",
+    "peer_chat_id",
+    "peer_message_id",
+    "created_at",
+)
+
+# Сообщение бота в чате (админа или автора заявки) -> заявка и куда переслать ответ на него.
+# Поиск — только по (chat_id, message_id): первичный ключ WITHOUT ROWID, без отдельного индекса и без leads.
+CREATE_TABLE_RELAY_MESSAGES_SQL = f"""
+CREATE TABLE IF NOT EXISTS {RELAY_MESSAGES_TABLE} (
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    lead_id INTEGER NOT NULL,
+    peer_chat_id INTEGER NOT NULL,
+    peer_message_id INTEGER,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (chat_id, message_id),
+    FOREIGN KEY (lead_id) REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+# для ON DELETE CASCADE при удалении заявки
+CREATE_INDEX_RELAY_MESSAGES_LEAD_ID_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{RELAY_MESSAGES_TABLE}_lead_id
+ON {RELAY_MESSAGES_TABLE}(lead_id);
+"""
+
+LEAD_ROUTES_TABLE = "lead_routes"
+
+LEAD_ROUTES_COLUMNS: tuple[str, ...] = (
+    "position",
+    "service_id",
+    "deadline_key",
+    "mode",
+    "admin_ids",
+)
+
+# Правила маршрутизации заявок по админам (bot/services/routing.py); пусто — берутся из LEAD_ROUTING.
+# admin_ids — JSON-список tg id
+CREATE_TABLE_LEAD_ROUTES_SQL = f"""
+CREATE TABLE IF NOT EXISTS {LEAD_ROUTES_TABLE} (
+    position INTEGER PRIMARY KEY,
+    service_id TEXT,
+    deadline_key TEXT,
+    mode TEXT NOT NULL,
+    admin_ids TEXT NOT NULL
+);
+"""
+
+LEAD_DELIVERIES_TABLE = "lead_deliveries"
+
+LEAD_DELIVERIES_COLUMNS: tuple[str, ...] = (
+    "lead_id",
+    "admin_id",
+    "status",
+    "messages",
+    "error",
+    "delivered_at",
+)
+
+# Доставка уведомления о заявке каждому админу: sent / partial (текст дошёл, часть файлов — нет) / failed
+CREATE_TABLE_LEAD_DELIVERIES_SQL = f"""
+CREATE TABLE IF NOT EXISTS {LEAD_DELIVERIES_TABLE} (
+    lead_id INTEGER NOT NULL,
+    admin_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    messages INTEGER NOT NULL,
+    error TEXT,
+    delivered_at TEXT NOT NULL,
+    PRIMARY KEY (lead_id, admin_id),
+    FOREIGN KEY (lead_id) REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+"""
+
+LEAD_DRAFTS_TABLE = "lead_drafts"
+
+LEAD_DRAFTS_COLUMNS: tuple[str, ...] = (
+    "chat_id",
+    "user_id",
+    "state",
+    "data_json",
+    "updated_at",
+    "reminded_at",
+)
+
+# Незавершённая заявка: состояние LeadForm и FSM data (bot/services/drafts.py). Одна на пользователя в чате.
+CREATE_TABLE_LEAD_DRAFTS_SQL = f"""
+CREATE TABLE IF NOT EXISTS {LEAD_DRAFTS_TABLE} (
+    chat_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    data_json TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    reminded_at TEXT,
+    PRIMARY KEY (chat_id, user_id)
+) WITHOUT ROWID;
+"""
+
+# Кандидаты на напоминание: только ещё не напомненные, по возрастанию updated_at.
+# Напомненные выпадают из индекса — выборка не проходит по ним повторно при любом числе черновиков.
+DRAFTS_PENDING_SQL = "reminded_at IS NULL"
+
+CREATE_INDEX_LEAD_DRAFTS_PENDING_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{LEAD_DRAFTS_TABLE}_pending
+ON {LEAD_DRAFTS_TABLE}(updated_at) WHERE {DRAFTS_PENDING_SQL};
+"""
+
+USER_PROFILES_TABLE = "user_profiles"
+
+USER_PROFILES_COLUMNS: tuple[str, ...] = (
+    "tg_user_id",
+    "tg_full_name",
+    "contact",
+    "contact_type",
+    "last_service",
+    "leads_count",
+    "updated_at",
+)
+
+# Профиль автора заявок (bot/services/profiles.py): обновляется в транзакции save_lead.
+# contact — последний распознанный (contact_type не NULL); пропущенный контакт прежний не затирает.
+CREATE_TABLE_USER_PROFILES_SQL = f"""
+CREATE TABLE IF NOT EXISTS {USER_PROFILES_TABLE} (
+    tg_user_id INTEGER PRIMARY KEY,
+    tg_full_name TEXT NOT NULL,
+    contact TEXT,
+    contact_type TEXT,
+    last_service TEXT NOT NULL,
+    leads_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+"""
+
+UPSERT_USER_PROFILE_SQL = f"""
+INSERT INTO {USER_PROFILES_TABLE} (
+    tg_user_id, tg_full_name, contact, contact_type, last_service, leads_count, updated_at
+)
+VALUES (?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT(tg_user_id) DO UPDATE SET
+    tg_full_name = excluded.tg_full_name,
+    contact = COALESCE(excluded.contact, contact),
+    contact_type = COALESCE(excluded.contact_type, contact_type),
+    last_service = excluded.last_service,
+    leads_count = leads_count + 1,
+    updated_at = excluded.updated_at;
+"""
+
+LEAD_STATS_DAILY_TABLE = "lead_stats_daily"
+
+LEAD_STATS_DAILY_COLUMNS: tuple[str, ...] = (
+    "day",
+    "service",
+    "deadline",
+    "with_files",
+    "leads",
+)
+
+# Счётчики заявок по дням (bot/services/stats.py): обновляются в транзакциях save_lead / save_files,
+# поэтому /stats не сканирует leads. Архивация заявок (RETENTION_DAYS) их не уменьшает.
+# deadline — ключ срока (urgent / week / not_urgent / custom), with_files — 1, если к заявке приложены файлы.
+CREATE_TABLE_LEAD_STATS_DAILY_SQL = f"""
+CREATE TABLE IF NOT EXISTS {LEAD_STATS_DAILY_TABLE} (
+    day TEXT NOT NULL,
+    service TEXT NOT NULL,
+    deadline TEXT NOT NULL,
+    with_files INTEGER NOT NULL,
+    leads INTEGER NOT NULL,
+    PRIMARY KEY (day, service, deadline, with_files)
+) WITHOUT ROWID;
+"""
+
+# Ключ счётчика из строки leads: день по created_at (ISO UTC) и ключ срока по его тексту
+DEADLINE_KEY_SQL = (
+    "CASE deadline "
+    + " ".join(f"WHEN '{label}' THEN '{key}'" for key, label in DEADLINE_LABELS.items())
+    + f" ELSE '{DEADLINE_CUSTOM}' END"
+)
+LEAD_STATS_KEY_SQL = f"substr(created_at, 1, 10), service, {DEADLINE_KEY_SQL}"
+
+# Параметры: with_files, прибавка (1 / -1), lead id. WHERE обязателен: без него upsert после SELECT не разбирается.
+ADD_LEAD_STATS_SQL = f"""
+INSERT INTO {LEAD_STATS_DAILY_TABLE} (day, service, deadline, with_files, leads)
+SELECT {LEAD_STATS_KEY_SQL}, ?, ? FROM {LEADS_TABLE} WHERE id = ?
+ON CONFLICT(day, service, deadline, with_files) DO UPDATE SET leads = leads + excluded.leads;
+"""
+
+# Пересчёт по заявкам с дня ? (YYYY-MM-DD) включительно, '' — по всем. Более поздние строки перед ним удаляются;
+# в самом этом дне часть заявок могла уже уйти в архив (retention режет день пачками) — остаётся большее.
+REBUILD_LEAD_STATS_SQL = f"""
+INSERT INTO {LEAD_STATS_DAILY_TABLE} (day, service, deadline, with_files, leads)
+SELECT {LEAD_STATS_KEY_SQL},
+    EXISTS (SELECT 1 FROM {LEAD_FILES_TABLE} f WHERE f.lead_id = {LEADS_TABLE}.id),
+    count(*)
+FROM {LEADS_TABLE}
+WHERE created_at >= ?
+GROUP BY 1, 2, 3, 4
+ON CONFLICT(day, service, deadline, with_files) DO UPDATE SET leads = max(leads, excluded.leads);
+"""
+
 CREATE_INDEX_LEAD_FILES_LEAD_ID_SQL = f"""
 CREATE INDEX IF NOT EXISTS idx_{LEAD_FILES_TABLE}_lead_id
 ON {LEAD_FILES_TABLE}(lead_id);
 """
+
+PORTFOLIO_MEDIA_TABLE = "portfolio_media"
+
+PORTFOLIO_MEDIA_COLUMNS: tuple[str, ...] = (
+    "id",
+    "service_id",
+    "file_id",
+    "media_type",
+    "position",
+    "created_at",
+)
+
+CREATE_TABLE_PORTFOLIO_MEDIA_SQL = f"""
+CREATE TABLE IF NOT EXISTS {PORTFOLIO_MEDIA_TABLE} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    service_id TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    media_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+CREATE_INDEX_PORTFOLIO_MEDIA_SERVICE_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_{PORTFOLIO_MEDIA_TABLE}_service_position
+ON {PORTFOLIO_MEDIA_TABLE}(service_id, position);
+"""
+
+BOT_META_TABLE = "bot_meta"
+
+# Разовые отметки локальной БД бота (ключ -> значение), например что портфолио уже заполнено из констант
+CREATE_TABLE_BOT_META_SQL = f"""
+CREATE TABLE IF NOT EXISTS {BOT_META_TABLE} (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# seed_portfolio_media: константы записаны (или таблица уже была заполнена) — повторно не наполнять
+META_PORTFOLIO_SEEDED = "portfolio_media_seeded"
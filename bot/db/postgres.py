@@ -0,0 +1,534 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Iterable
+
+from bot.constants.lead_status import STATUS_NEW
+from bot.db import repository
+from bot.db.models import (
+    CONTACT_KNOWN_SQL,
+    CREATE_INDEX_LEAD_FILES_LEAD_ID_SQL,
+    CREATE_INDEX_LEAD_STATUS_HISTORY_SQL,
+    CREATE_INDEX_LEADS_ASSIGNED_SQL,
+    CREATE_INDEX_LEADS_CONTACT_SQL,
+    CREATE_INDEX_LEADS_OPEN_SQL,
+    CREATE_INDEX_LEADS_SUBMIT_TOKEN_SQL,
+    CREATE_INDEX_RELAY_MESSAGES_LEAD_ID_SQL,
+    IN_PROGRESS_SQL,
+    LEAD_BRIEF_COLUMNS_SQL,
+    LEAD_DELIVERIES_TABLE,
+    LEAD_FILES_COLUMNS,
+    LEAD_FILES_TABLE,
+    LEAD_STATS_DAILY_COLUMNS,
+    LEAD_STATS_DAILY_TABLE,
+    LEAD_STATS_KEY_SQL,
+    LEAD_STATUS_HISTORY_COLUMNS,
+    LEAD_STATUS_HISTORY_TABLE,
+    LEADS_COLUMNS,
+    LEADS_TABLE,
+    OPEN_STATUSES_SQL,
+    RELAY_MESSAGES_TABLE,
+    USER_PROFILES_COLUMNS,
+    USER_PROFILES_TABLE,
+)
+from bot.db.repository import DuplicateLeadError
+
+if TYPE_CHECKING:
+    import asyncpg
+
+# Пул соединений на процесс: min — держать открытыми, max — по умолчанию (DB_POOL_SIZE)
+POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 10
+
+# Таблицы заявок в PostgreSQL: колонки и смысл — как в bot/db/models.py, даты — те же ISO-строки (TEXT),
+# поэтому ключи счётчиков (substr(created_at, 1, 10)) и сравнения дат совпадают с SQLite.
+# Индексы (в т.ч. частичные) — общие CREATE_INDEX_* из models.py: их синтаксис PostgreSQL понимает как есть.
+PG_TABLES: tuple[str, ...] = (
+    LEADS_TABLE,
+    LEAD_STATUS_HISTORY_TABLE,
+    LEAD_FILES_TABLE,
+    LEAD_DELIVERIES_TABLE,
+    RELAY_MESSAGES_TABLE,
+    USER_PROFILES_TABLE,
+    LEAD_STATS_DAILY_TABLE,
+)
+
+PG_SCHEMA_SQL: tuple[str, ...] = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {LEADS_TABLE} (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        tg_user_id BIGINT NOT NULL,
+        tg_username TEXT,
+        tg_full_name TEXT NOT NULL,
+        service TEXT NOT NULL,
+        task TEXT NOT NULL,
+        deadline TEXT NOT NULL,
+        budget TEXT,
+        contact TEXT NOT NULL,
+        extra_json TEXT NOT NULL,
+        submit_token TEXT,
+        status TEXT NOT NULL DEFAULT '{STATUS_NEW}',
+        assigned_to BIGINT,
+        status_changed_at TEXT,
+        contact_type TEXT
+    )
+    """,
+    CREATE_INDEX_LEADS_SUBMIT_TOKEN_SQL,
+    CREATE_INDEX_LEADS_OPEN_SQL,
+    CREATE_INDEX_LEADS_ASSIGNED_SQL,
+    CREATE_INDEX_LEADS_CONTACT_SQL,
+    f"""
+    CREATE TABLE IF NOT EXISTS {LEAD_STATUS_HISTORY_TABLE} (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        lead_id BIGINT NOT NULL REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE,
+        status TEXT NOT NULL,
+        changed_by BIGINT,
+        changed_at TEXT NOT NULL
+    )
+    """,
+    CREATE_INDEX_LEAD_STATUS_HISTORY_SQL,
+    f"""
+    CREATE TABLE IF NOT EXISTS {LEAD_FILES_TABLE} (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        lead_id BIGINT NOT NULL REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE,
+        file_type TEXT NOT NULL,
+        file_id TEXT NOT NULL
+    )
+    """,
+    CREATE_INDEX_LEAD_FILES_LEAD_ID_SQL,
+    f"""
+    CREATE TABLE IF NOT EXISTS {LEAD_DELIVERIES_TABLE} (
+        lead_id BIGINT NOT NULL REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE,
+        admin_id BIGINT NOT NULL,
+        status TEXT NOT NULL,
+        messages INTEGER NOT NULL,
+        error TEXT,
+        delivered_at TEXT NOT NULL,
+        PRIMARY KEY (lead_id, admin_id)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {RELAY_MESSAGES_TABLE} (
+        chat_id BIGINT NOT NULL,
+        message_id BIGINT NOT NULL,
+        lead_id BIGINT NOT NULL REFERENCES {LEADS_TABLE}(id) ON DELETE CASCADE,
+        peer_chat_id BIGINT NOT NULL,
+        peer_message_id BIGINT,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (chat_id, message_id)
+    )
+    """,
+    CREATE_INDEX_RELAY_MESSAGES_LEAD_ID_SQL,
+    f"""
+    CREATE TABLE IF NOT EXISTS {USER_PROFILES_TABLE} (
+        tg_user_id BIGINT PRIMARY KEY,
+        tg_full_name TEXT NOT NULL,
+        contact TEXT,
+        contact_type TEXT,
+        last_service TEXT NOT NULL,
+        leads_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {LEAD_STATS_DAILY_TABLE} (
+        day TEXT NOT NULL,
+        service TEXT NOT NULL,
+        deadline TEXT NOT NULL,
+        with_files INTEGER NOT NULL,
+        leads INTEGER NOT NULL,
+        PRIMARY KEY (day, service, deadline, with_files)
+    )
+    """,
+)
+
+# Один init на кластер за раз: несколько экземпляров бота стартуют одновременно
+_INIT_LOCK_KEY = 0x6C656164
+
+PG_INSERT_LEAD_SQL = f"""
+INSERT INTO {LEADS_TABLE} (
+    created_at, tg_user_id, tg_username, tg_full_name,
+    service, task, deadline, budget, contact, extra_json, submit_token, contact_type
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+ON CONFLICT (submit_token) DO NOTHING
+RETURNING id
+"""
+
+PG_UPSERT_USER_PROFILE_SQL = f"""
+INSERT INTO {USER_PROFILES_TABLE} (
+    tg_user_id, tg_full_name, contact, contact_type, last_service, leads_count, updated_at
+)
+VALUES ($1, $2, $3, $4, $5, 1, $6)
+ON CONFLICT (tg_user_id) DO UPDATE SET
+    tg_full_name = EXCLUDED.tg_full_name,
+    contact = COALESCE(EXCLUDED.contact, {USER_PROFILES_TABLE}.contact),
+    contact_type = COALESCE(EXCLUDED.contact_type, {USER_PROFILES_TABLE}.contact_type),
+    last_service = EXCLUDED.last_service,
+    leads_count = {USER_PROFILES_TABLE}.leads_count + 1,
+    updated_at = EXCLUDED.updated_at
+"""
+
+# Параметры: with_files, прибавка (1 / -1), lead id — как ADD_LEAD_STATS_SQL в models.py
+PG_ADD_LEAD_STATS_SQL = f"""
+INSERT INTO {LEAD_STATS_DAILY_TABLE} (day, service, deadline, with_files, leads)
+SELECT {LEAD_STATS_KEY_SQL}, $1::int, $2::int FROM {LEADS_TABLE} WHERE id = $3
+ON CONFLICT (day, service, deadline, with_files) DO UPDATE
+SET leads = {LEAD_STATS_DAILY_TABLE}.leads + EXCLUDED.leads
+"""
+
+# как REBUILD_LEAD_STATS_SQL: с дня $1 включительно, в самом дне остаётся большее
+PG_REBUILD_LEAD_STATS_SQL = f"""
+INSERT INTO {LEAD_STATS_DAILY_TABLE} AS s (day, service, deadline, with_files, leads)
+SELECT {LEAD_STATS_KEY_SQL},
+    (EXISTS (SELECT 1 FROM {LEAD_FILES_TABLE} f WHERE f.lead_id = {LEADS_TABLE}.id))::int,
+    count(*)
+FROM {LEADS_TABLE}
+WHERE created_at >= $1
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (day, service, deadline, with_files) DO UPDATE SET leads = GREATEST(s.leads, EXCLUDED.leads)
+"""
+
+# Многострочные upsert'ы: массивы колонок -> unnest, одна команда на пачку
+PG_UPSERT_DELIVERIES_SQL = f"""
+INSERT INTO {LEAD_DELIVERIES_TABLE} (lead_id, admin_id, status, messages, error, delivered_at)
+SELECT $1::bigint, d.*, $6::text FROM unnest($2::bigint[], $3::text[], $4::int[], $5::text[]) AS d
+ON CONFLICT (lead_id, admin_id) DO UPDATE SET
+    status = EXCLUDED.status, messages = EXCLUDED.messages,
+    error = EXCLUDED.error, delivered_at = EXCLUDED.delivered_at
+"""
+
+PG_UPSERT_RELAY_LINKS_SQL = f"""
+INSERT INTO {RELAY_MESSAGES_TABLE} (chat_id, message_id, lead_id, peer_chat_id, peer_message_id, created_at)
+SELECT *, $6::text FROM unnest($1::bigint[], $2::bigint[], $3::bigint[], $4::bigint[], $5::bigint[])
+ON CONFLICT (chat_id, message_id) DO UPDATE SET
+    lead_id = EXCLUDED.lead_id, peer_chat_id = EXCLUDED.peer_chat_id,
+    peer_message_id = EXCLUDED.peer_message_id, created_at = EXCLUDED.created_at
+"""
+
+
+def _affected(status: str) -> int:
+    # статус команды asyncpg: "DELETE 3", "INSERT 0 12"
+    return int(status.rsplit(" ", 1)[-1])
+
+
+class PostgresLeadStorage:
+    """
+    Заявки в PostgreSQL (asyncpg): пул соединений на процесс, вместо одного писателя SQLite —
+    несколько экземпляров бота на одной БД. Запросы и транзакции — те же, что в bot/db/repository.py;
+    файлы заявки — COPY, доставки и связки переписки — многострочным upsert.
+    """
+
+    def __init__(self, dsn: str, *, min_size: int = POOL_MIN_SIZE, max_size: int = DEFAULT_POOL_MAX_SIZE) -> None:
+        self.dsn = dsn
+        self._min_size = min_size
+        self._max_size = max_size
+        self._pool: asyncpg.Pool | None = None
+        self._lock = asyncio.Lock()
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    # asyncpg нужен только с DB_URL=postgresql://...
+                    import asyncpg
+
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn, min_size=self._min_size, max_size=self._max_size
+                    )
+        return self._pool
+
+    async def init(self) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", _INIT_LOCK_KEY)
+                for ddl in PG_SCHEMA_SQL:
+                    await conn.execute(ddl)
+                # таблица счётчиков пустая, а заявки есть — заполняем по ним (как _backfill_lead_stats)
+                if await conn.fetchval(
+                    f"SELECT NOT EXISTS (SELECT 1 FROM {LEAD_STATS_DAILY_TABLE}) "
+                    f"AND EXISTS (SELECT 1 FROM {LEADS_TABLE})"
+                ):
+                    await conn.execute(PG_REBUILD_LEAD_STATS_SQL, "")
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def save_lead(
+        self,
+        *,
+        tg_user_id: int,
+        tg_username: str | None,
+        tg_full_name: str,
+        service: str,
+        task: str,
+        deadline: str,
+        budget: str | None,
+        contact: str,
+        extra_json: dict[str, Any] | None,
+        submit_token: str | None = None,
+        contact_type: str | None = None,
+    ) -> int:
+        created_at = repository._now_iso_utc_seconds()
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                lead_id = await conn.fetchval(
+                    PG_INSERT_LEAD_SQL,
+                    created_at,
+                    tg_user_id,
+                    tg_username,
+                    tg_full_name,
+                    service,
+                    task,
+                    deadline,
+                    budget,
+                    contact,
+                    json.dumps(extra_json or {}, ensure_ascii=False),
+                    submit_token,
+                    contact_type,
+                )
+                if lead_id is None:
+                    # ON CONFLICT (submit_token) DO NOTHING — заявка с этим токеном уже есть
+                    raise DuplicateLeadError(
+                        await conn.fetchval(f"SELECT id FROM {LEADS_TABLE} WHERE submit_token=$1", submit_token)
+                    )
+                await conn.execute(
+                    f"INSERT INTO {LEAD_STATUS_HISTORY_TABLE} (lead_id, status, changed_by, changed_at) "
+                    "VALUES ($1, $2, NULL, $3)",
+                    lead_id,
+                    STATUS_NEW,
+                    created_at,
+                )
+                await conn.execute(PG_ADD_LEAD_STATS_SQL, 0, 1, lead_id)
+                await conn.execute(
+                    PG_UPSERT_USER_PROFILE_SQL,
+                    tg_user_id,
+                    tg_full_name,
+                    contact if contact_type else None,
+                    contact_type,
+                    service,
+                    created_at,
+                )
+        return int(lead_id)
+
+    async def save_files(self, *, lead_id: int, files: Iterable[dict[str, str]]) -> None:
+        rows = [
+            (lead_id, file_type, file_id)
+            for f in files
+            if (file_type := (f.get("file_type") or "").strip()) and (file_id := (f.get("file_id") or "").strip())
+        ]
+        if not rows:
+            return
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                had_files = await conn.fetchval(
+                    f"SELECT EXISTS (SELECT 1 FROM {LEAD_FILES_TABLE} WHERE lead_id=$1)", lead_id
+                )
+                await conn.copy_records_to_table(LEAD_FILES_TABLE, records=rows, columns=LEAD_FILES_COLUMNS[1:])
+                if not had_files:
+                    await conn.execute(PG_ADD_LEAD_STATS_SQL, 0, -1, lead_id)
+                    await conn.execute(PG_ADD_LEAD_STATS_SQL, 1, 1, lead_id)
+                    await conn.execute(f"DELETE FROM {LEAD_STATS_DAILY_TABLE} WHERE leads <= 0")
+
+    async def get_lead(self, lead_id: int) -> dict[str, Any] | None:
+        pool = await self._get_pool()
+        row = await pool.fetchrow(f"SELECT {LEAD_BRIEF_COLUMNS_SQL} FROM {LEADS_TABLE} WHERE id=$1", lead_id)
+        return dict(row) if row is not None else None
+
+    async def update_lead_status(
+        self,
+        lead_id: int,
+        *,
+        status: str,
+        allowed_from: Iterable[str],
+        changed_by: int | None,
+        assign: bool = False,
+    ) -> dict[str, Any] | None:
+        changed_at = repository._now_iso_utc_seconds()
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                row = await conn.fetchrow(
+                    f"""
+                    UPDATE {LEADS_TABLE}
+                    SET status=$1, status_changed_at=$2,
+                        assigned_to=CASE WHEN $3 THEN $4::bigint ELSE assigned_to END
+                    WHERE id=$5 AND status = ANY($6::text[])
+                    RETURNING {LEAD_BRIEF_COLUMNS_SQL}
+                    """,
+                    status,
+                    changed_at,
+                    assign,
+                    changed_by,
+                    lead_id,
+                    list(allowed_from),
+                )
+                if row is None:
+                    return None
+                await conn.execute(
+                    f"INSERT INTO {LEAD_STATUS_HISTORY_TABLE} (lead_id, status, changed_by, changed_at) "
+                    "VALUES ($1, $2, $3, $4)",
+                    lead_id,
+                    status,
+                    changed_by,
+                    changed_at,
+                )
+        return dict(row)
+
+    async def list_open_leads(self, *, limit: int = 20) -> list[dict[str, Any]]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"""
+            SELECT {LEAD_BRIEF_COLUMNS_SQL} FROM {LEADS_TABLE}
+            WHERE {OPEN_STATUSES_SQL}
+            ORDER BY created_at LIMIT $1
+            """,
+            limit,
+        )
+        return [dict(r) for r in rows]
+
+    async def list_assigned_leads(self, admin_id: int, *, limit: int = 20) -> list[dict[str, Any]]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"""
+            SELECT {LEAD_BRIEF_COLUMNS_SQL} FROM {LEADS_TABLE}
+            WHERE {IN_PROGRESS_SQL} AND assigned_to=$1
+            ORDER BY created_at LIMIT $2
+            """,
+            admin_id,
+            limit,
+        )
+        return [dict(r) for r in rows]
+
+    async def find_leads_by_contact(
+        self, contact: str, *, exclude_id: int | None = None, limit: int = 5
+    ) -> list[int]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"""
+            SELECT id FROM {LEADS_TABLE}
+            WHERE {CONTACT_KNOWN_SQL} AND contact=$1 AND id<>$2
+            ORDER BY id DESC LIMIT $3
+            """,
+            contact,
+            -1 if exclude_id is None else exclude_id,
+            limit,
+        )
+        return [row["id"] for row in rows]
+
+    async def lead_status_history(self, lead_id: int) -> list[dict[str, Any]]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"SELECT status, changed_by, changed_at FROM {LEAD_STATUS_HISTORY_TABLE} WHERE lead_id=$1 ORDER BY id",
+            lead_id,
+        )
+        return [dict(r) for r in rows]
+
+    async def save_lead_deliveries(self, lead_id: int, deliveries: Iterable[tuple[int, str, int, str | None]]) -> None:
+        rows = list(deliveries)
+        if not rows:
+            return
+        admin_ids, statuses, messages, errors = (list(column) for column in zip(*rows))
+        pool = await self._get_pool()
+        await pool.execute(
+            PG_UPSERT_DELIVERIES_SQL, lead_id, admin_ids, statuses, messages, errors, repository._now_iso_utc_seconds()
+        )
+
+    async def list_lead_deliveries(self, lead_id: int) -> list[dict[str, Any]]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"""
+            SELECT admin_id, status, messages, error, delivered_at FROM {LEAD_DELIVERIES_TABLE}
+            WHERE lead_id=$1 ORDER BY admin_id
+            """,
+            lead_id,
+        )
+        return [dict(r) for r in rows]
+
+    async def save_relay_links(self, rows: Iterable[tuple[int, int, int, int, int | None]]) -> None:
+        values = list(rows)
+        if not values:
+            return
+        columns = [list(column) for column in zip(*values)]
+        pool = await self._get_pool()
+        await pool.execute(PG_UPSERT_RELAY_LINKS_SQL, *columns, repository._now_iso_utc_seconds())
+
+    async def get_relay_link(self, chat_id: int, message_id: int) -> dict[str, Any] | None:
+        pool = await self._get_pool()
+        row = await pool.fetchrow(
+            f"SELECT lead_id, peer_chat_id, peer_message_id FROM {RELAY_MESSAGES_TABLE} "
+            "WHERE chat_id=$1 AND message_id=$2",
+            chat_id,
+            message_id,
+        )
+        return dict(row) if row is not None else None
+
+    async def get_user_profile(self, tg_user_id: int) -> dict[str, Any] | None:
+        pool = await self._get_pool()
+        row = await pool.fetchrow(
+            f"SELECT {', '.join(USER_PROFILES_COLUMNS)} FROM {USER_PROFILES_TABLE} WHERE tg_user_id=$1", tg_user_id
+        )
+        return dict(row) if row is not None else None
+
+    async def delete_stale_profiles(self, *, updated_before: str) -> int:
+        pool = await self._get_pool()
+        return _affected(await pool.execute(f"DELETE FROM {USER_PROFILES_TABLE} WHERE updated_at < $1", updated_before))
+
+    async def rebuild_lead_stats(self) -> int:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                oldest = await conn.fetchval(f"SELECT min(created_at) FROM {LEADS_TABLE}")
+                if oldest is None:
+                    return 0
+                first_day = oldest[:10]
+                await conn.execute(f"DELETE FROM {LEAD_STATS_DAILY_TABLE} WHERE day > $1", first_day)
+                return _affected(await conn.execute(PG_REBUILD_LEAD_STATS_SQL, first_day))
+
+    async def list_lead_stats(self, *, since_day: str) -> list[dict[str, Any]]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"SELECT {', '.join(LEAD_STATS_DAILY_COLUMNS)} FROM {LEAD_STATS_DAILY_TABLE} WHERE day >= $1 ORDER BY day",
+            since_day,
+        )
+        return [dict(r) for r in rows]
+
+    async def fetch_expired_leads(self, *, created_before: str, limit: int) -> list[dict[str, Any]]:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"SELECT {', '.join(LEADS_COLUMNS)} FROM {LEADS_TABLE} WHERE created_at < $1 ORDER BY id LIMIT $2",
+                created_before,
+                limit,
+            )
+            leads = {row["id"]: {**dict(row), "files": [], "history": []} for row in rows}
+            if not leads:
+                return []
+            for table, columns, key in (
+                (LEAD_FILES_TABLE, LEAD_FILES_COLUMNS, "files"),
+                (LEAD_STATUS_HISTORY_TABLE, LEAD_STATUS_HISTORY_COLUMNS, "history"),
+            ):
+                for row in await conn.fetch(
+                    f"SELECT {', '.join(columns)} FROM {table} WHERE lead_id = ANY($1::bigint[]) ORDER BY id",
+                    list(leads),
+                ):
+                    leads[row["lead_id"]][key].append(dict(row))
+        return list(leads.values())
+
+    async def delete_leads(self, lead_ids: Iterable[int]) -> int:
+        ids = list(lead_ids)
+        if not ids:
+            return 0
+        pool = await self._get_pool()
+        return _affected(await pool.execute(f"DELETE FROM {LEADS_TABLE} WHERE id = ANY($1::bigint[])", ids))
+
+    async def reclaim_space(self, max_pages: int) -> int:
+        # место удалённых строк PostgreSQL переиспользует сам (autovacuum); файл не ужимаем
+        return 0
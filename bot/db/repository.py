@@ -7,26 +7,121 @@ from typing import Any, Iterable
 
 import aiosqlite
 
+from bot.constants.lead_status import STATUS_NEW
 from bot.db.models import (
+    ADD_LEAD_STATS_SQL,
+    BOT_META_TABLE,
+    CONTACT_KNOWN_SQL,
+    CREATE_TABLE_BOT_META_SQL,
+    CREATE_INDEX_LEAD_DRAFTS_PENDING_SQL,
     CREATE_INDEX_LEAD_FILES_LEAD_ID_SQL,
+    CREATE_INDEX_LEAD_STATUS_HISTORY_SQL,
+    CREATE_INDEX_LEADS_ASSIGNED_SQL,
+    CREATE_INDEX_LEADS_CONTACT_SQL,
+    CREATE_INDEX_LEADS_OPEN_SQL,
+    CREATE_INDEX_LEADS_SUBMIT_TOKEN_SQL,
+    CREATE_INDEX_PORTFOLIO_MEDIA_SERVICE_SQL,
+    CREATE_INDEX_RELAY_MESSAGES_LEAD_ID_SQL,
+    CREATE_TABLE_LEAD_DELIVERIES_SQL,
+    CREATE_TABLE_LEAD_DRAFTS_SQL,
     CREATE_TABLE_LEAD_FILES_SQL,
+    CREATE_TABLE_LEAD_ROUTES_SQL,
+    CREATE_TABLE_LEAD_STATS_DAILY_SQL,
+    CREATE_TABLE_LEAD_STATUS_HISTORY_SQL,
     CREATE_TABLE_LEADS_SQL,
+    CREATE_TABLE_PORTFOLIO_MEDIA_SQL,
+    CREATE_TABLE_RELAY_MESSAGES_SQL,
+    CREATE_TABLE_USER_PROFILES_SQL,
+    DRAFTS_PENDING_SQL,
+    IN_PROGRESS_SQL,
+    LEAD_BRIEF_COLUMNS_SQL,
+    LEAD_FILES_COLUMNS,
+    LEAD_FILES_TABLE,
+    LEAD_STATS_DAILY_COLUMNS,
+    LEAD_STATUS_HISTORY_COLUMNS,
+    LEAD_STATUS_HISTORY_TABLE,
+    LEADS_ADDED_COLUMNS,
+    LEADS_COLUMNS,
+    LEADS_TABLE,
+    META_PORTFOLIO_SEEDED,
+    OPEN_STATUSES_SQL,
+    REBUILD_LEAD_STATS_SQL,
+    UPSERT_USER_PROFILE_SQL,
+    USER_PROFILES_COLUMNS,
 )
 
 
+# PRAGMA auto_vacuum: 0 — NONE, 1 — FULL, 2 — INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class DuplicateLeadError(Exception):
+    """Заявка с таким submit_token уже сохранена (повторное нажатие / повторная доставка callback)."""
+
+    def __init__(self, lead_id: int) -> None:
+        super().__init__(f"lead already saved: {lead_id}")
+        self.lead_id = lead_id
+
+
 def _now_iso_utc_seconds() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
+async def _ensure_columns(db: aiosqlite.Connection, table: str, columns: dict[str, str]) -> None:
+    # лёгкая миграция: ALTER TABLE ADD COLUMN для колонок, которых нет в старой БД
+    async with db.execute(f"PRAGMA table_info({table})") as cur:
+        existing = {row[1] for row in await cur.fetchall()}
+    for name, ddl in columns.items():
+        if name not in existing:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+
+async def _ensure_incremental_vacuum(db: aiosqlite.Connection) -> None:
+    # auto_vacuum=INCREMENTAL: место удалённых строк (архивация заявок) возвращается PRAGMA incremental_vacuum
+    # понемногу, без полного VACUUM. Режим включается до создания таблиц; в существующей БД — один VACUUM.
+    async with db.execute("PRAGMA auto_vacuum;") as cur:
+        mode = (await cur.fetchone())[0]
+    if mode == AUTO_VACUUM_INCREMENTAL:
+        return
+    await db.execute(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL};")
+    async with db.execute("SELECT count(*) FROM sqlite_master") as cur:
+        has_schema = (await cur.fetchone())[0] > 0
+    if has_schema:
+        await db.execute("VACUUM;")
+
+
 async def init_db(db_path: str | Path) -> None:
     db_path = Path(db_path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
     async with aiosqlite.connect(db_path.as_posix()) as db:
+        await _ensure_incremental_vacuum(db)
+        # WAL (сохраняется в файле БД): читатели не ждут писателя, запись другим соединением не перезапускает
+        # онлайн-бэкап с начала; WAL переносит в файл задача wal_checkpoint (checkpoint_wal)
+        await db.execute("PRAGMA journal_mode=WAL;")
         await db.execute("PRAGMA foreign_keys=ON;")
         await db.execute(CREATE_TABLE_LEADS_SQL)
+        await _ensure_columns(db, LEADS_TABLE, LEADS_ADDED_COLUMNS)
+        await db.execute(CREATE_INDEX_LEADS_SUBMIT_TOKEN_SQL)
+        await db.execute(CREATE_INDEX_LEADS_OPEN_SQL)
+        await db.execute(CREATE_INDEX_LEADS_ASSIGNED_SQL)
+        await db.execute(CREATE_INDEX_LEADS_CONTACT_SQL)
+        await db.execute(CREATE_TABLE_LEAD_STATUS_HISTORY_SQL)
+        await db.execute(CREATE_INDEX_LEAD_STATUS_HISTORY_SQL)
         await db.execute(CREATE_TABLE_LEAD_FILES_SQL)
         await db.execute(CREATE_INDEX_LEAD_FILES_LEAD_ID_SQL)
+        await db.execute(CREATE_TABLE_LEAD_DELIVERIES_SQL)
+        await db.execute(CREATE_TABLE_LEAD_ROUTES_SQL)
+        await db.execute(CREATE_TABLE_RELAY_MESSAGES_SQL)
+        await db.execute(CREATE_INDEX_RELAY_MESSAGES_LEAD_ID_SQL)
+        await db.execute(CREATE_TABLE_LEAD_DRAFTS_SQL)
+        await db.execute(CREATE_INDEX_LEAD_DRAFTS_PENDING_SQL)
+        await db.execute(CREATE_TABLE_USER_PROFILES_SQL)
+        await db.execute(CREATE_TABLE_LEAD_STATS_DAILY_SQL)
+        await _backfill_lead_stats(db)
+        await db.execute(CREATE_TABLE_PORTFOLIO_MEDIA_SQL)
+        await db.execute(CREATE_INDEX_PORTFOLIO_MEDIA_SERVICE_SQL)
+        await db.execute(CREATE_TABLE_BOT_META_SQL)
         await db.commit()
 
 
@@ -42,7 +137,13 @@ async def save_lead(
     budget: str | None,
     contact: str,
     extra_json: dict[str, Any] | None,
+    submit_token: str | None = None,
+    contact_type: str | None = None,
 ) -> int:
+    """
+    Сохраняет заявку и возвращает её id; профиль автора (user_profiles) — в той же транзакции.
+    Если submit_token уже встречался — DuplicateLeadError с id ранее сохранённой заявки.
+    """
     db_path = Path(db_path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -51,29 +152,51 @@ async def save_lead(
 
     async with aiosqlite.connect(db_path.as_posix()) as db:
         await db.execute("PRAGMA foreign_keys=ON;")
-        cur = await db.execute(
-            """
-            INSERT INTO leads (
-                created_at, tg_user_id, tg_username, tg_full_name,
-                service, task, deadline, budget, contact, extra_json
+        try:
+            cur = await db.execute(
+                """
+                INSERT INTO leads (
+                    created_at, tg_user_id, tg_username, tg_full_name,
+                    service, task, deadline, budget, contact, extra_json, submit_token, contact_type
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    created_at,
+                    tg_user_id,
+                    tg_username,
+                    tg_full_name,
+                    service,
+                    task,
+                    deadline,
+                    budget,
+                    contact,
+                    extra_json_str,
+                    submit_token,
+                    contact_type,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                created_at,
-                tg_user_id,
-                tg_username,
-                tg_full_name,
-                service,
-                task,
-                deadline,
-                budget,
-                contact,
-                extra_json_str,
-            ),
+        except aiosqlite.IntegrityError:
+            if submit_token is None:
+                raise
+            async with db.execute("SELECT id FROM leads WHERE submit_token=?", (submit_token,)) as dup:
+                row = await dup.fetchone()
+            if row is None:
+                raise
+            raise DuplicateLeadError(int(row[0])) from None
+        lead_id = int(cur.lastrowid)
+        # начальная запись истории статусов — в той же транзакции
+        await db.execute(
+            "INSERT INTO lead_status_history (lead_id, status, changed_by, changed_at) VALUES (?, ?, NULL, ?)",
+            (lead_id, STATUS_NEW, created_at),
+        )
+        await db.execute(ADD_LEAD_STATS_SQL, (0, 1, lead_id))
+        # профиль автора: нераспознанный или пропущенный контакт прежний не затирает
+        await db.execute(
+            UPSERT_USER_PROFILE_SQL,
+            (tg_user_id, tg_full_name, contact if contact_type else None, contact_type, service, created_at),
         )
         await db.commit()
-        lead_id = int(cur.lastrowid)
         return lead_id
 
 
@@ -102,6 +225,8 @@ async def save_files(
 
     async with aiosqlite.connect(db_path.as_posix()) as db:
         await db.execute("PRAGMA foreign_keys=ON;")
+        async with db.execute("SELECT 1 FROM lead_files WHERE lead_id=? LIMIT 1", (lead_id,)) as cur:
+            had_files = await cur.fetchone() is not None
         await db.executemany(
             """
             INSERT INTO lead_files (lead_id, file_type, file_id)
@@ -109,4 +234,620 @@ async def save_files(
             """,
             rows,
         )
+        if not had_files:
+            # первые файлы заявки: счётчик дня переходит из «без файлов» в «с файлами»
+            await db.execute(ADD_LEAD_STATS_SQL, (0, -1, lead_id))
+            await db.execute(ADD_LEAD_STATS_SQL, (1, 1, lead_id))
+            await db.execute("DELETE FROM lead_stats_daily WHERE leads <= 0")
+        await db.commit()
+
+
+# --------------------
+# Lead status
+# --------------------
+async def update_lead_status(
+    db_path: str | Path,
+    lead_id: int,
+    *,
+    status: str,
+    allowed_from: Iterable[str],
+    changed_by: int | None,
+    assign: bool = False,
+) -> dict[str, Any] | None:
+    """
+    Переводит заявку в status, если текущий статус из allowed_from: один UPDATE по первичному ключу
+    (условие на статус — в том же WHERE, без предварительного SELECT) + запись в историю.
+    assign — закрепить заявку за changed_by. Возвращает обновлённую строку или None
+    (заявки нет или переход недопустим — например, её уже взял другой админ).
+    """
+    allowed = tuple(allowed_from)
+    placeholders = ", ".join("?" for _ in allowed)
+    changed_at = _now_iso_utc_seconds()
+
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"""
+            UPDATE leads
+            SET status=?, status_changed_at=?,
+                assigned_to=CASE WHEN ? THEN ? ELSE assigned_to END
+            WHERE id=? AND status IN ({placeholders})
+            RETURNING {LEAD_BRIEF_COLUMNS_SQL}
+            """,
+            (status, changed_at, assign, changed_by, lead_id, *allowed),
+        ) as cur:
+            row = await cur.fetchone()
+        if row is None:
+            return None
+        await db.execute(
+            "INSERT INTO lead_status_history (lead_id, status, changed_by, changed_at) VALUES (?, ?, ?, ?)",
+            (lead_id, status, changed_by, changed_at),
+        )
+        await db.commit()
+    return dict(row)
+
+
+async def get_lead(db_path: str | Path, lead_id: int) -> dict[str, Any] | None:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(f"SELECT {LEAD_BRIEF_COLUMNS_SQL} FROM leads WHERE id=?", (lead_id,)) as cur:
+            row = await cur.fetchone()
+    return dict(row) if row is not None else None
+
+
+async def list_open_leads(db_path: str | Path, *, limit: int = 20) -> list[dict[str, Any]]:
+    """Открытые заявки (new/in_progress), старые первыми — по частичному индексу idx_leads_open."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"SELECT {LEAD_BRIEF_COLUMNS_SQL} FROM leads WHERE {OPEN_STATUSES_SQL} ORDER BY created_at LIMIT ?",
+            (limit,),
+        ) as cur:
+            rows = await cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+async def list_assigned_leads(db_path: str | Path, admin_id: int, *, limit: int = 20) -> list[dict[str, Any]]:
+    """Заявки в работе у admin_id — по частичному индексу idx_leads_in_progress_assignee."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"""
+            SELECT {LEAD_BRIEF_COLUMNS_SQL} FROM leads
+            WHERE {IN_PROGRESS_SQL} AND assigned_to=?
+            ORDER BY created_at LIMIT ?
+            """,
+            (admin_id, limit),
+        ) as cur:
+            rows = await cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+async def find_leads_by_contact(
+    db_path: str | Path, contact: str, *, exclude_id: int | None = None, limit: int = 5
+) -> list[int]:
+    """id прошлых заявок с тем же нормализованным контактом, новые первыми — по частичному индексу idx_leads_contact."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute(
+            f"""
+            SELECT id FROM leads
+            WHERE {CONTACT_KNOWN_SQL} AND contact=? AND id<>?
+            ORDER BY id DESC LIMIT ?
+            """,
+            (contact, -1 if exclude_id is None else exclude_id, limit),
+        ) as cur:
+            return [row[0] for row in await cur.fetchall()]
+
+
+async def lead_status_history(db_path: str | Path, lead_id: int) -> list[dict[str, Any]]:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """
+            SELECT status, changed_by, changed_at FROM lead_status_history
+            WHERE lead_id=? ORDER BY id
+            """,
+            (lead_id,),
+        ) as cur:
+            rows = await cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+# --------------------
+# Admin routing & delivery
+# --------------------
+async def list_lead_routes(db_path: str | Path) -> list[dict[str, Any]]:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT service_id, deadline_key, mode, admin_ids FROM lead_routes ORDER BY position"
+        ) as cur:
+            rows = await cur.fetchall()
+    return [{**dict(r), "admins": json.loads(r["admin_ids"])} for r in rows]
+
+
+async def replace_lead_routes(
+    db_path: str | Path,
+    routes: Iterable[tuple[str | None, str | None, str, Iterable[int]]],
+) -> None:
+    """routes: (service_id, deadline_key, mode, admin_ids) по порядку; пустой список — вернуться к конфигу."""
+    rows = [
+        (position, service_id, deadline_key, mode, json.dumps(list(admins)))
+        for position, (service_id, deadline_key, mode, admins) in enumerate(routes, 1)
+    ]
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.execute("DELETE FROM lead_routes")
+        await db.executemany(
+            "INSERT INTO lead_routes (position, service_id, deadline_key, mode, admin_ids) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        await db.commit()
+
+
+async def save_lead_deliveries(
+    db_path: str | Path,
+    lead_id: int,
+    deliveries: Iterable[tuple[int, str, int, str | None]],
+) -> None:
+    """deliveries: (admin_id, status, число отправленных сообщений, ошибка) — одним executemany."""
+    delivered_at = _now_iso_utc_seconds()
+    rows = [(lead_id, *d, delivered_at) for d in deliveries]
+    if not rows:
+        return
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.executemany(
+            """
+            INSERT OR REPLACE INTO lead_deliveries (lead_id, admin_id, status, messages, error, delivered_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        await db.commit()
+
+
+async def list_lead_deliveries(db_path: str | Path, lead_id: int) -> list[dict[str, Any]]:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """
+            SELECT admin_id, status, messages, error, delivered_at FROM lead_deliveries
+            WHERE lead_id=? ORDER BY admin_id
+            """,
+            (lead_id,),
+        ) as cur:
+            rows = await cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+# --------------------
+# Relay (переписка админа с автором заявки)
+# --------------------
+async def save_relay_links(
+    db_path: str | Path,
+    rows: Iterable[tuple[int, int, int, int, int | None]],
+) -> None:
+    """rows: (chat_id, message_id, lead_id, peer_chat_id, peer_message_id)."""
+    created_at = _now_iso_utc_seconds()
+    values = [(*row, created_at) for row in rows]
+    if not values:
+        return
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.executemany(
+            """
+            INSERT OR REPLACE INTO relay_messages
+                (chat_id, message_id, lead_id, peer_chat_id, peer_message_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            values,
+        )
         await db.commit()
+
+
+async def get_relay_link(db_path: str | Path, chat_id: int, message_id: int) -> dict[str, Any] | None:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT lead_id, peer_chat_id, peer_message_id FROM relay_messages WHERE chat_id=? AND message_id=?",
+            (chat_id, message_id),
+        ) as cur:
+            row = await cur.fetchone()
+    return dict(row) if row is not None else None
+
+
+# --------------------
+# Lead drafts
+# --------------------
+async def save_draft(db_path: str | Path, *, chat_id: int, user_id: int, state: str, data: dict[str, Any]) -> None:
+    """Upsert черновика; изменение сбрасывает reminded_at — после нового простоя снова одно напоминание."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.execute(
+            """
+            INSERT INTO lead_drafts (chat_id, user_id, state, data_json, updated_at, reminded_at)
+            VALUES (?, ?, ?, ?, ?, NULL)
+            ON CONFLICT (chat_id, user_id) DO UPDATE SET
+                state=excluded.state, data_json=excluded.data_json,
+                updated_at=excluded.updated_at, reminded_at=NULL
+            """,
+            (chat_id, user_id, state, json.dumps(data, ensure_ascii=False), _now_iso_utc_seconds()),
+        )
+        await db.commit()
+
+
+async def delete_draft(db_path: str | Path, chat_id: int, user_id: int) -> bool:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        cur = await db.execute("DELETE FROM lead_drafts WHERE chat_id=? AND user_id=?", (chat_id, user_id))
+        await db.commit()
+        return cur.rowcount > 0
+
+
+async def get_draft(db_path: str | Path, chat_id: int, user_id: int) -> dict[str, Any] | None:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT state, data_json, updated_at FROM lead_drafts WHERE chat_id=? AND user_id=?",
+            (chat_id, user_id),
+        ) as cur:
+            row = await cur.fetchone()
+    if row is None:
+        return None
+    return {"state": row["state"], "data": json.loads(row["data_json"]), "updated_at": row["updated_at"]}
+
+
+async def list_idle_drafts(db_path: str | Path, *, idle_before: str, limit: int) -> list[dict[str, Any]]:
+    """Не напомненные черновики, не менявшиеся с idle_before, старые первыми — по idx_lead_drafts_pending."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"""
+            SELECT chat_id, user_id, state, data_json FROM lead_drafts
+            WHERE {DRAFTS_PENDING_SQL} AND updated_at <= ?
+            ORDER BY updated_at LIMIT ?
+            """,
+            (idle_before, limit),
+        ) as cur:
+            rows = await cur.fetchall()
+    return [
+        {"chat_id": r["chat_id"], "user_id": r["user_id"], "state": r["state"], "data": json.loads(r["data_json"])}
+        for r in rows
+    ]
+
+
+async def mark_drafts_reminded(db_path: str | Path, keys: Iterable[tuple[int, int]]) -> None:
+    """keys: (chat_id, user_id) — одним executemany по первичному ключу."""
+    reminded_at = _now_iso_utc_seconds()
+    rows = [(reminded_at, chat_id, user_id) for chat_id, user_id in keys]
+    if not rows:
+        return
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.executemany("UPDATE lead_drafts SET reminded_at=? WHERE chat_id=? AND user_id=?", rows)
+        await db.commit()
+
+
+# --------------------
+# Lead stats (bot/services/stats.py)
+# --------------------
+async def _backfill_lead_stats(db: aiosqlite.Connection) -> None:
+    # таблица счётчиков появилась на существующей БД — заполняем по уже сохранённым заявкам
+    async with db.execute("SELECT EXISTS (SELECT 1 FROM lead_stats_daily), EXISTS (SELECT 1 FROM leads)") as cur:
+        has_stats, has_leads = await cur.fetchone()
+    if has_leads and not has_stats:
+        await db.execute(REBUILD_LEAD_STATS_SQL, ("",))
+
+
+async def rebuild_lead_stats(db_path: str | Path) -> int:
+    """
+    Пересчёт счётчиков по leads с дня самой старой заявки в БД. Более ранние дни — заявки ушли в архив
+    (retention) — не трогаются: пересчитать их не по чему. Возвращает число пересчитанных строк.
+    """
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute("SELECT min(created_at) FROM leads") as cur:
+            (oldest,) = await cur.fetchone()
+        if oldest is None:
+            return 0
+        first_day = oldest[:10]
+        await db.execute("DELETE FROM lead_stats_daily WHERE day > ?", (first_day,))
+        cur = await db.execute(REBUILD_LEAD_STATS_SQL, (first_day,))
+        await db.commit()
+        return cur.rowcount
+
+
+async def list_lead_stats(db_path: str | Path, *, since_day: str) -> list[dict[str, Any]]:
+    """Счётчики с since_day (YYYY-MM-DD) включительно — диапазон по первичному ключу."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"SELECT {', '.join(LEAD_STATS_DAILY_COLUMNS)} FROM lead_stats_daily WHERE day >= ? ORDER BY day",
+            (since_day,),
+        ) as cur:
+            return [dict(row) for row in await cur.fetchall()]
+
+
+# --------------------
+# User profiles
+# --------------------
+async def get_user_profile(db_path: str | Path, tg_user_id: int) -> dict[str, Any] | None:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"SELECT {', '.join(USER_PROFILES_COLUMNS)} FROM user_profiles WHERE tg_user_id=?", (tg_user_id,)
+        ) as cur:
+            row = await cur.fetchone()
+    return dict(row) if row is not None else None
+
+
+async def delete_stale_profiles(db_path: str | Path, *, updated_before: str) -> int:
+    """Профили без заявок с updated_before (заявки уже ушли в архив) — вместе с контактом."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        cur = await db.execute("DELETE FROM user_profiles WHERE updated_at < ?", (updated_before,))
+        await db.commit()
+        return cur.rowcount
+
+
+# --------------------
+# Portfolio media
+# --------------------
+async def seed_portfolio_media(db_path: str | Path, media: dict[str, list[str]]) -> int:
+    """
+    Первичное наполнение portfolio_media из констант — один раз за жизнь БД (отметка в bot_meta):
+    портфолио, очищенное админом, после перезапуска пустым и остаётся. Возвращает количество добавленных записей.
+    """
+    created_at = _now_iso_utc_seconds()
+    rows = [
+        (service_id, file_id, "photo", position, created_at)
+        for service_id, file_ids in media.items()
+        for position, file_id in enumerate(file_ids, start=1)
+    ]
+
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute(f"SELECT 1 FROM {BOT_META_TABLE} WHERE key=?", (META_PORTFOLIO_SEEDED,)) as cur:
+            if await cur.fetchone() is not None:
+                return 0
+        # БД до появления отметки: непустая таблица — уже наполнена, только отмечаем
+        async with db.execute("SELECT 1 FROM portfolio_media LIMIT 1") as cur:
+            seeded_before = await cur.fetchone() is not None
+        if not seeded_before:
+            await db.executemany(
+                """
+                INSERT INTO portfolio_media (service_id, file_id, media_type, position, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        await db.execute(
+            f"INSERT INTO {BOT_META_TABLE} (key, value) VALUES (?, ?)", (META_PORTFOLIO_SEEDED, created_at)
+        )
+        await db.commit()
+    return 0 if seeded_before else len(rows)
+
+
+async def list_portfolio_media(db_path: str | Path) -> list[dict[str, Any]]:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """
+            SELECT id, service_id, file_id, media_type, position
+            FROM portfolio_media
+            ORDER BY service_id, position, id
+            """
+        ) as cur:
+            rows = await cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+async def add_portfolio_media(
+    db_path: str | Path,
+    *,
+    service_id: str,
+    items: Iterable[dict[str, str]],
+) -> list[int]:
+    """
+    items: iterable of {"media_type": "photo|video", "file_id": "..."}
+    Добавляет в конец списка услуги одной транзакцией. Возвращает id новых записей.
+    """
+    created_at = _now_iso_utc_seconds()
+    ids: list[int] = []
+
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute(
+            "SELECT COALESCE(MAX(position), 0) FROM portfolio_media WHERE service_id=?",
+            (service_id,),
+        ) as cur:
+            position = int((await cur.fetchone())[0])
+
+        for item in items:
+            media_type = (item.get("media_type") or "").strip()
+            file_id = (item.get("file_id") or "").strip()
+            if not media_type or not file_id:
+                continue
+            position += 1
+            cur = await db.execute(
+                """
+                INSERT INTO portfolio_media (service_id, file_id, media_type, position, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (service_id, file_id, media_type, position, created_at),
+            )
+            ids.append(int(cur.lastrowid))
+        await db.commit()
+    return ids
+
+
+async def _service_media_ids(db: aiosqlite.Connection, service_id: str) -> list[int]:
+    async with db.execute(
+        "SELECT id FROM portfolio_media WHERE service_id=? ORDER BY position, id",
+        (service_id,),
+    ) as cur:
+        return [int(r[0]) for r in await cur.fetchall()]
+
+
+async def _rewrite_positions(db: aiosqlite.Connection, ordered_ids: list[int]) -> None:
+    await db.executemany(
+        "UPDATE portfolio_media SET position=? WHERE id=?",
+        [(position, media_id) for position, media_id in enumerate(ordered_ids, start=1)],
+    )
+
+
+async def delete_portfolio_media(db_path: str | Path, media_id: int) -> bool:
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute("SELECT service_id FROM portfolio_media WHERE id=?", (media_id,)) as cur:
+            row = await cur.fetchone()
+        if row is None:
+            return False
+        await db.execute("DELETE FROM portfolio_media WHERE id=?", (media_id,))
+        await _rewrite_positions(db, await _service_media_ids(db, row[0]))
+        await db.commit()
+    return True
+
+
+async def move_portfolio_media(db_path: str | Path, media_id: int, position: int) -> bool:
+    """Перемещает запись на позицию position (1-based) внутри своей услуги."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute("SELECT service_id FROM portfolio_media WHERE id=?", (media_id,)) as cur:
+            row = await cur.fetchone()
+        if row is None:
+            return False
+        ordered = await _service_media_ids(db, row[0])
+        ordered.remove(media_id)
+        index = min(max(position, 1), len(ordered) + 1) - 1
+        ordered.insert(index, media_id)
+        await _rewrite_positions(db, ordered)
+        await db.commit()
+    return True
+
+
+# --------------------
+# DB maintenance (задачи bot/scheduler.py)
+# --------------------
+async def optimize_db(db_path: str | Path) -> None:
+    """PRAGMA optimize: обновляет статистику планировщика запросов там, где она устарела."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.execute("PRAGMA optimize;")
+
+
+async def checkpoint_wal(db_path: str | Path) -> tuple[int, int, int]:
+    """
+    PRAGMA wal_checkpoint(TRUNCATE): переносит WAL в основной файл и обрезает его.
+    Возвращает (busy, страниц в WAL, перенесено); после успешного TRUNCATE WAL пуст — (0, 0, 0),
+    вне режима WAL — (0, -1, -1).
+    """
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute("PRAGMA wal_checkpoint(TRUNCATE);") as cur:
+            busy, log_pages, checkpointed = await cur.fetchone()
+    return busy, log_pages, checkpointed
+
+
+async def backup_db(
+    db_path: str | Path, target_path: str | Path, *, pages_per_step: int, step_sleep_s: float
+) -> tuple[int, int]:
+    """
+    Онлайн-копия БД в target_path (SQLite backup API) по pages_per_step страниц за шаг. Источник — в WAL:
+    все шаги читают один снимок под открытой транзакцией чтения, запись бота идёт параллельно и не
+    перезапускает копию (без неё запись из другого соединения начинает backup заново). Возвращает (страниц, шагов).
+    """
+    totals: list[int] = []
+
+    def progress(_status: int, _remaining: int, total: int) -> None:
+        totals.append(total)
+
+    async with aiosqlite.connect(Path(db_path).as_posix()) as src:
+        # как в init_db; режим хранится в файле — обычно уже WAL
+        await src.execute("PRAGMA journal_mode=WAL;")
+        await src.execute("BEGIN;")
+        # снимок фиксируется первым чтением и держится до закрытия соединения
+        async with src.execute("SELECT count(*) FROM sqlite_master;") as cur:
+            await cur.fetchone()
+        async with aiosqlite.connect(Path(target_path).as_posix()) as dst:
+            await src.backup(dst, pages=pages_per_step, sleep=step_sleep_s, progress=progress)
+            # копия — один самодостаточный файл: без -wal/-shm рядом (init_db вернёт WAL после восстановления)
+            await dst.execute("PRAGMA journal_mode=DELETE;")
+    return (totals[-1] if totals else 0), len(totals)
+
+
+async def integrity_check(db_path: str | Path) -> list[str]:
+    """PRAGMA integrity_check; ["ok"] — файл БД цел."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute("PRAGMA integrity_check;") as cur:
+            return [row[0] for row in await cur.fetchall()]
+
+
+# --------------------
+# Retention (bot/services/retention.py)
+# --------------------
+def _placeholders(values: Iterable[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+async def fetch_expired_leads(db_path: str | Path, *, created_before: str, limit: int) -> list[dict[str, Any]]:
+    """
+    До limit заявок с created_at < created_before, старые первыми, со всеми колонками, файлами (files)
+    и историей статусов (history). created_at растёт вместе с id: обход по первичному ключу с начала
+    таблицы находит пачку сразу, без отдельного индекса по дате.
+    """
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            f"SELECT {', '.join(LEADS_COLUMNS)} FROM leads WHERE created_at < ? ORDER BY id LIMIT ?",
+            (created_before, limit),
+        ) as cur:
+            leads = {row["id"]: {**dict(row), "files": [], "history": []} for row in await cur.fetchall()}
+        if not leads:
+            return []
+        for table, columns, key in (
+            (LEAD_FILES_TABLE, LEAD_FILES_COLUMNS, "files"),
+            (LEAD_STATUS_HISTORY_TABLE, LEAD_STATUS_HISTORY_COLUMNS, "history"),
+        ):
+            async with db.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE lead_id IN ({_placeholders(leads)}) ORDER BY id",
+                tuple(leads),
+            ) as cur:
+                for row in await cur.fetchall():
+                    leads[row["lead_id"]][key].append(dict(row))
+    return list(leads.values())
+
+
+async def archive_leads(archive_path: str | Path, leads: list[dict[str, Any]]) -> None:
+    """
+    Пишет заявки (из fetch_expired_leads) в архивную БД той же схемы: leads, lead_files, lead_status_history.
+    INSERT OR REPLACE по id — повтор после сбоя (архив записан, из основной БД не удалено) не даёт дублей.
+    """
+    archive_path = Path(archive_path)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    async with aiosqlite.connect(archive_path.as_posix()) as db:
+        await db.execute(CREATE_TABLE_LEADS_SQL)
+        await _ensure_columns(db, LEADS_TABLE, LEADS_ADDED_COLUMNS)
+        await db.execute(CREATE_TABLE_LEAD_FILES_SQL)
+        await db.execute(CREATE_TABLE_LEAD_STATUS_HISTORY_SQL)
+        for table, columns, rows in (
+            (LEADS_TABLE, LEADS_COLUMNS, leads),
+            (LEAD_FILES_TABLE, LEAD_FILES_COLUMNS, [f for lead in leads for f in lead["files"]]),
+            (LEAD_STATUS_HISTORY_TABLE, LEAD_STATUS_HISTORY_COLUMNS, [h for lead in leads for h in lead["history"]]),
+        ):
+            await db.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({_placeholders(columns)})",
+                [tuple(row[c] for c in columns) for row in rows],
+            )
+        await db.commit()
+
+
+async def delete_leads(db_path: str | Path, lead_ids: Iterable[int]) -> int:
+    """Удаляет заявки одной транзакцией; файлы, история, доставки и переписка — ON DELETE CASCADE."""
+    ids = tuple(lead_ids)
+    if not ids:
+        return 0
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        await db.execute("PRAGMA foreign_keys=ON;")
+        cur = await db.execute(f"DELETE FROM leads WHERE id IN ({_placeholders(ids)})", ids)
+        await db.commit()
+        return cur.rowcount
+
+
+async def incremental_vacuum(db_path: str | Path, max_pages: int) -> int:
+    """PRAGMA incremental_vacuum(max_pages): возвращает файлу до max_pages свободных страниц. Возвращает сколько."""
+    async with aiosqlite.connect(Path(db_path).as_posix()) as db:
+        async with db.execute("PRAGMA freelist_count;") as cur:
+            before = (await cur.fetchone())[0]
+        # execute() делает один шаг — одна страница; executescript шагает до конца
+        await db.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+        async with db.execute("PRAGMA freelist_count;") as cur:
+            after = (await cur.fetchone())[0]
+    return before - after
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterable, Protocol
+
+from bot.config import POSTGRES_URL_SCHEMES, Settings, get_settings
+from bot.db import repository
+
+
+class LeadStorage(Protocol):
+    """
+    Хранилище заявок: leads и всё, что на них ссылается (файлы, история статусов, доставки, переписка),
+    профили авторов и счётчики /stats. Реализации — SqliteLeadStorage (bot/db/repository.py)
+    и PostgresLeadStorage (bot/db/postgres.py); выбор — DB_URL.
+
+    Локальное состояние бота (черновики, портфолио, правила маршрутизации, бэкапы) всегда в SQLite DB_PATH.
+    """
+
+    async def init(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+    async def save_lead(
+        self,
+        *,
+        tg_user_id: int,
+        tg_username: str | None,
+        tg_full_name: str,
+        service: str,
+        task: str,
+        deadline: str,
+        budget: str | None,
+        contact: str,
+        extra_json: dict[str, Any] | None,
+        submit_token: str | None = None,
+        contact_type: str | None = None,
+    ) -> int: ...
+
+    async def save_files(self, *, lead_id: int, files: Iterable[dict[str, str]]) -> None: ...
+
+    async def get_lead(self, lead_id: int) -> dict[str, Any] | None: ...
+
+    async def update_lead_status(
+        self,
+        lead_id: int,
+        *,
+        status: str,
+        allowed_from: Iterable[str],
+        changed_by: int | None,
+        assign: bool = False,
+    ) -> dict[str, Any] | None: ...
+
+    async def list_open_leads(self, *, limit: int = 20) -> list[dict[str, Any]]: ...
+
+    async def list_assigned_leads(self, admin_id: int, *, limit: int = 20) -> list[dict[str, Any]]: ...
+
+    async def find_leads_by_contact(
+        self, contact: str, *, exclude_id: int | None = None, limit: int = 5
+    ) -> list[int]: ...
+
+    async def lead_status_history(self, lead_id: int) -> list[dict[str, Any]]: ...
+
+    async def save_lead_deliveries(
+        self, lead_id: int, deliveries: Iterable[tuple[int, str, int, str | None]]
+    ) -> None: ...
+
+    async def list_lead_deliveries(self, lead_id: int) -> list[dict[str, Any]]: ...
+
+    async def save_relay_links(self, rows: Iterable[tuple[int, int, int, int, int | None]]) -> None: ...
+
+    async def get_relay_link(self, chat_id: int, message_id: int) -> dict[str, Any] | None: ...
+
+    async def get_user_profile(self, tg_user_id: int) -> dict[str, Any] | None: ...
+
+    async def delete_stale_profiles(self, *, updated_before: str) -> int: ...
+
+    async def rebuild_lead_stats(self) -> int: ...
+
+    async def list_lead_stats(self, *, since_day: str) -> list[dict[str, Any]]: ...
+
+    async def fetch_expired_leads(self, *, created_before: str, limit: int) -> list[dict[str, Any]]: ...
+
+    async def delete_leads(self, lead_ids: Iterable[int]) -> int: ...
+
+    async def reclaim_space(self, max_pages: int) -> int: ...
+
+
+class SqliteLeadStorage:
+    """Заявки в SQLite-файле бота: функции bot/db/repository.py, соединение на вызов."""
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+
+    async def init(self) -> None:
+        # схема общая с локальными таблицами бота; init_db идемпотентен
+        await repository.init_db(self.db_path)
+
+    async def close(self) -> None:
+        pass
+
+    async def save_lead(self, **lead: Any) -> int:
+        return await repository.save_lead(self.db_path, **lead)
+
+    async def save_files(self, *, lead_id: int, files: Iterable[dict[str, str]]) -> None:
+        await repository.save_files(self.db_path, lead_id=lead_id, files=files)
+
+    async def get_lead(self, lead_id: int) -> dict[str, Any] | None:
+        return await repository.get_lead(self.db_path, lead_id)
+
+    async def update_lead_status(self, lead_id: int, **change: Any) -> dict[str, Any] | None:
+        return await repository.update_lead_status(self.db_path, lead_id, **change)
+
+    async def list_open_leads(self, *, limit: int = 20) -> list[dict[str, Any]]:
+        return await repository.list_open_leads(self.db_path, limit=limit)
+
+    async def list_assigned_leads(self, admin_id: int, *, limit: int = 20) -> list[dict[str, Any]]:
+        return await repository.list_assigned_leads(self.db_path, admin_id, limit=limit)
+
+    async def find_leads_by_contact(
+        self, contact: str, *, exclude_id: int | None = None, limit: int = 5
+    ) -> list[int]:
+        return await repository.find_leads_by_contact(self.db_path, contact, exclude_id=exclude_id, limit=limit)
+
+    async def lead_status_history(self, lead_id: int) -> list[dict[str, Any]]:
+        return await repository.lead_status_history(self.db_path, lead_id)
+
+    async def save_lead_deliveries(self, lead_id: int, deliveries: Iterable[tuple[int, str, int, str | None]]) -> None:
+        await repository.save_lead_deliveries(self.db_path, lead_id, deliveries)
+
+    async def list_lead_deliveries(self, lead_id: int) -> list[dict[str, Any]]:
+        return await repository.list_lead_deliveries(self.db_path, lead_id)
+
+    async def save_relay_links(self, rows: Iterable[tuple[int, int, int, int, int | None]]) -> None:
+        await repository.save_relay_links(self.db_path, rows)
+
+    async def get_relay_link(self, chat_id: int, message_id: int) -> dict[str, Any] | None:
+        return await repository.get_relay_link(self.db_path, chat_id, message_id)
+
+    async def get_user_profile(self, tg_user_id: int) -> dict[str, Any] | None:
+        return await repository.get_user_profile(self.db_path, tg_user_id)
+
+    async def delete_stale_profiles(self, *, updated_before: str) -> int:
+        return await repository.delete_stale_profiles(self.db_path, updated_before=updated_before)
+
+    async def rebuild_lead_stats(self) -> int:
+        return await repository.rebuild_lead_stats(self.db_path)
+
+    async def list_lead_stats(self, *, since_day: str) -> list[dict[str, Any]]:
+        return await repository.list_lead_stats(self.db_path, since_day=since_day)
+
+    async def fetch_expired_leads(self, *, created_before: str, limit: int) -> list[dict[str, Any]]:
+        return await repository.fetch_expired_leads(self.db_path, created_before=created_before, limit=limit)
+
+    async def delete_leads(self, lead_ids: Iterable[int]) -> int:
+        return await repository.delete_leads(self.db_path, lead_ids)
+
+    async def reclaim_space(self, max_pages: int) -> int:
+        return await repository.incremental_vacuum(self.db_path, max_pages)
+
+
+def open_storage(settings: Settings) -> LeadStorage:
+    """Хранилище заявок по DB_URL; соединения PostgreSQL открываются при первом запросе."""
+    if settings.db_url.startswith(POSTGRES_URL_SCHEMES):
+        from bot.db.postgres import PostgresLeadStorage
+
+        return PostgresLeadStorage(settings.db_url, max_size=settings.db_pool_size)
+    return SqliteLeadStorage(settings.db_path)
+
+
+_storage: LeadStorage | None = None
+
+
+def configure_storage(storage: LeadStorage) -> LeadStorage:
+    """Устанавливает хранилище заявок процесса (run_bot, тесты)."""
+    global _storage
+    _storage = storage
+    return storage
+
+
+def get_storage() -> LeadStorage:
+    """Активное хранилище заявок; при первом обращении — по настройкам."""
+    if _storage is None:
+        return configure_storage(open_storage(get_settings()))
+    return _storage
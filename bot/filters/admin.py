@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from aiogram.filters import BaseFilter
+from aiogram.types import CallbackQuery, Message
+
+from bot.config import get_settings
+
+
+class IsAdmin(BaseFilter):
+    """Пропускает только админов: ADMIN_TG_ID и ADMIN_IDS (значения берутся из настроек в момент апдейта)."""
+
+    async def __call__(self, event: Message | CallbackQuery) -> bool:
+        user = event.from_user
+        return user is not None and user.id in get_settings().admin_ids
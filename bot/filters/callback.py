@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram.filters import BaseFilter
+from aiogram.types import CallbackQuery
+
+# Ключ в flags хэндлера, по которому CallbackIndex строит таблицу маршрутов
+CALLBACK_ROUTE_FLAG = "callback_route"
+
+
+def parse_callback(data: str | None) -> tuple[str, str, str]:
+    """callback_data по схеме namespace:action:arg -> (namespace, action, arg); недостающие части — ""."""
+    parts = (data or "").split(":", 2)
+    parts += [""] * (3 - len(parts))
+    return parts[0], parts[1], parts[2]
+
+
+class CallbackRoute(BaseFilter):
+    """
+    callback_data с заданным namespace и одним из actions (без actions — любой action).
+
+    Работает как обычный фильтр aiogram и дополнительно помечает хэндлер в flags:
+    по этим меткам CallbackIndex (bot/callback_index.py) вызывает хэндлер без перебора роутеров.
+    """
+
+    def __init__(self, namespace: str, *actions: str) -> None:
+        self.namespace = namespace
+        self.actions: frozenset[str] | None = frozenset(actions) if actions else None
+
+    def update_handler_flags(self, flags: dict[str, Any]) -> None:
+        flags.setdefault(CALLBACK_ROUTE_FLAG, []).append((self.namespace, self.actions))
+
+    async def __call__(self, call: CallbackQuery) -> bool:
+        namespace, action, _ = parse_callback(call.data)
+        return namespace == self.namespace and (self.actions is None or action in self.actions)
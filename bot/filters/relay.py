@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram.filters import BaseFilter
+from aiogram.types import Message
+
+from bot.services.relay import lookup_reply
+
+
+class RelayReply(BaseFilter):
+    """Ответ (reply) на сообщение переписки по заявке; хэндлер получает relay_link."""
+
+    async def __call__(self, message: Message) -> bool | dict[str, Any]:
+        # без reply — сразу мимо, без обращения к индексу
+        if message.reply_to_message is None:
+            return False
+        link = await lookup_reply(message)
+        return {"relay_link": link} if link is not None else False
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.types import InlineKeyboardMarkup, Message, ReplyKeyboardMarkup
+
+from bot.services.content import content_store
+from bot.utils.navigation import Target, show, target_message
+from bot.utils.validators import is_non_empty_text
+
+# Псевдо-шаг "каталог услуг": prev первого шага каждого сценария
+CHOOSE_SERVICE = "choose_service"
+
+KeyboardFactory = Callable[[], InlineKeyboardMarkup | ReplyKeyboardMarkup]
+StepHook = Callable[[Message, FSMContext], Awaitable[None]]
+StepRender = Callable[[FSMContext], Awaitable[str]]
+StepMarkup = Callable[[FSMContext], Awaitable[InlineKeyboardMarkup | ReplyKeyboardMarkup]]
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    Шаг сценария заявки.
+
+    Показ: prompt (или текст из render, если он динамический) + keyboard() (или markup(state)) через navigation.show —
+    статичные экраны берутся готовыми из content_store по page (текст и клавиатура без пересборки);
+    после inline-кнопки сообщение редактируется; затем after (альбом и т.п.).
+    Текстовый ввод: если задан field — ответ проверяется validator и сохраняется в FSM data
+    (store(text, data) -> updates, по умолчанию {field: text}), затем переход на next.
+    next/prev — имена шагов; None — соседний шаг по порядку в Flow.
+    """
+
+    state: State
+    prompt: str = ""
+    keyboard: KeyboardFactory | None = None
+    page: str | None = None
+    render: StepRender | None = None
+    markup: StepMarkup | None = None
+    after: StepHook | None = None
+    field: str | None = None
+    validator: Callable[[str], bool] = is_non_empty_text
+    error: str = "Напишите текстом (не пусто)."
+    store: Callable[[str, dict[str, Any]], dict[str, Any]] | None = None
+    next: str | None = None
+    prev: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.state.state.split(":", 1)[1]
+
+
+@dataclass(frozen=True)
+class Flow:
+    service_id: str
+    steps: tuple[Step, ...]
+
+
+class CompiledFlows:
+    """
+    Таблицы переходов, собранные один раз при импорте:
+    (service_id, state) -> шаг / prev / next — каждый переход одним dict lookup.
+    """
+
+    def __init__(self, flows: Iterable[Flow], *, default_service_id: str) -> None:
+        self.entry: dict[str, str] = {}
+        self._steps: dict[tuple[str, str], Step] = {}
+        self._by_state: dict[tuple[str, str], Step] = {}
+        self._prev: dict[tuple[str, str], str] = {}
+        self._next: dict[tuple[str, str], str | None] = {}
+        text_states: set[str] = set()
+
+        for flow in flows:
+            if not flow.steps:
+                raise ValueError(f"flow {flow.service_id!r} has no steps")
+            names = [step.name for step in flow.steps]
+            if len(set(names)) != len(names):
+                raise ValueError(f"flow {flow.service_id!r} has duplicate steps")
+
+            self.entry[flow.service_id] = names[0]
+            for i, step in enumerate(flow.steps):
+                key = (flow.service_id, step.name)
+                prev = step.prev or (names[i - 1] if i > 0 else CHOOSE_SERVICE)
+                nxt = step.next or (names[i + 1] if i + 1 < len(names) else None)
+                for target in (prev, nxt):
+                    if target is not None and target != CHOOSE_SERVICE and target not in names:
+                        raise ValueError(f"flow {flow.service_id!r}: unknown step {target!r} in {step.name!r}")
+                self._steps[key] = step
+                self._by_state[(flow.service_id, step.state.state)] = step
+                self._prev[key] = prev
+                self._next[key] = nxt
+                if step.field:
+                    text_states.add(step.state.state)
+
+        if default_service_id not in self.entry:
+            raise ValueError(f"default flow {default_service_id!r} is not defined")
+        self.default_service_id = default_service_id
+        self.text_states: frozenset[str] = frozenset(text_states)
+
+    def resolve(self, service_id: str | None) -> str:
+        return service_id if service_id in self.entry else self.default_service_id
+
+    def step(self, service_id: str, name: str) -> Step:
+        return self._steps[(self.resolve(service_id), name)]
+
+    def step_for_state(self, service_id: str, state: str | None) -> Step | None:
+        return self._by_state.get((self.resolve(service_id), state or ""))
+
+    def prev_of(self, service_id: str, name: str) -> str | None:
+        return self._prev.get((self.resolve(service_id), name))
+
+    def next_of(self, service_id: str, name: str) -> str | None:
+        return self._next.get((self.resolve(service_id), name))
+
+
+async def show_step(step: Step, target: Target, state: FSMContext) -> None:
+    await state.set_state(step.state)
+    if step.page is not None:
+        page = content_store.page(step.page)
+        text, markup = page.text, page.markup
+    else:
+        text = await step.render(state) if step.render is not None else step.prompt
+        if step.markup is not None:
+            markup = await step.markup(state)
+        else:
+            markup = step.keyboard() if step.keyboard else None
+    await show(target, text, markup, state=state)
+    if step.after is not None:
+        await step.after(target_message(target), state)
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message, ReplyKeyboardMarkup
+
+from bot.config import get_settings
+from bot.flows.engine import CompiledFlows, Flow, Step
+from bot.keyboards.contact import contact_choice_kb, contact_input_kb
+from bot.keyboards.form import back_cancel_kb
+from bot.keyboards.inline import confirm_kb, deadline_kb, files_kb, restoration_type_kb
+from bot.services.idempotency import new_submit_token
+from bot.services.media_check import media_availability
+from bot.services.portfolio_media import neuro_example_file_ids
+from bot.services.profiles import lookup_profile
+from bot.services.summary import SUMMARY_CACHE_KEY, render_summary
+from bot.states.lead_form import LeadForm
+from bot.utils.contacts import normalize_contact
+from bot.utils.replies import send_photos
+from bot.utils.validators import validate_contact, validate_phone
+
+MAX_FILES = 10
+
+TASK_PROMPT = "Опишите задачу одним сообщением (что нужно сделать):"
+
+
+# --------------------
+# Динамические части шагов
+# --------------------
+async def _send_neuro_examples(message: Message, state: FSMContext) -> None:
+    examples = media_availability.filter_sendable(await neuro_example_file_ids(get_settings().db_path))
+    if not await send_photos(message, examples, limit=5):
+        await message.answer("⚠️ Примеры фото пока не настроены (нет file_id).")
+
+
+async def _render_confirm(state: FSMContext) -> str:
+    text, fragments = render_summary(await state.get_data())
+    # токен отправки: все нажатия «Отправить» для этого экрана — одна заявка
+    await state.update_data({SUMMARY_CACHE_KEY: fragments, "submit_token": new_submit_token()})
+    return text
+
+
+async def _contact_choice_markup(state: FSMContext) -> ReplyKeyboardMarkup:
+    # повторный клиент: контакт из профиля одной кнопкой, без шага ввода
+    profile = await lookup_profile(state.key.user_id)
+    if profile is None or profile.contact is None:
+        await state.update_data(previous_contact=None, previous_contact_type=None)
+        return contact_choice_kb()
+    await state.update_data(previous_contact=profile.contact, previous_contact_type=profile.contact_type)
+    return contact_choice_kb(profile.contact)
+
+
+def _store_restoration_task(text: str, data: dict[str, Any]) -> dict[str, Any]:
+    rest_type = (data.get("rest_type") or "").strip() or "—"
+    return {"task": f"Тип: {rest_type}\n{text}"}
+
+
+def _store_custom_deadline(text: str, data: dict[str, Any]) -> dict[str, Any]:
+    return {"deadline_key": "custom", "deadline_custom_text": text}
+
+
+def _store_contact(text: str, data: dict[str, Any]) -> dict[str, Any]:
+    # validator уже пропустил ввод — контакт распознан; в заявку идёт нормализованное значение
+    contact = normalize_contact(text)
+    return {"contact": contact.value, "contact_type": contact.type}
+
+
+# --------------------
+# Общий хвост: срок -> контакт -> подтверждение
+# --------------------
+def _tail(*, deadline_prev: str | None = None) -> tuple[Step, ...]:
+    return (
+        Step(
+            LeadForm.deadline,
+            prompt="Выберите срочность:",
+            keyboard=deadline_kb,
+            prev=deadline_prev,
+            next="contact_choice",
+        ),
+        Step(
+            LeadForm.deadline_custom,
+            prompt="Напишите ваш вариант срока (например: «к пятнице», «до 10 января»):",
+            keyboard=back_cancel_kb,
+            field="deadline_custom_text",
+            error="Напишите срок текстом (не пусто).",
+            store=_store_custom_deadline,
+            prev="deadline",
+            next="contact_choice",
+        ),
+        Step(
+            LeadForm.contact_choice,
+            prompt="Как удобнее оставить контакт?",
+            markup=_contact_choice_markup,
+            prev="deadline",
+            next="confirm",
+        ),
+        Step(
+            LeadForm.contact_phone,
+            prompt="Введите номер телефона (например, +7 900 123-45-67):",
+            keyboard=contact_input_kb,
+            field="contact",
+            validator=validate_phone,
+            error="Не похоже на номер. Введите телефон с кодом страны, например +7 900 123-45-67 или 8 900 123-45-67:",
+            store=_store_contact,
+            prev="contact_choice",
+            next="confirm",
+        ),
+        Step(
+            LeadForm.contact_other,
+            prompt="Введите контакт (телефон / @username / email / ссылка):",
+            keyboard=contact_input_kb,
+            field="contact",
+            validator=validate_contact,
+            error="Не получилось распознать контакт. Напишите телефон, @username, email или ссылку.",
+            store=_store_contact,
+            prev="contact_choice",
+            next="confirm",
+        ),
+        Step(LeadForm.confirm, render=_render_confirm, keyboard=confirm_kb, prev="contact_choice"),
+    )
+
+
+def _task_step(**overrides: Any) -> Step:
+    params: dict[str, Any] = dict(
+        prompt=TASK_PROMPT,
+        keyboard=back_cancel_kb,
+        field="task",
+        error="Напишите задачу текстом (не пусто).",
+    )
+    params.update(overrides)
+    return Step(LeadForm.task, **params)
+
+
+# --------------------
+# Сценарии по service_id (SPEC 5.x)
+# --------------------
+LEAD_FLOWS: tuple[Flow, ...] = (
+    Flow(
+        "neuro",
+        (
+            Step(LeadForm.neuro_step1, page="neuro_step1", after=_send_neuro_examples),
+            Step(LeadForm.neuro_step2, page="neuro_step2"),
+            Step(
+                LeadForm.neuro_wishes,
+                page="neuro_wishes",
+                field="task",
+                error="Напишите пожелания текстом (не пусто).",
+            ),
+            *_tail(),
+        ),
+    ),
+    Flow(
+        "restoration",
+        (
+            Step(LeadForm.rest_type, prompt="Что реставрируем?", keyboard=restoration_type_kb),
+            _task_step(store=_store_restoration_task),
+            Step(
+                LeadForm.files,
+                prompt=(
+                    "Прикрепите файлы (фото/видео/документы).\n"
+                    f"Можно до {MAX_FILES} файлов. Когда закончите — нажмите «✅ Готово»."
+                ),
+                keyboard=files_kb,
+            ),
+            *_tail(),
+        ),
+    ),
+    Flow(
+        "model3d",
+        (
+            Step(LeadForm.model3d_intro, page="model3d_intro"),
+            Step(
+                LeadForm.model3d_wait_file,
+                prompt=(
+                    "Отправьте изображение (фото или документ с картинкой).\n"
+                    "Можно добавить текст в подписи (caption)."
+                ),
+                keyboard=back_cancel_kb,
+            ),
+            Step(
+                LeadForm.model3d_desc,
+                prompt="Опишите, что на изображении и что нужно сделать (одним сообщением):",
+                keyboard=back_cancel_kb,
+                field="task",
+                error="Опишите текстом (не пусто).",
+            ),
+            # описание часто приходит в caption вместе с файлом — назад ведём к файлу
+            *_tail(deadline_prev="model3d_wait_file"),
+        ),
+    ),
+    Flow(
+        "content",
+        (
+            Step(LeadForm.content_task, page="content_task", field="task"),
+            *_tail(),
+        ),
+    ),
+    Flow(
+        "video_greeting",
+        (
+            Step(LeadForm.video_task, page="video_task", field="task"),
+            *_tail(),
+        ),
+    ),
+    Flow("photo_stories", (_task_step(), *_tail())),
+)
+
+# Общий сценарий "задача -> срок -> контакт" — для неизвестных service_id
+FLOWS = CompiledFlows(LEAD_FLOWS, default_service_id="photo_stories")
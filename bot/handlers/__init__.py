@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from aiogram import Dispatcher
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    # модуль bot.handlers.<name> с атрибутом router
+    name: str
+    # необязательные роутеры подключаются, только если включены в Settings.optional_routers
+    optional: bool = False
+
+
+# Порядок важен: aiogram проверяет роутеры последовательно.
+# fallback — последним (ловит медиа вне сценариев), админские — перед ним.
+# admin_leads — сразу после start: в режиме ответа автору заявки любой текст админа
+# (в т.ч. совпадающий с кнопками меню) должен уйти пользователю. relay — за ним же: reply на сообщение
+# переписки по заявке пересылается собеседнику, даже посреди сценария заявки.
+ROUTERS: tuple[RouterSpec, ...] = (
+    RouterSpec("start"),
+    RouterSpec("admin_leads", optional=True),
+    RouterSpec("relay", optional=True),
+    RouterSpec("pages"),
+    RouterSpec("services"),
+    RouterSpec("portfolio"),
+    RouterSpec("lead_flow"),
+    RouterSpec("admin_portfolio", optional=True),
+    RouterSpec("admin_content", optional=True),
+    RouterSpec("admin_jobs", optional=True),
+    RouterSpec("debug_file_id", optional=True),
+    RouterSpec("fallback"),
+)
+
+
+def enabled_routers(optional_enabled: Iterable[str]) -> list[RouterSpec]:
+    enabled = set(optional_enabled)
+    return [spec for spec in ROUTERS if not spec.optional or spec.name in enabled]
+
+
+def include_routers(dp: Dispatcher, optional_enabled: Iterable[str]) -> list[str]:
+    """Импортирует модули роутеров только при подключении. Возвращает имена подключённых."""
+    included: list[str] = []
+    for spec in enabled_routers(optional_enabled):
+        module = importlib.import_module(f"{__name__}.{spec.name}")
+        dp.include_router(module.router)
+        included.append(spec.name)
+    return included
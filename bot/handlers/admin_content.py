@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot.filters.admin import IsAdmin
+from bot.services.content import content_store
+
+router = Router()
+router.message.filter(IsAdmin())
+
+
+@router.message(Command("content_reload"))
+async def content_reload_cmd(message: Message) -> None:
+    # тексты перечитываются без перезапуска; при ошибке остаётся прежняя версия
+    errors = content_store.reload()
+    if errors:
+        shown = "\n".join(f"• {err}" for err in errors[:20])
+        # ошибки содержат "<" и "&" из текстов — отправляем без разметки
+        await message.answer(
+            f"Тексты не обновлены, осталась версия {content_store.version}:\n{shown}", parse_mode=None
+        )
+        return
+    await message.answer(f"Тексты обновлены, версия {content_store.version}.")
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.filters.admin import IsAdmin
+from bot.scheduler import format_jobs, scheduler
+from bot.services.backup import db_backups
+from bot.utils.text import escape_html, split_html
+
+# Периодические задачи (bot/scheduler.py): метрики и внеочередной запуск; бэкап БД по команде.
+router = Router()
+router.message.filter(IsAdmin())
+
+
+@router.message(Command("jobs"))
+async def jobs_cmd(message: Message, command: CommandObject) -> None:
+    action, _, name = (command.args or "").strip().partition(" ")
+    if action == "run":
+        name = name.strip()
+        if name not in scheduler.jobs:
+            await message.answer(f"Нет задачи {escape_html(name or '—')}. Список: /jobs")
+            return
+        await message.answer(f"Запускаю {escape_html(name)}…")
+        if not await scheduler.run_now(name):
+            await message.answer(f"{escape_html(name)} уже выполняется — запуск пропущен.")
+            return
+        error = scheduler.jobs[name].metrics.last_error
+        await message.answer(
+            f"{escape_html(name)}: ошибка {escape_html(error)}" if error else f"{escape_html(name)}: готово."
+        )
+        return
+    lines = [escape_html(line) for line in format_jobs(scheduler)] or ["Задач нет."]
+    for chunk in split_html("\n".join(["<b>Задачи</b> (/jobs run &lt;имя&gt; — запустить сейчас)", *lines])):
+        await message.answer(chunk)
+
+
+@router.message(Command("backup"))
+async def backup_cmd(message: Message) -> None:
+    if "db_backup" not in scheduler.jobs:
+        await message.answer("Бэкапы выключены (BACKUP_DIR).")
+        return
+    await message.answer("Делаю бэкап БД…")
+    if not await scheduler.run_now("db_backup"):
+        await message.answer("Бэкап уже идёт — дождитесь его.")
+        return
+    error = scheduler.jobs["db_backup"].metrics.last_error
+    report = db_backups.last
+    if error or report is None:
+        await message.answer(f"Бэкап не сделан: {escape_html(error or '—')}")
+        return
+    await message.answer(
+        f"Бэкап готов: <code>{escape_html(report.path.name)}</code>\n"
+        f"{report.db_bytes / 1024:.0f} КиБ → {report.stored_bytes / 1024:.0f} КиБ, "
+        f"{report.pages} стр. за {report.steps} шаг., {report.duration_s:.2f} с; integrity_check: ok"
+    )
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from aiogram import Router
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message
+
+from bot.config import get_settings
+from bot.constants.lead_status import STATUS_LABELS
+from bot.db.repository import replace_lead_routes
+from bot.db.storage import get_storage
+from bot.filters.admin import IsAdmin
+from bot.keyboards.admin_leads import lead_admin_kb
+from bot.keyboards.callback_data import LeadDone, LeadReject, LeadReply, LeadTake
+from bot.services.lead_status import apply_lead_action, status_line, with_status_line
+from bot.services.relay import RelayLink, relay_message
+from bot.services.routing import RoutingError, format_rules, lead_router, load_routing, parse_rules, save_routing
+from bot.services.stats import STATS_DEFAULT_DAYS, STATS_MAX_DAYS, format_stats, load_stats
+from bot.states.admin import AdminLeadReply
+from bot.utils.text import TELEGRAM_TEXT_LIMIT, escape_html, split_html, utf16_len
+
+logger = logging.getLogger(__name__)
+
+# Кнопки под уведомлением о заявке (services/notify.py), ответ автору, список открытых заявок.
+router = Router()
+router.message.filter(IsAdmin())
+router.callback_query.filter(IsAdmin())
+
+
+async def _show_status(call: CallbackQuery, lead: dict[str, Any], admin_name: str | None) -> None:
+    """Строка статуса и кнопки: правкой уведомления (ADMIN_EDIT_NOTIFICATIONS) или новым сообщением."""
+    line = status_line(lead, admin_name)
+    markup = lead_admin_kb(lead["id"], lead["status"])
+    message = call.message
+    if get_settings().admin_edit_notifications and isinstance(message, Message) and message.text is not None:
+        text = with_status_line(message.html_text, line)
+        try:
+            if utf16_len(text) <= TELEGRAM_TEXT_LIMIT:
+                await message.edit_text(text, reply_markup=markup)
+            else:
+                await message.edit_reply_markup(reply_markup=markup)
+            return
+        except TelegramBadRequest as e:
+            if "message is not modified" in (e.message or "").lower():
+                return
+            logger.info("lead #%s: notification edit failed: %s", lead["id"], e.message)
+    await call.bot.send_message(call.from_user.id, f"Заявка #{lead['id']}{line}", reply_markup=markup)
+
+
+async def _on_action(call: CallbackQuery, lead_id: int, action: str) -> None:
+    lead = await apply_lead_action(lead_id, action, admin_id=call.from_user.id)
+    if lead is None:
+        current = await get_storage().get_lead(lead_id)
+        if current is None:
+            await call.answer("Заявка не найдена.", show_alert=True)
+            return
+        # статус уже сменили (другой админ / повторное нажатие) — показываем актуальный
+        await call.answer(f"Статус уже: {STATUS_LABELS.get(current['status'], current['status'])}")
+        await _show_status(call, current, None)
+        return
+    await call.answer(f"Заявка #{lead_id}: {STATUS_LABELS[lead['status']]}")
+    await _show_status(call, lead, call.from_user.full_name)
+
+
+@router.callback_query(LeadTake.filter())
+async def lead_take(call: CallbackQuery, callback_data: LeadTake) -> None:
+    await _on_action(call, callback_data.lead_id, "take")
+
+
+@router.callback_query(LeadDone.filter())
+async def lead_done(call: CallbackQuery, callback_data: LeadDone) -> None:
+    await _on_action(call, callback_data.lead_id, "done")
+
+
+@router.callback_query(LeadReject.filter())
+async def lead_reject(call: CallbackQuery, callback_data: LeadReject) -> None:
+    await _on_action(call, callback_data.lead_id, "reject")
+
+
+# ====== ответ автору заявки ======
+@router.callback_query(LeadReply.filter())
+async def lead_reply_start(call: CallbackQuery, state: FSMContext, callback_data: LeadReply) -> None:
+    lead = await get_storage().get_lead(callback_data.lead_id)
+    if lead is None:
+        await call.answer("Заявка не найдена.", show_alert=True)
+        return
+    await state.set_state(AdminLeadReply.message)
+    await state.update_data(reply_lead_id=lead["id"])
+    await call.bot.send_message(
+        call.from_user.id,
+        f"Ответ на заявку #{lead['id']} ({escape_html(lead['tg_full_name'])}): "
+        "пришлите текст, фото, видео или документ. /cancel — отмена.",
+    )
+    await call.answer()
+
+
+@router.message(AdminLeadReply.message, Command("cancel"))
+async def lead_reply_cancel(message: Message, state: FSMContext) -> None:
+    await state.clear()
+    await message.answer("Ответ отменён.")
+
+
+@router.message(AdminLeadReply.message)
+async def lead_reply_send(message: Message, state: FSMContext) -> None:
+    lead_id = (await state.get_data()).get("reply_lead_id")
+    await state.clear()
+    lead = await get_storage().get_lead(lead_id) if lead_id else None
+    if lead is None:
+        await message.answer("Заявка не найдена.")
+        return
+    try:
+        # копия связывается с заявкой (services/relay.py): ответ автора на неё вернётся админу
+        await relay_message(message, RelayLink(lead["id"], lead["tg_user_id"]))
+    except TelegramAPIError as e:
+        await message.answer(f"Не доставлено: {escape_html(e.message)}")
+        return
+    await message.answer(f"Отправлено автору заявки #{lead['id']}.")
+
+
+# ====== списки ======
+def _lead_row(lead: dict[str, Any]) -> str:
+    return (
+        f"#{lead['id']} · {STATUS_LABELS.get(lead['status'], lead['status'])} · {lead['created_at'][:10]} · "
+        f"{escape_html(lead['service'])} · {escape_html(lead['tg_full_name'])}"
+    )
+
+
+@router.message(Command("leads"))
+async def leads_cmd(message: Message, command: CommandObject) -> None:
+    storage = get_storage()
+    if (command.args or "").strip() == "my":
+        leads, title = await storage.list_assigned_leads(message.from_user.id), "<b>В работе у вас</b>"
+    else:
+        leads, title = await storage.list_open_leads(), "<b>Открытые заявки</b> (/leads my — ваши)"
+    if not leads:
+        await message.answer("Открытых заявок нет.")
+        return
+    for chunk in split_html("\n".join([title, *map(_lead_row, leads)])):
+        await message.answer(chunk)
+
+
+# ====== маршрутизация и доставка ======
+_ROUTES_HELP = (
+    "/routes set &lt;правила&gt; — задать, /routes reset — вернуть LEAD_ROUTING из конфига.\n"
+    "Пример: <code>service=restoration:all:111,222; deadline=urgent:rr:111,333; *:rr:222,333</code>"
+)
+
+
+@router.message(Command("routes"))
+async def routes_cmd(message: Message, command: CommandObject) -> None:
+    settings = get_settings()
+    action, _, spec = (command.args or "").strip().partition(" ")
+    try:
+        if action == "set":
+            await save_routing(settings.db_path, parse_rules(spec), settings.admin_ids)
+        elif action == "reset":
+            await replace_lead_routes(settings.db_path, [])
+            await load_routing(settings.db_path, settings.lead_routing, settings.admin_ids)
+        elif action:
+            await message.answer(_ROUTES_HELP)
+            return
+    except RoutingError as e:
+        await message.answer(f"Правила не изменены: {escape_html(e)}")
+        return
+    rules = "\n".join(escape_html(format_rules([rule])) for rule in lead_router.rules) or "нет — заявки всем админам"
+    await message.answer(f"<b>Маршрутизация заявок</b> ({lead_router.source}):\n{rules}\n\n{_ROUTES_HELP}")
+
+
+@router.message(Command("delivery"))
+async def delivery_cmd(message: Message, command: CommandObject) -> None:
+    lead_id = (command.args or "").strip()
+    if not lead_id.isdigit():
+        await message.answer("Формат: /delivery &lt;номер заявки&gt;")
+        return
+    deliveries = await get_storage().list_lead_deliveries(int(lead_id))
+    if not deliveries:
+        await message.answer(f"По заявке #{lead_id} доставок нет.")
+        return
+    lines = [
+        f"{d['admin_id']}: {d['status']} · сообщений {d['messages']}"
+        + (f" · {escape_html(d['error'])}" if d["error"] else "")
+        for d in deliveries
+    ]
+    await message.answer("\n".join([f"<b>Доставка заявки #{lead_id}</b>", *lines]))
+
+
+@router.message(Command("stats"))
+async def stats_cmd(message: Message, command: CommandObject) -> None:
+    arg = (command.args or "").strip()
+    if arg == "rebuild":
+        rows = await get_storage().rebuild_lead_stats()
+        await message.answer(
+            f"Статистика пересчитана по заявкам в БД: {rows} строк.\n"
+            "Дни до самой старой заявки в БД (ушедшие в архив) не пересчитываются."
+        )
+        return
+    if arg and not (arg.isdigit() and 1 <= int(arg) <= STATS_MAX_DAYS):
+        await message.answer(f"Формат: /stats [дней, 1–{STATS_MAX_DAYS}] или /stats rebuild")
+        return
+    stats = await load_stats(int(arg) if arg else STATS_DEFAULT_DAYS)
+    for chunk in split_html(format_stats(stats)):
+        await message.answer(chunk)
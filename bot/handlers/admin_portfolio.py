@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message
+
+from bot.config import get_settings
+from bot.filters.admin import IsAdmin
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.services.portfolio_media import PORTFOLIO_MEDIA_TYPES, PORTFOLIO_TARGETS, portfolio_media_store
+from bot.states.admin import AdminPortfolio
+from bot.utils.media import extract_media
+
+router = Router()
+router.message.filter(IsAdmin())
+
+_USAGE = (
+    "<b>Портфолио (админ)</b>\n"
+    "/portfolio_list [service_id] — список\n"
+    "/portfolio_add &lt;service_id&gt; — загрузка фото/видео, /done — закончить\n"
+    "/portfolio_del &lt;id&gt; — удалить\n"
+    "/portfolio_move &lt;id&gt; &lt;позиция&gt; — переставить\n"
+    "/capture &lt;service_id&gt; — следующий альбом целиком сохранить одним пакетом\n\n"
+    "service_id: " + ", ".join(PORTFOLIO_TARGETS)
+)
+
+
+def _parse_ints(args: str | None, count: int) -> list[int] | None:
+    parts = (args or "").split()
+    if len(parts) != count:
+        return None
+    try:
+        return [int(p) for p in parts]
+    except ValueError:
+        return None
+
+
+@router.message(Command("portfolio_list"))
+async def portfolio_list_cmd(message: Message, command: CommandObject) -> None:
+    wanted = (command.args or "").strip()
+    if wanted and wanted not in PORTFOLIO_TARGETS:
+        await message.answer(_USAGE)
+        return
+    service_ids = [wanted] if wanted else list(PORTFOLIO_TARGETS)
+
+    lines: list[str] = []
+    for service_id in service_ids:
+        items = await portfolio_media_store.items(get_settings().db_path, service_id)
+        lines.append(f"<b>{service_id}</b>: {len(items)}")
+        lines.extend(f"  #{it.id} [{it.position}] {it.media_type}" for it in items)
+
+    await message.answer("\n".join(lines) if lines else _USAGE)
+
+
+@router.message(Command("portfolio_add"))
+async def portfolio_add_cmd(message: Message, command: CommandObject, state: FSMContext) -> None:
+    service_id = (command.args or "").strip()
+    if service_id not in PORTFOLIO_TARGETS:
+        await message.answer(_USAGE)
+        return
+    await state.set_state(AdminPortfolio.upload)
+    await state.update_data(portfolio_service_id=service_id)
+    await message.answer(
+        f"Присылайте фото/видео для «{SERVICE_ID_TO_TITLE.get(service_id, service_id)}».\n"
+        "Когда закончите — /done"
+    )
+
+
+@router.message(AdminPortfolio.upload, Command("done"))
+async def portfolio_add_done(message: Message, state: FSMContext) -> None:
+    await state.clear()
+    await message.answer("Готово. /portfolio_list — посмотреть результат.")
+
+
+@router.message(AdminPortfolio.upload, F.photo | F.video)
+async def portfolio_add_media(message: Message, state: FSMContext) -> None:
+    media_type, file_id = extract_media(message)
+    if media_type not in PORTFOLIO_MEDIA_TYPES:
+        return
+    data = await state.get_data()
+    service_id = data.get("portfolio_service_id") or ""
+    ids = await portfolio_media_store.add(
+        get_settings().db_path, service_id, [{"media_type": media_type, "file_id": file_id}]
+    )
+    await message.answer(f"Добавлено: #{ids[0]} ({media_type}) → {service_id}")
+
+
+@router.message(Command("portfolio_del"))
+async def portfolio_del_cmd(message: Message, command: CommandObject) -> None:
+    parsed = _parse_ints(command.args, 1)
+    if parsed is None:
+        await message.answer(_USAGE)
+        return
+    ok = await portfolio_media_store.remove(get_settings().db_path, parsed[0])
+    await message.answer("Удалено." if ok else "Запись не найдена.")
+
+
+@router.message(Command("portfolio_move"))
+async def portfolio_move_cmd(message: Message, command: CommandObject) -> None:
+    parsed = _parse_ints(command.args, 2)
+    if parsed is None:
+        await message.answer(_USAGE)
+        return
+    media_id, position = parsed
+    ok = await portfolio_media_store.move(get_settings().db_path, media_id, position)
+    await message.answer("Перемещено." if ok else "Запись не найдена.")
@@ -1,28 +1,71 @@
 from __future__ import annotations
 
 from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
+from bot.config import get_settings
+from bot.filters.admin import IsAdmin
+from bot.services.portfolio_media import PORTFOLIO_MEDIA_TYPES, PORTFOLIO_TARGETS, portfolio_media_store
+from bot.states.admin import AdminCapture
+from bot.utils.album import AlbumCollector
+from bot.utils.media import extract_media
+
+# Админский инструмент: file_id по присланным медиа + пакетная запись в portfolio_media.
+# Остальные пользователи сюда не попадают (см. bot/handlers/fallback.py).
 router = Router()
+router.message.filter(IsAdmin())
+
+album_collector = AlbumCollector()
+
+_MEDIA_LABELS = {
+    "photo": "📸 PHOTO",
+    "video": "🎬 VIDEO",
+    "document": "📎 DOCUMENT",
+}
+
+
+@router.message(Command("capture"))
+async def capture_start(message: Message, command: CommandObject, state: FSMContext) -> None:
+    target = (command.args or "").strip()
+    if target not in PORTFOLIO_TARGETS:
+        await message.answer("Использование: /capture &lt;service_id&gt;\nservice_id: " + ", ".join(PORTFOLIO_TARGETS))
+        return
+    await state.set_state(AdminCapture.collect)
+    await state.update_data(capture_target=target)
+    await message.answer(f"Пришлите альбом (или одно фото/видео) — сохраню в «{target}». /capture_cancel — отмена.")
+
+
+@router.message(AdminCapture.collect, Command("capture_cancel"))
+async def capture_cancel(message: Message, state: FSMContext) -> None:
+    await state.clear()
+    await message.answer("Захват отменён.")
 
 
-@router.message(F.photo)
-async def debug_photo_file_id(message: Message) -> None:
-    file_id = message.photo[-1].file_id
-    await message.answer(f"📸 PHOTO file_id:\n<code>{file_id}</code>")
+@router.message(F.photo | F.video | F.document)
+async def capture_media(message: Message, state: FSMContext) -> None:
+    album = await album_collector.collect(message)
+    if album is None:
+        # сообщение уже забрал первый обработчик этого альбома
+        return
 
+    captured = [m for m in (extract_media(msg) for msg in album) if m]
 
-@router.message(F.video)
-async def debug_video_file_id(message: Message) -> None:
-    file_id = message.video.file_id
-    await message.answer(f"🎬 VIDEO file_id:\n<code>{file_id}</code>")
+    target = None
+    if await state.get_state() == AdminCapture.collect.state:
+        target = (await state.get_data()).get("capture_target")
 
+    if target:
+        items = [{"media_type": t, "file_id": fid} for t, fid in captured if t in PORTFOLIO_MEDIA_TYPES]
+        ids = await portfolio_media_store.add(get_settings().db_path, target, items)
+        await state.clear()
+        skipped = len(captured) - len(items)
+        text = f"✅ Сохранено в «{target}»: {len(ids)}"
+        if skipped:
+            text += f" (пропущено документов: {skipped})"
+        await message.answer(text)
+        return
 
-@router.message(F.document)
-async def debug_document_file_id(message: Message) -> None:
-    file_id = message.document.file_id
-    mime = message.document.mime_type
-    await message.answer(
-        f"📎 DOCUMENT file_id:\n<code>{file_id}</code>\n"
-        f"mime: <code>{mime}</code>"
-    )
+    lines = [f"{_MEDIA_LABELS[t]} file_id:\n<code>{fid}</code>" for t, fid in captured]
+    await message.answer("\n\n".join(lines))
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from aiogram import F, Router
+from aiogram.enums import ChatType
+from aiogram.filters import StateFilter
+from aiogram.types import Message
+
+from bot.keyboards.main import main_menu_kb
+from bot.utils.rate_limit import PerKeyCooldown
+
+# Медиа вне сценария от обычных пользователей: одна подсказка не чаще раза в 10 минут,
+# остальное молча игнорируем (без исходящего запроса на каждое сообщение). Внутри сценария
+# (любое состояние FSM) подсказка «оформите заявку» неверна — там медиа не трогаем.
+router = Router()
+
+_hint_cooldown = PerKeyCooldown(600)
+
+
+@router.message(StateFilter(None), F.chat.type == ChatType.PRIVATE, F.photo | F.video | F.document)
+async def stray_media(message: Message) -> None:
+    if not _hint_cooldown.hit(message.from_user.id):
+        return
+    await message.answer(
+        "Чтобы отправить файлы, оформите заявку — «✅ Оставить заявку».",
+        reply_markup=main_menu_kb(),
+    )
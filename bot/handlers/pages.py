@@ -3,24 +3,26 @@ from __future__ import annotations
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 
-from bot.keyboards.main import main_menu_kb
-from bot.keyboards.pages import page_actions_kb
-from bot.texts.static_pages import CONTACTS_TEXT, HOW_WE_WORK_TEXT
+from bot.filters.callback import CallbackRoute
+from bot.services.content import content_store
 
 router = Router()
 
 
 @router.message(F.text == "🧾 Как мы работаем")
 async def how_we_work(message: Message) -> None:
-    await message.answer(HOW_WE_WORK_TEXT, reply_markup=page_actions_kb("⬅️ Назад"))
+    page = content_store.page("how_we_work")
+    await message.answer(page.text, reply_markup=page.markup)
 
 
 @router.message(F.text == "☎️ Контакты")
 async def contacts(message: Message) -> None:
-    await message.answer(CONTACTS_TEXT, reply_markup=page_actions_kb("⬅️ В меню"))
+    page = content_store.page("contacts")
+    await message.answer(page.text, reply_markup=page.markup)
 
 
-@router.callback_query(F.data == "pages:back_menu")
+@router.callback_query(CallbackRoute("pages", "back_menu"))
 async def pages_back_menu(call: CallbackQuery) -> None:
-    await call.message.answer("Главное меню 👇", reply_markup=main_menu_kb())
+    page = content_store.page("main_menu")
+    await call.message.answer(page.text, reply_markup=page.markup)
     await call.answer()
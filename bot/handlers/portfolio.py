@@ -2,40 +2,48 @@ from __future__ import annotations
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, InputMediaPhoto, Message
+from aiogram.types import CallbackQuery, Message
 
-from bot.constants.portfolio import PORTFOLIO_MEDIA_FILE_IDS
+from bot.config import get_settings
 from bot.constants.services import get_service_title
+from bot.filters.callback import CallbackRoute
 from bot.handlers.lead_flow import start_lead_with_service_id
-from bot.keyboards.main import main_menu_kb
-from bot.keyboards.portfolio import portfolio_after_album_kb, portfolio_services_kb
+from bot.keyboards.callback_data import PortfolioApply, PortfolioOpen
+from bot.keyboards.portfolio import portfolio_services_kb
+from bot.services.content import after_album_key, content_store
+from bot.services.media_check import media_availability
+from bot.services.portfolio_media import portfolio_media_store
+from bot.utils.navigation import Target, show, target_message
+from bot.utils.replies import send_album
 
 router = Router()
 
 
-async def _show_portfolio_services(message: Message) -> None:
-    await message.answer("Выберите услугу, чтобы посмотреть примеры работ:", reply_markup=portfolio_services_kb())
+async def _show_portfolio_services(target: Target) -> None:
+    page = content_store.page("portfolio_services")
+    await show(target, page.text, page.markup)
 
 
-async def _send_album_for_service(message: Message, service_id: str) -> None:
+async def _send_album_for_service(target: Target, service_id: str) -> None:
+    message = target_message(target)
     title = get_service_title(service_id)
     if not title:
         await message.answer("Не удалось определить услугу. Откройте «Примеры работ» заново.")
         return
 
-    file_ids = PORTFOLIO_MEDIA_FILE_IDS.get(service_id) or []
-    if not file_ids:
-        await message.answer(f"{title}\n\n⚠️ Примеры работ пока не настроены (нет file_id).")
-        await message.answer("⬅️ Вернуться к списку услуг:", reply_markup=portfolio_services_kb())
+    # битые file_id (по результатам фоновой проверки) не отправляем — иначе падает весь альбом
+    items = await portfolio_media_store.items(get_settings().db_path, service_id)
+    album = [(it.media_type, it.file_id) for it in items if media_availability.is_sendable(it.file_id)]
+    if not await send_album(message, album):
+        await show(
+            target,
+            f"{title}\n\n⚠️ Примеры работ пока не настроены (нет file_id).\n\n⬅️ Вернуться к списку услуг:",
+            portfolio_services_kb(),
+        )
         return
 
-    media = [InputMediaPhoto(media=fid) for fid in file_ids[:10]]  # безопасно, даже если больше
-    await message.answer_media_group(media=media)
-
-    await message.answer(
-        "Хотите такой же результат?",
-        reply_markup=portfolio_after_album_kb(service_id),
-    )
+    page = content_store.page(after_album_key(service_id))
+    await message.answer(page.text, reply_markup=page.markup)
 
 
 # ====== ENTRY: reply-menu ======
@@ -45,29 +53,28 @@ async def portfolio_from_menu(message: Message) -> None:
 
 
 # ====== NAV: list/menu ======
-@router.callback_query(F.data == "portfolio:list")
+@router.callback_query(CallbackRoute("portfolio", "list"))
 async def portfolio_list(call: CallbackQuery) -> None:
     await call.answer()
-    await _show_portfolio_services(call.message)
+    await _show_portfolio_services(call)
 
 
-@router.callback_query(F.data == "portfolio:menu")
+@router.callback_query(CallbackRoute("portfolio", "menu"))
 async def portfolio_to_menu(call: CallbackQuery) -> None:
     await call.answer()
-    await call.message.answer("Главное меню 👇", reply_markup=main_menu_kb())
+    page = content_store.page("main_menu")
+    await call.message.answer(page.text, reply_markup=page.markup)
 
 
 # ====== OPEN SERVICE (album) ======
-@router.callback_query(F.data.startswith("portfolio:open:"))
-async def portfolio_open(call: CallbackQuery) -> None:
-    service_id = (call.data or "").split(":", 2)[2].strip()
+@router.callback_query(PortfolioOpen.filter())
+async def portfolio_open(call: CallbackQuery, callback_data: PortfolioOpen) -> None:
     await call.answer()
-    await _send_album_for_service(call.message, service_id)
+    await _send_album_for_service(call, callback_data.service_id)
 
 
 # ====== APPLY (start lead with selected service) ======
-@router.callback_query(F.data.startswith("portfolio:apply:"))
-async def portfolio_apply(call: CallbackQuery, state: FSMContext) -> None:
-    service_id = (call.data or "").split(":", 2)[2].strip()
+@router.callback_query(PortfolioApply.filter())
+async def portfolio_apply(call: CallbackQuery, state: FSMContext, callback_data: PortfolioApply) -> None:
     await call.answer()
-    await start_lead_with_service_id(call.message, state, service_id)
+    await start_lead_with_service_id(call, state, callback_data.service_id)
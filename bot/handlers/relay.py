@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import logging
+
+from aiogram import F, Router
+from aiogram.enums import ChatType
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import Message
+
+from bot.filters.relay import RelayReply
+from bot.services.relay import RelayLink, relay_message
+from bot.utils.text import escape_html
+
+logger = logging.getLogger(__name__)
+
+# Переписка через бота: ответ админа на уведомление о заявке уходит автору, ответ автора — обратно админу.
+# Связки сообщений — services/relay.py; одно обращение к индексу и одна отправка на сообщение.
+router = Router()
+router.message.filter(F.chat.type == ChatType.PRIVATE)
+
+
+@router.message(RelayReply())
+async def relay_reply(message: Message, relay_link: RelayLink) -> None:
+    try:
+        await relay_message(message, relay_link)
+    except TelegramAPIError as e:
+        logger.info("lead #%s: relay to %s failed: %s", relay_link.lead_id, relay_link.peer_chat_id, e.message)
+        await message.answer(f"Не доставлено: {escape_html(e.message)}")
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from bot.keyboards.callback_data import LeadDone, LeadReject, LeadReply, LeadTake
+from bot.services.lead_status import available_actions
+
+_BUTTONS = {
+    "take": ("🙋 Взять", LeadTake),
+    "done": ("✅ Готово", LeadDone),
+    "reject": ("❌ Отклонить", LeadReject),
+}
+
+
+def lead_admin_kb(lead_id: int, status: str) -> InlineKeyboardMarkup:
+    # кнопки только допустимых из текущего статуса переходов + ответ пользователю всегда
+    actions = [
+        InlineKeyboardButton(text=_BUTTONS[name][0], callback_data=_BUTTONS[name][1](lead_id).pack())
+        for name in available_actions(status)
+    ]
+    rows = [actions] if actions else []
+    rows.append([InlineKeyboardButton(text="💬 Ответить", callback_data=LeadReply(lead_id).pack())])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
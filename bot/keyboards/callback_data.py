@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import dataclasses
+import string
+from typing import Any, Callable, ClassVar, NewType, TypeVar, get_type_hints
+
+from aiogram.types import CallbackQuery
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.filters.callback import CallbackRoute
+
+# Типизированные callback_data: упаковка/распаковка в одном месте.
+# Формат — схема namespace:action:args (см. CallbackRoute), args через ".":
+# int — base36, услуга — её номер в SERVICE_ID_TO_TITLE (base36, с 1).
+# Для номеров < 10 это совпадает со старыми f-строками (svc:3, services:open:3),
+# а старые portfolio:*:<service_id> тоже распаковываются — кнопки в уже отправленных сообщениях работают.
+
+MAX_CALLBACK_DATA_BYTES = 64  # лимит Telegram
+
+ServiceId = NewType("ServiceId", str)
+
+_ARG_SEP = "."
+_B36 = string.digits + string.ascii_lowercase
+_SERVICE_IDS: tuple[str, ...] = tuple(SERVICE_ID_TO_TITLE)
+_SERVICE_POS: dict[str, int] = {sid: i for i, sid in enumerate(_SERVICE_IDS, start=1)}
+
+
+def _b36(value: int) -> str:
+    if value < 0:
+        raise ValueError("negative values are not supported")
+    out = ""
+    while True:
+        value, rem = divmod(value, 36)
+        out = _B36[rem] + out
+        if not value:
+            return out
+
+
+def _encode_service(service_id: str) -> str:
+    return _b36(_SERVICE_POS[service_id])
+
+
+def _decode_service(raw: str) -> str:
+    if raw in _SERVICE_POS:
+        return raw
+    pos = int(raw, 36)
+    if not 1 <= pos <= len(_SERVICE_IDS):
+        raise ValueError(f"unknown service {raw!r}")
+    return _SERVICE_IDS[pos - 1]
+
+
+_CODECS: dict[Any, tuple[Callable[[Any], str], Callable[[str], Any]]] = {
+    int: (_b36, lambda raw: int(raw, 36)),
+    ServiceId: (_encode_service, _decode_service),
+}
+
+P = TypeVar("P", bound="CallbackPayload")
+
+
+class CallbackPayload:
+    """
+    База для callback_data кнопок. Наследник — frozen dataclass с полями int/ServiceId:
+
+        @dataclasses.dataclass(frozen=True)
+        class ServiceOpen(CallbackPayload, namespace="services", action="open"):
+            service_id: ServiceId
+
+    pack() — строка для InlineKeyboardButton, filter() — фильтр хэндлера:
+    распакованный объект приходит в аргумент callback_data.
+    """
+
+    namespace: ClassVar[str]
+    action: ClassVar[str | None]
+    _fields: ClassVar[tuple[tuple[str, Callable[[Any], str], Callable[[str], Any]], ...]]
+
+    def __init_subclass__(cls, *, namespace: str, action: str | None = None, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.namespace = namespace
+        cls.action = action
+
+    @classmethod
+    def _codecs(cls) -> tuple[tuple[str, Callable[[Any], str], Callable[[str], Any]], ...]:
+        # поля доступны только после @dataclass, поэтому собираем лениво
+        if "_fields" not in cls.__dict__:
+            hints = get_type_hints(cls)
+            cls._fields = tuple((f.name, *_CODECS[hints[f.name]]) for f in dataclasses.fields(cls))
+        return cls._fields
+
+    @classmethod
+    def _prefix(cls) -> str:
+        return f"{cls.namespace}:{cls.action}:" if cls.action else f"{cls.namespace}:"
+
+    def pack(self) -> str:
+        args = _ARG_SEP.join(encode(getattr(self, name)) for name, encode, _ in self._codecs())
+        data = self._prefix() + args
+        if len(data.encode()) > MAX_CALLBACK_DATA_BYTES:
+            raise ValueError(f"callback_data is too long: {data!r}")
+        return data
+
+    @classmethod
+    def unpack(cls: type[P], data: str | None) -> P:
+        prefix = cls._prefix()
+        if not data or not data.startswith(prefix):
+            raise ValueError(f"not a {cls.__name__} callback: {data!r}")
+        codecs = cls._codecs()
+        raw = data[len(prefix):].split(_ARG_SEP) if codecs else []
+        if len(raw) != len(codecs):
+            raise ValueError(f"{cls.__name__}: expected {len(codecs)} args, got {data!r}")
+        return cls(**{name: decode(value) for (name, _, decode), value in zip(codecs, raw)})
+
+    @classmethod
+    def filter(cls) -> CallbackPayloadFilter:
+        return CallbackPayloadFilter(cls)
+
+
+class CallbackPayloadFilter(CallbackRoute):
+    """CallbackRoute по namespace/action класса + распаковка в callback_data (битые данные — не совпадение)."""
+
+    def __init__(self, payload: type[CallbackPayload]) -> None:
+        super().__init__(payload.namespace, *((payload.action,) if payload.action else ()))
+        self.payload = payload
+
+    async def __call__(self, call: CallbackQuery) -> bool | dict[str, Any]:
+        try:
+            return {"callback_data": self.payload.unpack(call.data)}
+        except ValueError:
+            return False
+
+
+@dataclasses.dataclass(frozen=True)
+class ChooseService(CallbackPayload, namespace="svc"):
+    service_id: ServiceId
+
+
+@dataclasses.dataclass(frozen=True)
+class ServiceOpen(CallbackPayload, namespace="services", action="open"):
+    service_id: ServiceId
+
+
+@dataclasses.dataclass(frozen=True)
+class ServiceApply(CallbackPayload, namespace="services", action="apply"):
+    service_id: ServiceId
+
+
+@dataclasses.dataclass(frozen=True)
+class ServicePortfolio(CallbackPayload, namespace="services", action="portfolio"):
+    service_id: ServiceId
+
+
+@dataclasses.dataclass(frozen=True)
+class PortfolioOpen(CallbackPayload, namespace="portfolio", action="open"):
+    service_id: ServiceId
+
+
+@dataclasses.dataclass(frozen=True)
+class PortfolioApply(CallbackPayload, namespace="portfolio", action="apply"):
+    service_id: ServiceId
+
+
+# Кнопки уведомления о заявке у админа (bot/handlers/admin_leads.py)
+@dataclasses.dataclass(frozen=True)
+class LeadTake(CallbackPayload, namespace="adm", action="take"):
+    lead_id: int
+
+
+@dataclasses.dataclass(frozen=True)
+class LeadDone(CallbackPayload, namespace="adm", action="done"):
+    lead_id: int
+
+
+@dataclasses.dataclass(frozen=True)
+class LeadReject(CallbackPayload, namespace="adm", action="reject"):
+    lead_id: int
+
+
+@dataclasses.dataclass(frozen=True)
+class LeadReply(CallbackPayload, namespace="adm", action="reply"):
+    lead_id: int
@@ -3,9 +3,15 @@ from __future__ import annotations
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
 
 
-def contact_choice_kb() -> ReplyKeyboardMarkup:
+# Кнопка прежнего контакта: префикс + контакт из профиля (bot/services/profiles.py)
+PREVIOUS_CONTACT_PREFIX = "🔁 Как в прошлый раз: "
+
+
+def contact_choice_kb(previous_contact: str | None = None) -> ReplyKeyboardMarkup:
+    previous = [[KeyboardButton(text=PREVIOUS_CONTACT_PREFIX + previous_contact)]] if previous_contact else []
     return ReplyKeyboardMarkup(
         keyboard=[
+            *previous,
             [KeyboardButton(text="✅ Использовать мой @username")],
             [KeyboardButton(text="📞 Указать телефон"), KeyboardButton(text="✍️ Ввести другой контакт")],
             [KeyboardButton(text="⏭ Пропустить")],
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from bot.constants.services import SERVICE_TITLE_TO_ID
+from bot.keyboards.callback_data import ChooseService, ServiceId
+
 
 def services_kb(services: list[str]) -> InlineKeyboardMarkup:
-    # callback: svc:<idx>
     rows: list[list[InlineKeyboardButton]] = []
-    for i, title in enumerate(services, start=1):
-        rows.append([InlineKeyboardButton(text=title, callback_data=f"svc:{i}")])
+    for title in services:
+        cb = ChooseService(ServiceId(SERVICE_TITLE_TO_ID[title]))
+        rows.append([InlineKeyboardButton(text=title, callback_data=cb.pack())])
 
     rows.append(
         [
@@ -74,3 +77,13 @@ def confirm_kb() -> InlineKeyboardMarkup:
             ],
         ]
     )
+
+
+def draft_reminder_kb() -> InlineKeyboardMarkup:
+    # напоминание о незавершённой заявке (bot/services/drafts.py)
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="▶️ Продолжить заявку", callback_data="draft:resume")],
+            [InlineKeyboardButton(text="🗑 Не нужно", callback_data="draft:drop")],
+        ]
+    )
@@ -3,13 +3,14 @@ from __future__ import annotations
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.keyboards.callback_data import PortfolioApply, PortfolioOpen, ServiceId
 
 
 def portfolio_services_kb() -> InlineKeyboardMarkup:
     # inline-меню услуг для портфолио
     rows: list[list[InlineKeyboardButton]] = []
     for service_id, title in SERVICE_ID_TO_TITLE.items():
-        rows.append([InlineKeyboardButton(text=title, callback_data=f"portfolio:open:{service_id}")])
+        rows.append([InlineKeyboardButton(text=title, callback_data=PortfolioOpen(ServiceId(service_id)).pack())])
 
     rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data="portfolio:menu")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -18,7 +19,7 @@ def portfolio_services_kb() -> InlineKeyboardMarkup:
 def portfolio_after_album_kb(service_id: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="✅ Оставить заявку", callback_data=f"portfolio:apply:{service_id}")],
+            [InlineKeyboardButton(text="✅ Оставить заявку", callback_data=PortfolioApply(ServiceId(service_id)).pack())],
             [InlineKeyboardButton(text="⬅️ Назад к списку услуг", callback_data="portfolio:list")],
         ]
     )
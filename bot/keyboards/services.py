@@ -2,20 +2,25 @@ from __future__ import annotations
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from bot.constants.services import SERVICE_TITLE_TO_ID
+from bot.keyboards.callback_data import ServiceApply, ServiceId, ServiceOpen, ServicePortfolio
+
 
 def services_list_kb(services: list[str]) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
-    for idx, title in enumerate(services, start=1):
-        rows.append([InlineKeyboardButton(text=title, callback_data=f"services:open:{idx}")])
+    for title in services:
+        cb = ServiceOpen(ServiceId(SERVICE_TITLE_TO_ID[title]))
+        rows.append([InlineKeyboardButton(text=title, callback_data=cb.pack())])
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="services:back_menu")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def service_card_kb(service_idx: int) -> InlineKeyboardMarkup:
+def service_card_kb(service_id: str) -> InlineKeyboardMarkup:
+    sid = ServiceId(service_id)
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="✅ Оставить заявку", callback_data=f"services:apply:{service_idx}")],
-            [InlineKeyboardButton(text="🖼 Примеры работ", callback_data=f"services:portfolio:{service_idx}")],
+            [InlineKeyboardButton(text="✅ Оставить заявку", callback_data=ServiceApply(sid).pack())],
+            [InlineKeyboardButton(text="🖼 Примеры работ", callback_data=ServicePortfolio(sid).pack())],
             [InlineKeyboardButton(text="⬅️ К услугам", callback_data="services:list")],
         ]
     )
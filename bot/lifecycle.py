@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class ShutdownReport:
+    drained: int = 0
+    abandoned: int = 0
+    dropped_updates: int = 0
+    background_stopped: list[str] = field(default_factory=list)
+    hooks: dict[str, str] = field(default_factory=dict)
+    duration_s: float = 0.0
+
+    def summary(self) -> str:
+        hooks = ", ".join(f"{name}={status}" for name, status in self.hooks.items()) or "—"
+        return (
+            f"shutdown: drained={self.drained} abandoned={self.abandoned} "
+            f"dropped={self.dropped_updates} background={len(self.background_stopped)} "
+            f"hooks: {hooks} ({self.duration_s:.2f}s)"
+        )
+
+
+class InFlightMiddleware(BaseMiddleware):
+    """
+    Outer-middleware на update: считает обработчики в работе и отбрасывает апдейты после stop.
+    Обработчикам передаётся lifecycle — для задач, которые переживают сам обработчик (Lifecycle.spawn).
+    """
+
+    def __init__(self, lifecycle: Lifecycle) -> None:
+        self.lifecycle = lifecycle
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        data["lifecycle"] = self.lifecycle
+        return await self.lifecycle.run_handler(handler(event, data))
+
+
+class Lifecycle:
+    """
+    Жизненный цикл процесса бота.
+
+    Порядок остановки (shutdown):
+    1) перестаём принимать апдейты (новые отбрасываются middleware);
+    2) ждём обработчики в работе и начатые ими задачи (spawn) не дольше timeout, остальные отменяем;
+    3) останавливаем фоновые задачи;
+    4) flush-хуки (очереди записи/уведомлений), затем close-хуки (сессия бота и т.п.).
+    """
+
+    def __init__(self) -> None:
+        self._accepting = True
+        self._inflight: set[asyncio.Task[Any]] = set()
+        self._dropped = 0
+        self._background: dict[str, asyncio.Task[Any]] = {}
+        self._flush_hooks: list[tuple[str, Hook]] = []
+        self._close_hooks: list[tuple[str, Hook]] = []
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def middleware(self) -> InFlightMiddleware:
+        return InFlightMiddleware(self)
+
+    async def run_handler(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        if not self._accepting:
+            coro.close()
+            self._dropped += 1
+            return None
+        task = asyncio.current_task()
+        if task is None:
+            return await coro
+        self._inflight.add(task)
+        try:
+            return await coro
+        finally:
+            self._inflight.discard(task)
+
+    def start_background(self, name: str, coro: Coroutine[Any, Any, Any]) -> asyncio.Task[Any]:
+        task = asyncio.create_task(coro, name=name)
+        self._background[name] = task
+        return task
+
+    def spawn(self, name: str, coro: Coroutine[Any, Any, Any]) -> asyncio.Task[Any]:
+        """Задача обработчика, которая продолжается после ответа (доставка заявки): при остановке её ждут."""
+        task = asyncio.create_task(coro, name=name)
+        self._inflight.add(task)
+        task.add_done_callback(self._spawned_done)
+        return task
+
+    def _spawned_done(self, task: asyncio.Task[Any]) -> None:
+        self._inflight.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # ждать её некому — ошибка только в лог
+            logger.error("task %s failed", task.get_name(), exc_info=task.exception())
+
+    def on_flush(self, name: str, hook: Hook) -> None:
+        self._flush_hooks.append((name, hook))
+
+    def on_close(self, name: str, hook: Hook) -> None:
+        self._close_hooks.append((name, hook))
+
+    async def _run_hooks(self, hooks: list[tuple[str, Hook]], report: ShutdownReport) -> None:
+        for name, hook in hooks:
+            try:
+                await hook()
+                report.hooks[name] = "ok"
+            except Exception as e:  # noqa: BLE001 — один упавший хук не должен мешать остальным
+                logger.exception("shutdown hook %s failed", name)
+                report.hooks[name] = f"error: {e}"
+
+    async def shutdown(self, timeout: float) -> ShutdownReport:
+        started = time.monotonic()
+        report = ShutdownReport()
+        self._accepting = False
+
+        current = asyncio.current_task()
+        deadline = started + timeout
+        # обработчик может успеть начать задачу (spawn) — ждём, пока не останется ни тех, ни других
+        while pending := {t for t in self._inflight if t is not current and not t.done()}:
+            done, still_running = await asyncio.wait(pending, timeout=max(0.0, deadline - time.monotonic()))
+            report.drained += len(done)
+            report.abandoned += len(still_running)
+            for task in still_running:
+                task.cancel()
+            if still_running:
+                await asyncio.gather(*still_running, return_exceptions=True)
+
+        for name, task in self._background.items():
+            task.cancel()
+        if self._background:
+            await asyncio.gather(*self._background.values(), return_exceptions=True)
+        report.background_stopped = list(self._background)
+        self._background.clear()
+
+        await self._run_hooks(self._flush_hooks, report)
+        await self._run_hooks(self._close_hooks, report)
+
+        report.dropped_updates = self._dropped
+        report.duration_s = time.monotonic() - started
+        logger.info(report.summary())
+        return report
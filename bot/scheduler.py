@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Protocol
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+
+class ScheduleError(ValueError):
+    """Ошибка в расписании задачи (cron-выражение, интервал, повтор имени)."""
+
+
+class Clock(Protocol):
+    def time(self) -> float: ...
+
+    def monotonic(self) -> float: ...
+
+    async def sleep(self, delay: float) -> None: ...
+
+
+class SystemClock:
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+
+
+class Trigger(Protocol):
+    def next_fire(self, now: float, previous: float | None) -> float:
+        """Ближайший запуск (unix time) после now; previous — плановое время прошлого запуска."""
+        ...
+
+
+@dataclass(frozen=True)
+class IntervalTrigger:
+    interval_s: float
+    # первый запуск сразу при старте планировщика, а не через interval_s
+    run_at_start: bool = False
+
+    def __post_init__(self) -> None:
+        if self.interval_s <= 0:
+            raise ScheduleError(f"interval must be positive: {self.interval_s}")
+
+    def next_fire(self, now: float, previous: float | None) -> float:
+        if previous is None:
+            return now if self.run_at_start else now + self.interval_s
+        # сетка от прошлого планового запуска; пропущенные (долгий запуск) не догоняются пачкой
+        fire = previous + self.interval_s
+        if fire <= now:
+            fire += ((now - fire) // self.interval_s + 1) * self.interval_s
+        return fire
+
+
+def _parse_cron_field(raw: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in raw.split(","):
+        body, _, step_raw = part.partition("/")
+        try:
+            step = int(step_raw) if step_raw else 1
+            if body == "*":
+                start, end = low, high
+            elif "-" in body:
+                start, end = (int(x) for x in body.split("-", 1))
+            else:
+                start = int(body)
+                end = high if step_raw else start
+        except ValueError:
+            raise ScheduleError(f"bad cron field {raw!r}") from None
+        if step < 1 or not low <= start <= end <= high:
+            raise ScheduleError(f"bad cron field {raw!r}: allowed {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronTrigger:
+    """
+    Cron из пяти полей (минута час день месяц день_недели), время UTC: «*», числа, списки через «,»,
+    диапазоны «a-b», шаг «*/n». День недели 0–6, 0 — воскресенье (7 тоже воскресенье).
+    Как в cron: если заданы и день месяца, и день недели — достаточно совпадения любого.
+    """
+
+    spec: str
+    minutes: frozenset[int] = field(init=False)
+    hours: frozenset[int] = field(init=False)
+    days: frozenset[int] = field(init=False)
+    months: frozenset[int] = field(init=False)
+    weekdays: frozenset[int] = field(init=False)
+    _any_day: bool = field(init=False)
+    _any_weekday: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        parts = self.spec.split()
+        if len(parts) != 5:
+            raise ScheduleError(f"cron {self.spec!r}: expected 5 fields")
+        fields = {
+            "minutes": _parse_cron_field(parts[0], 0, 59),
+            "hours": _parse_cron_field(parts[1], 0, 23),
+            "days": _parse_cron_field(parts[2], 1, 31),
+            "months": _parse_cron_field(parts[3], 1, 12),
+            # 7 -> 0; cron: 0 — воскресенье, у datetime.weekday() 6 — воскресенье
+            "weekdays": frozenset(d % 7 for d in _parse_cron_field(parts[4], 0, 7)),
+            "_any_day": parts[2] == "*",
+            "_any_weekday": parts[4] == "*",
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def _day_matches(self, day: datetime) -> bool:
+        dom = day.day in self.days
+        dow = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_fire(self, now: float, previous: float | None) -> float:
+        # от прошлого планового запуска: часы, проснувшиеся чуть раньше, не дадут второй запуск в ту же минуту
+        base = now if previous is None else max(now, previous)
+        t = datetime.fromtimestamp(base, timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # не больше ~5 лет вперёд: «30 2 31 2 *» (31 февраля) не совпадёт никогда
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ScheduleError(f"cron {self.spec!r} never fires")
+
+
+@dataclass
+class JobMetrics:
+    runs: int = 0
+    failures: int = 0
+    # запуски, пропущенные из-за ещё идущего (плановый во время run_now и наоборот)
+    skipped: int = 0
+    last_started: float | None = None
+    last_duration_s: float | None = None
+    max_duration_s: float = 0.0
+    total_duration_s: float = 0.0
+    last_error: str | None = None
+    next_fire: float | None = None
+
+    @property
+    def avg_duration_s(self) -> float:
+        return self.total_duration_s / self.runs if self.runs else 0.0
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    # None — только вручную (run_now)
+    trigger: Trigger | None
+    # случайная добавка к задержке до запуска, 0..jitter_s: задачи разных процессов не совпадают
+    jitter_s: float = 0.0
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+
+class Scheduler:
+    """
+    Периодические задачи процесса бота: у каждой задачи свой цикл «ждать следующий запуск — выполнить».
+
+    Single-flight: запуск задачи не пересекается с её же предыдущим (долгий запуск сдвигает следующий,
+    run_now во время выполнения пропускается). Ошибка задачи пишется в лог и метрики, цикл продолжается.
+    run() — одна фоновая задача Lifecycle: её отмена при остановке отменяет циклы и текущие запуски.
+    """
+
+    def __init__(self, clock: Clock | None = None, rng: random.Random | None = None) -> None:
+        self.clock: Clock = clock or SystemClock()
+        self._rng = rng or random.Random()
+        self._jobs: dict[str, Job] = {}
+
+    def add(self, name: str, func: JobFunc, trigger: Trigger | None, *, jitter_s: float = 0.0) -> Job:
+        if name in self._jobs:
+            raise ScheduleError(f"job {name!r} already registered")
+        job = Job(name, func, trigger, jitter_s)
+        self._jobs[name] = job
+        return job
+
+    def add_interval(
+        self, name: str, func: JobFunc, interval_s: float, *, run_at_start: bool = False, jitter_s: float = 0.0
+    ) -> Job:
+        return self.add(name, func, IntervalTrigger(interval_s, run_at_start), jitter_s=jitter_s)
+
+    def add_cron(self, name: str, func: JobFunc, spec: str, *, jitter_s: float = 0.0) -> Job:
+        return self.add(name, func, CronTrigger(spec), jitter_s=jitter_s)
+
+    @property
+    def jobs(self) -> dict[str, Job]:
+        return dict(self._jobs)
+
+    async def run_now(self, name: str) -> bool:
+        """Внеочередной запуск (админ-команда). False — задача уже выполняется, запуск пропущен."""
+        job = self._jobs[name]
+        if job.running:
+            job.metrics.skipped += 1
+            return False
+        await self._execute(job)
+        return True
+
+    async def _execute(self, job: Job) -> None:
+        async with job._lock:
+            metrics = job.metrics
+            metrics.last_started = self.clock.time()
+            started = self.clock.monotonic()
+            try:
+                await job.func()
+                metrics.last_error = None
+            except asyncio.CancelledError:
+                logger.info("job %s cancelled", job.name)
+                raise
+            except Exception as e:  # noqa: BLE001 — задача не должна останавливать свой цикл
+                metrics.failures += 1
+                metrics.last_error = repr(e)
+                logger.exception("job %s failed", job.name)
+            finally:
+                duration = self.clock.monotonic() - started
+                metrics.runs += 1
+                metrics.last_duration_s = duration
+                metrics.total_duration_s += duration
+                metrics.max_duration_s = max(metrics.max_duration_s, duration)
+            logger.debug("job %s done in %.3fs", job.name, duration)
+
+    async def _job_loop(self, job: Job, trigger: Trigger) -> None:
+        previous: float | None = None
+        while True:
+            now = self.clock.time()
+            previous = trigger.next_fire(now, previous)
+            jitter = self._rng.uniform(0, job.jitter_s) if job.jitter_s else 0.0
+            job.metrics.next_fire = previous + jitter
+            await self.clock.sleep(max(0.0, previous - now) + jitter)
+            if job.running:
+                # идёт run_now — плановый запуск пропускаем, следующий по расписанию
+                job.metrics.skipped += 1
+                continue
+            await self._execute(job)
+
+    async def run(self) -> None:
+        tasks = [
+            asyncio.create_task(self._job_loop(job, job.trigger), name=f"job:{job.name}")
+            for job in self._jobs.values()
+            if job.trigger is not None
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def format_jobs(scheduler: Scheduler) -> list[str]:
+    """Строки для /jobs: имя, запуски/ошибки, длительность, следующий запуск (UTC)."""
+    lines = []
+    for job in scheduler.jobs.values():
+        m = job.metrics
+        if job.running:
+            state = "выполняется"
+        elif job.trigger is None:
+            state = "по команде"
+        elif m.next_fire is not None:
+            state = "след. " + datetime.fromtimestamp(m.next_fire, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            state = "след. —"
+        lines.append(
+            f"{job.name}: {state} · запусков {m.runs}, ошибок {m.failures}, пропущено {m.skipped} · "
+            f"посл. {m.last_duration_s or 0:.2f}s, сред. {m.avg_duration_s:.2f}s, макс. {m.max_duration_s:.2f}s"
+            + (f" · {m.last_error}" if m.last_error else "")
+        )
+    return lines
+
+
+scheduler = Scheduler()
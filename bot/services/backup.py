@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bot.db.repository import backup_db, integrity_check
+
+logger = logging.getLogger(__name__)
+
+# Страниц за шаг backup API (по 4 КиБ): между шагами блокировка источника отпускается
+BACKUP_PAGES_PER_STEP = 256
+# Пауза, если источник занят записью (SQLITE_BUSY/LOCKED) — шаг повторяется после неё
+BACKUP_STEP_SLEEP_S = 0.05
+
+
+class BackupError(RuntimeError):
+    """Копия не прошла проверку (integrity_check) — в каталог бэкапов не попадает."""
+
+
+@dataclass
+class BackupReport:
+    path: Path
+    pages: int
+    steps: int
+    # размер копии БД и файла в каталоге (после gzip — сжатого)
+    db_bytes: int
+    stored_bytes: int
+    duration_s: float
+
+    def summary(self) -> str:
+        return (
+            f"backup {self.path.name}: {self.pages} pages in {self.steps} steps, "
+            f"{self.db_bytes} -> {self.stored_bytes} bytes ({self.duration_s:.2f}s)"
+        )
+
+
+def _gzip_file(source: Path, target: Path) -> None:
+    with source.open("rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def backup_name_pattern(db_path: Path) -> re.Pattern[str]:
+    return re.compile(rf"^{re.escape(db_path.stem)}-\d{{8}}-\d{{6}}\.db(\.gz)?$")
+
+
+def list_backups(db_path: str | Path, backup_dir: str | Path) -> list[Path]:
+    """Бэкапы этой БД в каталоге, от старых к новым (время — в имени файла)."""
+    backup_dir = Path(backup_dir)
+    if not backup_dir.is_dir():
+        return []
+    pattern = backup_name_pattern(Path(db_path))
+    return sorted(p for p in backup_dir.iterdir() if pattern.match(p.name))
+
+
+def prune_backups(db_path: str | Path, backup_dir: str | Path, keep: int) -> list[Path]:
+    """Удаляет всё, кроме keep последних поколений. Возвращает удалённые файлы."""
+    backups = list_backups(db_path, backup_dir)
+    removed = backups[: max(0, len(backups) - keep)]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+class DbBackups:
+    """
+    Бэкапы БД бота: онлайн-копия (backup API) во временный .part в каталоге бэкапов, проверка копии
+    (integrity_check), по желанию gzip, атомарное переименование в <имя>-YYYYmmdd-HHMMSS.db[.gz], ротация.
+
+    Последний отчёт — в last (для /backup); запуски по расписанию и вручную идут через задачу
+    планировщика db_backup, поэтому не пересекаются.
+    """
+
+    def __init__(self) -> None:
+        self.last: BackupReport | None = None
+
+    async def run(
+        self,
+        db_path: str | Path,
+        backup_dir: str | Path,
+        *,
+        keep: int,
+        compress: bool,
+        pages_per_step: int = BACKUP_PAGES_PER_STEP,
+        step_sleep_s: float = BACKUP_STEP_SLEEP_S,
+        now: datetime | None = None,
+    ) -> BackupReport:
+        db_path, backup_dir = Path(db_path), Path(backup_dir)
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        started = time.monotonic()
+        stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%d-%H%M%S")
+        final = backup_dir / f"{db_path.stem}-{stamp}.db{'.gz' if compress else ''}"
+        # .part не подходит под шаблон ротации: недописанный файл не считается поколением
+        part = backup_dir / f"{db_path.stem}-{stamp}.db.part"
+        packed = part.with_name(part.name + ".gz")
+        try:
+            pages, steps = await backup_db(db_path, part, pages_per_step=pages_per_step, step_sleep_s=step_sleep_s)
+            problems = await integrity_check(part)
+            if problems != ["ok"]:
+                raise BackupError(f"integrity_check failed: {'; '.join(problems[:5])}")
+            db_bytes = part.stat().st_size
+            if compress:
+                await asyncio.to_thread(_gzip_file, part, packed)
+                os.replace(packed, final)
+            else:
+                os.replace(part, final)
+        finally:
+            part.unlink(missing_ok=True)
+            packed.unlink(missing_ok=True)
+
+        report = BackupReport(final, pages, steps, db_bytes, final.stat().st_size, time.monotonic() - started)
+        removed = prune_backups(db_path, backup_dir, keep)
+        if removed:
+            logger.info("backups pruned: %s", ", ".join(p.name for p in removed))
+        logger.info(report.summary())
+        self.last = report
+        return report
+
+
+db_backups = DbBackups()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup
+
+from bot.constants.services import SERVICE_ID_TO_TITLE, SERVICE_TITLE_TO_ID, SERVICES
+from bot.keyboards.form import back_cancel_kb
+from bot.keyboards.inline import services_kb
+from bot.keyboards.main import main_menu_kb
+from bot.keyboards.model3d import model3d_intro_kb
+from bot.keyboards.neuro import neuro_step1_kb, neuro_step2_kb
+from bot.keyboards.pages import page_actions_kb
+from bot.keyboards.portfolio import portfolio_after_album_kb, portfolio_services_kb
+from bot.keyboards.services import service_card_kb, services_list_kb
+from bot.texts.common import HELP_TEXT, MAIN_MENU_TEXT, START_TEXT
+from bot.texts.neuro import NEURO_STEP1_TEXT, NEURO_STEP2_TEXT, NEURO_WISHES_PROMPT
+from bot.texts.service_flows import CONTENT_TASK_TEXT, MODEL3D_INTRO_TEXT, VIDEO_TASK_TEXT
+from bot.texts.services import SERVICE_CARDS_BY_TITLE
+from bot.texts.static_pages import CONTACTS_TEXT, HOW_WE_WORK_TEXT
+
+logger = logging.getLogger(__name__)
+
+Markup = InlineKeyboardMarkup | ReplyKeyboardMarkup
+
+# Теги parse_mode=HTML, которые принимает Telegram (core.telegram.org/bots/api#html-style)
+_ALLOWED_TAGS: dict[str, frozenset[str]] = {
+    "b": frozenset(),
+    "strong": frozenset(),
+    "i": frozenset(),
+    "em": frozenset(),
+    "u": frozenset(),
+    "ins": frozenset(),
+    "s": frozenset(),
+    "strike": frozenset(),
+    "del": frozenset(),
+    "span": frozenset({"class"}),
+    "tg-spoiler": frozenset(),
+    "a": frozenset({"href"}),
+    "code": frozenset({"class"}),
+    "pre": frozenset(),
+    "blockquote": frozenset({"expandable"}),
+    "tg-emoji": frozenset({"emoji-id"}),
+}
+_ALLOWED_ENTITIES = frozenset({"lt", "gt", "amp", "quot"})
+# "&" не в начале сущности вида &name; / &#123; / &#x1F;
+_BARE_AMP = re.compile(r"&(?!(?:[a-zA-Z]+|#[0-9]+|#x[0-9a-fA-F]+);)")
+
+
+@dataclass(frozen=True)
+class Page:
+    """Готовая к отправке страница: текст (HTML) + клавиатура, собранные один раз."""
+
+    text: str
+    markup: Markup | None = None
+
+
+class ContentError(RuntimeError):
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("invalid content:\n" + "\n".join(errors))
+        self.errors = errors
+
+
+class _TelegramHTMLChecker(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.errors: list[str] = []
+        self._open: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        allowed = _ALLOWED_TAGS.get(tag)
+        if allowed is None:
+            self.errors.append(f"unsupported tag <{tag}>")
+            return
+        for name, value in attrs:
+            if name not in allowed:
+                self.errors.append(f"unsupported attribute {name!r} in <{tag}>")
+        if tag == "span" and dict(attrs).get("class") != "tg-spoiler":
+            self.errors.append('<span> must have class="tg-spoiler"')
+        if tag == "a" and not dict(attrs).get("href"):
+            self.errors.append("<a> without href")
+        self._open.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.errors.append(f"self-closing tag <{tag}/>")
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._open or self._open[-1] != tag:
+            self.errors.append(f"unexpected </{tag}>")
+            return
+        self._open.pop()
+
+    def handle_data(self, data: str) -> None:
+        # html.parser отдаёт "<" без тега как текст — Telegram такое не примет
+        for ch in "<>":
+            if ch in data:
+                self.errors.append(f"unescaped {ch!r} (use &lt; &gt;)")
+
+    def handle_entityref(self, name: str) -> None:
+        if name not in _ALLOWED_ENTITIES:
+            self.errors.append(f"unsupported entity &{name};")
+
+    def handle_comment(self, data: str) -> None:
+        self.errors.append("HTML comments are not supported")
+
+    def handle_decl(self, decl: str) -> None:
+        self.errors.append(f"unsupported declaration <!{decl}>")
+
+    def close(self) -> None:
+        super().close()
+        self.errors.extend(f"unclosed <{tag}>" for tag in self._open)
+
+
+def validate_telegram_html(text: str) -> list[str]:
+    """Ошибки разметки parse_mode=HTML (пустой список — текст можно отправлять)."""
+    checker = _TelegramHTMLChecker()
+    checker.feed(text)
+    checker.close()
+    if _BARE_AMP.search(text):
+        checker.errors.append("unescaped '&' (use &amp;)")
+    return checker.errors
+
+
+def card_key(service_id: str) -> str:
+    return f"service_card:{service_id}"
+
+
+def after_album_key(service_id: str) -> str:
+    return f"after_album:{service_id}"
+
+
+def _default_texts() -> dict[str, str]:
+    texts = {
+        "start": START_TEXT,
+        "help": HELP_TEXT,
+        "main_menu": MAIN_MENU_TEXT,
+        "how_we_work": HOW_WE_WORK_TEXT,
+        "contacts": CONTACTS_TEXT,
+        "services_list": "Выберите услугу:",
+        "lead_catalog": "Выберите услугу:",
+        "lead_restart": "Ок, давайте заново. Выберите услугу:",
+        "portfolio_services": "Выберите услугу, чтобы посмотреть примеры работ:",
+        "neuro_step1": NEURO_STEP1_TEXT,
+        "neuro_step2": NEURO_STEP2_TEXT,
+        "neuro_wishes": NEURO_WISHES_PROMPT,
+        "model3d_intro": MODEL3D_INTRO_TEXT,
+        "content_task": CONTENT_TASK_TEXT,
+        "video_task": VIDEO_TASK_TEXT,
+    }
+    for service_id, title in SERVICE_ID_TO_TITLE.items():
+        texts[card_key(service_id)] = SERVICE_CARDS_BY_TITLE.get(title, f"{title}\n\nОписание скоро добавим.")
+        texts[after_album_key(service_id)] = "Хотите такой же результат?"
+    return texts
+
+
+def _markup_factories() -> dict[str, Callable[[], Markup | None]]:
+    factories: dict[str, Callable[[], Markup | None]] = {
+        "start": main_menu_kb,
+        "help": main_menu_kb,
+        "main_menu": main_menu_kb,
+        "how_we_work": lambda: page_actions_kb("⬅️ Назад"),
+        "contacts": lambda: page_actions_kb("⬅️ В меню"),
+        "services_list": lambda: services_list_kb(SERVICES),
+        "lead_catalog": lambda: services_kb(SERVICES),
+        "lead_restart": lambda: services_kb(SERVICES),
+        "portfolio_services": portfolio_services_kb,
+        "neuro_step1": neuro_step1_kb,
+        "neuro_step2": neuro_step2_kb,
+        "neuro_wishes": back_cancel_kb,
+        "model3d_intro": model3d_intro_kb,
+        "content_task": back_cancel_kb,
+        "video_task": back_cancel_kb,
+    }
+    for service_id in SERVICE_ID_TO_TITLE:
+        factories[card_key(service_id)] = lambda sid=service_id: service_card_kb(sid)
+        factories[after_album_key(service_id)] = lambda sid=service_id: portfolio_after_album_kb(sid)
+    return factories
+
+
+def _read_overrides(path: Path) -> dict[str, str]:
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ContentError([f"{path}: {e}"]) from e
+    if not isinstance(raw, dict) or not all(isinstance(v, str) for v in raw.values()):
+        raise ContentError([f"{path}: expected a JSON object {{page: text}}"])
+    return raw
+
+
+def build_pages(overrides: Mapping[str, str] | None = None) -> Mapping[str, Page]:
+    """Собирает все страницы; ContentError со всеми ошибками сразу, если хоть одна невалидна."""
+    errors = [
+        f"SERVICE_CARDS_BY_TITLE: unknown service title {title!r}"
+        for title in SERVICE_CARDS_BY_TITLE
+        if title not in SERVICE_TITLE_TO_ID
+    ]
+    texts = _default_texts()
+    for key, text in (overrides or {}).items():
+        if key not in texts:
+            errors.append(f"{key}: unknown page")
+        texts[key] = text
+
+    factories = _markup_factories()
+    pages: dict[str, Page] = {}
+    for key, text in texts.items():
+        if not text.strip():
+            errors.append(f"{key}: empty text")
+        errors.extend(f"{key}: {err}" for err in validate_telegram_html(text))
+        factory = factories.get(key)
+        pages[key] = Page(text, factory() if factory is not None else None)
+    if errors:
+        raise ContentError(errors)
+    return MappingProxyType(pages)
+
+
+class ContentStore:
+    """
+    Тексты и клавиатуры статических страниц, собранные и проверенные один раз.
+
+    Источник — bot/texts + необязательный JSON-файл с заменами ({page: text}, CONTENT_PATH).
+    На горячем пути — только dict lookup; reload() собирает новый набор целиком и подменяет
+    ссылку одним присваиванием: читатели видят либо старый, либо новый набор, без смеси.
+    """
+
+    def __init__(self) -> None:
+        self._pages: Mapping[str, Page] | None = None
+        self._path: Path | None = None
+        self.version = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._pages is not None
+
+    def load(self, path: str | Path | None = None) -> None:
+        """Загрузка при старте: невалидный контент — ContentError (бот не запускается)."""
+        source = Path(path) if path is not None else None
+        pages = build_pages(_read_overrides(source) if source is not None else None)
+        self._path = source
+        self._swap(pages)
+
+    def reload(self) -> list[str]:
+        """Перечитывает источник. При ошибке остаётся прежний контент; возвращает список ошибок."""
+        try:
+            pages = build_pages(_read_overrides(self._path) if self._path is not None else None)
+        except ContentError as e:
+            logger.warning("content reload failed, keeping version %s: %s", self.version, e)
+            return e.errors
+        self._swap(pages)
+        return []
+
+    def _swap(self, pages: Mapping[str, Page]) -> None:
+        self._pages = pages
+        self.version += 1
+        logger.info("content loaded: %s pages, version %s", len(pages), self.version)
+
+    def page(self, key: str) -> Page:
+        pages = self._pages
+        if pages is None:
+            # без явной загрузки (тесты, утилиты) — тексты по умолчанию
+            self.load()
+            pages = self._pages
+        return pages[key]
+
+
+content_store = ContentStore()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Any
+
+from aiogram import Bot
+
+from bot.config import Settings
+from bot.db.storage import get_storage
+from bot.services.notify import LeadFile, NotifyReport, notify_admins
+from bot.services.relay import link_notification
+from bot.services.routing import lead_recipients
+
+
+async def deliver_lead(
+    bot: Bot,
+    settings: Settings,
+    lead_id: int,
+    lead: dict[str, Any],
+    files: list[LeadFile],
+    *,
+    service_id: str | None,
+    deadline_key: str | None,
+) -> dict[int, NotifyReport]:
+    """
+    Заявка админам по правилам маршрутизации: параллельная рассылка (services/notify.py),
+    с прошлыми заявками того же контакта (если он распознан),
+    состояние доставки каждому — в lead_deliveries, отправленные сообщения — в связки переписки.
+    """
+    recipients = lead_recipients(service_id, deadline_key, settings.admin_ids, settings.admin_tg_id)
+    storage = get_storage()
+    if lead.get("contact_type"):
+        # повторное обращение по тому же контакту — строкой «🔁 Прошлые заявки» в уведомлении
+        previous = await storage.find_leads_by_contact(lead["contact"], exclude_id=lead_id)
+        lead = {**lead, "previous_lead_ids": previous}
+    reports = await notify_admins(bot, recipients, lead_id, lead, files)
+    await storage.save_lead_deliveries(
+        lead_id,
+        [(admin_id, r.status, len(r.message_ids), r.error) for admin_id, r in reports.items()],
+    )
+    # ответ админа (reply) на любое из этих сообщений уйдёт автору заявки — handlers/relay.py
+    await link_notification(lead_id, {admin_id: r.message_ids for admin_id, r in reports.items()}, lead["tg_user_id"])
+    return reports
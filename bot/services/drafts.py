@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.exceptions import TelegramAPIError
+from aiogram.fsm.context import FSMContext
+from aiogram.types import TelegramObject
+
+from bot.config import get_settings
+from bot.db.repository import delete_draft, get_draft, list_idle_drafts, mark_drafts_reminded, save_draft
+from bot.keyboards.inline import draft_reminder_kb
+from bot.services import notify
+from bot.states.lead_form import LeadForm
+from bot.utils.lru import LruCache
+from bot.utils.navigation import NAV_ANCHOR_KEY
+from bot.utils.text import escape_html
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних снимков (чат, пользователь) помнить: неизменившийся шаг не пишется в БД повторно
+DRAFT_CACHE_SIZE = 10_000
+# Напоминания: пачка кандидатов из БД и предел пачек за один проход
+DRAFT_REMINDER_BATCH = 100
+DRAFT_REMINDER_MAX_BATCHES = 20
+
+_LEAD_FORM_PREFIX = f"{LeadForm.__full_group_name__}:"
+
+DraftKey = tuple[int, int]
+
+
+def is_draft_state(state: str | None, data: dict[str, Any]) -> bool:
+    """Черновик — шаг сценария заявки с уже выбранной услугой (каталог без услуги не считается)."""
+    return bool(state and state.startswith(_LEAD_FORM_PREFIX) and data.get("service"))
+
+
+class DraftTracker:
+    """
+    Сохраняет FSM заявки в lead_drafts после каждого обработанного апдейта.
+
+    Снимок (состояние + data) сравнивается с последним записанным: без изменений — без записи.
+    Ушёл из сценария (отправил, отменил, /start) — черновик удаляется; известное отсутствие
+    черновика тоже помнится, чтобы не слать DELETE на каждое сообщение вне заявки.
+    """
+
+    def __init__(self, capacity: int = DRAFT_CACHE_SIZE) -> None:
+        self._saved: LruCache[DraftKey, str | None] = LruCache(capacity)
+
+    def forget(self, key: DraftKey) -> None:
+        self._saved.pop(key, None)
+
+    async def sync(self, db_path: str | Path, key: DraftKey, state: str | None, data: dict[str, Any]) -> None:
+        if is_draft_state(state, data):
+            snapshot = json.dumps([state, data], sort_keys=True, ensure_ascii=False)
+            if self._saved.get(key) == snapshot:
+                return
+            await save_draft(db_path, chat_id=key[0], user_id=key[1], state=state, data=data)
+            self._saved.put(key, snapshot)
+            return
+        if key in self._saved and self._saved.get(key) is None:
+            return
+        await delete_draft(db_path, *key)
+        self._saved.put(key, None)
+
+    def middleware(self) -> DraftMiddleware:
+        return DraftMiddleware(self)
+
+
+class DraftMiddleware(BaseMiddleware):
+    """
+    Outer-middleware на update: после обработки — синхронизация черновика.
+
+    FSMContext и event_chat/event_from_user к этому моменту уже в data (middleware Dispatcher).
+    """
+
+    def __init__(self, tracker: DraftTracker) -> None:
+        self.tracker = tracker
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        result = await handler(event, data)
+        state: FSMContext | None = data.get("state")
+        chat, user = data.get("event_chat"), data.get("event_from_user")
+        if state is None or chat is None or user is None or chat.type != "private":
+            return result
+        try:
+            await self.tracker.sync(
+                get_settings().db_path, (chat.id, user.id), await state.get_state(), await state.get_data()
+            )
+        except Exception:  # noqa: BLE001 — черновик вспомогательный, ответ пользователю уже ушёл
+            logger.exception("draft sync failed for %s", user.id)
+        return result
+
+
+draft_tracker = DraftTracker()
+
+
+async def restore_draft(db_path: str | Path, state: FSMContext, chat_id: int, user_id: int) -> str | None:
+    """Возвращает в FSM сохранённые data и состояние черновика; None — черновика нет (отправлен/удалён)."""
+    draft = await get_draft(db_path, chat_id, user_id)
+    if draft is None:
+        return None
+    data = draft["data"]
+    # прежний экран навигации давно ниже в чате — шаг покажется на месте сообщения с кнопкой «Продолжить»
+    data.pop(NAV_ANCHOR_KEY, None)
+    await state.set_data(data)
+    await state.set_state(draft["state"])
+    return draft["state"]
+
+
+async def drop_draft(db_path: str | Path, chat_id: int, user_id: int) -> None:
+    draft_tracker.forget((chat_id, user_id))
+    await delete_draft(db_path, chat_id, user_id)
+
+
+def draft_reminder_text(data: dict[str, Any]) -> str:
+    return (
+        f"Вы начали заявку «{escape_html(data.get('service') or '—')}», но не отправили её.\n"
+        "Продолжить с того же места?"
+    )
+
+
+async def _remind(bot: Bot, draft: dict[str, Any]) -> None:
+    chat_id = draft["chat_id"]
+    await notify.send_limiter.acquire(chat_id)
+    try:
+        await bot.send_message(chat_id, draft_reminder_text(draft["data"]), reply_markup=draft_reminder_kb())
+    except TelegramAPIError as e:
+        # заблокировал бота и т.п. — всё равно помечаем: одно напоминание, без повторов
+        logger.info("draft reminder to %s failed: %s", chat_id, e)
+
+
+async def remind_idle_drafts(
+    bot: Bot,
+    db_path: str | Path,
+    *,
+    idle_s: float,
+    batch_size: int = DRAFT_REMINDER_BATCH,
+    max_batches: int = DRAFT_REMINDER_MAX_BATCHES,
+    now: datetime | None = None,
+) -> int:
+    """
+    Одно напоминание по каждому черновику без изменений дольше idle_s.
+
+    Кандидаты читаются пачками по batch_size через частичный индекс по updated_at; после отправки
+    пачка помечается reminded_at и выпадает из индекса — следующая выборка снова берёт «голову».
+    За проход не больше max_batches пачек, остаток — в следующий. Возвращает число напоминаний.
+    """
+    idle_before = ((now or datetime.now(timezone.utc)) - timedelta(seconds=idle_s)).isoformat(timespec="seconds")
+    sent = 0
+    for _ in range(max_batches):
+        drafts = await list_idle_drafts(db_path, idle_before=idle_before, limit=batch_size)
+        if not drafts:
+            break
+        await asyncio.gather(*(_remind(bot, d) for d in drafts))
+        await mark_drafts_reminded(db_path, [(d["chat_id"], d["user_id"]) for d in drafts])
+        sent += len(drafts)
+        if len(drafts) < batch_size:
+            break
+    if sent:
+        logger.info("draft reminders sent: %s", sent)
+    return sent
+
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+from bot.utils.lru import LruCache
+
+# Сколько последних отправленных токенов помнить в памяти (дальше страхует уникальный индекс в БД)
+DONE_TOKENS_LIMIT = 10_000
+
+
+def new_submit_token() -> str:
+    return secrets.token_urlsafe(12)
+
+
+class SubmissionGuard:
+    """
+    Защита от двойной отправки заявки.
+
+    - lock(user_id): отдельная блокировка на пользователя — дубли одного пользователя
+      выполняются по очереди, разные пользователи друг друга не ждут;
+    - mark_done/is_done: последние отправленные submit_token (ограниченный LRU).
+    """
+
+    def __init__(self, done_limit: int = DONE_TOKENS_LIMIT) -> None:
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self._done: LruCache[str, None] = LruCache(done_limit)
+
+    @asynccontextmanager
+    async def lock(self, user_id: Hashable) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._waiters[user_id] = self._waiters.get(user_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._waiters[user_id] -= 1
+            if not self._waiters[user_id]:
+                # последний ожидающий — убираем, чтобы словарь не рос
+                del self._waiters[user_id]
+                del self._locks[user_id]
+
+    def is_done(self, token: str) -> bool:
+        return token in self._done
+
+    def mark_done(self, token: str) -> None:
+        self._done.put(token, None)
+
+
+submission_guard = SubmissionGuard()
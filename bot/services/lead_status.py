@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from bot.constants.lead_status import (
+    OPEN_STATUSES,
+    STATUS_DONE,
+    STATUS_IN_PROGRESS,
+    STATUS_LABELS,
+    STATUS_NEW,
+    STATUS_REJECTED,
+)
+from bot.db.storage import get_storage
+from bot.utils.text import escape_html
+
+
+@dataclass(frozen=True)
+class LeadAction:
+    name: str
+    status: str
+    allowed_from: tuple[str, ...]
+    # закрепить заявку за нажавшим админом
+    assign: bool = False
+
+
+# Переходы по кнопкам уведомления: take — new -> in_progress, done/reject — из любого открытого
+LEAD_ACTIONS: dict[str, LeadAction] = {
+    "take": LeadAction("take", STATUS_IN_PROGRESS, (STATUS_NEW,), assign=True),
+    "done": LeadAction("done", STATUS_DONE, OPEN_STATUSES),
+    "reject": LeadAction("reject", STATUS_REJECTED, OPEN_STATUSES),
+}
+
+# Строка статуса в конце уведомления; при смене статуса заменяется
+STATUS_LINE_PREFIX = "\n\n📌 Статус: "
+
+
+async def apply_lead_action(lead_id: int, action: str, *, admin_id: int) -> dict[str, Any] | None:
+    """Меняет статус заявки по кнопке; None — переход недопустим (уже взята/закрыта) или заявки нет."""
+    spec = LEAD_ACTIONS[action]
+    return await get_storage().update_lead_status(
+        lead_id,
+        status=spec.status,
+        allowed_from=spec.allowed_from,
+        changed_by=admin_id,
+        assign=spec.assign,
+    )
+
+
+def available_actions(status: str) -> list[str]:
+    return [name for name, spec in LEAD_ACTIONS.items() if status in spec.allowed_from]
+
+
+def status_line(lead: dict[str, Any], admin_name: str | None = None) -> str:
+    label = STATUS_LABELS.get(lead.get("status") or "", lead.get("status") or "—")
+    who = f" · {escape_html(admin_name)}" if admin_name else ""
+    return f"{STATUS_LINE_PREFIX}{label}{who}"
+
+
+def with_status_line(text: str, line: str) -> str:
+    """Текст уведомления с новой строкой статуса вместо прежней."""
+    return text.split(STATUS_LINE_PREFIX, 1)[0] + line
@@ -2,12 +2,8 @@ from __future__ import annotations
 
 from typing import Any
 
-
-_DEADLINE_MAP: dict[str, str] = {
-    "urgent": "Срочно",
-    "week": "В течение недели",
-    "not_urgent": "Не срочно",
-}
+from bot.constants.deadlines import DEADLINE_CUSTOM, DEADLINE_LABELS
+from bot.utils.text import escape_html
 
 
 def map_deadline(deadline_key: str, custom_text: str | None = None) -> str:
@@ -19,9 +15,9 @@ def map_deadline(deadline_key: str, custom_text: str | None = None) -> str:
       custom -> custom_text
     """
     key = (deadline_key or "").strip().removeprefix("deadline:")
-    if key == "custom":
+    if key == DEADLINE_CUSTOM:
         return (custom_text or "").strip() or "—"
-    return _DEADLINE_MAP.get(key, "—")
+    return DEADLINE_LABELS.get(key, "—")
 
 
 def prepare_lead_data(
@@ -35,6 +31,7 @@ def prepare_lead_data(
     deadline_custom_text: str | None,
     budget: str | None,
     contact: str | None,
+    contact_type: str | None = None,
     extra: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     deadline_human = map_deadline(deadline_key, deadline_custom_text)
@@ -48,36 +45,68 @@ def prepare_lead_data(
         "deadline": deadline_human,
         "budget": budget,
         "contact": contact,
+        "contact_type": contact_type,
         "extra_json": extra or {},
     }
     return payload
 
 
-def format_admin_message(lead: dict[str, Any], files: list[dict[str, str]] | None = None) -> str:
-    """Единый формат уведомления админу по SPEC."""
+def _files_lines(files: list[dict[str, str]]) -> list[str]:
+    lines = []
+    for f in files:
+        ftype = escape_html((f.get("file_type") or "—").strip())
+        fid = escape_html((f.get("file_id") or "—").strip())
+        lines.append(f"- {ftype}: {fid}")
+    return lines
+
+
+def format_admin_message(
+    lead: dict[str, Any],
+    files: list[dict[str, str]] | None = None,
+    *,
+    attached: bool = False,
+) -> str:
+    """
+    Единый формат уведомления админу по SPEC.
+
+    Текст для parse_mode=HTML: поля заявки экранируются. Длина не ограничена —
+    при отправке делится utils.text.split_html. attached — файлы пересылаются
+    самими медиа (services/notify.py), в тексте только их число.
+    """
+
+    def field(name: str) -> str:
+        return escape_html(lead.get(name))
 
     username = lead.get("tg_username") or ""
-    username_part = f" (@{username})" if username else ""
+    username_part = f" (@{escape_html(username)})" if username else ""
 
     lines = [
         "🆕 Новая заявка",
-        f"От: {lead.get('tg_full_name')}{username_part}",
-        f"Услуга: {lead.get('service')}",
-        f"Задача: {lead.get('task')}",
-        f"Срок: {lead.get('deadline')}",
-        f"Контакт: {lead.get('contact')}",
+        f"От: {field('tg_full_name')}{username_part}",
+        f"Услуга: {field('service')}",
+        f"Задача: {field('task')}",
+        f"Срок: {field('deadline')}",
+        f"Контакт: {field('contact')}",
     ]
 
+    previous = lead.get("previous_lead_ids")
+    if previous:
+        lines.append("🔁 Прошлые заявки с этим контактом: " + ", ".join(f"#{i}" for i in previous))
+
     budget = lead.get("budget")
     if budget:
-        lines.append(f"Бюджет: {budget}")
+        lines.append(f"Бюджет: {escape_html(budget)}")
 
     files = files or []
-    if files:
+    if files and attached:
+        lines.append(f"Файлы: {len(files)} (пересланы отдельными сообщениями)")
+    elif files:
         lines.append("Файлы:")
-        for f in files:
-            ftype = (f.get("file_type") or "—").strip()
-            fid = (f.get("file_id") or "—").strip()
-            lines.append(f"- {ftype}: {fid}")
+        lines.extend(_files_lines(files))
 
     return "\n".join(lines)
+
+
+def format_files_listing(lead_id: int, files: list[dict[str, str]]) -> str:
+    """Файлы, которые не удалось переслать админу, — списком file_id."""
+    return "\n".join([f"⚠️ Не удалось переслать файлы к заявке #{lead_id}:", *_files_lines(files)])
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Iterable
+
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+
+from bot.constants.portfolio import PORTFOLIO_MEDIA_FILE_IDS
+from bot.services.portfolio_media import NEURO_EXAMPLES_KEY, portfolio_media_store
+from bot.texts.neuro import NEURO_EXAMPLE_PHOTO_FILE_IDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 5
+
+
+def collect_known_file_ids() -> dict[str, list[str]]:
+    """Все известные file_id по источникам: service_id портфолио (из БД-кэша) + примеры нейрофото."""
+    portfolio = portfolio_media_store.all_file_ids() if portfolio_media_store.loaded else PORTFOLIO_MEDIA_FILE_IDS
+    sources: dict[str, list[str]] = {sid: list(ids) for sid, ids in portfolio.items() if ids}
+    if NEURO_EXAMPLES_KEY not in sources and NEURO_EXAMPLE_PHOTO_FILE_IDS:
+        sources[NEURO_EXAMPLES_KEY] = list(NEURO_EXAMPLE_PHOTO_FILE_IDS)
+    return sources
+
+
+def _is_missing_file_error(exc: TelegramBadRequest) -> bool:
+    # "file is too big" означает, что файл существует, просто get_file его не отдаёт (>20 МБ)
+    return "too big" not in (exc.message or "").lower()
+
+
+class MediaAvailability:
+    """
+    Кэш доступности Telegram file_id.
+
+    Статус: True — проверен и рабочий, False — битый, нет записи — ещё не проверяли.
+    Непроверенные file_id считаем отправляемыми, чтобы альбомы работали до первой проверки.
+    """
+
+    def __init__(self) -> None:
+        self._status: dict[str, bool] = {}
+
+    def status(self, file_id: str) -> bool | None:
+        return self._status.get(file_id)
+
+    def is_sendable(self, file_id: str) -> bool:
+        return self._status.get(file_id) is not False
+
+    def filter_sendable(self, file_ids: Iterable[str]) -> list[str]:
+        return [fid for fid in file_ids if self._status.get(fid) is not False]
+
+    def broken(self) -> list[str]:
+        return [fid for fid, ok in self._status.items() if not ok]
+
+    async def _check_one(self, bot: Any, file_id: str, semaphore: asyncio.Semaphore) -> bool | None:
+        async with semaphore:
+            try:
+                await bot.get_file(file_id)
+            except TelegramBadRequest as e:
+                if _is_missing_file_error(e):
+                    return False
+                return True
+            except TelegramAPIError as e:
+                # сеть/флуд-контроль: статус неизвестен, оставляем прежний
+                logger.warning("file_id check failed for %s: %s", file_id, e)
+                return None
+            return True
+
+    async def validate(
+        self,
+        bot: Any,
+        file_ids: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[str]:
+        """
+        Параллельно проверяет file_id через getFile (не более concurrency запросов одновременно).
+        Возвращает file_id, которые стали битыми в этой проверке (для алерта без повторов).
+        """
+        unique = list(dict.fromkeys(fid for fid in file_ids if fid))
+        if not unique:
+            return []
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        results = await asyncio.gather(*(self._check_one(bot, fid, semaphore) for fid in unique))
+
+        newly_broken: list[str] = []
+        for fid, ok in zip(unique, results):
+            if ok is None:
+                continue
+            if not ok and self._status.get(fid) is not False:
+                newly_broken.append(fid)
+            self._status[fid] = ok
+        return newly_broken
+
+
+def format_broken_media_alert(broken: Iterable[str], sources: dict[str, list[str]]) -> str:
+    broken_set = set(broken)
+    lines = ["⚠️ Недоступные file_id в медиа бота:"]
+    for label, ids in sources.items():
+        bad = [fid for fid in ids if fid in broken_set]
+        if not bad:
+            continue
+        lines.append(f"{label}:")
+        lines.extend(f"- <code>{fid}</code>" for fid in bad)
+    return "\n".join(lines)
+
+
+async def validate_known_media(bot: Any, admin_id: int, *, concurrency: int = DEFAULT_CONCURRENCY) -> list[str]:
+    """Одна проверка всех известных file_id + алерт админу о новых битых."""
+    sources = collect_known_file_ids()
+    all_ids = [fid for ids in sources.values() for fid in ids]
+    newly_broken = await media_availability.validate(bot, all_ids, concurrency=concurrency)
+    if newly_broken:
+        try:
+            await bot.send_message(admin_id, format_broken_media_alert(newly_broken, sources))
+        except TelegramAPIError as e:
+            logger.warning("failed to alert admin about broken media: %s", e)
+    return newly_broken
+
+
+media_availability = MediaAvailability()
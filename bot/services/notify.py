@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup, InputMediaDocument, InputMediaPhoto, InputMediaVideo, Message
+
+from bot.constants.lead_status import STATUS_NEW
+from bot.keyboards.admin_leads import lead_admin_kb
+from bot.services.leads import format_admin_message, format_files_listing
+from bot.utils.rate_limit import SendLimiter
+from bot.utils.replies import MEDIA_GROUP_MAX
+from bot.utils.text import split_html
+
+logger = logging.getLogger(__name__)
+
+# Общий лимитер исходящих запросов бота (уведомления админу и т.п.)
+send_limiter = SendLimiter()
+
+# sendMediaGroup: фото и видео можно смешивать, документы — только с документами
+_VISUAL_TYPES = frozenset({"photo", "video"})
+
+LeadFile = dict[str, str]
+
+DELIVERY_SENT = "sent"
+DELIVERY_PARTIAL = "partial"
+DELIVERY_FAILED = "failed"
+
+
+@dataclass
+class NotifyReport:
+    text_sent: bool = False
+    media_sent: int = 0
+    # файлы, которые не удалось переслать (ушли списком file_id)
+    failed: list[LeadFile] = field(default_factory=list)
+    # id отправленных сообщений (текст, альбомы) — для связки с заявкой в services/relay.py
+    message_ids: list[int] = field(default_factory=list)
+    # почему не дошёл текст или его продолжение (бот заблокирован и т.п.)
+    error: str | None = None
+
+    @property
+    def status(self) -> str:
+        """Состояние доставки для lead_deliveries: sent / partial / failed."""
+        if not self.text_sent:
+            return DELIVERY_FAILED
+        return DELIVERY_PARTIAL if self.failed or self.error else DELIVERY_SENT
+
+
+def media_batches(files: list[LeadFile], size: int = MEDIA_GROUP_MAX) -> list[list[LeadFile]]:
+    """Файлы заявки пачками для sendMediaGroup: фото/видео отдельно от документов, до size в пачке."""
+    visual = [f for f in files if f.get("file_type") in _VISUAL_TYPES]
+    documents = [f for f in files if f.get("file_type") not in _VISUAL_TYPES]
+    return [group[i : i + size] for group in (visual, documents) for i in range(0, len(group), size)]
+
+
+def _input_media(file: LeadFile, caption: str | None) -> InputMediaPhoto | InputMediaVideo | InputMediaDocument:
+    file_type, file_id = file.get("file_type"), file.get("file_id") or ""
+    if file_type == "photo":
+        return InputMediaPhoto(media=file_id, caption=caption)
+    if file_type == "video":
+        return InputMediaVideo(media=file_id, caption=caption)
+    return InputMediaDocument(media=file_id, caption=caption)
+
+
+async def _limited(chat_id: int, cost: int, request: Callable[[], Awaitable[Any]]) -> Any:
+    """Запрос под send_limiter; на flood control (429) — одна повторная попытка через retry_after."""
+    await send_limiter.acquire(chat_id, cost)
+    try:
+        return await request()
+    except TelegramRetryAfter as e:
+        await asyncio.sleep(e.retry_after)
+        await send_limiter.acquire(chat_id, cost)
+        return await request()
+
+
+async def _send_single(bot: Bot, chat_id: int, file: LeadFile, caption: str | None) -> Message:
+    file_type, file_id = file.get("file_type"), file.get("file_id") or ""
+    if file_type == "photo":
+        return await _limited(chat_id, 1, lambda: bot.send_photo(chat_id, file_id, caption=caption))
+    if file_type == "video":
+        return await _limited(chat_id, 1, lambda: bot.send_video(chat_id, file_id, caption=caption))
+    return await _limited(chat_id, 1, lambda: bot.send_document(chat_id, file_id, caption=caption))
+
+
+async def _send_batch(
+    bot: Bot, chat_id: int, batch: list[LeadFile], caption: str
+) -> tuple[list[LeadFile], list[int]]:
+    """Отправляет пачку; возвращает файлы, которые переслать не удалось, и id отправленных сообщений."""
+    if len(batch) > 1:
+        media = [_input_media(f, caption if i == 0 else None) for i, f in enumerate(batch)]
+        try:
+            sent = await _limited(chat_id, len(batch), lambda: bot.send_media_group(chat_id, media=media))
+            return [], [m.message_id for m in sent]
+        except TelegramAPIError as e:
+            # один битый file_id роняет всю группу — пробуем по одному, чтобы дошли остальные
+            logger.info("media group failed, sending one by one: %s", e)
+
+    failed: list[LeadFile] = []
+    message_ids: list[int] = []
+    for i, f in enumerate(batch):
+        try:
+            message_ids.append((await _send_single(bot, chat_id, f, caption if i == 0 else None)).message_id)
+        except TelegramAPIError as e:
+            logger.info("lead file %s not forwarded: %s", f.get("file_id"), e)
+            failed.append(f)
+    return failed, message_ids
+
+
+async def _send_text(
+    bot: Bot, chat_id: int, text: str, reply_markup: InlineKeyboardMarkup | None = None
+) -> tuple[list[int], TelegramAPIError | None]:
+    """
+    Текст несколькими сообщениями, если не влез в 4096 (по границам строк); кнопки — под первым.
+    Не ушло первое — ошибка пробрасывается; не ушло следующее — id уже отправленных и ошибка.
+    """
+    message_ids: list[int] = []
+    for i, chunk in enumerate(split_html(text)):
+        markup = reply_markup if i == 0 else None
+        try:
+            sent = await _limited(
+                chat_id, 1, lambda chunk=chunk, markup=markup: bot.send_message(chat_id, chunk, reply_markup=markup)
+            )
+        except TelegramAPIError as e:
+            if not message_ids:
+                raise
+            return message_ids, e
+        message_ids.append(sent.message_id)
+    return message_ids, None
+
+
+async def notify_lead(
+    bot: Bot,
+    chat_id: int,
+    lead_id: int,
+    lead: dict[str, Any],
+    files: list[LeadFile] | None = None,
+) -> NotifyReport:
+    """
+    Уведомление о заявке: текст (с кнопками статуса) и сами файлы (альбомами до 10) — параллельно.
+
+    Файлы, которые не удалось переслать, дописываются отдельным сообщением списком file_id —
+    как раньше, чтобы ничего не потерялось. Ошибки отправки пишутся в лог, не пробрасываются:
+    заявка к этому моменту уже сохранена.
+    """
+    files = files or []
+    report = NotifyReport()
+    batches = media_batches(files)
+    total = len(batches)
+
+    text_job = _send_text(
+        bot, chat_id, format_admin_message(lead, files, attached=bool(files)), lead_admin_kb(lead_id, STATUS_NEW)
+    )
+    batch_jobs = [
+        _send_batch(bot, chat_id, batch, f"📎 Файлы к заявке #{lead_id}" + (f" ({n}/{total})" if total > 1 else ""))
+        for n, batch in enumerate(batches, 1)
+    ]
+    text_result, *batch_results = await asyncio.gather(text_job, *batch_jobs, return_exceptions=True)
+
+    if isinstance(text_result, BaseException):
+        logger.error("lead #%s: admin notification failed: %r", lead_id, text_result)
+        report.error = getattr(text_result, "message", None) or repr(text_result)
+    else:
+        # первое сообщение (с кнопками) дошло; обрыв на следующих — доставка partial
+        message_ids, error = text_result
+        report.text_sent = True
+        report.message_ids.extend(message_ids)
+        if error is not None:
+            logger.error("lead #%s: admin notification cut short: %r", lead_id, error)
+            report.error = error.message
+
+    for batch, result in zip(batches, batch_results):
+        if isinstance(result, BaseException):
+            logger.error("lead #%s: files not forwarded: %r", lead_id, result)
+            report.failed.extend(batch)
+        else:
+            failed, message_ids = result
+            report.failed.extend(failed)
+            report.media_sent += len(batch) - len(failed)
+            report.message_ids.extend(message_ids)
+
+    if report.failed:
+        try:
+            message_ids, error = await _send_text(bot, chat_id, format_files_listing(lead_id, report.failed))
+        except TelegramAPIError as e:
+            message_ids, error = [], e
+        report.message_ids.extend(message_ids)
+        if error is not None:
+            logger.error("lead #%s: file listing not sent: %s", lead_id, error)
+    return report
+
+
+async def notify_admins(
+    bot: Bot,
+    admin_ids: list[int],
+    lead_id: int,
+    lead: dict[str, Any],
+    files: list[LeadFile] | None = None,
+) -> dict[int, NotifyReport]:
+    """
+    Уведомление о заявке нескольким админам — параллельно, каждому своим notify_lead.
+
+    Лимитер считает токены по чатам отдельно, а 429/ошибки одного чата обрабатываются в его задаче:
+    медленный или заблокировавший бота админ не задерживает остальных.
+    """
+    results = await asyncio.gather(
+        *(notify_lead(bot, admin_id, lead_id, lead, files) for admin_id in admin_ids), return_exceptions=True
+    )
+    reports: dict[int, NotifyReport] = {}
+    for admin_id, result in zip(admin_ids, results):
+        if isinstance(result, BaseException):
+            logger.error("lead #%s: notification to %s failed: %r", lead_id, admin_id, result)
+            result = NotifyReport(failed=list(files or []), error=repr(result))
+        reports[admin_id] = result
+    return reports
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.db.repository import (
+    add_portfolio_media,
+    delete_portfolio_media,
+    list_portfolio_media,
+    move_portfolio_media,
+)
+from bot.texts.neuro import NEURO_EXAMPLE_PHOTO_FILE_IDS
+
+PORTFOLIO_MEDIA_TYPES: frozenset[str] = frozenset({"photo", "video"})
+
+# Ключ в portfolio_media для примеров фото на первом шаге нейрофотосессии
+NEURO_EXAMPLES_KEY = "neuro_examples"
+
+# Куда можно складывать медиа: альбомы услуг + примеры нейрофото
+PORTFOLIO_TARGETS: tuple[str, ...] = (*SERVICE_ID_TO_TITLE, NEURO_EXAMPLES_KEY)
+
+
+@dataclass(frozen=True)
+class PortfolioItem:
+    id: int
+    service_id: str
+    file_id: str
+    media_type: str
+    position: int
+
+
+class PortfolioMediaStore:
+    """
+    Read-through кэш таблицы portfolio_media.
+
+    Вся таблица читается одним запросом при первом обращении и хранится в памяти
+    (service_id -> кортеж элементов). Любое изменение через store инвалидирует кэш,
+    следующее чтение перезагружает его. На горячем пути — только dict lookup.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: dict[str, tuple[PortfolioItem, ...]] | None = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._snapshot = None
+
+    async def load(self, db_path: str | Path) -> dict[str, tuple[PortfolioItem, ...]]:
+        async with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            version = self._version
+            grouped: dict[str, list[PortfolioItem]] = {}
+            for row in await list_portfolio_media(db_path):
+                item = PortfolioItem(
+                    id=row["id"],
+                    service_id=row["service_id"],
+                    file_id=row["file_id"],
+                    media_type=row["media_type"],
+                    position=row["position"],
+                )
+                grouped.setdefault(item.service_id, []).append(item)
+            # атомарная подмена: читатели видят либо старый, либо новый снимок целиком
+            snapshot = {sid: tuple(items) for sid, items in grouped.items()}
+            # если во время чтения пришла инвалидация — снимок уже устарел, не кэшируем
+            if version == self._version:
+                self._snapshot = snapshot
+            return snapshot
+
+    async def items(self, db_path: str | Path, service_id: str) -> tuple[PortfolioItem, ...]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.load(db_path)
+        return snapshot.get(service_id, ())
+
+    def all_file_ids(self) -> dict[str, list[str]]:
+        """file_id по service_id из текущего снимка (пусто, если кэш не загружен)."""
+        snapshot = self._snapshot or {}
+        return {sid: [item.file_id for item in items] for sid, items in snapshot.items()}
+
+    async def add(self, db_path: str | Path, service_id: str, items: Iterable[dict[str, str]]) -> list[int]:
+        ids = await add_portfolio_media(db_path, service_id=service_id, items=items)
+        self.invalidate()
+        return ids
+
+    async def remove(self, db_path: str | Path, media_id: int) -> bool:
+        ok = await delete_portfolio_media(db_path, media_id)
+        self.invalidate()
+        return ok
+
+    async def move(self, db_path: str | Path, media_id: int, position: int) -> bool:
+        ok = await move_portfolio_media(db_path, media_id, position)
+        self.invalidate()
+        return ok
+
+
+portfolio_media_store = PortfolioMediaStore()
+
+
+async def neuro_example_file_ids(db_path: str | Path) -> list[str]:
+    """Примеры для нейрофотосессии из portfolio_media; если там пусто — из констант."""
+    items = await portfolio_media_store.items(db_path, NEURO_EXAMPLES_KEY)
+    if items:
+        return [it.file_id for it in items if it.media_type == "photo"]
+    return list(NEURO_EXAMPLE_PHOTO_FILE_IDS)
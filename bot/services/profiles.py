@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from bot.db.storage import get_storage
+from bot.utils.lru import LruCache
+
+# Сколько профилей держать в памяти; остальные — из user_profiles по первичному ключу
+PROFILE_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    tg_full_name: str
+    # последний распознанный контакт (bot/utils/contacts.py); None — ни разу не оставляли
+    contact: str | None
+    contact_type: str | None
+    last_service: str
+
+
+class ProfileCache:
+    """
+    LRU tg_user_id -> UserProfile перед таблицей user_profiles: шаг контакта показывает
+    «прежний контакт» без запроса в БД для недавних пользователей.
+
+    Новый пользователь кэшируется как None — не ходит в БД на каждом показе шага.
+    remember() после сохранения заявки повторяет логику upsert в save_lead, поэтому кэш не устаревает.
+    """
+
+    def __init__(self, capacity: int = PROFILE_CACHE_SIZE) -> None:
+        self._cache: LruCache[int, UserProfile | None] = LruCache(capacity)
+
+    async def lookup(self, tg_user_id: int) -> UserProfile | None:
+        if tg_user_id in self._cache:
+            return self._cache.get(tg_user_id)
+        row = await get_storage().get_user_profile(tg_user_id)
+        profile = (
+            UserProfile(row["tg_full_name"], row["contact"], row["contact_type"], row["last_service"])
+            if row is not None
+            else None
+        )
+        self._cache.put(tg_user_id, profile)
+        return profile
+
+    def remember(
+        self, tg_user_id: int, *, tg_full_name: str, contact: str, contact_type: str | None, service: str
+    ) -> None:
+        """Профиль после save_lead: пропущенный контакт прежний не затирает."""
+        if contact_type is None:
+            if tg_user_id not in self._cache:
+                # прежний контакт неизвестен без запроса в БД — прочитается при следующем показе
+                return
+            previous = self._cache.get(tg_user_id)
+            contact = previous.contact if previous else None
+            contact_type = previous.contact_type if previous else None
+        self._cache.put(tg_user_id, UserProfile(tg_full_name, contact, contact_type, service))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+profile_cache = ProfileCache()
+
+
+async def lookup_profile(tg_user_id: int) -> UserProfile | None:
+    return await profile_cache.lookup(tg_user_id)
+
+
+def remember_lead(lead: dict[str, Any]) -> None:
+    """Профиль в кэше после сохранения заявки (lead — из services.leads.prepare_lead_data)."""
+    profile_cache.remember(
+        lead["tg_user_id"],
+        tg_full_name=lead["tg_full_name"],
+        contact=lead["contact"],
+        contact_type=lead["contact_type"],
+        service=lead["service"],
+    )
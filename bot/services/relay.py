@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from aiogram.types import Message, ReplyParameters
+
+from bot.db.storage import get_storage
+from bot.utils.lru import LruCache
+
+# Сколько связок (чат, сообщение) -> заявка держать в памяти; остальное — из relay_messages по первичному ключу
+RELAY_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class RelayLink:
+    lead_id: int
+    # куда переслать ответ на сообщение и на какое сообщение там ответить (цепочка reply)
+    peer_chat_id: int
+    peer_message_id: int | None = None
+
+
+class RelayIndex:
+    """
+    LRU (chat_id, message_id) -> RelayLink перед таблицей relay_messages.
+
+    Сообщение без связки кэшируется как None: ответ на любое другое сообщение бота не ходит в БД повторно;
+    link() перезаписывает запись в кэше, поэтому такой промах не переживает новую связку.
+    """
+
+    def __init__(self, capacity: int = RELAY_CACHE_SIZE) -> None:
+        self._cache: LruCache[tuple[int, int], RelayLink | None] = LruCache(capacity)
+
+    async def link(self, messages: Iterable[tuple[int, int]], link: RelayLink) -> None:
+        """Связывает сообщения (chat_id, message_id) с link — одной записью в БД на все."""
+        keys = list(messages)
+        await get_storage().save_relay_links(
+            [(chat_id, mid, link.lead_id, link.peer_chat_id, link.peer_message_id) for chat_id, mid in keys]
+        )
+        for key in keys:
+            self._cache.put(key, link)
+
+    async def lookup(self, chat_id: int, message_id: int) -> RelayLink | None:
+        key = (chat_id, message_id)
+        if key in self._cache:
+            return self._cache.get(key)
+        row = await get_storage().get_relay_link(chat_id, message_id)
+        link = RelayLink(**row) if row is not None else None
+        self._cache.put(key, link)
+        return link
+
+
+relay_index = RelayIndex()
+
+
+async def link_notification(lead_id: int, sent: Mapping[int, Iterable[int]], user_chat_id: int) -> None:
+    """Сообщения уведомления о заявке {чат админа: id}: ответ админа на любое из них уходит автору заявки."""
+    messages = [(chat_id, mid) for chat_id, ids in sent.items() for mid in ids]
+    await relay_index.link(messages, RelayLink(lead_id, user_chat_id))
+
+
+async def lookup_reply(message: Message) -> RelayLink | None:
+    """Связка для ответа (reply) на сообщение бота; None — не ответ или сообщение не из переписки."""
+    reply = message.reply_to_message
+    if reply is None:
+        return None
+    return await relay_index.lookup(message.chat.id, reply.message_id)
+
+
+async def relay_message(message: Message, link: RelayLink) -> int:
+    """
+    Копирует сообщение (текст или медиа, copyMessage — без «Переслано от») собеседнику по заявке
+    ответом на peer_message_id и связывает копию с исходным сообщением: ответ на копию вернётся
+    в эту же цепочку. Возвращает message_id копии.
+    """
+    reply_parameters = (
+        ReplyParameters(message_id=link.peer_message_id, allow_sending_without_reply=True)
+        if link.peer_message_id is not None
+        else None
+    )
+    copied = await message.copy_to(link.peer_chat_id, reply_parameters=reply_parameters)
+    await relay_index.link(
+        [(link.peer_chat_id, copied.message_id)],
+        RelayLink(link.lead_id, message.chat.id, message.message_id),
+    )
+    return copied.message_id
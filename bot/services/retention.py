@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from bot.db.repository import archive_leads
+from bot.db.storage import get_storage
+from bot.services import profiles
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SQLITE = "sqlite"
+ARCHIVE_JSONL = "jsonl"
+ARCHIVE_FORMATS = frozenset({ARCHIVE_SQLITE, ARCHIVE_JSONL})
+
+# Пачка заявок за одну транзакцию удаления и предел пачек за проход — остаток в следующий запуск
+RETENTION_BATCH = 200
+RETENTION_MAX_BATCHES = 50
+# Сколько свободных страниц возвращать файлу БД после каждой пачки (PRAGMA incremental_vacuum)
+VACUUM_PAGES_PER_BATCH = 2000
+
+# Что остаётся от персональных данных в архиве при RETENTION_ANONYMIZE
+ANONYMIZED = "—"
+
+
+@dataclass
+class RetentionReport:
+    archived: int = 0
+    batches: int = 0
+    freed_pages: int = 0
+    # профили авторов без заявок новее срока хранения (user_profiles)
+    profiles: int = 0
+    # файлы архива, в которые писали за проход
+    archives: set[str] = field(default_factory=set)
+    duration_s: float = 0.0
+
+    def summary(self) -> str:
+        files = ", ".join(sorted(self.archives)) or "—"
+        return (
+            f"retention: archived={self.archived} batches={self.batches} "
+            f"freed_pages={self.freed_pages} profiles={self.profiles} files: {files} ({self.duration_s:.2f}s)"
+        )
+
+
+def anonymize_lead(lead: dict[str, Any]) -> dict[str, Any]:
+    """Заявка без персональных данных: имя, username, контакт и tg id; задача и услуга остаются для статистики."""
+    return {
+        **lead,
+        "tg_user_id": 0,
+        "tg_username": None,
+        "tg_full_name": ANONYMIZED,
+        "contact": ANONYMIZED,
+        "contact_type": None,
+    }
+
+
+def archive_path(archive_dir: Path, created_at: str, fmt: str) -> Path:
+    """Архив — по месяцу создания заявки: leads-YYYY-MM.db или leads-YYYY-MM.jsonl.gz."""
+    month = created_at[:7]
+    return archive_dir / (f"leads-{month}.db" if fmt == ARCHIVE_SQLITE else f"leads-{month}.jsonl.gz")
+
+
+def _append_jsonl(path: Path, leads: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # дозапись — ещё один gzip-member в тот же файл; gzip/zcat читают такой файл целиком
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for lead in leads:
+            f.write(json.dumps(lead, ensure_ascii=False) + "\n")
+
+
+async def archive_old_leads(
+    archive_dir: str | Path,
+    *,
+    older_than_days: int,
+    fmt: str = ARCHIVE_SQLITE,
+    anonymize: bool = False,
+    batch_size: int = RETENTION_BATCH,
+    max_batches: int = RETENTION_MAX_BATCHES,
+    now: datetime | None = None,
+) -> RetentionReport:
+    """
+    Переносит заявки старше older_than_days из хранилища заявок (bot/db/storage.py) в помесячные архивы
+    и удаляет их оттуда.
+
+    Пачка: чтение (с файлами и историей) -> запись в архив -> удаление одной транзакцией ->
+    возврат места (SQLite — incremental_vacuum). Архив пишется до удаления: сбой между ними оставит заявки в хранилище,
+    следующий запуск перезапишет их в архив (SQLite — без дублей, JSONL — строкой ещё раз).
+    """
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"unknown archive format: {fmt}")
+    started = time.monotonic()
+    archive_dir = Path(archive_dir)
+    cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=older_than_days)).isoformat(timespec="seconds")
+    storage = get_storage()
+    report = RetentionReport()
+
+    for _ in range(max_batches):
+        leads = await storage.fetch_expired_leads(created_before=cutoff, limit=batch_size)
+        if not leads:
+            break
+        by_file: dict[Path, list[dict[str, Any]]] = {}
+        for lead in leads:
+            by_file.setdefault(archive_path(archive_dir, lead["created_at"], fmt), []).append(
+                anonymize_lead(lead) if anonymize else lead
+            )
+        for path, rows in by_file.items():
+            if fmt == ARCHIVE_SQLITE:
+                await archive_leads(path, rows)
+            else:
+                await asyncio.to_thread(_append_jsonl, path, rows)
+            report.archives.add(path.name)
+
+        report.archived += await storage.delete_leads([lead["id"] for lead in leads])
+        report.freed_pages += await storage.reclaim_space(VACUUM_PAGES_PER_BATCH)
+        report.batches += 1
+        if len(leads) < batch_size:
+            break
+
+    # контакт из профиля живёт не дольше заявок автора
+    report.profiles = await storage.delete_stale_profiles(updated_before=cutoff)
+    if report.profiles:
+        profiles.profile_cache.clear()
+    report.duration_s = time.monotonic() - started
+    if report.archived or report.profiles:
+        logger.info(report.summary())
+    return report
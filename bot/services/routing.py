@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.db.repository import list_lead_routes, replace_lead_routes
+
+ROUTE_ALL = "all"
+ROUTE_ROUND_ROBIN = "rr"
+_MODES = frozenset({ROUTE_ALL, ROUTE_ROUND_ROBIN})
+_DEADLINE_KEYS = frozenset({"urgent", "week", "not_urgent", "custom"})
+
+
+class RoutingError(ValueError):
+    """Ошибка в правилах маршрутизации заявок (LEAD_ROUTING / /routes set)."""
+
+
+@dataclass(frozen=True)
+class RoutingRule:
+    admins: tuple[int, ...]
+    mode: str = ROUTE_ALL
+    # None — любое значение
+    service_id: str | None = None
+    deadline_key: str | None = None
+
+    def matches(self, service_id: str | None, deadline_key: str | None) -> bool:
+        return (self.service_id is None or self.service_id == service_id) and (
+            self.deadline_key is None or self.deadline_key == deadline_key
+        )
+
+
+def _parse_rule(raw: str) -> RoutingRule:
+    try:
+        match, mode, admins_raw = (part.strip() for part in raw.split(":"))
+    except ValueError:
+        raise RoutingError(f"{raw!r}: expected <условие>:<all|rr>:<id,id,...>") from None
+
+    conditions: dict[str, str] = {}
+    if match != "*":
+        for cond in match.split("&"):
+            name, _, value = cond.strip().partition("=")
+            if name not in {"service", "deadline"} or not value:
+                raise RoutingError(f"{raw!r}: unknown condition {cond!r} (service=<id>, deadline=<key>, *)")
+            conditions[name] = value.strip()
+    if "service" in conditions and conditions["service"] not in SERVICE_ID_TO_TITLE:
+        raise RoutingError(f"{raw!r}: unknown service {conditions['service']!r}")
+    if "deadline" in conditions and conditions["deadline"] not in _DEADLINE_KEYS:
+        raise RoutingError(f"{raw!r}: unknown deadline {conditions['deadline']!r}")
+    if mode not in _MODES:
+        raise RoutingError(f"{raw!r}: mode must be all or rr")
+    try:
+        admins = tuple(dict.fromkeys(int(a) for a in admins_raw.split(",") if a.strip()))
+    except ValueError:
+        raise RoutingError(f"{raw!r}: admin ids must be integers") from None
+    if not admins:
+        raise RoutingError(f"{raw!r}: no admins")
+    return RoutingRule(admins, mode, conditions.get("service"), conditions.get("deadline"))
+
+
+def parse_rules(spec: str) -> list[RoutingRule]:
+    """
+    Правила через «;», проверяются по порядку, срабатывает первое подходящее:
+    «service=restoration:all:111,222; deadline=urgent:rr:111,333; *:rr:222,333».
+    Условие — service=<service_id>, deadline=<urgent|week|not_urgent|custom>, их сочетание через «&» или «*».
+    Режим: all — всем админам правила, rr — одному по очереди.
+    """
+    return [_parse_rule(raw) for raw in spec.split(";") if raw.strip()]
+
+
+def format_rules(rules: Iterable[RoutingRule]) -> str:
+    parts = []
+    for rule in rules:
+        conds = []
+        if rule.service_id is not None:
+            conds.append(f"service={rule.service_id}")
+        if rule.deadline_key is not None:
+            conds.append(f"deadline={rule.deadline_key}")
+        parts.append(f"{'&'.join(conds) or '*'}:{rule.mode}:{','.join(map(str, rule.admins))}")
+    return "; ".join(parts)
+
+
+def check_admins(rules: Iterable[RoutingRule], admin_ids: Iterable[int]) -> None:
+    """Правило может слать только известным админам (ADMIN_TG_ID / ADMIN_IDS) — у них есть права на кнопки."""
+    known = set(admin_ids)
+    for rule in rules:
+        unknown = [a for a in rule.admins if a not in known]
+        if unknown:
+            raise RoutingError(f"{format_rules([rule])!r}: not admins: {', '.join(map(str, unknown))}")
+
+
+class LeadRouter:
+    """
+    Правила маршрутизации в памяти: выбор получателей заявки без обращения к БД.
+
+    Счётчики round-robin — в памяти процесса, после перезапуска очередь начинается сначала.
+    """
+
+    def __init__(self) -> None:
+        self.rules: tuple[RoutingRule, ...] = ()
+        self.source = "default"
+        self._turns: dict[int, Iterator[int]] = {}
+
+    def configure(self, rules: Iterable[RoutingRule], source: str) -> None:
+        self.rules = tuple(rules)
+        self.source = source
+        self._turns = {}
+
+    def route(self, service_id: str | None, deadline_key: str | None) -> tuple[int, ...] | None:
+        """Получатели по первому подходящему правилу; None — ни одно не подошло."""
+        for i, rule in enumerate(self.rules):
+            if not rule.matches(service_id, deadline_key):
+                continue
+            if rule.mode == ROUTE_ROUND_ROBIN:
+                turn = self._turns.setdefault(i, itertools.cycle(rule.admins))
+                return (next(turn),)
+            return rule.admins
+        return None
+
+
+lead_router = LeadRouter()
+
+
+async def load_routing(db_path: str | Path, config_spec: str, admin_ids: Iterable[int]) -> str:
+    """
+    Загружает правила в lead_router: таблица lead_routes (меняется командой /routes), если в ней
+    что-то есть, иначе LEAD_ROUTING из конфига. Возвращает источник: db / config / default.
+    """
+    rows = await list_lead_routes(db_path)
+    if rows:
+        rules = [RoutingRule(tuple(r["admins"]), r["mode"], r["service_id"], r["deadline_key"]) for r in rows]
+        source = "db"
+    else:
+        rules = parse_rules(config_spec)
+        source = "config" if rules else "default"
+    check_admins(rules, admin_ids)
+    lead_router.configure(rules, source)
+    return source
+
+
+async def save_routing(db_path: str | Path, rules: list[RoutingRule], admin_ids: Iterable[int]) -> None:
+    """Правила из /routes set: в lead_routes (переживают перезапуск) и сразу в lead_router."""
+    check_admins(rules, admin_ids)
+    await replace_lead_routes(db_path, [(r.service_id, r.deadline_key, r.mode, r.admins) for r in rules])
+    lead_router.configure(rules, "db")
+
+
+def lead_recipients(
+    service_id: str | None, deadline_key: str | None, admin_ids: Iterable[int], primary_admin: int
+) -> list[int]:
+    """Кому слать заявку: по правилам lead_router, без подходящего правила — всем админам (основной первым)."""
+    routed = lead_router.route(service_id, deadline_key)
+    if routed is not None:
+        return list(routed)
+    return [primary_admin, *sorted(set(admin_ids) - {primary_admin})]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from bot.constants.deadlines import DEADLINE_CUSTOM, DEADLINE_LABELS
+from bot.db.storage import get_storage
+from bot.utils.text import escape_html
+
+STATS_DEFAULT_DAYS = 7
+STATS_MAX_DAYS = 366
+
+_DEADLINE_TITLES: dict[str, str] = {**DEADLINE_LABELS, DEADLINE_CUSTOM: "Свой срок"}
+
+
+@dataclass
+class LeadStats:
+    since: date
+    days: int
+    total: int = 0
+    with_files: int = 0
+    by_day: Counter[str] = field(default_factory=Counter)
+    by_service: Counter[str] = field(default_factory=Counter)
+    by_deadline: Counter[str] = field(default_factory=Counter)
+
+
+async def load_stats(days: int, *, today: date | None = None) -> LeadStats:
+    """Сводка за days дней по today включительно (UTC) — один запрос к lead_stats_daily по первичному ключу."""
+    since = (today or datetime.now(timezone.utc).date()) - timedelta(days=days - 1)
+    stats = LeadStats(since, days)
+    for row in await get_storage().list_lead_stats(since_day=since.isoformat()):
+        n = row["leads"]
+        stats.total += n
+        stats.with_files += n if row["with_files"] else 0
+        stats.by_day[row["day"]] += n
+        stats.by_service[row["service"]] += n
+        stats.by_deadline[row["deadline"]] += n
+    return stats
+
+
+def _rows(counter: Counter[str], titles: dict[str, str] | None = None) -> list[str]:
+    return [f"• {escape_html((titles or {}).get(k, k))} — {n}" for k, n in counter.most_common()]
+
+
+def format_stats(stats: LeadStats) -> str:
+    """Текст /stats (HTML): итог, по услугам, по срокам и по дням (дни без заявок не показываются)."""
+    title = f"📊 <b>Заявки с {stats.since:%d.%m.%Y} ({stats.days} дн.)</b>: {stats.total}"
+    if not stats.total:
+        return title
+    lines = [
+        title,
+        f"с файлами: {stats.with_files}, без файлов: {stats.total - stats.with_files}",
+        "",
+        "<b>По услугам</b>",
+        *_rows(stats.by_service),
+        "",
+        "<b>По срокам</b>",
+        *_rows(stats.by_deadline, _DEADLINE_TITLES),
+        "",
+        "<b>По дням</b>",
+        *(f"{date.fromisoformat(day):%d.%m} — {n}" for day, n in sorted(stats.by_day.items())),
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from bot.constants.services import get_service_id
+from bot.services.leads import map_deadline
+from bot.utils.text import clip, escape_html
+
+# FSM data: {поле: [исходные значения, готовый фрагмент HTML]} — кэш экрана «Проверь заявку»
+SUMMARY_CACHE_KEY = "summary_fragments"
+
+_HEADER = "<b>Проверь заявку</b>\n"
+_FOOTER = "\nЕсли всё верно — жми «Отправить»."
+
+# Экран подтверждения — одно сообщение с кнопками (лимит 4096): длинный ввод показываем обрезанным,
+# админу уходит полный текст. Сумма лимитов + подписи заметно меньше 4096.
+_TASK_PREVIEW_LIMIT = 3000
+_FIELD_PREVIEW_LIMIT = 256
+
+# Подпись поля task на экране подтверждения по service_id
+_TASK_LABELS: dict[str, str] = {
+    "neuro": "Пожелания",
+    "model3d": "Описание",
+}
+
+
+def deadline_human_from_state(data: dict[str, Any]) -> str:
+    key = (data.get("deadline_key") or "").strip()
+    custom = data.get("deadline_custom_text")
+    return map_deadline(key, custom)
+
+
+def _text(value: Any, limit: int = _FIELD_PREVIEW_LIMIT) -> str:
+    # пользовательский ввод — только как текст: "<" в задаче иначе ломает parse_mode=HTML
+    return escape_html(clip(str(value or "—"), limit))
+
+
+def _service_fragment(service: str | None) -> str:
+    return f"<b>Услуга:</b> {_text(service)}"
+
+
+def _task_fragment(service: str | None, service_id: str | None, task: str | None) -> str:
+    sid = service_id or get_service_id(service or "") or ""
+    return f"<b>{_TASK_LABELS.get(sid, 'Задача')}:</b> {_text(task, _TASK_PREVIEW_LIMIT)}"
+
+
+def _deadline_fragment(deadline_key: str | None, custom: str | None) -> str:
+    return f"<b>Срок:</b> {_text(map_deadline((deadline_key or '').strip(), custom))}"
+
+
+def _contact_fragment(contact: str | None) -> str:
+    return f"<b>Контакт:</b> {_text(contact)}"
+
+
+def _files_fragment(count: int) -> str:
+    return f"<b>Файлы:</b> {count}" if count else ""
+
+
+# (имя, исходные значения из FSM data, рендер фрагмента по ним) — в порядке строк на экране
+_FRAGMENTS: tuple[tuple[str, Callable[[dict[str, Any]], list[Any]], Callable[..., str]], ...] = (
+    ("service", lambda d: [d.get("service")], _service_fragment),
+    ("task", lambda d: [d.get("service"), d.get("service_id"), d.get("task")], _task_fragment),
+    ("deadline", lambda d: [d.get("deadline_key"), d.get("deadline_custom_text")], _deadline_fragment),
+    ("contact", lambda d: [d.get("contact")], _contact_fragment),
+    ("files", lambda d: [len(d.get("files") or [])], _files_fragment),
+)
+
+
+def render_summary(data: dict[str, Any]) -> tuple[str, dict[str, list[Any]]]:
+    """
+    Текст экрана «Проверь заявку» и обновлённый кэш фрагментов.
+
+    Фрагмент поля пересобирается, только если изменились его исходные значения в FSM data;
+    при возврате на подтверждение «Назад»/«Вперёд» без правок все строки берутся из кэша.
+    Кэш хранится в FSM data под SUMMARY_CACHE_KEY (JSON-совместимые списки).
+    """
+    cache: dict[str, list[Any]] = data.get(SUMMARY_CACHE_KEY) or {}
+    fresh: dict[str, list[Any]] = {}
+    lines = [_HEADER]
+    for name, source, render in _FRAGMENTS:
+        values = source(data)
+        cached = cache.get(name)
+        fragment = cached[1] if cached is not None and cached[0] == values else render(*values)
+        fresh[name] = [values, fragment]
+        if fragment:
+            lines.append(fragment)
+    lines.append(_FOOTER)
+    return "\n".join(lines), fresh
+
+
+def summary_text(data: dict[str, Any]) -> str:
+    """Текст экрана «Проверь заявку» по FSM data."""
+    return render_summary(data)[0]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from aiogram.fsm.state import State, StatesGroup
+
+
+class AdminPortfolio(StatesGroup):
+    # админ присылает фото/видео, они добавляются в portfolio_media выбранной услуги
+    upload = State()
+
+
+class AdminCapture(StatesGroup):
+    # следующий альбом/файл админа целиком пишется в portfolio_media (capture_target в data)
+    collect = State()
+
+
+class AdminLeadReply(StatesGroup):
+    # следующее сообщение админа копируется автору заявки (reply_lead_id в data)
+    message = State()
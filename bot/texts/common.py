@@ -6,3 +6,16 @@ LEAD_SUCCESS_TEXT = (
     "Если понадобится уточнение — я напишу сам.\n\n"
     "🙌 Хорошего дня!"
 )
+
+START_TEXT = (
+    "Привет! Это <b>Romanov Bot Studio</b>.\n"
+    "Выберите действие ниже 👇"
+)
+
+HELP_TEXT = (
+    "<b>Помощь</b>\n"
+    "Нажмите «✅ Оставить заявку», чтобы оформить запрос.\n"
+    "Можно открыть «🧩 Услуги» или «🖼 Примеры работ»."
+)
+
+MAIN_MENU_TEXT = "Главное меню 👇"
@@ -37,8 +37,8 @@ SERVICE_CARDS_BY_TITLE: dict[str, str] = {
         "• подготовим под нужный формат (обсуждается)\n\n"
         "💬 Нажми «Оставить заявку» и пришли рисунок — предложим варианты результата."
     ),
-    "📣 Контент для соцсетей/рекламы": (
-        "📣 Контент для соцсетей/рекламы\n\n"
+    "📢 Контент для соцсетей/рекламы": (
+        "📢 Контент для соцсетей/рекламы\n\n"
         "Делаем контент-пак под твою задачу: визуалы, идеи, стиль и готовые материалы для публикаций и рекламы.\n\n"
         "Варианты:\n"
         "• обложки / баннеры / креативы\n"
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+# сколько ждём остальные сообщения альбома после первого (Telegram присылает их отдельными апдейтами)
+ALBUM_LATENCY_S = 0.6
+
+
+class AlbumCollector:
+    """
+    Собирает сообщения одной media group в список.
+
+    Первый вызов для media_group_id ждёт latency и возвращает весь альбом (по порядку message_id),
+    остальные вызовы возвращают None — их обработка на этом заканчивается.
+    Требует конкурентной обработки апдейтов (handle_as_tasks в aiogram — по умолчанию).
+    """
+
+    def __init__(self, latency: float = ALBUM_LATENCY_S) -> None:
+        self.latency = latency
+        self._buffers: dict[str, list[Any]] = {}
+
+    async def collect(self, message: Any) -> list[Any] | None:
+        group_id = message.media_group_id
+        if not group_id:
+            return [message]
+
+        buffer = self._buffers.get(group_id)
+        if buffer is not None:
+            buffer.append(message)
+            return None
+
+        self._buffers[group_id] = [message]
+        await asyncio.sleep(self.latency)
+        return sorted(self._buffers.pop(group_id), key=lambda m: m.message_id)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+# Разбор контакта из заявки: телефон (E.164), Telegram (@username / t.me), email, ссылка.
+# Чистые функции на заранее скомпилированных выражениях, без общего состояния — вызываются прямо в хэндлерах.
+
+CONTACT_PHONE = "phone"
+CONTACT_TELEGRAM = "telegram"
+CONTACT_EMAIL = "email"
+CONTACT_URL = "url"
+
+# E.164: до 15 цифр с кодом страны; короче 8 — не номер (даже короткие зарубежные длиннее)
+_PHONE_MIN_DIGITS = 8
+_PHONE_MAX_DIGITS = 15
+
+# цифры, пробелы, дефисы, точки, скобки и необязательный + в начале
+_PHONE_RE = re.compile(r"\+?[\d\s().\-]{6,}")
+_PHONE_JUNK_RE = re.compile(r"[\s().\-]")
+# username Telegram: 5–32 символа, латиница/цифры/_, начинается с буквы, не кончается на _
+_USERNAME = r"[A-Za-z](?:[A-Za-z0-9_]{3,30})[A-Za-z0-9]"
+_USERNAME_RE = re.compile(rf"@({_USERNAME})")
+_TG_LINK_RE = re.compile(
+    rf"(?:https?://)?(?:www\.)?(?:t\.me|telegram\.me|telegram\.dog)/@?({_USERNAME})/?(?:\?\S*)?", re.IGNORECASE
+)
+_TG_RESOLVE_RE = re.compile(rf"tg://resolve\?domain=({_USERNAME})(?:&\S*)?", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+\-]+@(?:[A-Za-z0-9](?:[A-Za-z0-9\-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,24}")
+# ссылка на Telegram без username — не контакт, а просто адрес мессенджера
+_TG_HOSTS = frozenset({"t.me", "telegram.me", "telegram.dog"})
+_URL_RE = re.compile(
+    r"(?:https?://)?((?:[A-Za-z0-9](?:[A-Za-z0-9\-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,24})(/\S*)?", re.IGNORECASE
+)
+
+
+class Contact(NamedTuple):
+    type: str
+    # нормализованное значение: по нему ищутся повторные обращения
+    value: str
+
+
+def normalize_phone(text: str | None) -> str | None:
+    """
+    Телефон в E.164 (+79001234567) или None.
+    Российские номера без кода страны: 8XXXXXXXXXX и 7XXXXXXXXXX (11 цифр), 9XXXXXXXXX (10 цифр);
+    международные — с «+» или «00» перед кодом страны.
+    """
+    raw = (text or "").strip()
+    if not _PHONE_RE.fullmatch(raw):
+        return None
+    digits = _PHONE_JUNK_RE.sub("", raw)
+    if digits.startswith("+"):
+        digits = digits[1:]
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits[0] in "78":
+        digits = "7" + digits[1:]
+    elif len(digits) == 10 and digits[0] == "9":
+        digits = "7" + digits
+    else:
+        return None
+    if not digits.isdigit() or digits[0] == "0" or not _PHONE_MIN_DIGITS <= len(digits) <= _PHONE_MAX_DIGITS:
+        return None
+    # российский номер — ровно 11 цифр
+    if digits[0] == "7" and len(digits) != 11:
+        return None
+    return "+" + digits
+
+
+def normalize_contact(text: str | None) -> Contact | None:
+    """Тип и нормализованное значение контакта; None — не похоже ни на один из поддерживаемых."""
+    raw = (text or "").strip()
+    if not raw:
+        return None
+    phone = normalize_phone(raw)
+    if phone is not None:
+        return Contact(CONTACT_PHONE, phone)
+    for pattern in (_USERNAME_RE, _TG_LINK_RE, _TG_RESOLVE_RE):
+        m = pattern.fullmatch(raw)
+        if m:
+            # username в Telegram без учёта регистра
+            return Contact(CONTACT_TELEGRAM, "@" + m.group(1).lower())
+    if _EMAIL_RE.fullmatch(raw):
+        return Contact(CONTACT_EMAIL, raw.lower())
+    m = _URL_RE.fullmatch(raw)
+    if m:
+        host, path = m.group(1).lower(), (m.group(2) or "").rstrip("/")
+        if host.startswith("www."):
+            host = host[4:]
+        if host in _TG_HOSTS:
+            return None
+        return Contact(CONTACT_URL, host + path)
+    return None
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from aiogram.types import Message
+
+
+def extract_media(message: Message) -> tuple[str, str] | None:
+    """(media_type, file_id) из фото/видео/документа; для фото — самый большой размер."""
+    if message.photo:
+        return ("photo", message.photo[-1].file_id)
+    if message.video:
+        return ("video", message.video.file_id)
+    if message.document:
+        return ("document", message.document.file_id)
+    return None
+
+
+def lead_file(message: Message, *, document_type: str = "doc") -> dict[str, str] | None:
+    """
+    Файл заявки {"file_type", "file_id"} из сообщения (по extract_media). Документ получает
+    document_type — значения lead_files.file_type исторические: "doc", в 3D-сценарии "document_image".
+    """
+    media = extract_media(message)
+    if media is None:
+        return None
+    media_type, file_id = media
+    return {"file_type": document_type if media_type == "document" else media_type, "file_id": file_id}
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
+
+from bot.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# FSM data: id сообщения, которое сейчас служит "экраном" навигации
+NAV_ANCHOR_KEY = "nav_anchor_id"
+
+Target = Message | CallbackQuery
+
+
+def target_message(target: Target) -> Message:
+    return target.message if isinstance(target, CallbackQuery) else target
+
+
+async def clear_state(state: FSMContext) -> None:
+    """state.clear() с сохранением экрана навигации (перезапуск сценария с той же кнопки)."""
+    anchor_id = (await state.get_data()).get(NAV_ANCHOR_KEY)
+    await state.clear()
+    if anchor_id is not None:
+        await state.update_data({NAV_ANCHOR_KEY: anchor_id})
+
+
+def _editable(target: Target, reply_markup: Any, anchor_id: int | None) -> Message | None:
+    """Сообщение, которое можно отредактировать вместо отправки нового, иначе None."""
+    if not isinstance(target, CallbackQuery) or not get_settings().nav_edit_messages:
+        return None
+    # reply-клавиатуру к существующему сообщению не прикрепить
+    if reply_markup is not None and not isinstance(reply_markup, InlineKeyboardMarkup):
+        return None
+    message = target.message
+    # InaccessibleMessage (слишком старое) и медиа (caption вместо text) не редактируем
+    if not isinstance(message, Message) or message.text is None:
+        return None
+    # нажали кнопку в старом сообщении — "экран" уже ниже, новый шаг показываем новым сообщением
+    if anchor_id is not None and message.message_id != anchor_id:
+        return None
+    return message
+
+
+async def show(
+    target: Target,
+    text: str,
+    reply_markup: Any = None,
+    *,
+    state: FSMContext | None = None,
+) -> Message | None:
+    """
+    Показывает экран навигации.
+
+    Переход по inline-кнопке — edit_message_text того же сообщения (один запрос вместо нового сообщения
+    в чате); отправка — только если редактировать нельзя (reply-клавиатура, медиа, старое сообщение,
+    ошибка API). С state id "экрана" хранится в FSM data (NAV_ANCHOR_KEY).
+    """
+    anchor_id = (await state.get_data()).get(NAV_ANCHOR_KEY) if state is not None else None
+    message = _editable(target, reply_markup, anchor_id)
+
+    shown: Message | None = None
+    if message is not None:
+        try:
+            edited = await message.edit_text(text, reply_markup=reply_markup)
+            shown = edited if isinstance(edited, Message) else message
+        except TelegramBadRequest as e:
+            if "message is not modified" in (e.message or "").lower():
+                shown = message
+            else:
+                logger.info("navigation edit failed, sending new message: %s", e.message)
+
+    if shown is None:
+        shown = await target_message(target).answer(text, reply_markup=reply_markup)
+
+    if state is not None:
+        # экраном может быть только сообщение с inline-кнопками
+        is_screen = isinstance(reply_markup, InlineKeyboardMarkup)
+        await state.update_data({NAV_ANCHOR_KEY: shown.message_id if is_screen else None})
+    return shown
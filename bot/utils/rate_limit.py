@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable
+
+
+class PerKeyCooldown:
+    """
+    Не чаще одного раза в cooldown_s секунд на ключ (например, tg_user_id).
+    Старые ключи вычищаются при записи, чтобы словарь не рос бесконечно.
+    """
+
+    def __init__(self, cooldown_s: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.cooldown_s = cooldown_s
+        self._clock = clock
+        self._last: dict[Hashable, float] = {}
+
+    def hit(self, key: Hashable) -> bool:
+        """True — можно действовать (и засчитываем попытку), False — ещё действует кулдаун."""
+        now = self._clock()
+        last = self._last.get(key)
+        if last is not None and now - last < self.cooldown_s:
+            return False
+        if len(self._last) > 10_000:
+            self._last = {k: t for k, t in self._last.items() if now - t < self.cooldown_s}
+        self._last[key] = now
+        return True
+
+
+class TokenBucket:
+    """
+    Token bucket: rate токенов в секунду, не больше capacity про запас.
+
+    reserve() списывает токены сразу (баланс может уйти в минус) и возвращает, сколько секунд
+    подождать до их появления — конкурентные вызовы в одном event loop выстраиваются в очередь
+    без блокировок, т.к. между проверкой и списанием нет await.
+    """
+
+    def __init__(self, rate: float, capacity: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> float:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    def reserve(self, cost: float = 1.0) -> float:
+        tokens = self._refill() - cost
+        self._tokens = tokens
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    @property
+    def full(self) -> bool:
+        return self._refill() >= self.capacity
+
+
+class SendLimiter:
+    """
+    Исходящие запросы к Bot API: общий лимит бота + лимит на чат (Telegram: ~30 сообщений/с
+    на бота, ~1/с в один чат с небольшим запасом на всплеск). acquire() ждёт своей очереди.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 20.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._global = TokenBucket(global_rate, global_rate, clock=clock)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: dict[Hashable, TokenBucket] = {}
+
+    def _chat(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > 10_000:
+                # полные корзины ничем не отличаются от новых — их можно забыть
+                self._chats = {k: b for k, b in self._chats.items() if not b.full}
+            bucket = self._chats[chat_id] = TokenBucket(self._chat_rate, self._chat_burst, clock=self._clock)
+        return bucket
+
+    async def acquire(self, chat_id: Hashable, cost: float = 1.0) -> None:
+        """cost — число сообщений запроса (sendMediaGroup из N элементов Telegram считает как N)."""
+        wait = max(self._global.reserve(cost), self._chat(chat_id).reserve(cost))
+        if wait > 0:
+            await self._sleep(wait)
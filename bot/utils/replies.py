@@ -1,12 +1,44 @@
 from __future__ import annotations
 
-from aiogram.types import Message
+from aiogram.types import InputMediaPhoto, InputMediaVideo, Message
 
 from bot.keyboards.main import main_menu_kb
 from bot.texts.common import LEAD_SUCCESS_TEXT
 
+# Telegram: media group — от 2 до 10 элементов
+MEDIA_GROUP_MAX = 10
+
 
 async def send_lead_success(message: Message) -> None:
     # Единая точка финального ответа после успешной отправки заявки (для всех сценариев).
     await message.answer(LEAD_SUCCESS_TEXT)
     await message.answer("Главное меню 👇", reply_markup=main_menu_kb())
+
+
+async def send_photos(message: Message, file_ids: list[str], *, limit: int = MEDIA_GROUP_MAX) -> bool:
+    """Отправляет фото альбомом (см. send_album). Возвращает False, если отправлять нечего."""
+    return await send_album(message, [("photo", fid) for fid in file_ids], limit=limit)
+
+
+async def send_album(message: Message, items: list[tuple[str, str]], *, limit: int = MEDIA_GROUP_MAX) -> bool:
+    """
+    items: [(media_type, file_id), ...], media_type: photo | video.
+    Один элемент отправляется обычным фото/видео (sendMediaGroup требует минимум 2).
+    Возвращает False, если отправлять нечего.
+    """
+    items = items[: min(limit, MEDIA_GROUP_MAX)]
+    if not items:
+        return False
+    if len(items) == 1:
+        media_type, file_id = items[0]
+        if media_type == "video":
+            await message.answer_video(file_id)
+        else:
+            await message.answer_photo(file_id)
+        return True
+    media = [
+        InputMediaVideo(media=file_id) if media_type == "video" else InputMediaPhoto(media=file_id)
+        for media_type, file_id in items
+    ]
+    await message.answer_media_group(media=media)
+    return True
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Any
+
+# Telegram: до 4096 символов текста сообщения (считаются UTF-16 code units)
+TELEGRAM_TEXT_LIMIT = 4096
+
+
+def escape_html(value: Any) -> str:
+    """
+    Пользовательский ввод как текст для parse_mode=HTML: & < > -> сущности.
+
+    Экранируется один раз — фрагмент при подстановке, а не сообщение целиком. Цепочка
+    str.replace (как html.escape) в CPython быстрее посимвольного прохода str.translate/re.sub
+    (см. benchmarks/text_build.py), а для текста без спецсимволов не копирует строку.
+    """
+    text = str(value)
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def utf16_len(text: str) -> int:
+    """Длина в единицах, которыми Telegram считает лимиты (emoji вне BMP — 2)."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _prefix_within(text: str, limit: int) -> int:
+    """Наибольшее число символов text, укладывающееся в limit единиц UTF-16."""
+    cut = min(len(text), limit)
+    excess = utf16_len(text[:cut]) - limit
+    # каждый символ — 1 или 2 единицы: отрезаем по избытку, пока не уложимся
+    while excess > 0:
+        cut -= (excess + 1) // 2
+        excess = utf16_len(text[:cut]) - limit
+    return cut
+
+
+def clip(text: str, limit: int, suffix: str = "…") -> str:
+    """Обрезает обычный (не HTML) текст до limit единиц UTF-16, отмечая обрезку suffix."""
+    if utf16_len(text) <= limit:
+        return text
+    return text[: _prefix_within(text, max(0, limit - utf16_len(suffix)))].rstrip() + suffix
+
+
+def _hard_cut(line: str, limit: int) -> int:
+    """Позиция разреза строки длиннее limit: по пробелу, не внутри <тега> и &сущности;."""
+    cut = _prefix_within(line, limit)
+    space = line.rfind(" ", cut // 2, cut)
+    if space > 0:
+        cut = space
+    lt = line.rfind("<", 0, cut)
+    if lt != -1 and line.find(">", lt, cut) == -1:
+        cut = lt
+    amp = line.rfind("&", 0, cut)
+    if amp != -1 and line.find(";", amp, cut) == -1:
+        cut = amp
+    # тег/сущность длиннее лимита — режем как есть, иначе зациклимся
+    return cut if cut > 0 else _prefix_within(line, limit) or 1
+
+
+def split_html(text: str, limit: int = TELEGRAM_TEXT_LIMIT) -> list[str]:
+    """
+    Делит текст (HTML) на сообщения не длиннее limit: по границам строк, строку длиннее
+    лимита — по пробелу. Теги должны открываться и закрываться в пределах одной строки
+    (так собирают все текстовые билдеры бота). Длина считается по исходному HTML — не меньше
+    видимой, поэтому куски гарантированно проходят лимит Telegram. Пустые куски не возвращаются.
+    """
+    # быстрый путь (почти все сообщения): помещается целиком — без разбора по строкам
+    if utf16_len(text) <= limit:
+        return [text] if text.strip() else []
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal current, size
+        chunk = "\n".join(current)
+        if chunk.strip():
+            chunks.append(chunk)
+        current, size = [], 0
+
+    for line in text.split("\n"):
+        units = utf16_len(line)
+        # +1 — перевод строки перед line
+        if current and size + 1 + units <= limit:
+            current.append(line)
+            size += 1 + units
+            continue
+        if current:
+            flush()
+        while units > limit:
+            cut = _hard_cut(line, limit)
+            current.append(line[:cut])
+            flush()
+            line = line[cut:]
+            units = utf16_len(line)
+        current, size = [line], units
+    flush()
+    return chunks
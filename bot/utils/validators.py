@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from bot.utils.contacts import normalize_contact, normalize_phone
+
 
 def is_non_empty_text(text: str | None) -> bool:
     return bool((text or "").strip())
 
 
 def validate_contact(contact: str | None) -> bool:
-    value = (contact or "").strip()
-    if len(value) >= 3:
-        return True
-    return False
+    """Телефон, @username / t.me, email или ссылка (bot/utils/contacts.py)."""
+    return normalize_contact(contact) is not None
+
+
+def validate_phone(phone: str | None) -> bool:
+    """Номер, который приводится к E.164."""
+    return normalize_phone(phone) is not None
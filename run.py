@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 
 from bot.bot import run_bot
+from bot.config import load_settings
 
 
 def main() -> None:
-    asyncio.run(run_bot())
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(run_bot(load_settings()))
 
 
 if __name__ == "__main__":
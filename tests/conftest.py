@@ -2,17 +2,82 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
 import pytest_asyncio
 
 from bot.db.repository import init_db
 
 
 @pytest_asyncio.fixture
-async def inited_db(tmp_path: Path) -> Path:
+async def inited_db(tmp_path: Path):
     """
-    Создаёт временную БД в tmp_path и инициализирует схему.
+    Создаёт временную БД в tmp_path, инициализирует схему и делает её хранилищем заявок процесса.
     Возвращает путь к файлу БД.
     """
+    from bot.db import storage
+
     db_path = tmp_path / "test.db"
     await init_db(db_path)
-    return db_path
+    previous = storage._storage
+    storage.configure_storage(storage.SqliteLeadStorage(db_path))
+    yield db_path
+    storage._storage = previous
+
+
+@pytest.fixture(scope="session")
+def project_dispatcher():
+    """
+    Dispatcher со всеми роутерами проекта — один на сессию:
+    роутеры модулей bot.handlers — синглтоны и подключаются к родителю только один раз.
+    """
+    from aiogram import Dispatcher
+
+    from bot.callback_index import CallbackIndex
+    from bot.handlers import ROUTERS, include_routers
+
+    dp = Dispatcher()
+    include_routers(dp, {spec.name for spec in ROUTERS})
+    dp.callback_query.outer_middleware(CallbackIndex.build(dp))
+    return dp
+
+
+@pytest.fixture
+def settings(inited_db: Path):
+    """Активные Settings процесса с временной БД; после теста — прежние."""
+    from bot import config
+
+    previous = config._settings
+    active = config.configure(config.Settings(bot_token="42:TEST", admin_tg_id=777, db_path=inited_db))
+    yield active
+    config._settings = previous
+
+
+@pytest.fixture(autouse=True)
+def fresh_send_limiter(monkeypatch):
+    """Свой лимитер исходящих запросов на каждый тест: тесты не ждут токенов, потраченных другими."""
+    from bot.services import notify
+    from bot.utils.rate_limit import SendLimiter
+
+    limiter = SendLimiter()
+    monkeypatch.setattr(notify, "send_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture(autouse=True)
+def fresh_relay_index(monkeypatch):
+    """Пустой кэш связок переписки на каждый тест: id сообщений фейкового API повторяются между тестами."""
+    from bot.services import relay
+
+    index = relay.RelayIndex()
+    monkeypatch.setattr(relay, "relay_index", index)
+    return index
+
+
+@pytest.fixture(autouse=True)
+def fresh_profile_cache(monkeypatch):
+    """Пустой кэш профилей на каждый тест: у пользователя фейкового чата один и тот же id, а БД у теста своя."""
+    from bot.services import profiles
+
+    cache = profiles.ProfileCache()
+    monkeypatch.setattr(profiles, "profile_cache", cache)
+    return cache
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+
+# Часы для тестов планировщика (bot/scheduler.py): время идёт только в advance(), sleep ждёт его.
+
+# 2026-01-01 00:00:00 UTC
+EPOCH = 1767225600.0
+
+
+class FakeClock:
+    def __init__(self, start: float = EPOCH) -> None:
+        self.now = start
+        self._sleepers: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + max(0.0, delay), next(self._seq), future))
+        await future
+
+    async def advance(self, seconds: float) -> None:
+        """Сдвигает время на seconds, будя спящих по порядку; после каждого пробуждения задачи доходят до await."""
+        target = self.now + seconds
+        await settle()
+        while self._sleepers and self._sleepers[0][0] <= target:
+            when, _, future = heapq.heappop(self._sleepers)
+            self.now = max(self.now, when)
+            if not future.done():
+                future.set_result(None)
+                await settle()
+        self.now = target
+        await settle()
+
+
+async def settle(rounds: int = 20) -> None:
+    for _ in range(rounds):
+        await asyncio.sleep(0)
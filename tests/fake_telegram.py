@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import datetime
+import itertools
+from collections import Counter
+from typing import Any, AsyncGenerator
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import CallbackQuery, Message, Update, User
+
+# Заглушка Telegram Bot API для тестов и бенчмарков: без сети, все запросы записываются.
+# Результат — правдоподобный объект (Message с новым id, список для sendMediaGroup, иначе True).
+
+CHAT_ID = 1
+USER = {"id": CHAT_ID, "is_bot": False, "first_name": "U", "username": "user"}
+
+_MESSAGE_METHODS = {
+    "sendMessage",
+    "sendPhoto",
+    "sendVideo",
+    "sendDocument",
+    "editMessageText",
+    "editMessageReplyMarkup",
+    "copyMessage",
+}
+
+
+class FakeSession(BaseSession):
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests: list[TelegramMethod[Any]] = []
+        # api_method -> исключение (или список исключений по очереди) вместо ответа
+        self.fail: dict[str, Any] = {}
+        self._ids = itertools.count(1000)
+        self.messages: dict[int, Message] = {}
+
+    @property
+    def calls(self) -> Counter[str]:
+        return Counter(r.__api_method__ for r in self.requests)
+
+    def _message(self, bot: Bot, method: TelegramMethod[Any], **fields: Any) -> Message:
+        name = method.__api_method__
+        # правка — то же сообщение; copyMessage.message_id — id исходного, копия получает новый
+        message_id = (getattr(method, "message_id", None) if name.startswith("edit") else None) or next(self._ids)
+        payload = {
+            "message_id": message_id,
+            "date": datetime.datetime.now(),
+            "chat": {"id": getattr(method, "chat_id", None) or CHAT_ID, "type": "private"},
+            "from": {"id": 42, "is_bot": True, "first_name": "Bot"},
+            **fields,
+        }
+        markup = getattr(method, "reply_markup", None)
+        if markup is not None and getattr(markup, "inline_keyboard", None) is not None:
+            payload["reply_markup"] = markup.model_dump()
+        message = Message.model_validate(payload, context={"bot": bot})
+        self.messages[message.message_id] = message
+        return message
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        self.requests.append(method)
+        name = method.__api_method__
+        failure = self.fail.get(name)
+        if isinstance(failure, list):
+            failure = failure.pop(0) if failure else None
+        if failure is not None:
+            raise failure
+
+        if name in _MESSAGE_METHODS:
+            text = getattr(method, "text", None)
+            if name == "editMessageReplyMarkup":
+                old = self.messages.get(method.message_id)
+                text = old.text if old else ""
+            if text is not None:
+                return self._message(bot, method, text=text)
+            return self._message(bot, method, caption=getattr(method, "caption", None))
+        if name == "sendMediaGroup":
+            return [self._message(bot, method, caption=None) for _ in method.media]
+        if name == "getFile":
+            return {"file_id": method.file_id, "file_unique_id": method.file_id}
+        return True
+
+    async def close(self) -> None:
+        return None
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:  # pragma: no cover
+        yield b""
+
+
+def fake_bot() -> tuple[Bot, FakeSession]:
+    session = FakeSession()
+    return Bot("42:TEST", session=session), session
+
+
+class ChatDriver:
+    """Пользователь в личке с ботом: шлёт текст/медиа и жмёт inline-кнопки последнего экрана."""
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        session: FakeSession,
+        user: dict[str, Any] | None = None,
+        context: dict[str, Any] | None = None,
+    ) -> None:
+        self.dp, self.bot, self.session = dp, bot, session
+        # другой user (например, админ) — свой личный чат с id пользователя
+        self.user = user or USER
+        # доп. данные обработчикам (как от middleware run_bot), например lifecycle
+        self.context = context or {}
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    def _user_message(self, **fields: Any) -> Message:
+        return Message.model_validate(
+            {
+                "message_id": next(self._message_ids),
+                "date": datetime.datetime.now(),
+                "chat": {"id": self.user["id"], "type": "private"},
+                "from": self.user,
+                **fields,
+            },
+            context={"bot": self.bot},
+        )
+
+    async def send(self, text: str | None = None, **fields: Any) -> None:
+        message = self._user_message(text=text, **fields) if text is not None else self._user_message(**fields)
+        await self.dp.feed_update(self.bot, Update(update_id=next(self._update_ids), message=message), **self.context)
+
+    def last_screen(self) -> Message:
+        """Последнее сообщение бота с inline-клавиатурой (то, где пользователь жмёт кнопку)."""
+        for message in sorted(self.session.messages.values(), key=lambda m: -m.message_id):
+            if message.reply_markup is not None:
+                return message
+        raise AssertionError("no inline keyboard in chat")
+
+    async def press(self, data: str, message: Message | None = None) -> None:
+        message = message or self.last_screen()
+        buttons = [b.callback_data for row in message.reply_markup.inline_keyboard for b in row]
+        assert data in buttons, f"{data!r} not in {buttons}"
+        call = CallbackQuery(
+            id=str(next(self._update_ids)),
+            from_user=User(**self.user),
+            chat_instance="c",
+            data=data,
+            message=message,
+        )
+        await self.dp.feed_update(
+            self.bot, Update(update_id=next(self._update_ids), callback_query=call), **self.context
+        )
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bot.db.repository import backup_db, save_lead
+from bot.services import backup
+from bot.services.backup import BackupError, DbBackups, list_backups, prune_backups
+
+T0 = datetime(2026, 10, 19, 3, 30, tzinfo=timezone.utc)
+
+
+async def _lead(db_path, n: int) -> int:
+    return await save_lead(
+        db_path,
+        tg_user_id=n,
+        tg_username="u",
+        tg_full_name="User",
+        service="s",
+        # ~2 КиБ на заявку: БД в сотни страниц, копия — за много шагов
+        task="задача " * 300,
+        deadline="Срочно",
+        budget=None,
+        contact="@u",
+        extra_json={},
+    )
+
+
+def _count_leads(path) -> int:
+    with sqlite3.connect(path) as db:
+        assert db.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return db.execute("SELECT count(*) FROM leads").fetchone()[0]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+async def test_backup_is_consistent_copy(inited_db, tmp_path, compress):
+    for n in range(50):
+        await _lead(inited_db, n)
+    backup_dir = tmp_path / "backups"
+
+    report = await DbBackups().run(inited_db, backup_dir, keep=3, compress=compress, pages_per_step=8, now=T0)
+
+    assert report.path.name == "test-20261019-033000.db" + (".gz" if compress else "")
+    assert report.steps > 1 and report.pages > 8
+    assert report.db_bytes == report.pages * 4096
+    assert report.stored_bytes == report.path.stat().st_size
+    if compress:
+        assert report.stored_bytes < report.db_bytes
+        restored = tmp_path / "restored.db"
+        restored.write_bytes(gzip.decompress(report.path.read_bytes()))
+    else:
+        restored = report.path
+    assert _count_leads(restored) == 50
+    # временных файлов не осталось
+    assert [p.name for p in backup_dir.iterdir()] == [report.path.name]
+
+
+async def test_writes_proceed_during_backup(inited_db, tmp_path):
+    for n in range(100):
+        await _lead(inited_db, n)
+
+    async def writer() -> list[int]:
+        return [await _lead(inited_db, 1000 + n) for n in range(20)]
+
+    report, written = await asyncio.gather(
+        DbBackups().run(inited_db, tmp_path / "b", keep=1, compress=False, pages_per_step=1, step_sleep_s=0),
+        writer(),
+    )
+
+    assert len(written) == 20
+    # копия — согласованный снимок на какой-то момент между началом и концом записи
+    assert 100 <= _count_leads(report.path) <= 120
+    assert _count_leads(inited_db) == 120
+
+
+async def test_second_connection_writes_do_not_restart_backup(inited_db, tmp_path):
+    for n in range(100):
+        await _lead(inited_db, n)
+    stop = threading.Event()
+    writes: list[int] = []
+
+    def writer() -> None:
+        # отдельное соединение в своём потоке — как внешний процесс, пишущий в ту же БД
+        with sqlite3.connect(inited_db, timeout=5) as db:
+            while not stop.is_set():
+                db.execute(
+                    "INSERT INTO lead_routes (position, mode, admin_ids) VALUES (?, 'all', '[]')", (len(writes),)
+                )
+                db.commit()
+                writes.append(1)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        pages, steps = await asyncio.wait_for(
+            backup_db(inited_db, tmp_path / "b.db", pages_per_step=1, step_sleep_s=0.001), timeout=30
+        )
+    finally:
+        stop.set()
+        thread.join()
+
+    assert writes
+    # по странице за шаг и ни одного перезапуска
+    assert steps == pages
+    assert _count_leads(tmp_path / "b.db") == 100
+    with sqlite3.connect(tmp_path / "b.db") as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+
+async def test_keeps_n_generations(inited_db, tmp_path):
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    (backup_dir / "other-20260101-000000.db").write_bytes(b"x")
+    (backup_dir / "notes.txt").write_text("x")
+    backups = DbBackups()
+
+    for day in range(4):
+        await backups.run(inited_db, backup_dir, keep=2, compress=True, now=T0 + timedelta(days=day))
+
+    assert [p.name for p in list_backups(inited_db, backup_dir)] == [
+        "test-20261021-033000.db.gz",
+        "test-20261022-033000.db.gz",
+    ]
+    assert (backup_dir / "other-20260101-000000.db").exists() and (backup_dir / "notes.txt").exists()
+    assert backups.last.path.name == "test-20261022-033000.db.gz"
+    assert prune_backups(inited_db, backup_dir, keep=5) == []
+
+
+async def test_failed_integrity_check_leaves_nothing(inited_db, tmp_path, monkeypatch):
+    async def broken(_path):
+        return ["*** in database main ***", "Page 3: never used"]
+
+    monkeypatch.setattr(backup, "integrity_check", broken)
+    backups = DbBackups()
+
+    with pytest.raises(BackupError, match="integrity_check"):
+        await backups.run(inited_db, tmp_path / "b", keep=3, compress=True, now=T0)
+
+    assert list((tmp_path / "b").iterdir()) == []
+    assert backups.last is None
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import pytest
+from aiogram.types import CallbackQuery, User
+
+from bot.constants.services import SERVICE_ID_TO_TITLE, SERVICES
+from bot.keyboards.callback_data import (
+    MAX_CALLBACK_DATA_BYTES,
+    ChooseService,
+    PortfolioApply,
+    PortfolioOpen,
+    ServiceApply,
+    ServiceId,
+    ServiceOpen,
+    ServicePortfolio,
+)
+from bot.keyboards.inline import services_kb
+from bot.keyboards.portfolio import portfolio_services_kb
+from bot.keyboards.services import service_card_kb, services_list_kb
+
+PAYLOADS = (ChooseService, ServiceOpen, ServiceApply, ServicePortfolio, PortfolioOpen, PortfolioApply)
+
+
+def _call(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=User(id=1, is_bot=False, first_name="U"), chat_instance="c", data=data)
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+@pytest.mark.parametrize("service_id", list(SERVICE_ID_TO_TITLE))
+def test_roundtrip_and_size(payload, service_id):
+    obj = payload(ServiceId(service_id))
+    data = obj.pack()
+    assert len(data.encode()) <= MAX_CALLBACK_DATA_BYTES
+    assert payload.unpack(data) == obj
+
+
+def test_compact_format_matches_legacy_strings():
+    # номера услуг с 1 — как в старых f-строках, уже отправленные кнопки продолжают работать
+    assert ChooseService(ServiceId("neuro")).pack() == "svc:1"
+    assert ServiceOpen(ServiceId("model3d")).pack() == "services:open:3"
+    assert PortfolioOpen(ServiceId("video_greeting")).pack() == "portfolio:open:6"
+    assert PortfolioApply.unpack("portfolio:apply:video_greeting").service_id == "video_greeting"
+    assert ServicePortfolio.unpack("services:portfolio:2").service_id == "restoration"
+
+
+@pytest.mark.parametrize(
+    "payload,data",
+    [
+        (ServiceOpen, "services:open:"),
+        (ServiceOpen, "services:open:0"),
+        (ServiceOpen, "services:open:99"),
+        (ServiceOpen, "services:open:abc!"),
+        (ServiceOpen, "services:apply:1"),
+        (ServiceOpen, "services:open:1.2"),
+        (ChooseService, "svc:"),
+        (PortfolioOpen, "portfolio:open:unknown_service"),
+        (PortfolioOpen, None),
+    ],
+)
+def test_unpack_rejects_bad_data(payload, data):
+    with pytest.raises(ValueError):
+        payload.unpack(data)
+
+
+@pytest.mark.asyncio
+async def test_filter_injects_parsed_payload():
+    flt = ServiceApply.filter()
+    assert await flt(_call("services:apply:4")) == {"callback_data": ServiceApply(ServiceId("content"))}
+    assert await flt(_call("services:apply:zz")) is False
+    assert await flt(_call("services:open:4")) is False
+    # фильтр — CallbackRoute: хэндлер попадает в CallbackIndex по (namespace, action)
+    flags: dict = {}
+    flt.update_handler_flags(flags)
+    assert flags["callback_route"] == [("services", frozenset({"apply"}))]
+
+
+def test_keyboards_use_typed_payloads():
+    def datas(markup):
+        return [b.callback_data for row in markup.inline_keyboard for b in row]
+
+    catalog = datas(services_kb(SERVICES))
+    assert [ChooseService.unpack(d).service_id for d in catalog[: len(SERVICES)]] == list(SERVICE_ID_TO_TITLE)
+
+    listing = datas(services_list_kb(SERVICES))
+    assert ServiceOpen.unpack(listing[0]).service_id == "neuro"
+
+    card = datas(service_card_kb("restoration"))
+    assert ServiceApply.unpack(card[0]).service_id == "restoration"
+    assert ServicePortfolio.unpack(card[1]).service_id == "restoration"
+
+    portfolio = datas(portfolio_services_kb())
+    assert PortfolioOpen.unpack(portfolio[-2]).service_id == list(SERVICE_ID_TO_TITLE)[-1]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from bot.callback_index import CallbackIndex
+from bot.filters.callback import CALLBACK_ROUTE_FLAG, CallbackRoute, parse_callback
+
+
+class Form(StatesGroup):
+    step = State()
+
+
+def _update(data: str, update_id: int = 1) -> Update:
+    user = User(id=1, is_bot=False, first_name="U")
+    message = Message(message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"))
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(id=str(update_id), from_user=user, chat_instance="c", data=data, message=message),
+    )
+
+
+def _dispatcher(log: list[str]) -> tuple[Dispatcher, CallbackIndex]:
+    dp = Dispatcher()
+    first = Router()
+    second = Router()
+    admin = Router()
+    admin.callback_query.filter(F.from_user.id == 999)
+
+    @first.callback_query(CallbackRoute("a", "x"))
+    async def a_x(call: CallbackQuery) -> None:
+        log.append("a_x")
+
+    @first.callback_query(Form.step, CallbackRoute("a"))
+    async def a_any_in_state(call: CallbackQuery) -> None:
+        log.append("a_any_in_state")
+
+    @admin.callback_query(CallbackRoute("b", "x"))
+    async def b_admin(call: CallbackQuery) -> None:
+        log.append("b_admin")
+
+    @second.callback_query(CallbackRoute("a", "y"))
+    async def a_y(call: CallbackQuery) -> None:
+        log.append("a_y")
+
+    @second.callback_query(CallbackRoute("b", "x"))
+    async def b_x(call: CallbackQuery) -> None:
+        log.append("b_x")
+
+    @second.callback_query(F.data == "plain")
+    async def plain(call: CallbackQuery) -> None:
+        log.append("plain")
+
+    dp.include_routers(first, admin, second)
+    index = CallbackIndex.build(dp)
+    dp.callback_query.outer_middleware(index)
+    return dp, index
+
+
+def test_parse_callback():
+    assert parse_callback("services:open:3") == ("services", "open", "3")
+    assert parse_callback("svc:3") == ("svc", "3", "")
+    assert parse_callback("a:b:c:d") == ("a", "b", "c:d")
+    assert parse_callback(None) == ("", "", "")
+
+
+def test_candidates_keep_registration_order():
+    dp, index = _dispatcher([])
+    assert [c.name for c in index.candidates("a:x")] == ["a_x", "a_any_in_state"]
+    # ключа a:y нет у первого роутера, но wildcard "a" зарегистрирован раньше a_y
+    assert [c.name for c in index.candidates("a:y")] == ["a_any_in_state", "a_y"]
+    assert [c.name for c in index.candidates("a:zzz")] == ["a_any_in_state"]
+    assert index.candidates("plain") == []
+
+
+@pytest.mark.asyncio
+async def test_dispatch_matches_plain_routing():
+    log: list[str] = []
+    dp, index = _dispatcher(log)
+    bot = Bot("42:TEST")
+
+    await dp.feed_update(bot, _update("a:x"))
+    await dp.feed_update(bot, _update("a:y"))
+    # фильтр роутера (не админ) — берётся следующий кандидат
+    await dp.feed_update(bot, _update("b:x"))
+    assert log == ["a_x", "a_y", "b_x"]
+    assert index.hits == 3
+
+    # не подошло по состоянию -> обычная маршрутизация (и там тоже никто не обработал)
+    await dp.feed_update(bot, _update("a:zzz"))
+    assert log == ["a_x", "a_y", "b_x"]
+
+    state = dp.fsm.get_context(bot, chat_id=1, user_id=1)
+    await state.set_state(Form.step)
+    await dp.feed_update(bot, _update("a:zzz"))
+    assert log[-1] == "a_any_in_state"
+
+    # неиндексированный хэндлер — обычным путём
+    await dp.feed_update(bot, _update("plain"))
+    assert log[-1] == "plain"
+    assert index.misses == 2
+    await bot.session.close()
+
+
+def test_all_project_callback_handlers_are_indexed(project_dispatcher):
+    dp = project_dispatcher
+    index = CallbackIndex.build(dp)
+
+    # хэндлер с F.data без CallbackRoute пропускался бы быстрым путём — таких быть не должно
+    for router in dp.chain_tail:
+        for handler in router.callback_query.handlers:
+            assert handler.flags.get(CALLBACK_ROUTE_FLAG), handler.callback.__name__
+
+    assert [c.name for c in index.candidates("lead:send")] == ["lead_send"]
+    assert [c.name for c in index.candidates("neuro:back")] == ["back_from_inline"]
+    assert [c.name for c in index.candidates("svc:4")] == ["choose_service"]
+    assert [c.name for c in index.candidates("services:open:2")] == ["services_open"]
+    assert [c.name for c in index.candidates("deadline:week")] == ["choose_deadline"]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import dataclasses
+
+import aiosqlite
+import pytest
+
+from bot import config
+from bot.db.models import CONTACT_KNOWN_SQL
+from bot.db.repository import find_leads_by_contact, save_lead
+from bot.services.leads import format_admin_message
+from bot.utils.contacts import (
+    CONTACT_EMAIL,
+    CONTACT_PHONE,
+    CONTACT_TELEGRAM,
+    CONTACT_URL,
+    Contact,
+    normalize_contact,
+    normalize_phone,
+)
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("+7 900 123-45-67", "+79001234567"),
+        ("+7 (900) 123 45 67", "+79001234567"),
+        ("8 900 123 45 67", "+79001234567"),
+        ("8(900)123-45-67", "+79001234567"),
+        ("7 900 123 45 67", "+79001234567"),
+        ("89001234567", "+79001234567"),
+        ("9001234567", "+79001234567"),
+        ("900.123.45.67", "+79001234567"),
+        ("  +7 900 123-45-67  ", "+79001234567"),
+        ("+375 29 123-45-67", "+375291234567"),
+        ("+380 (44) 123 45 67", "+380441234567"),
+        ("+1 (212) 555-0123", "+12125550123"),
+        ("+44 20 7946 0958", "+442079460958"),
+        ("0049 30 1234567", "+49301234567"),
+        ("+86 138 0013 8000", "+8613800138000"),
+    ],
+)
+def test_phone_normalized_to_e164(text, expected):
+    assert normalize_phone(text) == expected
+    assert normalize_contact(text) == Contact(CONTACT_PHONE, expected)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "   ",
+        "123",
+        "+7 900",
+        "+7 900 123-45-67-89",
+        "8 900 123 45",
+        "123456789",
+        "1234567890",
+        "+0 123 456 789",
+        "+1234567890123456",
+        "+7 9OO 123 45 67",
+        "тел. 89001234567",
+        "8-800-ДОСТАВКА",
+    ],
+)
+def test_not_a_phone(text):
+    assert normalize_phone(text) is None
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("@User_Name", Contact(CONTACT_TELEGRAM, "@user_name")),
+        ("@abcde", Contact(CONTACT_TELEGRAM, "@abcde")),
+        ("t.me/SomeUser", Contact(CONTACT_TELEGRAM, "@someuser")),
+        ("https://t.me/someuser/", Contact(CONTACT_TELEGRAM, "@someuser")),
+        ("http://telegram.me/someuser", Contact(CONTACT_TELEGRAM, "@someuser")),
+        ("https://t.me/@someuser?start=1", Contact(CONTACT_TELEGRAM, "@someuser")),
+        ("tg://resolve?domain=someuser", Contact(CONTACT_TELEGRAM, "@someuser")),
+        ("Ivan.Petrov@Example.COM", Contact(CONTACT_EMAIL, "ivan.petrov@example.com")),
+        ("a+tag@mail.co.uk", Contact(CONTACT_EMAIL, "a+tag@mail.co.uk")),
+        ("https://www.Behance.net/someone/", Contact(CONTACT_URL, "behance.net/someone")),
+        ("vk.com/id123", Contact(CONTACT_URL, "vk.com/id123")),
+        ("HTTP://Example.org", Contact(CONTACT_URL, "example.org")),
+        ("8 (900) 123-45-67", Contact(CONTACT_PHONE, "+79001234567")),
+    ],
+)
+def test_contact_classified(text, expected):
+    assert normalize_contact(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "ab", "позвоните мне", "@abc", "@_under", "@1digit", "user@", "@user@", "t.me/", "just text here", "123"],
+)
+def test_contact_not_recognized(text):
+    assert normalize_contact(text) is None
+
+
+def test_same_contact_in_different_spellings_matches():
+    spellings = ["+7 900 123-45-67", "8 (900) 123 45 67", "9001234567", "+7(900)1234567"]
+    assert len({normalize_contact(s) for s in spellings}) == 1
+    assert normalize_contact("@SomeUser") == normalize_contact("https://t.me/someuser")
+
+
+async def _lead(db_path, contact: str, contact_type: str | None) -> int:
+    return await save_lead(
+        db_path,
+        tg_user_id=1,
+        tg_username=None,
+        tg_full_name="User",
+        service="s",
+        task="t",
+        deadline="Срочно",
+        budget=None,
+        contact=contact,
+        extra_json={},
+        contact_type=contact_type,
+    )
+
+
+async def test_previous_leads_by_contact(inited_db):
+    first = await _lead(inited_db, "+79001234567", CONTACT_PHONE)
+    await _lead(inited_db, "@other", CONTACT_TELEGRAM)
+    # контакт пропущен — в повторные не попадает, даже с тем же текстом
+    await _lead(inited_db, "+79001234567", None)
+    second = await _lead(inited_db, "+79001234567", CONTACT_PHONE)
+    third = await _lead(inited_db, "+79001234567", CONTACT_PHONE)
+
+    assert await find_leads_by_contact(inited_db, "+79001234567", exclude_id=third) == [second, first]
+    assert await find_leads_by_contact(inited_db, "+79001234567", limit=1) == [third]
+    assert await find_leads_by_contact(inited_db, "@nobody") == []
+
+
+async def test_contact_lookup_uses_partial_index(inited_db):
+    async with aiosqlite.connect(inited_db) as db:
+        async with db.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM leads WHERE {CONTACT_KNOWN_SQL} AND contact=? AND id<>? "
+            "ORDER BY id DESC LIMIT 5",
+            ("+79001234567", 1),
+        ) as cur:
+            plan = " ".join(row[-1] for row in await cur.fetchall())
+    assert "idx_leads_contact" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_admin_message_lists_previous_leads():
+    lead = {"tg_full_name": "U", "service": "s", "task": "t", "deadline": "Срочно", "contact": "+79001234567"}
+    assert "Прошлые заявки" not in format_admin_message(lead)
+    text = format_admin_message({**lead, "previous_lead_ids": [15, 12]})
+    assert "🔁 Прошлые заявки с этим контактом: #15, #12" in text
+
+
+@pytest.fixture
+async def admin_chat(project_dispatcher, settings):
+    # пользователь чата — он же админ: уведомление приходит в тот же чат
+    config.configure(dataclasses.replace(settings, admin_tg_id=CHAT_ID))
+    bot, session = fake_bot()
+    state = project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+    yield ChatDriver(project_dispatcher, bot, session)
+    await state.clear()
+
+
+async def _submit(chat: ChatDriver, phone: str) -> str:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send("Ролик к юбилею")
+    await chat.press("deadline:week")
+    await chat.send("📞 Указать телефон")
+    await chat.send("+7 900")
+    await chat.send(phone)
+    await chat.press("lead:send")
+    return [m.text for m in chat.session.messages.values() if (m.text or "").startswith("🆕 Новая заявка")][-1]
+
+
+async def test_flow_stores_normalized_contact_and_flags_repeat(admin_chat, settings):
+    first = await _submit(admin_chat, "8 (900) 123-45-67")
+    second = await _submit(admin_chat, "+7 900 123 45 67")
+
+    async with aiosqlite.connect(settings.db_path) as db:
+        cur = await db.execute("SELECT id, contact, contact_type FROM leads ORDER BY id")
+        rows = await cur.fetchall()
+    assert [r[1:] for r in rows] == [("+79001234567", CONTACT_PHONE)] * 2
+    assert "Прошлые заявки" not in first
+    assert f"🔁 Прошлые заявки с этим контактом: #{rows[0][0]}" in second
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.flows.lead import LEAD_FLOWS
+from bot.services.content import (
+    ContentError,
+    ContentStore,
+    build_pages,
+    card_key,
+    validate_telegram_html,
+)
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "просто текст",
+        "<b>жирный</b> и <i>курсив</i>",
+        '<a href="https://example.com">ссылка</a>',
+        '<span class="tg-spoiler">спойлер</span>',
+        "1 &lt; 2 &amp;&amp; 3 &gt; 2, &#128512;",
+        "<blockquote expandable>цитата</blockquote>",
+    ],
+)
+def test_valid_html(text):
+    assert validate_telegram_html(text) == []
+
+
+@pytest.mark.parametrize(
+    "text, error",
+    [
+        ("a < b", "unescaped '<'"),
+        ("Q&A", "unescaped '&'"),
+        ("&nbsp;", "unsupported entity"),
+        ("<b>не закрыт", "unclosed <b>"),
+        ("лишний</i>", "unexpected </i>"),
+        ("<i><b>x</i></b>", "unexpected </i>"),
+        ("<div>x</div>", "unsupported tag <div>"),
+        ("<span>x</span>", "tg-spoiler"),
+        ('<b style="x">x</b>', "unsupported attribute"),
+        ("<br/>", "self-closing"),
+    ],
+)
+def test_invalid_html(text, error):
+    errors = validate_telegram_html(text)
+    assert any(error in e for e in errors), errors
+
+
+def test_default_pages_are_valid_and_cover_every_service():
+    pages = build_pages()
+    for service_id, title in SERVICE_ID_TO_TITLE.items():
+        card = pages[card_key(service_id)]
+        # у каждой услуги настоящая карточка, а не заглушка
+        assert card.text.startswith(title) and "скоро добавим" not in card.text
+        assert card.markup is not None
+
+    step_pages = {step.page for flow in LEAD_FLOWS for step in flow.steps if step.page is not None}
+    assert step_pages <= set(pages)
+
+
+def test_pages_are_built_once():
+    store = ContentStore()
+    store.load()
+    assert store.page("contacts") is store.page("contacts")
+    assert store.page("contacts").markup is store.page("contacts").markup
+
+
+def test_override_file_and_validation(tmp_path):
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({"contacts": "<b>Звоните</b>"}), encoding="utf-8")
+    store = ContentStore()
+    store.load(path)
+    assert store.page("contacts").text == "<b>Звоните</b>"
+    # клавиатура страницы остаётся из кода
+    assert store.page("contacts").markup is not None
+
+    path.write_text(json.dumps({"contcts": "x", "help": "<b>помощь"}), encoding="utf-8")
+    with pytest.raises(ContentError) as e:
+        ContentStore().load(path)
+    assert {err.split(":", 1)[0] for err in e.value.errors} == {"contcts", "help"}
+
+
+def test_reload_swaps_atomically_and_keeps_old_on_error(tmp_path):
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({"contacts": "v1"}), encoding="utf-8")
+    store = ContentStore()
+    store.load(path)
+    old = store.page("contacts")
+    version = store.version
+
+    path.write_text(json.dumps({"contacts": "Q&A"}), encoding="utf-8")
+    assert store.reload()
+    assert store.page("contacts") is old and store.version == version
+
+    path.write_text("{broken", encoding="utf-8")
+    assert store.reload()
+    assert store.page("contacts") is old
+
+    path.write_text(json.dumps({"contacts": "v2"}), encoding="utf-8")
+    assert store.reload() == []
+    assert store.page("contacts").text == "v2" and store.version == version + 1
+
+
+async def test_content_card_is_shown(project_dispatcher, settings):
+    bot, session = fake_bot()
+    chat = ChatDriver(project_dispatcher, bot, session)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+    await chat.send("🧩 Услуги")
+    await chat.press("services:open:4")
+    assert chat.last_screen().text.startswith(SERVICE_ID_TO_TITLE["content"])
+    assert "скоро добавим" not in chat.last_screen().text
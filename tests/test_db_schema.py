@@ -3,7 +3,7 @@ from __future__ import annotations
 import aiosqlite
 import pytest
 
-from bot.db.models import LEADS_COLUMNS, LEAD_FILES_COLUMNS
+from bot.db.models import LEADS_COLUMNS, LEAD_FILES_COLUMNS, PORTFOLIO_MEDIA_COLUMNS
 
 
 @pytest.mark.asyncio
@@ -31,3 +31,11 @@ async def test_db_schema_tables_and_columns(inited_db):
             files_info = await cur.fetchall()
         files_cols = [r[1] for r in files_info]
         assert files_cols == list(LEAD_FILES_COLUMNS)
+
+
+@pytest.mark.asyncio
+async def test_db_schema_portfolio_media(inited_db):
+    async with aiosqlite.connect(str(inited_db)) as db:
+        async with db.execute("PRAGMA table_info(portfolio_media)") as cur:
+            cols = [r[1] for r in await cur.fetchall()]
+    assert cols == list(PORTFOLIO_MEDIA_COLUMNS)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import aiosqlite
+import pytest
+from aiogram.methods import EditMessageText, SendMessage
+
+from bot.db.models import DRAFTS_PENDING_SQL
+from bot.db.repository import get_draft, save_draft
+from bot.services import drafts
+from bot.services.drafts import DraftTracker, remind_idle_drafts
+from bot.states.lead_form import LeadForm
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+LATER = datetime.now(timezone.utc) + timedelta(hours=2)
+
+
+@pytest.fixture
+def tracked(project_dispatcher, monkeypatch):
+    """Dispatcher проекта с middleware черновиков (как в run_bot) — только на время теста."""
+    tracker = DraftTracker()
+    monkeypatch.setattr(drafts, "draft_tracker", tracker)
+    middleware = tracker.middleware()
+    project_dispatcher.update.outer_middleware(middleware)
+    yield project_dispatcher
+    project_dispatcher.update.outer_middleware.unregister(middleware)
+
+
+async def _start_until_deadline(chat: ChatDriver) -> None:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send("Ролик к юбилею")
+
+
+async def test_draft_survives_restart_and_resumes(tracked, settings):
+    bot, session = fake_bot()
+    chat = ChatDriver(tracked, bot, session)
+    state = tracked.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+    await _start_until_deadline(chat)
+
+    draft = await get_draft(settings.db_path, CHAT_ID, CHAT_ID)
+    assert draft["state"] == LeadForm.deadline.state and draft["data"]["task"] == "Ролик к юбилею"
+
+    # «перезапуск»: FSM в памяти пропал, черновик в БД остался
+    await state.set_state(None)
+    await state.set_data({})
+
+    assert await remind_idle_drafts(bot, settings.db_path, idle_s=3600, now=LATER) == 1
+    assert isinstance(session.requests[-1], SendMessage) and "Продолжить" in session.requests[-1].text
+    reminder = max(session.messages.values(), key=lambda m: m.message_id)
+    # одно напоминание на простой
+    assert await remind_idle_drafts(bot, settings.db_path, idle_s=3600, now=LATER) == 0
+
+    await chat.press("draft:resume")
+    assert await state.get_state() == LeadForm.deadline.state
+    assert (await state.get_data())["task"] == "Ролик к юбилею"
+    # шаг показан на месте напоминания
+    edit = session.requests[-1]
+    assert isinstance(edit, EditMessageText) and edit.message_id == reminder.message_id
+
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+    assert await get_draft(settings.db_path, CHAT_ID, CHAT_ID) is None
+
+
+async def test_unchanged_step_is_not_rewritten(tracked, settings, monkeypatch):
+    writes = []
+    original = drafts.save_draft
+
+    async def counting(*args, **kwargs):
+        writes.append(kwargs["state"])
+        await original(*args, **kwargs)
+
+    monkeypatch.setattr(drafts, "save_draft", counting)
+    bot, session = fake_bot()
+    chat = ChatDriver(tracked, bot, session)
+    await tracked.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+    await chat.send("✅ Оставить заявку")
+    assert writes == []  # каталог без выбранной услуги — не черновик
+    await chat.press("svc:5")
+    await chat.send("   ")  # невалидный ввод: шаг и data не изменились
+    assert len(writes) == 1
+
+    await chat.send("❌ Отменить")
+    assert await get_draft(settings.db_path, CHAT_ID, CHAT_ID) is None
+
+
+async def test_drop_button_deletes_draft(tracked, settings):
+    bot, session = fake_bot()
+    chat = ChatDriver(tracked, bot, session)
+    await tracked.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+    await _start_until_deadline(chat)
+    await remind_idle_drafts(bot, settings.db_path, idle_s=3600, now=LATER)
+
+    await chat.press("draft:drop")
+    assert await get_draft(settings.db_path, CHAT_ID, CHAT_ID) is None
+    assert await tracked.fsm.get_context(bot, CHAT_ID, CHAT_ID).get_state() is None
+
+
+async def test_reminders_run_in_bounded_batches(inited_db):
+    for user_id in range(1, 251):
+        await save_draft(inited_db, chat_id=user_id, user_id=user_id, state="LeadForm:task", data={"service": "s"})
+    bot, session = fake_bot()
+
+    assert await remind_idle_drafts(bot, inited_db, idle_s=60, batch_size=100, max_batches=2, now=LATER) == 200
+    assert await remind_idle_drafts(bot, inited_db, idle_s=60, batch_size=100, max_batches=2, now=LATER) == 50
+    assert session.calls["sendMessage"] == 250
+    # свежие черновики (моложе idle_s) не трогаются
+    assert await remind_idle_drafts(bot, inited_db, idle_s=60) == 0
+
+
+async def test_candidates_query_uses_pending_index(inited_db):
+    async with aiosqlite.connect(inited_db) as db:
+        async with db.execute(
+            f"EXPLAIN QUERY PLAN SELECT chat_id FROM lead_drafts WHERE {DRAFTS_PENDING_SQL} AND updated_at <= '' "
+            "ORDER BY updated_at LIMIT 100"
+        ) as cur:
+            plan = " ".join(row[-1] for row in await cur.fetchall())
+    assert "idx_lead_drafts_pending" in plan and "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.flows.engine import CHOOSE_SERVICE, CompiledFlows, Flow, Step
+from bot.flows.lead import FLOWS
+from bot.services.summary import summary_text
+from bot.states.lead_form import LeadForm
+
+
+def test_every_service_has_flow_entry():
+    assert set(FLOWS.entry) == set(SERVICE_ID_TO_TITLE)
+    assert FLOWS.entry["neuro"] == "neuro_step1"
+    assert FLOWS.entry["restoration"] == "rest_type"
+    assert FLOWS.entry["model3d"] == "model3d_intro"
+    assert FLOWS.entry["photo_stories"] == "task"
+
+
+def test_unknown_service_uses_default_flow():
+    assert FLOWS.resolve("nope") == "photo_stories"
+    assert FLOWS.resolve(None) == "photo_stories"
+    assert FLOWS.next_of("nope", "task") == "deadline"
+
+
+@pytest.mark.parametrize(
+    "service_id,name,prev",
+    [
+        ("neuro", "neuro_step1", CHOOSE_SERVICE),
+        ("neuro", "neuro_step2", "neuro_step1"),
+        ("neuro", "deadline", "neuro_wishes"),
+        ("restoration", "task", "rest_type"),
+        ("restoration", "deadline", "files"),
+        ("model3d", "model3d_intro", CHOOSE_SERVICE),
+        ("model3d", "model3d_desc", "model3d_wait_file"),
+        ("model3d", "deadline", "model3d_wait_file"),
+        ("content", "deadline", "content_task"),
+        ("video_greeting", "deadline", "video_task"),
+        ("photo_stories", "deadline", "task"),
+        ("photo_stories", "deadline_custom", "deadline"),
+        ("photo_stories", "contact_phone", "contact_choice"),
+        ("photo_stories", "confirm", "contact_choice"),
+    ],
+)
+def test_prev_table(service_id, name, prev):
+    assert FLOWS.prev_of(service_id, name) == prev
+
+
+@pytest.mark.parametrize(
+    "service_id,name,nxt",
+    [
+        ("neuro", "neuro_wishes", "deadline"),
+        ("restoration", "task", "files"),
+        ("photo_stories", "task", "deadline"),
+        ("model3d", "model3d_desc", "deadline"),
+        ("content", "deadline_custom", "contact_choice"),
+        ("content", "contact_other", "confirm"),
+        ("content", "confirm", None),
+    ],
+)
+def test_next_table(service_id, name, nxt):
+    assert FLOWS.next_of(service_id, name) == nxt
+
+
+def test_text_states_are_input_steps_only():
+    assert LeadForm.task.state in FLOWS.text_states
+    assert LeadForm.contact_phone.state in FLOWS.text_states
+    assert LeadForm.deadline_custom.state in FLOWS.text_states
+    # шаги с кнопками/файлами обрабатываются своими handler'ами
+    assert LeadForm.deadline.state not in FLOWS.text_states
+    assert LeadForm.files.state not in FLOWS.text_states
+    assert LeadForm.model3d_wait_file.state not in FLOWS.text_states
+
+
+def test_step_store_functions():
+    rest_task = FLOWS.step("restoration", "task")
+    assert rest_task.store("поправить цвет", {"rest_type": "Фото"}) == {"task": "Тип: Фото\nпоправить цвет"}
+    assert FLOWS.step("photo_stories", "task").store is None
+
+    custom = FLOWS.step("neuro", "deadline_custom")
+    assert custom.store("к пятнице", {}) == {"deadline_key": "custom", "deadline_custom_text": "к пятнице"}
+
+
+def test_step_validators():
+    phone = FLOWS.step("neuro", "contact_phone")
+    assert not phone.validator("123")
+    assert not phone.validator("+7 900")
+    assert phone.validator("8 (900) 123-45-67")
+    assert phone.store("8 (900) 123-45-67", {}) == {"contact": "+79001234567", "contact_type": "phone"}
+    assert not FLOWS.step("neuro", "neuro_wishes").validator("   ")
+
+
+def test_step_for_state():
+    step = FLOWS.step_for_state("model3d", LeadForm.model3d_desc.state)
+    assert step is not None and step.field == "task"
+    assert FLOWS.step_for_state("model3d", None) is None
+    assert FLOWS.step_for_state("neuro", LeadForm.choosing_service.state) is None
+
+
+def test_compile_rejects_unknown_target():
+    with pytest.raises(ValueError, match="unknown step"):
+        CompiledFlows([Flow("x", (Step(LeadForm.task, next="nope"),))], default_service_id="x")
+
+
+def test_compile_rejects_duplicates_and_missing_default():
+    with pytest.raises(ValueError, match="duplicate"):
+        CompiledFlows([Flow("x", (Step(LeadForm.task), Step(LeadForm.task)))], default_service_id="x")
+    with pytest.raises(ValueError, match="default"):
+        CompiledFlows([Flow("x", (Step(LeadForm.task),))], default_service_id="y")
+
+
+@pytest.mark.parametrize(
+    "service_id,label",
+    [("neuro", "Пожелания"), ("model3d", "Описание"), ("restoration", "Задача")],
+)
+def test_summary_task_label(service_id, label):
+    text = summary_text(
+        {"service": SERVICE_ID_TO_TITLE[service_id], "service_id": service_id, "task": "t", "deadline_key": "week"}
+    )
+    assert f"<b>{label}:</b> t" in text
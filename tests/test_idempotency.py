@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+
+import aiosqlite
+import pytest
+
+from bot.db.repository import DuplicateLeadError, init_db, list_lead_deliveries, save_lead, save_lead_deliveries
+from bot.handlers import lead_flow
+from bot.services.idempotency import SubmissionGuard, new_submit_token
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+def _lead_kwargs(**overrides):
+    kwargs = dict(
+        tg_user_id=1,
+        tg_username="u",
+        tg_full_name="User",
+        service="Нейрофотосессия",
+        task="t",
+        deadline="Срочно",
+        budget=None,
+        contact="@u",
+        extra_json={},
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+@pytest.mark.asyncio
+async def test_same_submit_token_saved_once(inited_db):
+    token = new_submit_token()
+    lead_id = await save_lead(inited_db, **_lead_kwargs(), submit_token=token)
+
+    with pytest.raises(DuplicateLeadError) as exc:
+        await save_lead(inited_db, **_lead_kwargs(), submit_token=token)
+    assert exc.value.lead_id == lead_id
+
+    # без токена (старые вызовы) дедупликации нет
+    await save_lead(inited_db, **_lead_kwargs())
+    await save_lead(inited_db, **_lead_kwargs())
+
+    async with aiosqlite.connect(str(inited_db)) as db:
+        async with db.execute("SELECT COUNT(*) FROM leads") as cur:
+            assert (await cur.fetchone())[0] == 3
+
+
+@pytest.mark.asyncio
+async def test_init_db_migrates_old_leads_table(tmp_path):
+    db_path = tmp_path / "old.db"
+    async with aiosqlite.connect(str(db_path)) as db:
+        await db.execute(
+            """
+            CREATE TABLE leads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL, tg_user_id INTEGER NOT NULL, tg_username TEXT,
+                tg_full_name TEXT NOT NULL, service TEXT NOT NULL, task TEXT NOT NULL,
+                deadline TEXT NOT NULL, budget TEXT, contact TEXT NOT NULL, extra_json TEXT NOT NULL
+            )
+            """
+        )
+        await db.commit()
+
+    await init_db(db_path)
+    await init_db(db_path)  # повторный запуск — без ошибок
+
+    await save_lead(db_path, **_lead_kwargs(), submit_token="tok")
+    with pytest.raises(DuplicateLeadError):
+        await save_lead(db_path, **_lead_kwargs(), submit_token="tok")
+
+
+@pytest.mark.asyncio
+async def test_guard_serializes_same_user_only():
+    guard = SubmissionGuard()
+    order: list[str] = []
+
+    async def submit(user_id: int, name: str, delay: float):
+        async with guard.lock(user_id):
+            order.append(f"{name}:start")
+            await asyncio.sleep(delay)
+            order.append(f"{name}:end")
+
+    await asyncio.gather(submit(1, "a1", 0.02), submit(1, "a2", 0), submit(2, "b", 0))
+
+    # пользователь 2 не ждал пользователя 1
+    assert order.index("b:end") < order.index("a1:end")
+    # дубли пользователя 1 не пересекаются
+    assert order.index("a1:end") < order.index("a2:start")
+    # блокировки освобождены
+    assert guard._locks == {}
+
+
+def test_guard_done_tokens_are_bounded():
+    guard = SubmissionGuard(done_limit=2)
+    for token in ("t1", "t2", "t3"):
+        guard.mark_done(token)
+    assert not guard.is_done("t1")
+    assert guard.is_done("t2") and guard.is_done("t3")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("delivered_before", [False, True])
+async def test_duplicate_submit_redelivers_only_undelivered_lead(
+    project_dispatcher, settings, monkeypatch, delivered_before
+):
+    # процесс перезапущен: в памяти токенов нет, заявка уже в БД с прошлой попытки
+    monkeypatch.setattr(lead_flow, "submission_guard", SubmissionGuard())
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session)
+    state = project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+    await user.send("✅ Оставить заявку")
+    await user.press("svc:5")
+    await user.send("Ролик к юбилею")
+    await user.press("deadline:week")
+    await user.send("⏭ Пропустить")
+
+    token = (await state.get_data())["submit_token"]
+    lead_id = await save_lead(settings.db_path, **_lead_kwargs(tg_user_id=CHAT_ID), submit_token=token)
+    if delivered_before:
+        await save_lead_deliveries(settings.db_path, lead_id, [(777, "sent", 1, None)])
+
+    await user.press("lead:send")
+
+    notified = [m for m in session.messages.values() if m.chat.id == 777 and (m.text or "").startswith("🆕")]
+    assert len(notified) == (0 if delivered_before else 1)
+    assert [d["admin_id"] for d in await list_lead_deliveries(settings.db_path, lead_id)] == [777]
+    assert await state.get_state() is None
+    async with aiosqlite.connect(str(settings.db_path)) as db:
+        async with db.execute("SELECT COUNT(*) FROM leads") as cur:
+            assert (await cur.fetchone())[0] == 1
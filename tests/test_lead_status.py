@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import dataclasses
+
+import aiosqlite
+import pytest
+from aiogram.methods import CopyMessage, EditMessageText
+
+from bot import config
+from bot.db.models import IN_PROGRESS_SQL, OPEN_STATUSES_SQL
+from bot.db.repository import (
+    get_lead,
+    lead_status_history,
+    list_assigned_leads,
+    list_open_leads,
+    save_lead,
+    update_lead_status,
+)
+from bot.keyboards.callback_data import LeadReply, LeadTake
+from bot.services.lead_status import apply_lead_action, with_status_line
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+async def _lead(db_path, **overrides) -> int:
+    kwargs = dict(
+        tg_user_id=1, tg_username="u", tg_full_name="User", service="s", task="t",
+        deadline="Срочно", budget=None, contact="@u", extra_json={},
+    )
+    kwargs.update(overrides)
+    return await save_lead(db_path, **kwargs)
+
+
+async def test_transitions_and_history(inited_db):
+    lead_id = await _lead(inited_db)
+    assert (await get_lead(inited_db, lead_id))["status"] == "new"
+
+    taken = await apply_lead_action(lead_id, "take", admin_id=777)
+    assert taken["status"] == "in_progress" and taken["assigned_to"] == 777
+    # второй «Взять» (другой админ / двойное нажатие) — переход уже недопустим
+    assert await apply_lead_action(lead_id, "take", admin_id=888) is None
+
+    done = await apply_lead_action(lead_id, "done", admin_id=777)
+    assert done["status"] == "done" and done["assigned_to"] == 777
+    assert await apply_lead_action(lead_id, "reject", admin_id=777) is None
+    assert await apply_lead_action(999, "done", admin_id=777) is None
+
+    history = await lead_status_history(inited_db, lead_id)
+    assert [(h["status"], h["changed_by"]) for h in history] == [("new", None), ("in_progress", 777), ("done", 777)]
+
+
+async def test_open_and_assigned_lists(inited_db):
+    ids = [await _lead(inited_db) for _ in range(4)]
+    await update_lead_status(inited_db, ids[0], status="done", allowed_from=("new",), changed_by=1)
+    await update_lead_status(inited_db, ids[1], status="in_progress", allowed_from=("new",), changed_by=5, assign=True)
+
+    assert [lead["id"] for lead in await list_open_leads(inited_db)] == ids[1:]
+    assert [lead["id"] for lead in await list_assigned_leads(inited_db, 5)] == [ids[1]]
+    assert await list_assigned_leads(inited_db, 6) == []
+
+
+@pytest.mark.parametrize(
+    "sql, index",
+    [
+        (f"SELECT id FROM leads WHERE {OPEN_STATUSES_SQL} ORDER BY created_at LIMIT 20", "idx_leads_open"),
+        (
+            f"SELECT id FROM leads WHERE {IN_PROGRESS_SQL} AND assigned_to=5 ORDER BY created_at",
+            "idx_leads_in_progress_assignee",
+        ),
+        ("UPDATE leads SET status='done' WHERE id=1 AND status IN ('new')", "INTEGER PRIMARY KEY"),
+    ],
+)
+async def test_status_queries_use_indexes(inited_db, sql, index):
+    async with aiosqlite.connect(inited_db) as db:
+        async with db.execute("EXPLAIN QUERY PLAN " + sql) as cur:
+            plan = " ".join(row[-1] for row in await cur.fetchall())
+    # полный проход по таблице и сортировка во временном B-дереве — признак того, что индекс не подхватился
+    assert index in plan and "TEMP B-TREE" not in plan, plan
+
+
+def test_status_line_is_replaced():
+    text = with_status_line("🆕 Новая заявка\nЗадача: t", "\n\n📌 Статус: 🙋 В работе")
+    assert with_status_line(text, "\n\n📌 Статус: ✅ Выполнена") == "🆕 Новая заявка\nЗадача: t\n\n📌 Статус: ✅ Выполнена"
+
+
+@pytest.fixture
+async def admin_chat(project_dispatcher, settings):
+    # пользователь чата — он же админ: уведомление приходит в тот же чат
+    config.configure(dataclasses.replace(settings, admin_tg_id=CHAT_ID))
+    bot, session = fake_bot()
+    state = project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+    yield ChatDriver(project_dispatcher, bot, session)
+    await state.clear()
+
+
+async def _submit(chat: ChatDriver) -> tuple[int, object]:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send("Ролик к юбилею")
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+    notification = next(m for m in chat.session.messages.values() if (m.text or "").startswith("🆕 Новая заявка"))
+    lead_id = LeadTake.unpack(notification.reply_markup.inline_keyboard[0][0].callback_data).lead_id
+    return lead_id, notification
+
+
+async def test_admin_buttons_edit_notification(admin_chat, settings):
+    lead_id, notification = await _submit(admin_chat)
+
+    await admin_chat.press(LeadTake(lead_id).pack(), message=notification)
+    edit = [r for r in admin_chat.session.requests if isinstance(r, EditMessageText)][-1]
+    assert edit.message_id == notification.message_id
+    assert edit.text.endswith("📌 Статус: 🙋 В работе · U")
+    updated = admin_chat.session.messages[notification.message_id]
+    buttons = [b.text for row in updated.reply_markup.inline_keyboard for b in row]
+    assert buttons == ["✅ Готово", "❌ Отклонить", "💬 Ответить"]
+    assert (await get_lead(settings.db_path, lead_id))["status"] == "in_progress"
+
+    # повторный «Взять» со старого сообщения — статус не меняется
+    await admin_chat.press(LeadTake(lead_id).pack(), message=notification)
+    assert len(await lead_status_history(settings.db_path, lead_id)) == 2
+
+
+async def test_admin_buttons_without_edit_send_new_message(admin_chat, settings):
+    config.configure(dataclasses.replace(config.get_settings(), admin_edit_notifications=False))
+    lead_id, notification = await _submit(admin_chat)
+    sends = admin_chat.session.calls["sendMessage"]
+    await admin_chat.press(LeadTake(lead_id).pack(), message=notification)
+    assert admin_chat.session.calls["editMessageText"] == 0
+    assert admin_chat.session.calls["sendMessage"] == sends + 1
+
+
+async def test_reply_to_lead_author(admin_chat, settings):
+    lead_id, notification = await _submit(admin_chat)
+    await admin_chat.press(LeadReply(lead_id).pack(), message=notification)
+    # текст совпадает с кнопкой меню — всё равно уходит автору, а не в меню
+    await admin_chat.send("🧩 Услуги")
+    copies = [r for r in admin_chat.session.requests if isinstance(r, CopyMessage)]
+    assert len(copies) == 1 and copies[0].chat_id == CHAT_ID
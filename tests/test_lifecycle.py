@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import AnswerCallbackQuery
+
+from bot.db.storage import get_storage
+from bot.lifecycle import Lifecycle
+from bot.texts.common import LEAD_SUCCESS_TEXT
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+async def _handler(lifecycle: Lifecycle, delay: float, log: list[str], name: str):
+    async def work():
+        await asyncio.sleep(delay)
+        log.append(name)
+        return name
+
+    return await lifecycle.run_handler(work())
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_inflight_then_runs_hooks_in_order():
+    lifecycle = Lifecycle()
+    log: list[str] = []
+
+    handlers = [asyncio.create_task(_handler(lifecycle, 0.05, log, f"h{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    assert lifecycle.inflight == 3
+
+    async def flush():
+        log.append("flush")
+
+    async def close():
+        log.append("close")
+
+    lifecycle.on_close("session", close)
+    lifecycle.on_flush("queue", flush)
+
+    report = await lifecycle.shutdown(timeout=1)
+
+    assert report.drained == 3
+    assert report.abandoned == 0
+    assert report.hooks == {"queue": "ok", "session": "ok"}
+    assert log[-2:] == ["flush", "close"]
+    assert sorted(await asyncio.gather(*handlers)) == ["h0", "h1", "h2"]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_handlers_after_timeout():
+    lifecycle = Lifecycle()
+    log: list[str] = []
+
+    fast = asyncio.create_task(_handler(lifecycle, 0, log, "fast"))
+    slow = asyncio.create_task(_handler(lifecycle, 10, log, "slow"))
+    await asyncio.sleep(0)
+
+    report = await lifecycle.shutdown(timeout=0.05)
+
+    assert report.drained == 1
+    assert report.abandoned == 1
+    assert fast.done() and not fast.cancelled()
+    assert slow.cancelled()
+    assert log == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_updates_after_shutdown_are_dropped():
+    lifecycle = Lifecycle()
+    await lifecycle.shutdown(timeout=0)
+
+    log: list[str] = []
+    assert await _handler(lifecycle, 0, log, "late") is None
+    assert log == []
+
+    report = await lifecycle.shutdown(timeout=0)
+    assert report.dropped_updates == 1
+
+
+@pytest.mark.asyncio
+async def test_background_tasks_stopped_and_hook_errors_reported():
+    lifecycle = Lifecycle()
+    lifecycle.start_background("loop", asyncio.sleep(3600))
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    lifecycle.on_close("broken", broken)
+    report = await lifecycle.shutdown(timeout=0)
+
+    assert report.background_stopped == ["loop"]
+    assert report.hooks["broken"] == "error: boom"
+    assert "drained=0" in report.summary()
+
+
+async def test_lead_send_replies_first_and_shutdown_waits_for_delivery(project_dispatcher, settings):
+    lifecycle = Lifecycle()
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session, context={"lifecycle": lifecycle})
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+    await user.send("✅ Оставить заявку")
+    await user.press("svc:5")
+    await user.send("Ролик к юбилею")
+    await user.press("deadline:week")
+    await user.send("⏭ Пропустить")
+    await user.press("lead:send")
+
+    # ответ пользователю уже ушёл, рассылка админам — фоновой задачей
+    assert any(m.text == LEAD_SUCCESS_TEXT for m in session.messages.values())
+    assert lifecycle.inflight == 1
+    assert not any(m.chat.id == 777 for m in session.messages.values())
+
+    report = await lifecycle.shutdown(timeout=5)
+
+    assert (report.drained, report.abandoned) == (1, 0)
+    assert any(m.chat.id == 777 and (m.text or "").startswith("🆕") for m in session.messages.values())
+    assert [d["admin_id"] for d in await get_storage().list_lead_deliveries(1)] == [777]
+
+
+@pytest.mark.parametrize("with_lifecycle", [True, False])
+async def test_lead_is_delivered_when_reply_to_user_fails(project_dispatcher, settings, with_lifecycle):
+    lifecycle = Lifecycle()
+    bot, session = fake_bot()
+    context = {"lifecycle": lifecycle} if with_lifecycle else {}
+    user = ChatDriver(project_dispatcher, bot, session, context=context)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+    await user.send("✅ Оставить заявку")
+    await user.press("svc:5")
+    await user.send("Ролик к юбилею")
+    await user.press("deadline:week")
+    await user.send("⏭ Пропустить")
+    too_old = TelegramBadRequest(AnswerCallbackQuery(callback_query_id="1"), "query is too old")
+    session.fail["answerCallbackQuery"] = [too_old]
+    with pytest.raises(TelegramBadRequest):
+        await user.press("lead:send")
+    await lifecycle.shutdown(timeout=5)
+
+    assert any(m.chat.id == 777 and (m.text or "").startswith("🆕") for m in session.messages.values())
+    assert [d["admin_id"] for d in await get_storage().list_lead_deliveries(1)] == [777]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError
+from aiogram.methods import GetFile
+
+from bot.services.media_check import MediaAvailability, format_broken_media_alert
+
+
+class FakeBot:
+    def __init__(self, broken: set[str] = frozenset(), flaky: set[str] = frozenset()):
+        self.broken = set(broken)
+        self.flaky = set(flaky)
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_file(self, file_id: str):
+        self.calls.append(file_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            if file_id in self.broken:
+                raise TelegramBadRequest(GetFile(file_id=file_id), "Bad Request: wrong file_id")
+            if file_id in self.flaky:
+                raise TelegramNetworkError(GetFile(file_id=file_id), "timeout")
+            return object()
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_validate_marks_broken_and_filters_them_out():
+    cache = MediaAvailability()
+    bot = FakeBot(broken={"BAD"})
+
+    newly_broken = await cache.validate(bot, ["OK1", "BAD", "OK2"])
+
+    assert newly_broken == ["BAD"]
+    assert cache.status("OK1") is True
+    assert cache.status("BAD") is False
+    assert cache.filter_sendable(["OK1", "BAD", "OK2", "UNCHECKED"]) == ["OK1", "OK2", "UNCHECKED"]
+
+
+@pytest.mark.asyncio
+async def test_validate_reports_broken_only_once():
+    cache = MediaAvailability()
+    bot = FakeBot(broken={"BAD"})
+
+    assert await cache.validate(bot, ["BAD"]) == ["BAD"]
+    assert await cache.validate(bot, ["BAD"]) == []
+    assert cache.broken() == ["BAD"]
+
+
+@pytest.mark.asyncio
+async def test_network_errors_keep_previous_status():
+    cache = MediaAvailability()
+    await cache.validate(FakeBot(), ["X"])
+    await cache.validate(FakeBot(flaky={"X", "Y"}), ["X", "Y"])
+
+    assert cache.status("X") is True
+    assert cache.status("Y") is None
+
+
+@pytest.mark.asyncio
+async def test_validate_respects_concurrency_and_dedups():
+    cache = MediaAvailability()
+    bot = FakeBot()
+    ids = [f"ID{i}" for i in range(20)] + ["ID0", "ID1"]
+
+    await cache.validate(bot, ids, concurrency=3)
+
+    assert sorted(bot.calls) == sorted(set(ids))
+    assert bot.max_in_flight <= 3
+
+
+def test_format_broken_media_alert_groups_by_source():
+    text = format_broken_media_alert(["B"], {"neuro": ["A", "B"], "content": ["C"]})
+    assert "neuro:" in text
+    assert "<code>B</code>" in text
+    assert "content:" not in text
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import dataclasses
+
+import aiosqlite
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageText
+
+from bot import config
+from bot.handlers import fallback
+from bot.utils.rate_limit import PerKeyCooldown
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+@pytest.fixture
+async def chat(project_dispatcher, settings):
+    bot, session = fake_bot()
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+    yield ChatDriver(project_dispatcher, bot, session)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+
+async def _restoration_lead(chat: ChatDriver) -> None:
+    await chat.send("🧩 Услуги")
+    await chat.press("services:open:2")
+    await chat.press("services:apply:2")
+    await chat.press("rest:photo")
+    await chat.send("Убрать царапины")
+    await chat.press("files:done")
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+
+
+async def test_inline_transitions_edit_the_same_message(chat, settings):
+    await _restoration_lead(chat)
+
+    calls = chat.session.calls
+    # список -> карточка -> тип реставрации; файлы -> срок
+    assert calls["editMessageText"] == 3
+    edited = {r.message_id for r in chat.session.requests if isinstance(r, EditMessageText)}
+    assert len(edited) == 2
+
+    async with aiosqlite.connect(settings.db_path) as db:
+        cur = await db.execute("SELECT service, task FROM leads")
+        assert await cur.fetchall() == [("🛠 Реставрация фото/видео", "Тип: Фото\nУбрать царапины")]
+
+
+async def test_edit_mode_off_sends_every_step(chat, settings):
+    config.configure(dataclasses.replace(settings, nav_edit_messages=False))
+    await _restoration_lead(chat)
+    assert chat.session.calls["editMessageText"] == 0
+
+
+async def test_falls_back_to_send_when_edit_fails(chat):
+    await chat.send("🧩 Услуги")
+    chat.session.fail["editMessageText"] = [TelegramBadRequest(EditMessageText(text="x"), "message can't be edited")]
+    before = chat.session.calls["sendMessage"]
+    await chat.press("services:open:1")
+    assert chat.session.calls["sendMessage"] == before + 1
+
+    # "не изменилось" — не ошибка и не повод слать дубль
+    chat.session.fail["editMessageText"] = [TelegramBadRequest(EditMessageText(text="x"), "message is not modified")]
+    before = chat.session.calls["sendMessage"]
+    await chat.press("services:list")
+    assert chat.session.calls["sendMessage"] == before
+
+
+async def test_stale_screen_gets_a_new_message(chat):
+    await chat.send("✅ Оставить заявку")
+    old_catalog = chat.last_screen()
+    await chat.press("svc:2")  # каталог -> тип реставрации (тот же экран)
+    await chat.press("lead:back")  # обратно в каталог
+    await chat.send("✅ Оставить заявку")  # новый экран ниже, старый больше не якорь
+    sends = chat.session.calls["sendMessage"]
+    await chat.press("svc:1", message=old_catalog)
+    assert chat.session.calls["sendMessage"] > sends
+
+
+async def test_stray_media_hint_only_outside_the_form(chat, monkeypatch):
+    monkeypatch.setattr(fallback, "_hint_cooldown", PerKeyCooldown(600))
+    photo = [{"file_id": "P", "file_unique_id": "p", "width": 1, "height": 1}]
+
+    def hints() -> int:
+        return sum("Чтобы отправить файлы" in (m.text or "") for m in chat.session.messages.values())
+
+    # заявка уже оформляется (шаг срока) — подсказка «оформите заявку» не к месту
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send("Ролик к юбилею")
+    await chat.send(photo=photo)
+    assert hints() == 0
+
+    await chat.dp.fsm.get_context(chat.bot, CHAT_ID, CHAT_ID).clear()
+    await chat.send(photo=photo)
+    assert hints() == 1
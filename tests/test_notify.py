@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendMediaGroup, SendMessage
+
+from bot.services.notify import media_batches, notify_lead
+from bot.utils.rate_limit import SendLimiter, TokenBucket
+from tests.fake_telegram import FakeSession, fake_bot
+
+ADMIN = 777
+LEAD = {"tg_full_name": "User", "service": "x", "task": "t", "deadline": "Срочно", "contact": "@u"}
+
+
+def _files(kind: str, count: int, prefix: str | None = None) -> list[dict[str, str]]:
+    return [{"file_type": kind, "file_id": f"{prefix or kind}{i}"} for i in range(count)]
+
+
+def _bad_request() -> TelegramBadRequest:
+    return TelegramBadRequest(SendMessage(chat_id=ADMIN, text="x"), "wrong file identifier")
+
+
+def test_media_batches_group_by_type_and_size():
+    files = [*_files("photo", 7), *_files("doc", 3), *_files("video", 5)]
+    batches = media_batches(files)
+    assert [len(b) for b in batches] == [10, 2, 3]
+    assert {f["file_type"] for f in batches[0] + batches[1]} == {"photo", "video"}
+    assert {f["file_type"] for f in batches[2]} == {"doc"}
+    assert media_batches([]) == []
+
+
+async def test_files_are_forwarded_as_media():
+    bot, session = fake_bot()
+    files = [*_files("photo", 3), *_files("doc", 1)]
+    report = await notify_lead(bot, ADMIN, 5, LEAD, files)
+
+    assert report.text_sent and report.media_sent == 4 and report.failed == []
+    assert session.calls["sendMediaGroup"] == 1 and session.calls["sendDocument"] == 1
+    group = next(r for r in session.requests if isinstance(r, SendMediaGroup))
+    assert group.media[0].caption == "📎 Файлы к заявке #5 (1/2)"
+    text = next(r.text for r in session.requests if isinstance(r, SendMessage))
+    # file_id в тексте больше не перечисляются — файлы пришли сами
+    assert "Файлы: 4 (пересланы отдельными сообщениями)" in text and "photo0" not in text
+
+
+async def test_failed_items_degrade_to_listing():
+    bot, session = fake_bot()
+    # группа падает целиком -> по одному; второе фото битое
+    session.fail["sendMediaGroup"] = [_bad_request()]
+    session.fail["sendPhoto"] = [None, _bad_request(), None]
+    report = await notify_lead(bot, ADMIN, 9, LEAD, _files("photo", 3))
+
+    assert report.media_sent == 2
+    assert report.failed == [{"file_type": "photo", "file_id": "photo1"}]
+    listing = [r.text for r in session.requests if isinstance(r, SendMessage)][-1]
+    assert listing == "⚠️ Не удалось переслать файлы к заявке #9:\n- photo: photo1"
+
+
+async def test_text_failure_does_not_block_files():
+    bot, session = fake_bot()
+    session.fail["sendMessage"] = [_bad_request()]
+    report = await notify_lead(bot, ADMIN, 1, LEAD, _files("video", 2))
+    assert not report.text_sent and report.media_sent == 2
+
+
+async def test_cut_short_text_keeps_delivered_message_ids():
+    bot, session = fake_bot()
+    # задача на три сообщения; второе не дошло
+    lead = {**LEAD, "task": "\n".join(["строка задачи " * 20] * 40)}
+    session.fail["sendMessage"] = [None, _bad_request()]
+    report = await notify_lead(bot, ADMIN, 1, lead)
+
+    assert session.calls["sendMessage"] == 2
+    assert report.text_sent and len(report.message_ids) == 1
+    assert (report.status, report.error) == ("partial", "wrong file identifier")
+
+
+class SlowSession(FakeSession):
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def make_request(self, bot: Any, method: Any, timeout: int | None = None) -> Any:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return await super().make_request(bot, method, timeout)
+
+
+async def test_text_and_media_are_sent_concurrently():
+    from aiogram import Bot
+
+    session = SlowSession()
+    bot = Bot("42:TEST", session=session)
+    await notify_lead(bot, ADMIN, 1, LEAD, [*_files("photo", 2), *_files("doc", 2)])
+    assert session.max_in_flight == 3
+
+
+def test_token_bucket():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    now[0] = 10
+    assert bucket.full and bucket.reserve() == 0
+
+
+async def test_send_limiter_queues_per_chat():
+    now = [0.0]
+    waits: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        waits.append(seconds)
+
+    limiter = SendLimiter(global_rate=100, chat_rate=1, chat_burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        await limiter.acquire(1)
+    await limiter.acquire(2)
+    # в чат 1 — два сразу, дальше по одному в секунду; чат 2 не ждёт
+    assert waits == [pytest.approx(1.0), pytest.approx(2.0)]
+    await limiter.acquire(1, cost=10)
+    assert waits[-1] == pytest.approx(12.0)
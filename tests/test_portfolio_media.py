@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import pytest
+
+from bot.db import repository
+from bot.db.repository import (
+    add_portfolio_media,
+    delete_portfolio_media,
+    init_db,
+    list_portfolio_media,
+    move_portfolio_media,
+    seed_portfolio_media,
+)
+from bot.services import portfolio_media
+from bot.services.portfolio_media import PortfolioMediaStore
+from tests.fake_telegram import ChatDriver, fake_bot
+
+
+def _ids_in_order(rows, service_id):
+    return [r["file_id"] for r in rows if r["service_id"] == service_id]
+
+
+@pytest.mark.asyncio
+async def test_seed_only_when_table_empty(inited_db):
+    added = await seed_portfolio_media(inited_db, {"neuro": ["A", "B"], "content": []})
+    assert added == 2
+    assert await seed_portfolio_media(inited_db, {"neuro": ["C"]}) == 0
+
+    rows = await list_portfolio_media(inited_db)
+    assert _ids_in_order(rows, "neuro") == ["A", "B"]
+    assert [r["position"] for r in rows] == [1, 2]
+    assert {r["media_type"] for r in rows} == {"photo"}
+
+
+@pytest.mark.asyncio
+async def test_seed_does_not_return_after_admin_cleared_portfolio(inited_db):
+    await seed_portfolio_media(inited_db, {"neuro": ["A", "B"]})
+    for row in await list_portfolio_media(inited_db):
+        await delete_portfolio_media(inited_db, row["id"])
+
+    # перезапуск: init_db и снова seed из констант
+    await init_db(inited_db)
+    assert await seed_portfolio_media(inited_db, {"neuro": ["A", "B"]}) == 0
+    assert await list_portfolio_media(inited_db) == []
+
+
+@pytest.mark.asyncio
+async def test_seed_marks_db_filled_before_marker(inited_db):
+    # БД до отметки в bot_meta: портфолио уже наполнено — не дублируется, и после очистки не возвращается
+    await add_portfolio_media(inited_db, service_id="neuro", items=[{"media_type": "photo", "file_id": "OLD"}])
+    assert await seed_portfolio_media(inited_db, {"neuro": ["A"]}) == 0
+    for row in await list_portfolio_media(inited_db):
+        await delete_portfolio_media(inited_db, row["id"])
+    assert await seed_portfolio_media(inited_db, {"neuro": ["A"]}) == 0
+
+
+@pytest.mark.asyncio
+async def test_add_appends_and_skips_empty(inited_db):
+    await seed_portfolio_media(inited_db, {"neuro": ["A"]})
+    ids = await add_portfolio_media(
+        inited_db,
+        service_id="neuro",
+        items=[
+            {"media_type": "video", "file_id": "V1"},
+            {"media_type": "photo", "file_id": ""},
+            {"media_type": "photo", "file_id": "P2"},
+        ],
+    )
+    assert len(ids) == 2
+
+    rows = await list_portfolio_media(inited_db)
+    assert _ids_in_order(rows, "neuro") == ["A", "V1", "P2"]
+    assert [r["position"] for r in rows] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_move_and_delete_keep_positions_compact(inited_db):
+    ids = await add_portfolio_media(
+        inited_db,
+        service_id="restoration",
+        items=[{"media_type": "photo", "file_id": fid} for fid in ("A", "B", "C", "D")],
+    )
+
+    assert await move_portfolio_media(inited_db, ids[3], 1)
+    rows = await list_portfolio_media(inited_db)
+    assert _ids_in_order(rows, "restoration") == ["D", "A", "B", "C"]
+
+    # позиция за пределами — в конец
+    assert await move_portfolio_media(inited_db, ids[3], 99)
+    rows = await list_portfolio_media(inited_db)
+    assert _ids_in_order(rows, "restoration") == ["A", "B", "C", "D"]
+
+    assert await delete_portfolio_media(inited_db, ids[1])
+    rows = await list_portfolio_media(inited_db)
+    assert _ids_in_order(rows, "restoration") == ["A", "C", "D"]
+    assert [r["position"] for r in rows] == [1, 2, 3]
+
+    assert not await delete_portfolio_media(inited_db, 12345)
+    assert not await move_portfolio_media(inited_db, 12345, 1)
+
+
+@pytest.mark.asyncio
+async def test_store_reads_db_once_and_reloads_after_change(inited_db, monkeypatch):
+    calls = 0
+    original = repository.list_portfolio_media
+
+    async def counting(db_path):
+        nonlocal calls
+        calls += 1
+        return await original(db_path)
+
+    monkeypatch.setattr(portfolio_media, "list_portfolio_media", counting)
+
+    await seed_portfolio_media(inited_db, {"neuro": ["A", "B"]})
+    store = PortfolioMediaStore()
+
+    for _ in range(5):
+        items = await store.items(inited_db, "neuro")
+    assert [it.file_id for it in items] == ["A", "B"]
+    assert await store.items(inited_db, "unknown") == ()
+    assert calls == 1
+
+    await store.add(inited_db, "neuro", [{"media_type": "video", "file_id": "V"}])
+    items = await store.items(inited_db, "neuro")
+    assert [(it.media_type, it.file_id) for it in items] == [("photo", "A"), ("photo", "B"), ("video", "V")]
+    assert calls == 2
+
+    await store.remove(inited_db, items[0].id)
+    assert [it.file_id for it in await store.items(inited_db, "neuro")] == ["B", "V"]
+    assert store.all_file_ids() == {"neuro": ["B", "V"]}
+
+
+@pytest.mark.asyncio
+async def test_neuro_examples_fall_back_to_constants(inited_db, monkeypatch):
+    store = PortfolioMediaStore()
+    monkeypatch.setattr(portfolio_media, "portfolio_media_store", store)
+
+    fallback = await portfolio_media.neuro_example_file_ids(inited_db)
+    assert fallback == list(portfolio_media.NEURO_EXAMPLE_PHOTO_FILE_IDS)
+
+    await store.add(inited_db, portfolio_media.NEURO_EXAMPLES_KEY, [{"media_type": "photo", "file_id": "N1"}])
+    assert await portfolio_media.neuro_example_file_ids(inited_db) == ["N1"]
+
+
+@pytest.mark.asyncio
+async def test_portfolio_list_rejects_unknown_service(project_dispatcher, settings):
+    bot, session = fake_bot()
+    admin = ChatDriver(project_dispatcher, bot, session, user={"id": 777, "is_bot": False, "first_name": "A"})
+
+    await admin.send("/portfolio_list <b>x</b>")
+
+    [reply] = [m.text for m in session.messages.values() if m.chat.id == 777]
+    # неизвестный service_id — подсказка, а не эхо аргумента в HTML
+    assert reply.startswith("<b>Портфолио (админ)</b>") and "<b>x</b>" not in reply
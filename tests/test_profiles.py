@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime, timezone
+
+import aiosqlite
+import pytest
+from aiogram.types import ReplyKeyboardMarkup
+
+from bot import config
+from bot.db.repository import get_user_profile, save_lead
+from bot.db.storage import get_storage
+from bot.keyboards.contact import PREVIOUS_CONTACT_PREFIX
+from bot.services.profiles import ProfileCache, UserProfile
+from bot.services.retention import archive_old_leads
+from bot.utils.contacts import CONTACT_EMAIL, CONTACT_PHONE
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+
+async def _lead(db_path, *, service: str = "s", contact: str = "—", contact_type: str | None = None) -> int:
+    return await save_lead(
+        db_path,
+        tg_user_id=CHAT_ID,
+        tg_username=None,
+        tg_full_name="User",
+        service=service,
+        task="t",
+        deadline="Срочно",
+        budget=None,
+        contact=contact,
+        extra_json={},
+        contact_type=contact_type,
+    )
+
+
+async def test_profile_upserted_with_lead(inited_db):
+    assert await get_user_profile(inited_db, CHAT_ID) is None
+
+    await _lead(inited_db, service="Реставрация", contact="+79001234567", contact_type=CONTACT_PHONE)
+    # контакт пропущен — прежний остаётся, услуга и счётчик обновляются
+    await _lead(inited_db, service="Нейрофото")
+
+    profile = await get_user_profile(inited_db, CHAT_ID)
+    assert (profile["contact"], profile["contact_type"]) == ("+79001234567", CONTACT_PHONE)
+    assert (profile["last_service"], profile["leads_count"]) == ("Нейрофото", 2)
+
+    await _lead(inited_db, contact="a@b.ru", contact_type=CONTACT_EMAIL)
+    assert (await get_user_profile(inited_db, CHAT_ID))["contact"] == "a@b.ru"
+
+
+async def test_lead_and_profile_share_transaction(inited_db):
+    async with aiosqlite.connect(inited_db) as db:
+        await db.execute("DROP TABLE user_profiles")
+        await db.commit()
+
+    with pytest.raises(aiosqlite.OperationalError):
+        await _lead(inited_db, contact="+79001234567", contact_type=CONTACT_PHONE)
+
+    # upsert профиля не прошёл — заявка тоже не сохранилась
+    async with aiosqlite.connect(inited_db) as db:
+        cur = await db.execute("SELECT count(*) FROM leads")
+        assert await cur.fetchone() == (0,)
+
+
+def _count_profile_reads(monkeypatch) -> list[int]:
+    storage = get_storage()
+    original = storage.get_user_profile
+    reads: list[int] = []
+
+    async def counting(tg_user_id):
+        reads.append(tg_user_id)
+        return await original(tg_user_id)
+
+    monkeypatch.setattr(storage, "get_user_profile", counting)
+    return reads
+
+
+async def test_cache_reads_db_once_and_follows_saves(inited_db, monkeypatch):
+    reads = _count_profile_reads(monkeypatch)
+    cache = ProfileCache(capacity=2)
+
+    # промах тоже кэшируется
+    assert await cache.lookup(CHAT_ID) is None
+    assert await cache.lookup(CHAT_ID) is None
+    assert reads == [CHAT_ID]
+
+    cache.remember(CHAT_ID, tg_full_name="User", contact="+79001234567", contact_type=CONTACT_PHONE, service="s")
+    cache.remember(CHAT_ID, tg_full_name="User", contact="—", contact_type=None, service="s2")
+    assert await cache.lookup(CHAT_ID) == UserProfile("User", "+79001234567", CONTACT_PHONE, "s2")
+    assert reads == [CHAT_ID]
+
+    # пропущенный контакт у пользователя не из кэша — в кэш не пишется, прочитается из БД
+    cache.remember(5, tg_full_name="U5", contact="—", contact_type=None, service="s")
+    await cache.lookup(5)
+    await cache.lookup(6)
+    await cache.lookup(CHAT_ID)  # вытеснен как самый старый
+    assert reads == [CHAT_ID, 5, 6, CHAT_ID]
+
+
+async def test_stale_profiles_go_with_archived_leads(inited_db, tmp_path):
+    await _lead(inited_db, contact="+79001234567", contact_type=CONTACT_PHONE)
+    async with aiosqlite.connect(inited_db) as db:
+        await db.execute("UPDATE leads SET created_at='2025-01-01T00:00:00+00:00'")
+        await db.execute("UPDATE user_profiles SET updated_at='2025-01-01T00:00:00+00:00'")
+        await db.commit()
+
+    report = await archive_old_leads(tmp_path, older_than_days=30, now=datetime(2026, 10, 19, tzinfo=timezone.utc))
+
+    assert (report.archived, report.profiles) == (1, 1)
+    assert await get_user_profile(inited_db, CHAT_ID) is None
+
+
+@pytest.fixture
+async def chat(project_dispatcher, settings):
+    config.configure(dataclasses.replace(settings, admin_tg_id=CHAT_ID))
+    bot, session = fake_bot()
+    state = project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+    yield ChatDriver(project_dispatcher, bot, session)
+    await state.clear()
+
+
+def _reply_buttons(chat: ChatDriver) -> list[str]:
+    # reply-клавиатуру фейковый API в сообщениях не хранит — берём из последнего запроса с ней
+    request = next(r for r in reversed(chat.session.requests) if isinstance(r.reply_markup, ReplyKeyboardMarkup))
+    return [b.text for row in request.reply_markup.keyboard for b in row]
+
+
+async def _to_contact_step(chat: ChatDriver) -> None:
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send("Ролик к юбилею")
+    await chat.press("deadline:week")
+
+
+async def test_repeat_user_reuses_previous_contact(chat, settings, monkeypatch):
+    reads = _count_profile_reads(monkeypatch)
+    await _to_contact_step(chat)
+    assert not any(b.startswith(PREVIOUS_CONTACT_PREFIX) for b in _reply_buttons(chat))
+    await chat.send("📞 Указать телефон")
+    await chat.send("8 900 123-45-67")
+    await chat.press("lead:send")
+
+    await _to_contact_step(chat)
+    previous = PREVIOUS_CONTACT_PREFIX + "+79001234567"
+    assert _reply_buttons(chat)[0] == previous
+    await chat.send(previous)
+    await chat.press("lead:send")
+
+    async with aiosqlite.connect(settings.db_path) as db:
+        cur = await db.execute("SELECT contact, contact_type FROM leads")
+        assert await cur.fetchall() == [("+79001234567", CONTACT_PHONE)] * 2
+    assert (await get_user_profile(settings.db_path, CHAT_ID))["leads_count"] == 2
+    # БД — только при первом показе шага контакта; дальше профиль из кэша
+    assert reads == [CHAT_ID]
+
+
+async def test_stale_previous_contact_button_reshows_choice(chat):
+    await _to_contact_step(chat)
+    sends = chat.session.calls["sendMessage"]
+    await chat.send(PREVIOUS_CONTACT_PREFIX + "+70000000000")
+    assert chat.session.calls["sendMessage"] == sends + 1
+    assert chat.session.requests[-1].text == "Как удобнее оставить контакт?"
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import aiosqlite
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import CopyMessage, SendMessage
+
+from bot.db.repository import save_lead
+from bot.db.storage import get_storage
+from bot.services.relay import RelayIndex, RelayLink
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+ADMIN = {"id": 777, "is_bot": False, "first_name": "Admin"}
+
+
+async def _lead(db_path) -> int:
+    return await save_lead(
+        db_path, tg_user_id=CHAT_ID, tg_username="u", tg_full_name="U", service="s", task="t",
+        deadline="Срочно", budget=None, contact="—", extra_json={},
+    )
+
+
+async def test_index_caches_hits_and_misses(inited_db, monkeypatch):
+    lead_id = await _lead(inited_db)
+    index = RelayIndex(capacity=2)
+    await index.link([(777, 10), (777, 11)], RelayLink(lead_id, CHAT_ID))
+
+    reads: list[tuple[int, int]] = []
+    storage = get_storage()
+    original = storage.get_relay_link
+
+    async def counting(chat_id, message_id):
+        reads.append((chat_id, message_id))
+        return await original(chat_id, message_id)
+
+    monkeypatch.setattr(storage, "get_relay_link", counting)
+
+    assert await index.lookup(777, 10) == RelayLink(lead_id, CHAT_ID)
+    assert await index.lookup(777, 99) is None
+    assert await index.lookup(777, 99) is None
+    assert reads == [(777, 99)]
+
+    # вытеснен из LRU (ёмкость 2) — читается из БД
+    assert await index.lookup(777, 11) == RelayLink(lead_id, CHAT_ID)
+    assert reads == [(777, 99), (777, 11)]
+
+    # закэшированный промах перекрывается новой связкой
+    await index.link([(777, 99)], RelayLink(lead_id, CHAT_ID, 5))
+    assert await index.lookup(777, 99) == RelayLink(lead_id, CHAT_ID, 5)
+
+
+async def test_lookup_is_primary_key_search(inited_db):
+    async with aiosqlite.connect(inited_db) as db:
+        async with db.execute(
+            "EXPLAIN QUERY PLAN SELECT lead_id, peer_chat_id, peer_message_id FROM relay_messages "
+            "WHERE chat_id=1 AND message_id=2"
+        ) as cur:
+            plan = " ".join(row[-1] for row in await cur.fetchall())
+    assert "USING PRIMARY KEY (chat_id=? AND message_id=?)" in plan, plan
+
+
+async def _submit_lead(user: ChatDriver):
+    await user.send("✅ Оставить заявку")
+    await user.press("svc:5")
+    await user.send("Ролик к юбилею")
+    await user.press("deadline:week")
+    await user.send("⏭ Пропустить")
+    await user.press("lead:send")
+    return next(
+        m for m in user.session.messages.values() if m.chat.id == ADMIN["id"] and (m.text or "").startswith("🆕")
+    )
+
+
+def _copies(session) -> list[CopyMessage]:
+    return [r for r in session.requests if isinstance(r, CopyMessage)]
+
+
+async def test_conversation_round_trip(project_dispatcher, settings):
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session)
+    admin = ChatDriver(project_dispatcher, bot, session, user=ADMIN)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+    notification = await _submit_lead(user)
+
+    await admin.send("Добрый день! Уточните размер", reply_to_message=notification)
+    to_user = _copies(session)[-1]
+    assert (to_user.chat_id, to_user.from_chat_id, to_user.reply_parameters) == (CHAT_ID, ADMIN["id"], None)
+    admin_message_id = to_user.message_id
+
+    # пользователь отвечает на копию — уходит админу ответом на его сообщение
+    user_copy = max(m.message_id for m in session.messages.values() if m.chat.id == CHAT_ID)
+    await user.send("30x40", reply_to_message=session.messages[user_copy])
+    to_admin = _copies(session)[-1]
+    assert to_admin.chat_id == ADMIN["id"] and to_admin.reply_parameters.message_id == admin_message_id
+
+    # и обратно: админ отвечает на пересланный ответ пользователя
+    admin_copy = max(m.message_id for m in session.messages.values() if m.chat.id == ADMIN["id"])
+    await admin.send("Принято", reply_to_message=session.messages[admin_copy])
+    assert _copies(session)[-1].chat_id == CHAT_ID
+    assert len(_copies(session)) == 3
+
+
+async def test_reply_to_unrelated_message_is_not_relayed(project_dispatcher, settings):
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+    await user.send("/start")
+    greeting = max(session.messages.values(), key=lambda m: m.message_id)
+    await user.send("привет", reply_to_message=greeting)
+    assert session.calls["copyMessage"] == 0
+
+
+async def test_relay_failure_is_reported(project_dispatcher, settings):
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session)
+    admin = ChatDriver(project_dispatcher, bot, session, user=ADMIN)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+    notification = await _submit_lead(user)
+
+    session.fail["copyMessage"] = TelegramForbiddenError(method=None, message="bot was blocked by the user")
+    await admin.send("Здравствуйте", reply_to_message=notification)
+    last = [r for r in session.requests if isinstance(r, SendMessage)][-1]
+    assert last.chat_id == ADMIN["id"] and last.text.startswith("Не доставлено")
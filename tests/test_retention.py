@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import gzip
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+import aiosqlite
+import pytest
+
+from bot.db.repository import (
+    archive_leads,
+    fetch_expired_leads,
+    init_db,
+    save_files,
+    save_lead,
+    save_relay_links,
+    update_lead_status,
+)
+from bot.services.retention import archive_old_leads
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+async def _lead(db_path, created_at: str, n: int = 1) -> int:
+    lead_id = await save_lead(
+        db_path,
+        tg_user_id=100 + n,
+        tg_username=f"user{n}",
+        tg_full_name=f"User {n}",
+        service="s",
+        task="t" * 500,
+        deadline="Срочно",
+        budget=None,
+        contact=f"+7 900 000-00-{n:02d}",
+        extra_json={"n": n},
+    )
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("UPDATE leads SET created_at=? WHERE id=?", (created_at, lead_id))
+        await db.commit()
+    return lead_id
+
+
+def _rows(path, sql: str) -> list[tuple]:
+    with sqlite3.connect(path) as db:
+        return db.execute(sql).fetchall()
+
+
+async def test_old_leads_move_to_monthly_archives(inited_db, tmp_path):
+    old_aug = await _lead(inited_db, "2025-08-03T10:00:00+00:00", 1)
+    old_sep = await _lead(inited_db, "2025-09-20T10:00:00+00:00", 2)
+    recent = await _lead(inited_db, "2026-10-01T10:00:00+00:00", 3)
+    await save_files(inited_db, lead_id=old_aug, files=[{"file_type": "photo", "file_id": "F1"}])
+    await update_lead_status(inited_db, old_aug, status="done", allowed_from=["new"], changed_by=777)
+    await save_relay_links(inited_db, [(777, 5000, old_aug, 101, None)])
+
+    report = await archive_old_leads(tmp_path / "archive", older_than_days=365, now=NOW)
+
+    assert report.archived == 2 and report.batches == 1
+    assert report.archives == {"leads-2025-08.db", "leads-2025-09.db"}
+    aug = tmp_path / "archive" / "leads-2025-08.db"
+    assert _rows(aug, "SELECT id, status, contact FROM leads") == [(old_aug, "done", "+7 900 000-00-01")]
+    assert _rows(aug, "SELECT file_id FROM lead_files") == [("F1",)]
+    assert [r[0] for r in _rows(aug, "SELECT status FROM lead_status_history ORDER BY id")] == ["new", "done"]
+    assert _rows(tmp_path / "archive" / "leads-2025-09.db", "SELECT id FROM leads") == [(old_sep,)]
+
+    # в основной БД — только свежая заявка; связанные строки ушли каскадом
+    assert _rows(inited_db, "SELECT id FROM leads") == [(recent,)]
+    for table in ("lead_files", "relay_messages"):
+        assert _rows(inited_db, f"SELECT count(*) FROM {table}") == [(0,)]
+    assert _rows(inited_db, "SELECT count(*) FROM lead_status_history") == [(1,)]
+
+
+async def test_batches_are_bounded(inited_db, tmp_path):
+    for n in range(7):
+        await _lead(inited_db, f"2025-01-{n + 1:02d}T10:00:00+00:00", n)
+
+    first = await archive_old_leads(tmp_path, older_than_days=30, batch_size=3, max_batches=2, now=NOW)
+    assert (first.archived, first.batches) == (6, 2)
+    assert len(_rows(inited_db, "SELECT id FROM leads")) == 1
+
+    second = await archive_old_leads(tmp_path, older_than_days=30, batch_size=3, now=NOW)
+    assert (second.archived, second.batches) == (1, 1)
+    assert _rows(tmp_path / "leads-2025-01.db", "SELECT count(*) FROM leads") == [(7,)]
+
+
+async def test_jsonl_archive_with_anonymization(inited_db, tmp_path):
+    lead_id = await _lead(inited_db, "2025-05-05T10:00:00+00:00", 7)
+
+    for _ in range(2):  # второй проход — архивировать нечего, файл не трогается
+        await archive_old_leads(tmp_path, older_than_days=30, fmt="jsonl", anonymize=True, now=NOW)
+
+    lines = gzip.decompress((tmp_path / "leads-2025-05.jsonl.gz").read_bytes()).decode().splitlines()
+    assert len(lines) == 1
+    lead = json.loads(lines[0])
+    assert lead["id"] == lead_id and lead["task"] == "t" * 500
+    assert (lead["tg_user_id"], lead["tg_username"], lead["tg_full_name"], lead["contact"]) == (0, None, "—", "—")
+    assert [h["status"] for h in lead["history"]] == ["new"]
+
+
+async def test_rearchive_after_crash_has_no_duplicates(inited_db, tmp_path):
+    await _lead(inited_db, "2025-05-05T10:00:00+00:00")
+    leads = await fetch_expired_leads(inited_db, created_before="2026-01-01", limit=10)
+    # архив записан, а удалить из основной БД не успели — следующий проход пишет те же строки ещё раз
+    await archive_leads(tmp_path / "leads-2025-05.db", leads)
+
+    await archive_old_leads(tmp_path, older_than_days=30, now=NOW)
+
+    assert _rows(tmp_path / "leads-2025-05.db", "SELECT count(*) FROM leads") == [(1,)]
+    assert _rows(tmp_path / "leads-2025-05.db", "SELECT count(*) FROM lead_status_history") == [(1,)]
+
+
+async def test_incremental_auto_vacuum_returns_space(inited_db, tmp_path):
+    assert _rows(inited_db, "PRAGMA auto_vacuum") == [(2,)]
+    for n in range(300):
+        await _lead(inited_db, "2025-01-01T10:00:00+00:00", n % 100)
+    pages_before = _rows(inited_db, "PRAGMA page_count")[0][0]
+
+    report = await archive_old_leads(tmp_path, older_than_days=30, now=NOW)
+
+    assert report.archived == 300 and report.freed_pages > 0
+    assert _rows(inited_db, "PRAGMA freelist_count") == [(0,)]
+    assert _rows(inited_db, "PRAGMA page_count")[0][0] < pages_before - report.freed_pages // 2
+
+
+async def test_existing_db_switches_to_incremental_vacuum(tmp_path):
+    db_path = tmp_path / "old.db"
+    with sqlite3.connect(db_path) as db:
+        db.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT NOT NULL, contact TEXT)")
+    assert _rows(db_path, "PRAGMA auto_vacuum") == [(0,)]
+
+    await init_db(db_path)
+
+    assert _rows(db_path, "PRAGMA auto_vacuum") == [(2,)]
+
+
+async def test_unknown_format_rejected(inited_db, tmp_path):
+    with pytest.raises(ValueError):
+        await archive_old_leads(tmp_path, older_than_days=1, fmt="csv")
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+
+from bot import config
+from bot.db.repository import list_lead_deliveries, list_lead_routes
+from bot.services.notify import DELIVERY_FAILED, DELIVERY_SENT, notify_admins
+from bot.services.routing import (
+    RoutingError,
+    RoutingRule,
+    format_rules,
+    lead_recipients,
+    lead_router,
+    load_routing,
+    parse_rules,
+)
+from tests.fake_telegram import CHAT_ID, ChatDriver, FakeSession, fake_bot
+
+LEAD = {"tg_user_id": CHAT_ID, "tg_full_name": "User", "service": "x", "task": "t", "deadline": "Срочно", "contact": "@u"}
+
+
+@pytest.fixture(autouse=True)
+def default_routing():
+    lead_router.configure((), "default")
+    yield
+    lead_router.configure((), "default")
+
+
+def test_parse_and_format_roundtrip():
+    spec = "service=restoration&deadline=urgent:all:1,2; deadline=urgent:rr:3,1; *:all:2"
+    rules = parse_rules(spec)
+    assert rules[0] == RoutingRule((1, 2), "all", "restoration", "urgent")
+    assert rules[2] == RoutingRule((2,))
+    assert format_rules(rules) == spec
+    assert parse_rules(" ; ") == []
+
+
+@pytest.mark.parametrize(
+    "spec",
+    ["*:all", "service=nope:all:1", "deadline=soon:all:1", "*:some:1", "*:all:x", "*:all:", "colour=red:all:1"],
+)
+def test_parse_rejects(spec):
+    with pytest.raises(RoutingError):
+        parse_rules(spec)
+
+
+def test_first_matching_rule_and_round_robin():
+    lead_router.configure(parse_rules("service=neuro:all:1,2; deadline=urgent:rr:3,4,5"), "config")
+    assert lead_router.route("neuro", "urgent") == (1, 2)
+    assert [lead_router.route("content", "urgent") for _ in range(4)] == [(3,), (4,), (5,), (3,)]
+    assert lead_router.route("content", "week") is None
+    # без подходящего правила — всем админам, основной первым
+    assert lead_recipients("content", "week", {9, 1, 5}, 5) == [5, 1, 9]
+
+
+async def test_routes_from_db_override_config(inited_db):
+    assert await load_routing(inited_db, "", {1}) == "default"
+    assert await load_routing(inited_db, "*:all:1", {1}) == "config"
+    with pytest.raises(RoutingError, match="not admins: 2"):
+        await load_routing(inited_db, "*:all:1,2", {1})
+
+
+class PerChatSession(FakeSession):
+    """Один админ заблокировал бота, другой отвечает, только когда отпустят release."""
+
+    def __init__(self, blocked: int, slow: int) -> None:
+        super().__init__()
+        self.blocked, self.slow = blocked, slow
+        self.release = asyncio.Event()
+
+    async def make_request(self, bot, method, timeout=None):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id == self.slow:
+            await self.release.wait()
+        if chat_id == self.blocked:
+            self.requests.append(method)
+            raise TelegramForbiddenError(method, "Forbidden: bot was blocked by the user")
+        return await super().make_request(bot, method, timeout)
+
+
+async def test_fan_out_isolates_recipients():
+    session = PerChatSession(blocked=2, slow=3)
+    bot = Bot("42:TEST", session=session)
+    task = asyncio.create_task(notify_admins(bot, [1, 2, 3], 7, LEAD, [{"file_type": "photo", "file_id": "p"}]))
+
+    # быстрый админ получает всё, пока медленный ещё ждёт
+    for _ in range(50):
+        await asyncio.sleep(0)
+        if sum(getattr(r, "chat_id", None) == 1 for r in session.requests) == 2:
+            break
+    assert not task.done()
+    assert sum(getattr(r, "chat_id", None) == 1 for r in session.requests) == 2
+
+    session.release.set()
+    reports = await task
+    assert [reports[a].status for a in (1, 2, 3)] == [DELIVERY_SENT, DELIVERY_FAILED, DELIVERY_SENT]
+    assert "blocked" in reports[2].error
+    assert len(reports[1].message_ids) == 2
+
+
+async def test_lead_goes_to_routed_admins_with_delivery_state(project_dispatcher, settings):
+    config.configure(dataclasses.replace(settings, extra_admin_ids=frozenset({888, 999})))
+    lead_router.configure(parse_rules("service=photo_stories:rr:888,999"), "config")
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+    await user.send("✅ Оставить заявку")
+    await user.press("svc:5")
+    await user.send("Ролик к юбилею")
+    await user.press("deadline:week")
+    await user.send("⏭ Пропустить")
+    await user.press("lead:send")
+
+    notified = {m.chat.id for m in session.messages.values() if (m.text or "").startswith("🆕")}
+    assert notified == {888}
+    deliveries = await list_lead_deliveries(settings.db_path, 1)
+    assert [(d["admin_id"], d["status"], d["messages"]) for d in deliveries] == [(888, DELIVERY_SENT, 1)]
+
+
+async def test_routes_command_persists_rules(project_dispatcher, settings):
+    bot, session = fake_bot()
+    admin = ChatDriver(project_dispatcher, bot, session, user={"id": 777, "is_bot": False, "first_name": "A"})
+
+    await admin.send("/routes set deadline=urgent:all:777")
+    assert lead_router.source == "db" and lead_router.rules == (RoutingRule((777,), "all", None, "urgent"),)
+    assert [r["admins"] for r in await list_lead_routes(settings.db_path)] == [[777]]
+
+    await admin.send("/routes set *:all:123")
+    assert "Правила не изменены" in session.requests[-1].text
+    assert lead_router.rules == (RoutingRule((777,), "all", None, "urgent"),)
+
+    await admin.send("/routes reset")
+    assert lead_router.source == "default" and await list_lead_routes(settings.db_path) == []
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime, timezone
+
+import aiosqlite
+import pytest
+
+from bot.bot import schedule_jobs
+from bot.config import Settings
+from bot.db.repository import checkpoint_wal, optimize_db
+from bot.scheduler import CronTrigger, IntervalTrigger, ScheduleError, Scheduler
+from tests.fake_clock import EPOCH, FakeClock, settle
+from tests.fake_telegram import fake_bot
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+async def _running(scheduler: Scheduler):
+    task = asyncio.create_task(scheduler.run())
+    await settle()
+    return task
+
+
+async def _stop(task: asyncio.Task) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def test_interval_job_runs_on_grid(clock):
+    scheduler = Scheduler(clock)
+    fired: list[float] = []
+
+    async def job():
+        fired.append(clock.time() - EPOCH)
+
+    scheduler.add_interval("tick", job, 10)
+    scheduler.add_interval("boot", job, 100, run_at_start=True)
+    task = await _running(scheduler)
+    await clock.advance(35)
+    await _stop(task)
+
+    assert fired == [0, 10, 20, 30]
+    assert scheduler.jobs["tick"].metrics.runs == 3
+    assert scheduler.jobs["boot"].metrics.next_fire == EPOCH + 100
+
+
+async def test_long_run_does_not_overlap_or_burst(clock):
+    scheduler = Scheduler(clock)
+    active = 0
+    peak = 0
+    started: list[float] = []
+
+    async def slow():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        started.append(clock.time() - EPOCH)
+        await clock.sleep(25)
+        active -= 1
+
+    scheduler.add_interval("slow", slow, 10)
+    task = await _running(scheduler)
+    await clock.advance(99)
+    await _stop(task)
+
+    assert peak == 1
+    # запуск 10..35: точки 20 и 30 пропущены, следующий — 40, а не три подряд
+    assert started == [10, 40, 70]
+    m = scheduler.jobs["slow"].metrics
+    assert m.runs == 3 and m.last_duration_s == 25 and m.max_duration_s == 25
+
+
+async def test_run_now_is_single_flight(clock):
+    scheduler = Scheduler(clock)
+    runs = 0
+
+    async def job():
+        nonlocal runs
+        runs += 1
+        await clock.sleep(5)
+
+    scheduler.add_interval("job", job, 3600)
+    first = asyncio.create_task(scheduler.run_now("job"))
+    await settle()
+    assert await scheduler.run_now("job") is False
+    await clock.advance(5)
+    assert await first is True
+    assert runs == 1
+    assert scheduler.jobs["job"].metrics.skipped == 1
+
+
+async def test_failure_is_recorded_and_loop_continues(clock):
+    scheduler = Scheduler(clock)
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+
+    scheduler.add_interval("flaky", flaky, 10)
+    task = await _running(scheduler)
+    await clock.advance(10)
+    m = scheduler.jobs["flaky"].metrics
+    assert m.failures == 1 and "boom" in m.last_error
+    await clock.advance(10)
+    await _stop(task)
+
+    assert calls == 2
+    assert m.runs == 2 and m.failures == 1 and m.last_error is None
+
+
+async def test_jitter_delays_within_bounds(clock):
+    scheduler = Scheduler(clock, rng=random.Random(1))
+    fired: list[float] = []
+
+    async def job():
+        fired.append(clock.time() - EPOCH)
+
+    scheduler.add_interval("job", job, 100, jitter_s=20)
+    task = await _running(scheduler)
+    await clock.advance(1000)
+    await _stop(task)
+
+    assert len(fired) >= 8
+    for n, t in enumerate(fired, 1):
+        assert 100 * n <= t <= 100 * n + 20
+    assert len(set(t % 100 for t in fired)) > 1
+
+
+async def test_cancel_stops_loops_and_current_run(clock):
+    scheduler = Scheduler(clock)
+    cancelled = asyncio.Event()
+
+    async def long():
+        try:
+            await clock.sleep(1000)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    scheduler.add_interval("long", long, 10)
+    scheduler.add_interval("idle", long, 3600)
+    task = await _running(scheduler)
+    await clock.advance(10)
+    assert scheduler.jobs["long"].running
+
+    await _stop(task)
+    assert task.cancelled()
+    assert cancelled.is_set()
+    assert not scheduler.jobs["long"].running
+    assert not any(t.get_name().startswith("job:") for t in asyncio.all_tasks())
+
+
+def _ts(text: str) -> float:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize(
+    "spec, now, expected",
+    [
+        ("*/15 * * * *", "2026-03-01 10:07:30", "2026-03-01 10:15:00"),
+        ("15 4 * * *", "2026-03-01 04:15:00", "2026-03-02 04:15:00"),
+        ("0 0 1 * *", "2026-12-31 23:59:00", "2027-01-01 00:00:00"),
+        ("30 9 * * 1-5", "2026-10-17 12:00:00", "2026-10-19 09:30:00"),  # суббота -> понедельник
+        ("0 12 * * 7", "2026-10-19 00:00:00", "2026-10-25 12:00:00"),  # 7 — воскресенье
+        ("0 0 13 * 5", "2026-10-19 00:00:00", "2026-10-23 00:00:00"),  # 13-е ИЛИ пятница
+        ("0 0 29 2 *", "2026-03-01 00:00:00", "2028-02-29 00:00:00"),
+        ("5,35 1-2 * * *", "2026-03-01 01:35:00", "2026-03-01 02:05:00"),
+    ],
+)
+def test_cron_next_fire(spec, now, expected):
+    assert CronTrigger(spec).next_fire(_ts(now), None) == _ts(expected)
+
+
+@pytest.mark.parametrize("spec", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "a * * * *", "0 0 31 2 *"])
+def test_cron_rejects_bad_spec(spec):
+    with pytest.raises(ScheduleError):
+        CronTrigger(spec).next_fire(EPOCH, None)
+
+
+def test_interval_trigger_validation_and_catch_up():
+    with pytest.raises(ScheduleError):
+        IntervalTrigger(0)
+    trigger = IntervalTrigger(10)
+    assert trigger.next_fire(EPOCH, None) == EPOCH + 10
+    assert trigger.next_fire(EPOCH + 25, EPOCH) == EPOCH + 30
+
+
+async def test_cron_job_fires_once_per_match(clock):
+    scheduler = Scheduler(clock)
+    fired: list[float] = []
+
+    async def job():
+        fired.append(clock.time())
+
+    scheduler.add_cron("nightly", job, "15 4 * * *")
+    task = await _running(scheduler)
+    await clock.advance(2 * 86400)
+    await _stop(task)
+
+    assert fired == [EPOCH + 4 * 3600 + 900, EPOCH + 86400 + 4 * 3600 + 900]
+
+
+def test_schedule_jobs_follow_settings(tmp_path):
+    bot, _ = fake_bot()
+    base = Settings(bot_token="42:TEST", admin_tg_id=777, db_path=tmp_path / "x.db")
+    assert schedule_jobs(Scheduler(), bot, base) == [
+        "media_validation",
+        "draft_reminders",
+        "db_optimize",
+        "wal_checkpoint",
+        "db_backup",
+    ]
+
+    off = Settings(
+        bot_token="42:TEST",
+        admin_tg_id=777,
+        db_path=tmp_path / "x.db",
+        draft_reminder_after_s=0,
+        db_optimize_cron="",
+        wal_checkpoint_interval_s=0,
+        backup_dir=None,
+    )
+    assert schedule_jobs(Scheduler(), bot, off) == ["media_validation"]
+
+    scheduler = Scheduler()
+    schedule_jobs(scheduler, bot, base)
+    with pytest.raises(ScheduleError):
+        scheduler.add_interval("media_validation", optimize_db, 1)
+
+
+async def test_maintenance_jobs_run_on_db(inited_db):
+    await optimize_db(inited_db)
+    async with aiosqlite.connect(inited_db) as db:
+        assert await (await db.execute("PRAGMA journal_mode")).fetchone() == ("wal",)
+        # соединение с записью открыто: WAL не переносится в файл при его закрытии
+        await db.execute("INSERT INTO lead_routes (position, mode, admin_ids) VALUES (1, 'all', '[1]')")
+        await db.commit()
+        wal = inited_db.with_name(inited_db.name + "-wal")
+        assert wal.stat().st_size > 0
+
+        busy, log_pages, checkpointed = await checkpoint_wal(inited_db)
+        assert busy == 0 and log_pages >= 0 and checkpointed >= 0
+        # TRUNCATE: всё перенесено в основной файл, WAL обрезан
+        assert wal.stat().st_size == 0
+        assert await (await db.execute("SELECT count(*) FROM lead_routes")).fetchone() == (1,)
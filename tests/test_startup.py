@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from bot.config import load_settings
+from bot.db.storage import SqliteLeadStorage, open_storage
+from bot.handlers import ROUTERS, enabled_routers
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Бюджет собственного кода бота при импорте точки входа (self-time модулей bot.*), мкс.
+# aiogram в бюджет не входит — его стоимость от нас не зависит.
+BOT_IMPORT_BUDGET_US = 250_000
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if k not in {"BOT_TOKEN", "ADMIN_TG_ID"}}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_core_modules_import_without_env_and_aiogram():
+    code = (
+        "import sys\n"
+        "import bot.config, bot.db.repository, bot.services.leads, bot.services.portfolio_media, bot.handlers\n"
+        "assert 'aiogram' not in sys.modules, 'aiogram imported'\n"
+    )
+    result = _run_python("-c", code)
+    assert result.returncode == 0, result.stderr
+
+
+def test_entrypoint_import_budget_and_lazy_routers():
+    result = _run_python("-X", "importtime", "-c", "import bot.bot")
+    assert result.returncode == 0, result.stderr
+
+    own_us = 0
+    imported: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if not self_us.isdigit():
+            continue  # заголовок
+        imported.add(name)
+        if name == "bot" or name.startswith("bot."):
+            own_us += int(self_us)
+
+    assert "bot.bot" in imported
+    # модули хендлеров импортируются только в include_routers()
+    assert not {f"bot.handlers.{spec.name}" for spec in ROUTERS} & imported
+    assert own_us < BOT_IMPORT_BUDGET_US
+
+
+def test_load_settings_parses_env():
+    settings = load_settings(
+        {
+            "BOT_TOKEN": " 1:abc ",
+            "ADMIN_TG_ID": "42",
+            "DB_PATH": "tmp/x.db",
+            "OPTIONAL_ROUTERS": "debug_file_id, ",
+            "ADMIN_IDS": "43, 44",
+            "LEAD_ROUTING": "deadline=urgent:rr:43,44",
+        }
+    )
+    assert settings.bot_token == "1:abc"
+    assert settings.admin_tg_id == 42
+    assert settings.db_path == Path("tmp/x.db")
+    assert settings.optional_routers == frozenset({"debug_file_id"})
+    assert settings.admin_ids == frozenset({42, 43, 44})
+    assert settings.lead_routing == "deadline=urgent:rr:43,44"
+
+
+@pytest.mark.parametrize(
+    "env, message",
+    [
+        ({"ADMIN_TG_ID": "1"}, "BOT_TOKEN"),
+        ({"BOT_TOKEN": "t"}, "ADMIN_TG_ID"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "abc"}, "ADMIN_TG_ID"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "MEDIA_CHECK_INTERVAL_S": "x"}, "MEDIA_CHECK_INTERVAL_S"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "ADMIN_IDS": "2,x"}, "ADMIN_IDS"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "LEAD_ROUTING": "*:all:2"}, "LEAD_ROUTING"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "DB_OPTIMIZE_CRON": "0 4 * *"}, "DB_OPTIMIZE_CRON"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "BACKUP_CRON": "61 * * * *"}, "BACKUP_CRON"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "BACKUP_KEEP": "0"}, "BACKUP_KEEP"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "ARCHIVE_FORMAT": "csv"}, "ARCHIVE_FORMAT"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "DB_URL": "mysql://db/bot"}, "DB_URL"),
+        ({"BOT_TOKEN": "t", "ADMIN_TG_ID": "1", "DB_POOL_SIZE": "0"}, "DB_POOL_SIZE"),
+    ],
+)
+def test_load_settings_validation(env, message):
+    with pytest.raises(RuntimeError, match=message):
+        load_settings(env)
+
+
+def test_db_url_selects_lead_storage():
+    base = {"BOT_TOKEN": "t", "ADMIN_TG_ID": "1"}
+
+    sqlite = load_settings({**base, "DB_URL": "sqlite:///tmp/leads.db"})
+    assert (sqlite.db_url, sqlite.db_path) == ("", Path("tmp/leads.db"))
+    assert isinstance(open_storage(sqlite), SqliteLeadStorage)
+
+    pg = load_settings({**base, "DB_URL": "postgresql://bot@db/bot", "DB_POOL_SIZE": "4"})
+    assert (pg.db_url, pg.db_pool_size, pg.db_path) == ("postgresql://bot@db/bot", 4, Path("data/bot.db"))
+    # asyncpg импортируется только при первом запросе
+    assert type(open_storage(pg)).__name__ == "PostgresLeadStorage"
+
+
+def test_optional_routers_are_filtered_and_order_kept():
+    names = [spec.name for spec in enabled_routers(set())]
+    assert "debug_file_id" not in names and "admin_portfolio" not in names
+    assert names[-1] == "fallback"
+
+    names = [spec.name for spec in enabled_routers({"debug_file_id"})]
+    assert names.index("debug_file_id") < names.index("fallback")
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+from collections import Counter
+from datetime import date, datetime, timezone
+
+import aiosqlite
+
+from bot.constants.deadlines import DEADLINE_CUSTOM, DEADLINE_LABELS
+from bot.db import repository
+from bot.db.repository import init_db, rebuild_lead_stats, save_files, save_lead
+from bot.services.retention import archive_old_leads
+from bot.services.stats import format_stats, load_stats
+
+SERVICES = ["🧠 Нейрофотосессия", "🛠 Реставрация фото/видео", "🎬 Видео-поздравление"]
+DEADLINES = [*DEADLINE_LABELS.values(), "к пятнице", "до 10 января"]
+
+
+async def _random_leads(db_path, monkeypatch, n: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    ids = []
+    for _ in range(n):
+        created_at = f"2026-10-{rng.randint(1, 19):02d}T{rng.randint(0, 23):02d}:00:00+00:00"
+        monkeypatch.setattr(repository, "_now_iso_utc_seconds", lambda: created_at)
+        lead_id = await save_lead(
+            db_path,
+            tg_user_id=rng.randint(1, 20),
+            tg_username=None,
+            tg_full_name="U",
+            service=rng.choice(SERVICES),
+            task="t",
+            deadline=rng.choice(DEADLINES),
+            budget=None,
+            contact="—",
+            extra_json={},
+        )
+        ids.append(lead_id)
+        if rng.random() < 0.4:
+            await save_files(db_path, lead_id=lead_id, files=[{"file_type": "photo", "file_id": f"F{lead_id}"}])
+    # файлы к заявке вторым вызовом — счётчик не двоится
+    for lead_id in rng.sample(ids, 5):
+        await save_files(db_path, lead_id=lead_id, files=[{"file_type": "document", "file_id": f"D{lead_id}"}])
+
+
+def _oracle(db_path) -> Counter[tuple]:
+    """Полный проход по leads и lead_files — независимо от SQL счётчиков."""
+    keys = {label: key for key, label in DEADLINE_LABELS.items()}
+    with sqlite3.connect(db_path) as db:
+        with_files = {row[0] for row in db.execute("SELECT lead_id FROM lead_files")}
+        leads = db.execute("SELECT id, created_at, service, deadline FROM leads").fetchall()
+    return Counter(
+        (created_at[:10], service, keys.get(deadline, DEADLINE_CUSTOM), int(lead_id in with_files))
+        for lead_id, created_at, service, deadline in leads
+    )
+
+
+def _aggregates(db_path) -> Counter[tuple]:
+    with sqlite3.connect(db_path) as db:
+        rows = db.execute("SELECT day, service, deadline, with_files, leads FROM lead_stats_daily").fetchall()
+    assert all(row[-1] > 0 for row in rows)
+    return Counter({row[:4]: row[4] for row in rows})
+
+
+async def test_write_path_matches_full_scan(inited_db, monkeypatch):
+    await _random_leads(inited_db, monkeypatch, 300)
+
+    assert _aggregates(inited_db) == _oracle(inited_db)
+    assert sum(_oracle(inited_db).values()) == 300
+
+
+async def test_rebuild_and_backfill_match_full_scan(inited_db, monkeypatch):
+    await _random_leads(inited_db, monkeypatch, 120, seed=3)
+    expected = _oracle(inited_db)
+
+    assert await rebuild_lead_stats(inited_db) == len(expected)
+    assert _aggregates(inited_db) == expected
+
+    # БД до появления счётчиков: таблица пустая, заявки есть — init_db заполняет её
+    with sqlite3.connect(inited_db) as db:
+        db.execute("DROP TABLE lead_stats_daily")
+    await init_db(inited_db)
+    assert _aggregates(inited_db) == expected
+
+
+async def test_rebuild_after_retention_keeps_archived_days(inited_db, monkeypatch, tmp_path):
+    # по две заявки в день с 1 по 12 октября, created_at растёт вместе с id
+    for day in range(1, 13):
+        for hour, service in ((9, SERVICES[0]), (15, SERVICES[1])):
+            created_at = f"2026-10-{day:02d}T{hour:02d}:00:00+00:00"
+            monkeypatch.setattr(repository, "_now_iso_utc_seconds", lambda: created_at)
+            await save_lead(
+                inited_db,
+                tg_user_id=day,
+                tg_username=None,
+                tg_full_name="U",
+                service=service,
+                task="t",
+                deadline="Срочно",
+                budget=None,
+                contact="—",
+                extra_json={},
+            )
+    before = _aggregates(inited_db)
+    # одна пачка из 15: 1–7 октября целиком и утренняя заявка 8-го
+    await archive_old_leads(
+        tmp_path, older_than_days=9, batch_size=15, max_batches=1, now=datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    )
+    with sqlite3.connect(inited_db) as db:
+        assert db.execute("SELECT min(created_at), count(*) FROM leads").fetchone() == ("2026-10-08T15:00:00+00:00", 9)
+
+    assert await rebuild_lead_stats(inited_db) == 9
+    assert _aggregates(inited_db) == before
+
+
+async def test_stats_query_uses_primary_key(inited_db):
+    async with aiosqlite.connect(inited_db) as db:
+        async with db.execute(
+            "EXPLAIN QUERY PLAN SELECT day, service, deadline, with_files, leads FROM lead_stats_daily "
+            "WHERE day >= ? ORDER BY day",
+            ("2026-10-01",),
+        ) as cur:
+            plan = " ".join(row[-1] for row in await cur.fetchall())
+    assert "USING PRIMARY KEY (day>?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+async def test_load_and_format(inited_db, monkeypatch):
+    await _random_leads(inited_db, monkeypatch, 200, seed=11)
+    oracle = _oracle(inited_db)
+
+    stats = await load_stats(7, today=date(2026, 10, 19))
+
+    week = {k: n for k, n in oracle.items() if k[0] >= "2026-10-13"}
+    assert stats.total == sum(week.values())
+    assert stats.with_files == sum(n for k, n in week.items() if k[3])
+    assert set(stats.by_day) <= {f"2026-10-{d}" for d in range(13, 20)}
+    text = format_stats(stats)
+    assert text.startswith(f"📊 <b>Заявки с 13.10.2026 (7 дн.)</b>: {stats.total}")
+    assert f"• Срочно — {stats.by_deadline['urgent']}" in text
+    assert f"• Свой срок — {stats.by_deadline[DEADLINE_CUSTOM]}" in text
+
+    empty = await load_stats(1, today=date(2027, 1, 1))
+    assert format_stats(empty) == "📊 <b>Заявки с 01.01.2027 (1 дн.)</b>: 0"
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+import pytest_asyncio
+
+from bot.db import repository
+from bot.db.repository import DuplicateLeadError
+from bot.db.storage import configure_storage, get_storage
+from bot.utils.contacts import CONTACT_PHONE
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+# Контрактные тесты хранилища заявок: одни и те же сценарии для SQLite и PostgreSQL.
+# PostgreSQL — по DSN из TEST_PG_DSN (локальный контейнер и т.п.); без него и без asyncpg — пропуск.
+PG_DSN_ENV = "TEST_PG_DSN"
+
+ADMIN = {"id": 777, "is_bot": False, "first_name": "Admin"}
+
+
+@pytest_asyncio.fixture(params=["sqlite", "postgres"])
+async def storage(request, inited_db):
+    if request.param == "sqlite":
+        # inited_db уже сделал свою SQLite хранилищем процесса
+        yield get_storage()
+        return
+    dsn = os.environ.get(PG_DSN_ENV)
+    if not dsn:
+        pytest.skip(f"{PG_DSN_ENV} не задан")
+    asyncpg = pytest.importorskip("asyncpg")
+    from bot.db.postgres import PG_TABLES, PostgresLeadStorage
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP TABLE IF EXISTS {', '.join(PG_TABLES)} CASCADE")
+    finally:
+        await conn.close()
+    pg = PostgresLeadStorage(dsn, max_size=4)
+    await pg.init()
+    # прежнее хранилище вернёт inited_db
+    configure_storage(pg)
+    yield pg
+    await pg.close()
+
+
+async def _lead(storage, *, n: int = 1, contact: str = "—", contact_type: str | None = None, **kwargs) -> int:
+    return await storage.save_lead(
+        tg_user_id=100 + n,
+        tg_username=None,
+        tg_full_name=f"User {n}",
+        service="s",
+        task="t",
+        deadline="Срочно",
+        budget=None,
+        contact=contact,
+        extra_json={"n": n},
+        contact_type=contact_type,
+        **kwargs,
+    )
+
+
+async def test_save_lead_profile_and_duplicates(storage):
+    first = await _lead(storage, contact="+79001234567", contact_type=CONTACT_PHONE, submit_token="tok")
+    with pytest.raises(DuplicateLeadError) as e:
+        await _lead(storage, submit_token="tok")
+    assert e.value.lead_id == first
+    # без токена дублей не бывает; пропущенный контакт прежний в профиле не затирает
+    second = await _lead(storage)
+
+    assert (await storage.get_lead(second))["status"] == "new"
+    assert [h["status"] for h in await storage.lead_status_history(first)] == ["new"]
+    profile = await storage.get_user_profile(101)
+    assert (profile["contact"], profile["leads_count"]) == ("+79001234567", 2)
+    third = await _lead(storage, contact="+79001234567", contact_type=CONTACT_PHONE)
+    assert await storage.find_leads_by_contact("+79001234567", exclude_id=third) == [first]
+
+
+async def test_status_transitions(storage):
+    lead_id = await _lead(storage)
+
+    taken = await storage.update_lead_status(
+        lead_id, status="in_progress", allowed_from=["new"], changed_by=777, assign=True
+    )
+    assert (taken["status"], taken["assigned_to"]) == ("in_progress", 777)
+    assert await storage.update_lead_status(lead_id, status="in_progress", allowed_from=["new"], changed_by=1) is None
+    assert [lead["id"] for lead in await storage.list_open_leads()] == [lead_id]
+    assert [lead["id"] for lead in await storage.list_assigned_leads(777)] == [lead_id]
+
+    await storage.update_lead_status(lead_id, status="done", allowed_from=["new", "in_progress"], changed_by=777)
+    assert await storage.list_open_leads() == []
+    history = await storage.lead_status_history(lead_id)
+    assert [(h["status"], h["changed_by"]) for h in history] == [("new", None), ("in_progress", 777), ("done", 777)]
+
+
+async def test_files_and_stats(storage, monkeypatch):
+    monkeypatch.setattr(repository, "_now_iso_utc_seconds", lambda: "2026-10-19T12:00:00+00:00")
+    with_files = await _lead(storage)
+    await _lead(storage, n=2)
+    await storage.save_files(lead_id=with_files, files=[{"file_type": "photo", "file_id": "F1"}, {"file_type": ""}])
+    # вторые файлы той же заявки счётчик не двигают
+    await storage.save_files(lead_id=with_files, files=[{"file_type": "document", "file_id": "D1"}])
+
+    rows = await storage.list_lead_stats(since_day="2026-10-19")
+    assert sorted((r["with_files"], r["leads"]) for r in rows) == [(0, 1), (1, 1)]
+    assert {r["deadline"] for r in rows} == {"urgent"}
+    assert await storage.rebuild_lead_stats() == 2
+    assert await storage.list_lead_stats(since_day="2026-10-19") == rows
+    assert await storage.list_lead_stats(since_day="2026-10-20") == []
+
+
+async def test_deliveries_and_relay_links_upsert(storage):
+    lead_id = await _lead(storage)
+
+    await storage.save_lead_deliveries(lead_id, [(777, "failed", 0, "blocked"), (888, "sent", 2, None)])
+    await storage.save_lead_deliveries(lead_id, [(777, "sent", 1, None)])
+    deliveries = await storage.list_lead_deliveries(lead_id)
+    assert [(d["admin_id"], d["status"], d["messages"], d["error"]) for d in deliveries] == [
+        (777, "sent", 1, None),
+        (888, "sent", 2, None),
+    ]
+
+    await storage.save_relay_links([(777, 10, lead_id, CHAT_ID, None), (777, 11, lead_id, CHAT_ID, None)])
+    await storage.save_relay_links([(777, 11, lead_id, CHAT_ID, 5)])
+    link = await storage.get_relay_link(777, 10)
+    assert link == {"lead_id": lead_id, "peer_chat_id": CHAT_ID, "peer_message_id": None}
+    assert (await storage.get_relay_link(777, 11))["peer_message_id"] == 5
+    assert await storage.get_relay_link(777, 12) is None
+
+
+async def test_expired_leads_are_fetched_and_deleted(storage, monkeypatch):
+    monkeypatch.setattr(repository, "_now_iso_utc_seconds", lambda: "2025-01-01T00:00:00+00:00")
+    old = await _lead(storage, contact="+79001234567", contact_type=CONTACT_PHONE)
+    await storage.save_files(lead_id=old, files=[{"file_type": "photo", "file_id": "F1"}])
+    await storage.save_relay_links([(777, 10, old, CHAT_ID, None)])
+    await storage.save_lead_deliveries(old, [(777, "sent", 1, None)])
+    monkeypatch.setattr(repository, "_now_iso_utc_seconds", lambda: "2026-10-19T00:00:00+00:00")
+    recent = await _lead(storage, n=2)
+
+    expired = await storage.fetch_expired_leads(created_before="2026-01-01", limit=10)
+    assert [lead["id"] for lead in expired] == [old]
+    assert [f["file_id"] for f in expired[0]["files"]] == ["F1"]
+    assert [h["status"] for h in expired[0]["history"]] == ["new"]
+
+    assert await storage.delete_leads([old]) == 1
+    # файлы, доставки и переписка — каскадом
+    assert await storage.get_relay_link(777, 10) is None
+    assert await storage.list_lead_deliveries(old) == []
+    assert await storage.fetch_expired_leads(created_before="2026-01-01", limit=10) == []
+    assert await storage.get_lead(recent) is not None
+    # счётчики дня ушедшей в архив заявки пересчёт не стирает
+    stats = await storage.list_lead_stats(since_day="2025-01-01")
+    assert await storage.rebuild_lead_stats() == 1
+    assert await storage.list_lead_stats(since_day="2025-01-01") == stats
+    assert [r["day"] for r in stats] == ["2025-01-01", "2026-10-19"]
+    assert await storage.delete_stale_profiles(updated_before="2026-01-01") == 1
+    assert await storage.get_user_profile(101) is None
+    assert await storage.reclaim_space(100) >= 0
+
+
+async def test_lead_flow_goes_through_storage(project_dispatcher, settings, storage):
+    bot, session = fake_bot()
+    user = ChatDriver(project_dispatcher, bot, session)
+    admin = ChatDriver(project_dispatcher, bot, session, user=ADMIN)
+    await project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID).clear()
+
+    await user.send("✅ Оставить заявку")
+    await user.press("svc:5")
+    await user.send("Ролик к юбилею")
+    await user.press("deadline:week")
+    await user.send("⏭ Пропустить")
+    await user.press("lead:send")
+
+    [lead] = await storage.list_open_leads()
+    assert (lead["tg_user_id"], lead["status"]) == (CHAT_ID, "new")
+    assert [d["admin_id"] for d in await storage.list_lead_deliveries(lead["id"])] == [ADMIN["id"]]
+    notification = next(
+        m for m in session.messages.values() if m.chat.id == ADMIN["id"] and (m.text or "").startswith("🆕")
+    )
+    # ответ админа находит заявку по связке в хранилище
+    await admin.send("Добрый день!", reply_to_message=notification)
+    assert session.calls["copyMessage"] == 1
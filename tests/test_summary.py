@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from aiogram.methods import EditMessageText, SendMessage
+
+from bot.constants.services import SERVICE_ID_TO_TITLE
+from bot.services.content import validate_telegram_html
+from bot.services.summary import SUMMARY_CACHE_KEY, render_summary, summary_text
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+DATA = {
+    "service": SERVICE_ID_TO_TITLE["restoration"],
+    "service_id": "restoration",
+    "task": "Тип: Фото\nубрать <царапины> & пятна",
+    "deadline_key": "custom",
+    "deadline_custom_text": "до <пятницы>",
+    "contact": "<@user>",
+    "files": [{"file_type": "photo", "file_id": "x"}],
+}
+
+
+def test_user_input_is_escaped():
+    text = summary_text(DATA)
+    assert validate_telegram_html(text) == []
+    assert "убрать &lt;царапины&gt; &amp; пятна" in text
+    assert "<b>Срок:</b> до &lt;пятницы&gt;" in text
+    assert "<b>Контакт:</b> &lt;@user&gt;" in text
+    assert "<b>Файлы:</b> 1" in text
+
+
+def test_layout_without_optional_parts():
+    assert summary_text({}) == (
+        "<b>Проверь заявку</b>\n\n"
+        "<b>Услуга:</b> —\n<b>Задача:</b> —\n<b>Срок:</b> —\n<b>Контакт:</b> —\n\n"
+        "Если всё верно — жми «Отправить»."
+    )
+
+
+def test_fragments_are_reused_until_their_field_changes():
+    text, cache = render_summary(DATA)
+    # подменённые фрагменты видны в тексте — значит, взяты из кэша, а не пересобраны
+    cache["task"][1] = "TASK"
+    cache["contact"][1] = "CONTACT"
+    cached_text, cache = render_summary({**DATA, SUMMARY_CACHE_KEY: cache})
+    assert "TASK" in cached_text and "CONTACT" in cached_text
+
+    changed, cache = render_summary({**DATA, "contact": "@new", SUMMARY_CACHE_KEY: cache})
+    assert "TASK" in changed and "<b>Контакт:</b> @new" in changed
+
+    # смена услуги меняет подпись задачи — фрагмент task тоже пересобирается
+    neuro, _ = render_summary({**DATA, "service_id": "neuro", SUMMARY_CACHE_KEY: cache})
+    assert "TASK" not in neuro and "<b>Пожелания:</b>" in neuro
+
+
+async def test_confirm_screen_escapes_and_caches(project_dispatcher, settings):
+    bot, session = fake_bot()
+    chat = ChatDriver(project_dispatcher, bot, session)
+    state = project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send("ролик <на юбилей>")
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+
+    screens = [r.text for r in session.requests if isinstance(r, (SendMessage, EditMessageText))]
+    assert "ролик &lt;на юбилей&gt;" in screens[-1]
+    assert validate_telegram_html(screens[-1]) == []
+    assert (await state.get_data())[SUMMARY_CACHE_KEY]["task"][0][-1] == "ролик <на юбилей>"
+    await state.clear()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import html
+import random
+
+import pytest
+from aiogram.methods import SendMessage
+
+from bot.services.content import validate_telegram_html
+from bot.services.leads import format_admin_message
+from bot.services.summary import summary_text
+from bot.utils.text import TELEGRAM_TEXT_LIMIT, clip, escape_html, split_html, utf16_len
+from tests.fake_telegram import CHAT_ID, ChatDriver, fake_bot
+
+# алфавит фаззинга: разметка, кириллица, emoji вне BMP (2 единицы UTF-16), переводы строк
+_ALPHABET = ["a", "я", " ", " ", "\n", "<", ">", "&", ";", "😀", "🧠", "b", "1"]
+
+
+def _random_text(rng: random.Random, size: int) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(size))
+
+
+def _random_html(rng: random.Random, size: int) -> str:
+    """Похоже на вывод билдеров: строки «<b>Метка:</b> экранированный ввод»."""
+    lines = []
+    while sum(map(len, lines)) < size:
+        user = _random_text(rng, rng.randint(0, size // 3)).replace("\n", " ")
+        lines.append(f"<b>Поле {len(lines)}:</b> {escape_html(user)}")
+        if rng.random() < 0.2:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def test_escape_matches_stdlib():
+    for seed in range(200):
+        text = _random_text(random.Random(seed), 300)
+        assert escape_html(text) == html.escape(text, quote=False)
+    assert escape_html(None) == "None"
+    plain = "без спецсимволов"
+    assert escape_html(plain) is plain
+
+
+def test_utf16_len():
+    assert utf16_len("abc") == 3
+    assert utf16_len("я") == 1
+    assert utf16_len("😀") == 2
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_split_fuzz(seed):
+    rng = random.Random(seed)
+    limit = rng.choice([16, 64, 200, TELEGRAM_TEXT_LIMIT])
+    text = _random_html(rng, rng.randint(0, limit * 4))
+
+    chunks = split_html(text, limit)
+
+    assert all(utf16_len(chunk) <= limit for chunk in chunks)
+    assert all(chunk.strip() for chunk in chunks)
+    # режем только между символами: без пробельных символов всё на месте и по порядку
+    assert "".join("".join(chunks).split()) == "".join(text.split())
+    # теги и сущности не разрезаны (если строка с разметкой вообще помещается в лимит)
+    if all(utf16_len(line) <= limit for line in text.split("\n")):
+        assert all(validate_telegram_html(chunk) == [] for chunk in chunks)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_split_long_user_line_keeps_entities(seed):
+    rng = random.Random(seed)
+    text = escape_html(_random_text(rng, 2000).replace("\n", " "))
+    for chunk in split_html(text, 100):
+        assert validate_telegram_html(chunk) == [], chunk
+
+
+def test_split_prefers_line_boundaries():
+    text = "\n".join(["x" * 30] * 5)
+    assert split_html(text, 70) == ["x" * 30 + "\n" + "x" * 30] * 2 + ["x" * 30]
+    assert split_html(text) == [text]
+    assert split_html("\n \n") == []
+
+
+def test_clip():
+    assert clip("короткий", 100) == "короткий"
+    clipped = clip("😀" * 100, 11)
+    assert clipped == "😀" * 5 + "…" and utf16_len(clipped) <= 11
+
+
+def test_admin_message_is_escaped():
+    text = format_admin_message(
+        {"tg_full_name": "<Иван & Co>", "tg_username": "u", "task": "if a < b", "contact": "@u"},
+        [{"file_type": "doc", "file_id": "id<1>"}],
+    )
+    assert validate_telegram_html(text) == []
+    assert "От: &lt;Иван &amp; Co&gt; (@u)" in text
+    assert "- doc: id&lt;1&gt;" in text
+
+
+def test_summary_fits_one_message():
+    long_text = "длинно <текст> & " * 1000
+    text = summary_text(
+        {"service": "x", "task": long_text, "contact": long_text, "deadline_key": "custom", "deadline_custom_text": long_text}
+    )
+    # лимит Telegram считается по тексту после разбора сущностей
+    visible = html.unescape(text.replace("<b>", "").replace("</b>", ""))
+    assert utf16_len(visible) <= TELEGRAM_TEXT_LIMIT
+    assert validate_telegram_html(text) == []
+
+
+async def test_long_lead_reaches_admin_in_parts(project_dispatcher, settings):
+    bot, session = fake_bot()
+    chat = ChatDriver(project_dispatcher, bot, session)
+    state = project_dispatcher.fsm.get_context(bot, CHAT_ID, CHAT_ID)
+    await state.clear()
+
+    await chat.send("✅ Оставить заявку")
+    await chat.press("svc:5")
+    await chat.send(("строка задачи <с разметкой> & символами\n" * 150).strip())
+    await chat.press("deadline:week")
+    await chat.send("⏭ Пропустить")
+    await chat.press("lead:send")
+
+    to_admin = [r.text for r in session.requests if isinstance(r, SendMessage) and r.chat_id == settings.admin_tg_id]
+    assert len(to_admin) >= 2
+    assert all(utf16_len(t) <= TELEGRAM_TEXT_LIMIT and validate_telegram_html(t) == [] for t in to_admin)
+    assert to_admin[0].startswith("🆕 Новая заявка")
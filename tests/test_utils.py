@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.utils.album import AlbumCollector
+from bot.utils.lru import LruCache
+from bot.utils.media import extract_media, lead_file
+from bot.utils.rate_limit import PerKeyCooldown
+
+
+def _msg(message_id: int, group: str | None = None):
+    return SimpleNamespace(message_id=message_id, media_group_id=group)
+
+
+@pytest.mark.asyncio
+async def test_album_collector_returns_whole_album_once():
+    collector = AlbumCollector(latency=0.01)
+    results = await asyncio.gather(*(collector.collect(_msg(i, "G")) for i in (3, 1, 2)))
+
+    albums = [r for r in results if r is not None]
+    assert len(albums) == 1
+    assert [m.message_id for m in albums[0]] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_album_collector_single_message_passes_through():
+    collector = AlbumCollector(latency=10)
+    single = _msg(7)
+    assert await collector.collect(single) == [single]
+
+
+def test_per_key_cooldown():
+    now = [0.0]
+    cooldown = PerKeyCooldown(60, clock=lambda: now[0])
+
+    assert cooldown.hit(1)
+    assert not cooldown.hit(1)
+    assert cooldown.hit(2)
+
+    now[0] = 61
+    assert cooldown.hit(1)
+
+
+def test_lead_file_maps_media_kinds():
+    def media(photo=None, video=None, document=None):
+        return SimpleNamespace(photo=photo, video=video, document=document)
+
+    doc = media(document=SimpleNamespace(file_id="D"))
+    photo = media(photo=[SimpleNamespace(file_id="small"), SimpleNamespace(file_id="big")])
+
+    assert extract_media(doc) == ("document", "D")
+    assert lead_file(doc) == {"file_type": "doc", "file_id": "D"}
+    assert lead_file(doc, document_type="document_image") == {"file_type": "document_image", "file_id": "D"}
+    assert lead_file(photo) == {"file_type": "photo", "file_id": "big"}
+    assert lead_file(media(video=SimpleNamespace(file_id="V"))) == {"file_type": "video", "file_id": "V"}
+    assert lead_file(media()) is None
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LruCache[str, int | None] = LruCache(2)
+    cache.put("a", 1)
+    cache.put("miss", None)
+    assert cache.get("a") == 1
+    cache.put("b", 2)
+
+    # «miss» использовался давнее всех — вытеснен; None от отсутствия отличает `in`
+    assert "miss" not in cache and len(cache) == 2
+    assert cache.get("a") == 1 and cache.get("b") == 2
+    cache.put("miss", None)
+    assert "miss" in cache and cache.get("miss") is None and "a" not in cache
+    assert cache.pop("miss") is None and len(cache) == 1